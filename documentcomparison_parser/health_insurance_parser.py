@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
+import contextvars
+import hashlib
 import logging
+import time
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
@@ -11,6 +15,11 @@ from langchain_core.messages import HumanMessage
 from langchain_groq import ChatGroq
 
 from .utils import (
+    RELEVANCE_BENCHMARK_FILE,
+    build_relevance_scorer,
+    calibrate_relevance,
+    chunk_pdf_by_structure,
+    count_benefit_values,
     deep_merge_extraction,
     extract_text_from_pdf,
     load_groq_key,
@@ -31,6 +40,14 @@ class InsuranceComparisonParser:
     CHUNK_CHARS = 8000
     CHUNK_OVERLAP = 500
     MAX_PROMPT_CHUNK = 8000
+    MAX_CHUNK_CONCURRENCY = 4
+    CHUNK_TOKENS = 2000
+    # Chunks scoring below this (see utils.build_relevance_scorer) are not sent to the LLM
+    # (from `--calibrate` on data/relevance_benchmark.json: benefit chunks score 26 and up,
+    # definitions, exclusions and T&C at most 14)
+    MIN_RELEVANCE = 20.0
+    # Chunks with at least this many AED amounts, percentages or table rows are always sent
+    MIN_BENEFIT_VALUES = 3
     DEFAULT_PROMPT_YAML = Path(__file__).resolve().parent / "prompts" / "uae_health_insurance.yaml"
 
     def __init__(
@@ -42,11 +59,18 @@ class InsuranceComparisonParser:
         chunk_size: int | None = None,
         chunk_overlap: int | None = None,
         max_prompt_chunk: int | None = None,
+        max_concurrency: int | None = None,
+        chunk_tokens: int | None = None,
+        min_relevance: float | None = None,
+        min_benefit_values: int | None = None,
         prompt_template: str | None = None,
         prompt_yaml_path: str | Path | None = None,
         text_extractor: Callable[[str | Path], str] = extract_text_from_pdf,
         json_parser: Callable[[str], dict[str, Any] | None] = parse_json_from_llm,
         merge_func: Callable[[dict[str, Any], dict[str, Any]], dict[str, Any]] = deep_merge_extraction,
+        llm_factory: Callable[..., ChatGroq] | None = None,
+        chunker: Callable[[str | Path], list[str]] | None = None,
+        relevance_scorer: Callable[[str], float] | None = None,
     ) -> None:
         self._api_key = (api_key or "").strip()
         self._model_name = model_name or self.DEFAULT_MODEL
@@ -54,6 +78,7 @@ class InsuranceComparisonParser:
         self._chunk_size = self.CHUNK_CHARS if chunk_size is None else chunk_size
         self._chunk_overlap = self.CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap
         self._max_prompt_chunk = self.MAX_PROMPT_CHUNK if max_prompt_chunk is None else max_prompt_chunk
+        self._max_concurrency = max(1, self.MAX_CHUNK_CONCURRENCY if max_concurrency is None else max_concurrency)
         self._prompt_template = (
             prompt_template
             if isinstance(prompt_template, str) and prompt_template.strip()
@@ -62,36 +87,172 @@ class InsuranceComparisonParser:
         self._text_extractor = text_extractor
         self._json_parser = json_parser
         self._merge_func = merge_func
+        self._llm_factory = llm_factory or _new_llm
+        self._chunk_tokens = self.CHUNK_TOKENS if chunk_tokens is None else chunk_tokens
+        # Section/table-aware chunks straight from the PDF layout, unless the caller supplied
+        # its own text extractor (then its text is cut into overlapping character windows)
+        if chunker is None and text_extractor is extract_text_from_pdf:
+            chunker = self._structured_chunks
+        self._chunker = chunker
+        self._min_relevance = self.MIN_RELEVANCE if min_relevance is None else min_relevance
+        self._min_benefit_values = self.MIN_BENEFIT_VALUES if min_benefit_values is None else min_benefit_values
+        self._relevance_scorer = relevance_scorer or build_relevance_scorer(self._prompt_template)
+
+    @property
+    def cache_version(self) -> str:
+        """Hash of everything that shapes :meth:`extract` output: model, prompt template,
+        chunking and relevance settings. Results cached under another version are stale."""
+        parts = [
+            self._model_name,
+            str(self._temperature),
+            self._prompt_template,
+            "structured" if self._chunker == self._structured_chunks else "windows",
+            f"{self._chunk_tokens}/{self._chunk_size}/{self._chunk_overlap}/{self._max_prompt_chunk}",
+            f"{self._min_relevance}/{self._min_benefit_values}",
+        ]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()[:16]
 
     def extract(self, pdf_path: str | Path) -> dict[str, Any]:
+        merged, _ = self.extract_with_stats(pdf_path)
+        return merged
+
+    def extract_with_stats(self, pdf_path: str | Path) -> tuple[dict[str, Any], dict[str, Any]]:
+        """Like :meth:`extract`, also returning per-chunk latency and token usage.
+
+        Chunks are sent to the LLM concurrently (at most ``max_concurrency`` per document)
+        and merged in chunk order, so the result does not depend on which call finishes first.
+        """
         key = self._api_key or load_groq_key()
         if not key:
             raise ValueError(
                 "GROQ_API_KEY is missing: add it to .env in the project root or pass api_key=..."
             )
 
-        llm = ChatGroq(
-            groq_api_key=key,
-            model_name=self._model_name,
-            temperature=self._temperature,
+        llm = self._llm_factory(model=self._model_name, temperature=self._temperature, api_key=key)
+
+        started = time.perf_counter()
+        if self._chunker is not None:
+            chunks = self._chunker(pdf_path)
+        else:
+            raw_text = self._text_extractor(pdf_path)
+            chunks = _split_text(raw_text, chunk_size=self._chunk_size, chunk_overlap=self._chunk_overlap)
+        chunks = [chunk for chunk in chunks if chunk.strip()] or [""]
+        text_seconds = time.perf_counter() - started
+
+        selected, skipped = self._select_relevant(chunks)
+        if skipped:
+            logger.info(
+                "%s: skipping %s of %s chunks with no benefit/pricing content (scores %s)",
+                Path(pdf_path).name,
+                len(skipped),
+                len(chunks),
+                [item["score"] for item in skipped],
+            )
+
+        workers = min(self._max_concurrency, len(selected))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chunk-extract") as executor:
+            # Each call runs in a copy of this context (keeps the caller's LLM lane)
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._extract_chunk, llm, i, chunks[i])
+                for i in selected
+            ]
+            try:
+                results = [future.result() for future in futures]
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        merged: dict[str, Any] = {}
+        for data, _ in results:
+            if data is not None:
+                self._merge_func(merged, data)
+
+        chunk_stats = [chunk_stat for _, chunk_stat in results]
+        stats = {
+            "chunks": len(chunks),
+            "sent_chunks": len(selected),
+            "chunk_chars": sum(len(chunk) for chunk in chunks),
+            "concurrency": workers,
+            "text_seconds": round(text_seconds, 3),
+            "seconds": round(time.perf_counter() - started, 3),
+            "llm_seconds": round(sum(c["seconds"] for c in chunk_stats), 3),
+            "input_tokens": sum(c["input_tokens"] for c in chunk_stats),
+            "output_tokens": sum(c["output_tokens"] for c in chunk_stats),
+            "skipped_chunks": sum(1 for c in chunk_stats if not c["ok"]),
+            "chunk_stats": chunk_stats,
+            "irrelevant_chunks": skipped,
+        }
+        logger.info(
+            "%s: %s of %s chunks in %.1fs (%.1fs of LLM time, %s concurrent), %s input / %s output tokens",
+            Path(pdf_path).name,
+            stats["sent_chunks"],
+            stats["chunks"],
+            stats["seconds"],
+            stats["llm_seconds"],
+            workers,
+            stats["input_tokens"],
+            stats["output_tokens"],
         )
+        return merged, stats
+
+    def _select_relevant(self, chunks: list[str]) -> tuple[list[int], list[dict[str, Any]]]:
+        """Indices of chunks worth an LLM call, and a report of the ones skipped.
+
+        The first chunk (cover page / letterhead with the insurer's name), the best-scoring
+        chunk and every chunk with benefit values (amounts, percentages, table rows) are kept,
+        whatever their score.
+        """
+        if self._min_relevance <= 0 or len(chunks) == 1:
+            return list(range(len(chunks))), []
+        scores = [self._relevance_scorer(chunk) for chunk in chunks]
+        best = max(range(len(chunks)), key=scores.__getitem__)
+        selected: list[int] = []
+        skipped: list[dict[str, Any]] = []
+        for i, (chunk, score) in enumerate(zip(chunks, scores)):
+            values = count_benefit_values(chunk)
+            if score >= self._min_relevance or values >= self._min_benefit_values or i in (0, best):
+                selected.append(i)
+            else:
+                skipped.append(
+                    {"chunk": i, "score": score, "values": values, "chars": len(chunk), "preview": chunk[:80]}
+                )
+        return selected, skipped
 
+    def _structured_chunks(self, pdf_path: str | Path) -> list[str]:
+        chunks = chunk_pdf_by_structure(pdf_path, token_budget=self._chunk_tokens)
+        if chunks:
+            return chunks
+        # No usable layout (e.g. an unusual PDF producer): fall back to plain text windows
         raw_text = self._text_extractor(pdf_path)
-        chunks = _split_text(raw_text, chunk_size=self._chunk_size, chunk_overlap=self._chunk_overlap)
+        return _split_text(raw_text, chunk_size=self._chunk_size, chunk_overlap=self._chunk_overlap)
 
-        merged: dict[str, Any] = {}
+    def _extract_chunk(self, llm: ChatGroq, i: int, chunk: str) -> tuple[dict[str, Any] | None, dict[str, Any]]:
+        prompt = self._prompt_template.format(chunk=chunk[: self._max_prompt_chunk])
+        started = time.perf_counter()
+        response = llm.invoke([HumanMessage(content=prompt)])
+        seconds = time.perf_counter() - started
+        content = response.content if isinstance(response.content, str) else str(response.content)
+        usage = getattr(response, "usage_metadata", None) or {}
+        data = self._json_parser(content)
+        if not isinstance(data, dict):
+            logger.warning("Chunk %s: no valid JSON, skipped", i)
+            data = None
+        chunk_stat = {
+            "chunk": i,
+            "chars": len(chunk),
+            "seconds": round(seconds, 3),
+            "input_tokens": usage.get("input_tokens", 0),
+            "output_tokens": usage.get("output_tokens", 0),
+            "ok": data is not None,
+        }
+        logger.debug("Chunk %s: %.2fs, %s", i, seconds, chunk_stat)
+        return data, chunk_stat
 
-        for i, chunk in enumerate(chunks):
-            prompt = self._prompt_template.format(chunk=chunk[: self._max_prompt_chunk])
-            response = llm.invoke([HumanMessage(content=prompt)])
-            content = response.content if isinstance(response.content, str) else str(response.content)
-            data = self._json_parser(content)
-            if not isinstance(data, dict):
-                logger.warning("Chunk %s: no valid JSON, skipped", i)
-                continue
-            self._merge_func(merged, data)
 
-        return merged
+def _new_llm(*, model: str, temperature: float, api_key: str) -> ChatGroq:
+    """Default ``llm_factory``: a standalone client per ``extract`` call."""
+    return ChatGroq(groq_api_key=api_key, model_name=model, temperature=temperature)
 
 
 def _split_text(text: str, *, chunk_size: int, chunk_overlap: int) -> list[str]:
@@ -118,7 +279,20 @@ def _split_text(text: str, *, chunk_size: int, chunk_overlap: int) -> list[str]:
 
 
 if __name__ == "__main__":
+    import json
+    import sys
+
     logging.basicConfig(level=logging.INFO)
+    if "--calibrate" in sys.argv:
+        # python -m documentcomparison_parser.health_insurance_parser --calibrate
+        with open(RELEVANCE_BENCHMARK_FILE, encoding="utf-8") as f:
+            samples = json.load(f)
+        parser = InsuranceComparisonParser()
+        report = calibrate_relevance(
+            samples, parser._relevance_scorer, min_benefit_values=parser._min_benefit_values
+        )
+        print(json.dumps(report, indent=1))
+        sys.exit()
     pdf = Path(__file__).resolve().parent.parent / "Metlife_SP & Green_461k.pdf"
     parser = InsuranceComparisonParser()
     _ = parser.extract(pdf)
@@ -4,7 +4,10 @@ import json
 import logging
 import os
 import re
+import statistics
+from collections import Counter
 from collections.abc import Callable
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
@@ -89,6 +92,349 @@ def split_text(text: str, *, chunk_size: int, chunk_overlap: int) -> list[str]:
     return chunks
 
 
+CHARS_PER_TOKEN = 4
+# Font size ratio to the body text that marks a heading
+HEADING_SIZE_RATIO = 1.15
+# Top/bottom share of the page where running headers and footers live
+PAGE_MARGIN_RATIO = 0.1
+# A section that does not fit starts a new chunk only once the current one is this full
+SECTION_BREAK_FILL = 0.75
+
+
+@dataclass
+class PdfBlock:
+    """A paragraph or table from one PDF page, in reading order."""
+
+    page: int
+    text: str
+    top: float
+    bottom: float
+    page_height: float
+    is_heading: bool = False
+    is_table: bool = False
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _clean_line(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _table_text(table: Any) -> str:
+    rows = []
+    for row in table.extract():
+        cells = [_clean_line(cell) for cell in row if cell and cell.strip()]
+        if cells:
+            rows.append(" | ".join(cells))
+    return "\n".join(rows)
+
+
+def _inside(bbox: tuple[float, ...], region: tuple[float, ...]) -> bool:
+    x0, y0, x1, y1 = bbox
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    return region[0] <= cx <= region[2] and region[1] <= cy <= region[3]
+
+
+def extract_blocks_from_pdf(pdf_path: str | Path, *, detect_tables: bool = True) -> list[PdfBlock]:
+    """Text blocks with heading and table structure, using PyMuPDF's layout information.
+
+    Table regions (``page.find_tables()``) become one block each, rows rendered as
+    ``cell | cell``. Blocks set in a font noticeably larger than the body text are headings.
+    """
+    if fitz is None:
+        raise ImportError("PyMuPDF is required. Install it via `pip install pymupdf`.")
+    doc = fitz.open(Path(pdf_path))
+    raw: list[tuple[PdfBlock, float]] = []
+    try:
+        for page in doc:
+            height = page.rect.height
+            tables = []
+            if detect_tables:
+                try:
+                    tables = [table for table in page.find_tables().tables if table.row_count]
+                except Exception as e:  # pragma: no cover - layout analysis is best effort
+                    logger.debug("Table detection failed on page %s: %s", page.number + 1, e)
+            items: list[tuple[float, PdfBlock, float]] = []
+            for table in tables:
+                text = _table_text(table)
+                if text:
+                    block = PdfBlock(page.number + 1, text, table.bbox[1], table.bbox[3], height, is_table=True)
+                    items.append((table.bbox[1], block, 0.0))
+            for block in page.get_text("dict")["blocks"]:
+                if block.get("type") != 0:
+                    continue
+                if any(_inside(block["bbox"], table.bbox) for table in tables):
+                    continue
+                lines = [" ".join(span["text"] for span in line["spans"]) for line in block["lines"]]
+                text = "\n".join(line for line in (_clean_line(line) for line in lines) if line)
+                if not text:
+                    continue
+                size = max((span["size"] for line in block["lines"] for span in line["spans"]), default=0.0)
+                items.append((block["bbox"][1], PdfBlock(page.number + 1, text, block["bbox"][1], block["bbox"][3], height), size))
+            items.sort(key=lambda item: item[0])
+            raw.extend((block, size) for _, block, size in items)
+    finally:
+        doc.close()
+
+    sizes = [size for block, size in raw if size and not block.is_table]
+    body_size = statistics.median(sizes) if sizes else 0.0
+    for block, size in raw:
+        if body_size and size >= body_size * HEADING_SIZE_RATIO and len(block.text) <= 120:
+            block.is_heading = True
+    return _drop_page_furniture([block for block, _ in raw])
+
+
+def _drop_page_furniture(blocks: list[PdfBlock]) -> list[PdfBlock]:
+    """Remove running headers/footers: margin blocks repeated on most pages (page numbers ignored)."""
+    pages = {block.page for block in blocks}
+    if len(pages) < 3:
+        return blocks
+
+    def signature(block: PdfBlock) -> str | None:
+        in_margin = block.bottom <= block.page_height * PAGE_MARGIN_RATIO or block.top >= block.page_height * (
+            1 - PAGE_MARGIN_RATIO
+        )
+        return re.sub(r"\d+", "#", block.text.lower()) if in_margin and not block.is_table else None
+
+    counts: Counter[str] = Counter()
+    for page in pages:
+        counts.update({sig for b in blocks if b.page == page and (sig := signature(b))})
+    repeated = {sig for sig, count in counts.items() if count >= max(3, len(pages) // 2)}
+    return [block for block in blocks if signature(block) not in repeated]
+
+
+def _split_oversized(text: str, budget_chars: int) -> list[str]:
+    """Split text bigger than the budget at line boundaries (character windows as a last resort)."""
+    pieces: list[str] = []
+    current = ""
+    for line in text.split("\n"):
+        if len(line) > budget_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.extend(split_text(line, chunk_size=budget_chars, chunk_overlap=0))
+            continue
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > budget_chars:
+            pieces.append(current)
+            current = line
+        else:
+            current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def pack_blocks(blocks: list[PdfBlock], *, token_budget: int) -> list[str]:
+    """Pack blocks into chunks of at most ``token_budget`` (estimated) tokens along section lines.
+
+    A section is a heading plus the blocks up to the next heading. Sections are packed whole
+    while they fit. One that does not fit starts a new chunk if the current chunk is already
+    reasonably full (``SECTION_BREAK_FILL``); otherwise it continues in the current chunk and
+    is split between blocks (tables between rows), with its heading repeated at the top of the
+    next chunk as the only overlap.
+    """
+    budget_chars = max(token_budget * CHARS_PER_TOKEN, 200)
+    sections: list[list[PdfBlock]] = []
+    for block in blocks:
+        if block.is_heading or not sections:
+            sections.append([block])
+        else:
+            sections[-1].append(block)
+
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+
+    def flush() -> None:
+        nonlocal current, size
+        if current:
+            chunks.append("\n\n".join(current))
+        current, size = [], 0
+
+    def fits(text: str) -> bool:
+        return size + len(text) + (2 if current else 0) <= budget_chars
+
+    def add(text: str) -> None:
+        nonlocal size
+        size += len(text) + (2 if current else 0)
+        current.append(text)
+
+    for section in sections:
+        texts = [block.text for block in section]
+        section_size = sum(len(text) for text in texts) + 2 * len(texts)
+        if size + section_size > budget_chars and size >= budget_chars * SECTION_BREAK_FILL:
+            flush()
+
+        context = f"{texts[0]} (continued)" if section[0].is_heading else ""
+        for text in texts:
+            pieces = [text] if len(text) <= budget_chars else _split_oversized(text, budget_chars - len(context) - 2)
+            for piece in pieces:
+                if not fits(piece):
+                    flush()
+                    if context and piece != texts[0]:
+                        add(context)
+                add(piece)
+    flush()
+    return chunks
+
+
+def chunk_pdf_by_structure(
+    pdf_path: str | Path, *, token_budget: int, detect_tables: bool = True
+) -> list[str]:
+    """Structure-aware chunks for LLM extraction (see :func:`extract_blocks_from_pdf`, :func:`pack_blocks`)."""
+    return pack_blocks(extract_blocks_from_pdf(pdf_path, detect_tables=detect_tables), token_budget=token_budget)
+
+
+# Terms that mark benefit / pricing content, weighted above words taken from the prompt's field names
+RELEVANCE_CORE_TERMS = (
+    "premium",
+    "deductible",
+    "co-pay",
+    "copay",
+    "co-payment",
+    "co-insurance",
+    "coinsurance",
+    "inpatient",
+    "in-patient",
+    "outpatient",
+    "out-patient",
+    "maternity",
+    "annual limit",
+    "aggregate limit",
+    "table of benefits",
+    "category a",
+    "category b",
+    "network",
+    "vat",
+    "grand total",
+    "per person",
+    "sessions",
+)
+# Field-name words too common in policy wording (definitions, exclusions, T&C) to say
+# anything about a chunk
+_RELEVANCE_STOPWORDS = {
+    "additional",
+    "administrator",
+    "area",
+    "average",
+    "benefits",
+    "care",
+    "company",
+    "conditions",
+    "count",
+    "cover",
+    "coverage",
+    "existing",
+    "four",
+    "health",
+    "holders",
+    "life",
+    "limit",
+    "local",
+    "medical",
+    "member",
+    "members",
+    "name",
+    "notes",
+    "other",
+    "outside",
+    "person",
+    "policy",
+    "related",
+    "section",
+    "services",
+    "three",
+    "total",
+    "treatment",
+    "with",
+    "work",
+    "year",
+}
+_VALUE_PATTERN = re.compile(r"\b(?:aed|dhs?)\s*[\d,]+|\b\d{1,3}(?:\.\d+)?\s*%", re.IGNORECASE)
+
+
+def relevance_terms(prompt_template: str) -> dict[str, float]:
+    """Weighted terms for :func:`build_relevance_scorer`: the core list plus words from the
+    quoted JSON field names in the extraction prompt (e.g. ``"Room & Board"``)."""
+    terms = {term: 2.0 for term in RELEVANCE_CORE_TERMS}
+    for field in re.findall(r'"([^"{}]+)"\s*:', prompt_template):
+        for word in re.findall(r"[a-z][a-z-]{3,}", field.lower()):
+            if word not in _RELEVANCE_STOPWORDS:
+                terms.setdefault(word, 1.0)
+    return terms
+
+
+def build_relevance_scorer(prompt_template: str) -> Callable[[str], float]:
+    """Return ``score(text)``: weighted term and value (AED amounts, percentages) hits per
+    1000 characters, with table rows (``a | b``) counting as well. Benefit schedules and
+    pricing tables score high; definitions, exclusions and T&C wording score low."""
+    terms = relevance_terms(prompt_template)
+    pattern = re.compile(
+        r"(?<![a-z])(" + "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)) + r")(?![a-z])",
+        re.IGNORECASE,
+    )
+
+    def score(text: str) -> float:
+        if not text.strip():
+            return 0.0
+        hits = sum(terms.get(match.lower(), 1.0) for match in pattern.findall(text))
+        hits += len(_VALUE_PATTERN.findall(text))
+        hits += 0.5 * sum(1 for line in text.splitlines() if " | " in line)
+        return round(hits * 1000 / len(text), 2)
+
+    return score
+
+
+def count_benefit_values(text: str) -> int:
+    """AED amounts, percentages and table rows (``a | b``) in ``text``. Unlike the relevance
+    score this does not depend on the chunk's length, so a benefit table packed together with
+    pages of policy wording is still recognised."""
+    rows = sum(1 for line in text.splitlines() if " | " in line)
+    return len(_VALUE_PATTERN.findall(text)) + rows
+
+
+# Labelled chunks (benefit/pricing vs definitions, exclusions, T&C) behind the parser's MIN_RELEVANCE
+RELEVANCE_BENCHMARK_FILE = Path(__file__).resolve().parent / "data" / "relevance_benchmark.json"
+
+
+def calibrate_relevance(
+    samples: list[dict[str, Any]],
+    scorer: Callable[[str], float],
+    *,
+    min_benefit_values: int,
+    thresholds: list[float] | None = None,
+) -> dict[str, Any]:
+    """Measure chunk selection on labelled samples (``[{"text", "kind", "relevant"}]``, see
+    :data:`RELEVANCE_BENCHMARK_FILE`) at each relevance threshold.
+
+    A sample is sent when it scores at least the threshold or has ``min_benefit_values`` values,
+    as in the parser. Returns per-threshold counts of relevant samples dropped and irrelevant
+    ones sent, and ``recommended``: the middle of the thresholds with neither, so the cut keeps
+    a margin on both sides.
+    """
+    thresholds = thresholds or [float(t) for t in range(10, 32, 2)]
+    scored = [(scorer(s["text"]), count_benefit_values(s["text"]), s["relevant"]) for s in samples]
+    rows = []
+    for threshold in thresholds:
+        sent = [relevant for score, values, relevant in scored if score >= threshold or values >= min_benefit_values]
+        rows.append({
+            "threshold": threshold,
+            "dropped_relevant": sum(1 for *_, relevant in scored if relevant) - sum(sent),
+            "sent_irrelevant": len(sent) - sum(sent),
+        })
+    safe = [row["threshold"] for row in rows if not row["dropped_relevant"] and not row["sent_irrelevant"]]
+    return {
+        "samples": len(scored),
+        "relevant_scores": sorted(score for score, _, relevant in scored if relevant)[:3],
+        "irrelevant_scores": sorted(score for score, _, relevant in scored if not relevant)[-3:],
+        "thresholds": rows,
+        "recommended": safe[(len(safe) - 1) // 2] if safe else None,
+    }
+
+
 def parse_json_from_llm(content: str) -> dict[str, Any] | None:
     """Strip optional markdown fences and parse the first JSON object."""
     text = content.strip()
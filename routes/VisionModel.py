@@ -1,14 +1,18 @@
 from json import load
 import logging
 import os
-import base64
-import io
 import mimetypes
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from pathlib import Path
 
 # Import libraries
 from langchain_core.messages import HumanMessage
-from langchain_groq import ChatGroq
+from services.llm_clients import get_llm
+from services.vision_encoder import encode_for_vision, render_zoom
 from PIL import Image
 import fitz  # PyMuPDF for PDF processing
 from dotenv import load_dotenv
@@ -16,6 +20,19 @@ from dotenv import load_dotenv
 load_dotenv()
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Pages of one PDF sent to the vision model at the same time (1 = one after another)
+VISION_OCR_MAX_WORKERS = int(os.getenv('VISION_OCR_MAX_WORKERS', '4'))
+# Seconds to wait for a whole PDF before returning the pages finished so far
+VISION_OCR_TIMEOUT = float(os.getenv('VISION_OCR_TIMEOUT', '180'))
+# Pages whose embedded text layer has at least this many letters/digits are read
+# directly instead of being rendered and sent to the vision model (0 = always OCR)
+PDF_TEXT_LAYER_MIN_CHARS = int(os.getenv('PDF_TEXT_LAYER_MIN_CHARS', '40'))
+# ...unless images cover at least this share of the page: a scan with a caption,
+# stamp or partial OCR layer still goes to the vision model
+PDF_TEXT_LAYER_MAX_IMAGE_COVERAGE = float(os.getenv('PDF_TEXT_LAYER_MAX_IMAGE_COVERAGE', '0.5'))
+
+
 class DocumentVisionOCR:
     def __init__(self, api_key=None, model=None, max_tokens=1000, temperature=0.2):
         """
@@ -35,28 +52,23 @@ class DocumentVisionOCR:
         if not self.model:
             raise ValueError("VISION_MODEL not found. Please specify a model.")
         
-        self.chat = ChatGroq(
-            groq_api_key=self.api_key,
-            model=self.model,
-            temperature=temperature,
-            max_tokens=max_tokens
+        # Shared across instances, so a per-upload DocumentVisionOCR reuses the pool
+        self.chat = get_llm(
+            self.model, temperature, max_tokens=max_tokens, api_key=self.api_key
         )
         logging.info(f"Initialized DocumentVisionOCR with model: {self.model}")
         
-    def encode_image(self, image, max_size=(1000, 1000), quality=85):
-        """Encode image to base64 with resizing if needed"""
-        # Resize if image is too large
-        if image.width > max_size[0] or image.height > max_size[1]:
-            image = image.resize(
-                (min(image.width, max_size[0]), 
-                min(image.height, max_size[1])),
-                Image.LANCZOS
-            )
+    def encode_image(self, image):
+        """
+        Encode image to base64, cropped, downscaled and compressed for the vision model
         
-        # Save with compression
-        buffered = io.BytesIO()
-        image.save(buffered, format="JPEG", quality=quality)
-        return base64.b64encode(buffered.getvalue()).decode('utf-8')
+        Args:
+            image (PIL.Image): PIL Image object
+            
+        Returns:
+            str: Base64 encoded image (see services.vision_encoder for the format)
+        """
+        return encode_for_vision(image).data
         
     def extract_text_from_image(self, image, prompt=None):
         """
@@ -69,8 +81,8 @@ class DocumentVisionOCR:
         Returns:
             str: Extracted text from the image
         """
-        # Encode image
-        base64_image = self.encode_image(image)
+        # Crop, downscale and compress to the model's input resolution
+        encoded = encode_for_vision(image)
         
         # Use default or custom prompt
         text_prompt = prompt or (
@@ -85,7 +97,7 @@ class DocumentVisionOCR:
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:image/png;base64,{base64_image}"
+                            "url": encoded.data_url
                         }
                     },
                     {
@@ -96,57 +108,178 @@ class DocumentVisionOCR:
             )
             
             # Invoke OCR
-            logging.info("Sending image to vision model for text extraction")
+            logging.info(f"Sending image to vision model for text extraction ({encoded.size} bytes)")
             response = self.chat.invoke([msg])
             return response.content
         except Exception as e:
             logging.error(f"Text Extraction Error: {e}")
             return None
     
-    def extract_text_from_pdf(self, pdf_path, dpi=300, prompt=None):
+    @staticmethod
+    def image_coverage(page):
+        """
+        Share of the page area (0 to 1) covered by images drawn on it
         """
-        Extract text from a PDF file by converting pages to images
-        and performing OCR on each page
+        page_area = abs(page.rect)
+        if not page_area:
+            return 0.0
+        covered = 0.0
+        for info in page.get_image_info():
+            # Clip to the page: scans are often placed slightly larger than it
+            covered += abs(fitz.Rect(info["bbox"]) & page.rect)
+        return min(1.0, covered / page_area)
+
+    @staticmethod
+    def page_text_layer(page, min_chars=None, max_image_coverage=None):
+        """
+        Return the page's embedded text if it is enough to skip OCR, else None
+        
+        Scanned pages have no text layer (or only a few stray characters, e.g.
+        a stamp or page number), so they fall below min_chars. Pages mostly
+        covered by images (max_image_coverage or more) are OCR'd whatever their
+        text layer says: the text is then usually a caption, header or an
+        incomplete OCR layer, not the content of the scan.
+        """
+        min_chars = PDF_TEXT_LAYER_MIN_CHARS if min_chars is None else min_chars
+        if max_image_coverage is None:
+            max_image_coverage = PDF_TEXT_LAYER_MAX_IMAGE_COVERAGE
+        if min_chars <= 0:
+            return None
+        text = page.get_text("text").strip()
+        if sum(char.isalnum() for char in text) < min_chars:
+            return None
+        if DocumentVisionOCR.image_coverage(page) >= max_image_coverage:
+            return None
+        return text
+        
+    def extract_pdf_pages(self, pdf_path, dpi=300, prompt=None,
+                          max_workers=None, timeout=None, text_layer=True):
+        """
+        Extract text from every page of a PDF, reading the embedded text layer
+        where there is one and running vision OCR only on image-only pages
+        
+        OCR pages are rendered one at a time in this thread and each page is sent
+        to the vision model as soon as it is rendered, with at most max_workers
+        pages in flight (rendered pages waiting for OCR count as in flight, so
+        memory stays bounded). If the document is not done within timeout
+        seconds, the pages finished so far are returned and the result is
+        flagged as partial; so is a result with a page whose OCR failed.
         
         Args:
             pdf_path (str): Path to the PDF file
             dpi (int): DPI for rendering PDF pages as images
             prompt (str, optional): Custom prompt for the vision model
+            max_workers (int, optional): Concurrent pages. Defaults to VISION_OCR_MAX_WORKERS.
+            timeout (float, optional): Seconds for the whole document. Defaults to VISION_OCR_TIMEOUT.
+            text_layer (bool): Use embedded text where available. Defaults to True.
             
         Returns:
-            dict: Dictionary with page numbers as keys and extracted text as values
+            tuple: (pages, partial). pages is a dict of page number ->
+            {"source": "text" | "ocr", "text": str}, in page order (OCR pages
+            that did not finish in time are missing), or None if the PDF could
+            not be processed. partial is True when any page is missing or has
+            no text, so the result should not be cached.
         """
+        max_workers = max(1, max_workers or VISION_OCR_MAX_WORKERS)
+        timeout = timeout or VISION_OCR_TIMEOUT
+        deadline = time.monotonic() + timeout
+        in_flight = threading.BoundedSemaphore(max_workers)
+        futures = {}
         results = {}
         
+        def ocr_page(img, page_prompt):
+            try:
+                return self.extract_text_from_image(img, prompt=page_prompt)
+            finally:
+                in_flight.release()
+        
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vision-ocr")
         try:
             # Open the PDF
             pdf_document = fitz.open(pdf_path)
             total_pages = len(pdf_document)
-            logging.info(f"Processing PDF with {total_pages} pages at {dpi} DPI")
+            logging.info(f"Processing PDF with {total_pages} pages at {dpi} DPI ({max_workers} concurrent)")
             
-            # Process each page
+            # Read text-layer pages directly; render the rest and hand them to the pool
             for page_num, page in enumerate(pdf_document):
                 page_number = page_num + 1
+                text = self.page_text_layer(page) if text_layer else None
+                if text is not None:
+                    logging.info(f"Page {page_number} of {total_pages}: using embedded text layer")
+                    results[page_number] = {"source": "text", "text": text}
+                    continue
+                if not in_flight.acquire(timeout=max(0, deadline - time.monotonic())):
+                    logging.warning(f"OCR timed out before page {page_number} of {total_pages} was rendered")
+                    break
                 logging.info(f"Processing page {page_number} of {total_pages}")
                 
-                # Convert page to an image
-                pix = page.get_pixmap(matrix=fitz.Matrix(dpi/72, dpi/72))
-                
-                # Convert to PIL Image
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                
-                # Extract text from the image
-                page_prompt = prompt or f"Extract ALL text from page {page_number} of this document. Preserve formatting."
-                extracted_text = self.extract_text_from_image(img, prompt=page_prompt)
-                
-                # Store the result
-                results[page_number] = extracted_text
+                try:
+                    # Convert page to an image, no larger than the vision model can use
+                    zoom = render_zoom(page.rect.width, page.rect.height, dpi)
+                    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+                    
+                    # Convert to PIL Image
+                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                    
+                    # Extract text from the image (keeps the caller's LLM lane)
+                    page_prompt = prompt or f"Extract ALL text from page {page_number} of this document. Preserve formatting."
+                    futures[page_number] = executor.submit(
+                        contextvars.copy_context().run, ocr_page, img, page_prompt
+                    )
+                except Exception:
+                    in_flight.release()
+                    raise
+            
+            # Collect OCR pages, keeping whatever finished before the deadline
+            for page_number, future in futures.items():
+                try:
+                    text = future.result(timeout=max(0, deadline - time.monotonic()))
+                    results[page_number] = {"source": "ocr", "text": text}
+                except FutureTimeoutError:
+                    results.update(
+                        (number, {"source": "ocr", "text": f.result()})
+                        for number, f in futures.items()
+                        if number not in results and f.done()
+                    )
+                    missing = [number for number in range(1, total_pages + 1) if number not in results]
+                    logging.warning(
+                        f"OCR timed out after {timeout}s; returning {len(results)} "
+                        f"of {total_pages} pages (missing: {missing})"
+                    )
+                    break
                 
-            return results
+            partial = len(results) < total_pages or any(
+                page["text"] is None for page in results.values()
+            )
+            return dict(sorted(results.items())), partial
             
         except Exception as e:
             logging.error(f"PDF Processing Error: {e}")
+            return None, True
+        finally:
+            # Pages still running finish in the background; queued ones are dropped
+            executor.shutdown(wait=False, cancel_futures=True)
+            
+    def extract_text_from_pdf(self, pdf_path, dpi=300, prompt=None,
+                              max_workers=None, timeout=None):
+        """
+        Extract text from a PDF file, using the embedded text layer where
+        there is one and OCR on the pages that are images
+        
+        Args:
+            pdf_path (str): Path to the PDF file
+            dpi (int): DPI for rendering PDF pages as images
+            prompt (str, optional): Custom prompt for the vision model
+            max_workers (int, optional): Concurrent OCR pages
+            timeout (float, optional): Seconds for the whole document
+            
+        Returns:
+            dict: Dictionary with page numbers as keys and extracted text as values
+        """
+        pages, _ = self.extract_pdf_pages(pdf_path, dpi, prompt, max_workers, timeout)
+        if pages is None:
             return None
+        return {page_number: page["text"] for page_number, page in pages.items()}
             
     def extract_text_from_pdf_to_string(self, pdf_path, dpi=300, prompt=None, 
                                         separator="\n\n--- Page {page_num} ---\n\n"):
@@ -163,13 +296,28 @@ class DocumentVisionOCR:
             str: Extracted text from all pages
         """
         results = self.extract_text_from_pdf(pdf_path, dpi, prompt)
+        return self.pages_to_string(results, separator)
+    
+    @staticmethod
+    def pages_to_string(results, separator="\n\n--- Page {page_num} ---\n\n"):
+        """
+        Combine per-page text into a single string
         
+        Args:
+            results (dict): Page number -> extracted text
+            separator (str): Text to insert between pages
+            
+        Returns:
+            str: Extracted text from all pages, or None if there were no pages
+        """
         if not results:
             return None
             
         # Combine all pages into a single string
         combined_text = ""
         for page_num, text in sorted(results.items()):
+            if text is None:
+                continue
             page_separator = separator.format(page_num=page_num)
             combined_text += page_separator + text
             
@@ -1,10 +1,62 @@
 import asyncio
+import os
 from fastapi import APIRouter
 from models.model import UserInput
+from services import llm_services
 from services.llm_services import process_user_input
+from services.completion_sink import completion_sink
+from services.llm_clients import close_clients, pool_stats
+from services.llm_gateway import gateway_stats
+from services.response_cache import response_cache
+from services.session_store import session_store, start_sweeper
 
 router = APIRouter()
 #Chat
 @router.post("/chat/")
 async def chat_with_bot(user_input: UserInput):
-    return process_user_input(user_input)
+    return await process_user_input(user_input)
+
+
+@router.get("/sessions/stats/")
+async def session_stats():
+    # Live sessions, evictions and approximate memory footprint of the session store
+    return await session_store.stats()
+
+
+@router.get("/assistant-cache/stats/")
+async def assistant_cache_stats():
+    # Hits and size of the general-assistant fallback reply cache
+    return response_cache.stats()
+
+
+@router.get("/llm/pool/stats/")
+async def llm_pool_stats():
+    # Connection reuse on the shared Groq pool, plus gateway queueing, throttling and retries
+    return {**pool_stats(), "gateway": gateway_stats()}
+
+
+@router.on_event("startup")
+async def start_session_sweeper():
+    # Expire idle sessions incrementally instead of wiping every session at once
+    start_sweeper()
+
+
+@router.on_event("shutdown")
+async def flush_completion_log():
+    # Write completed applications still waiting in the queue
+    await completion_sink.close()
+
+
+@router.on_event("shutdown")
+async def close_llm_clients():
+    await close_clients()
+
+
+@router.on_event("startup")
+async def build_question_catalog():
+    # Opt-in: translate the static questions in the background when no catalog exists
+    if (
+        os.getenv("QUESTION_CATALOG_BUILD_ON_STARTUP")
+        and not llm_services.question_catalog
+    ):
+        asyncio.create_task(llm_services.refresh_question_catalog())
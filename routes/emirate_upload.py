@@ -1,3 +1,4 @@
+import asyncio
 import io
 import os
 import re
@@ -6,7 +7,7 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, File, HTTPException, UploadFile
 
-from langchain_groq import ChatGroq
+from services.llm_clients import get_llm
 
 from routes.utils import extract_pdf_info1
 from utils.helper import valid_emirates_id
@@ -74,11 +75,7 @@ def _llm_extract_emirates_id_from_text(text: str) -> Optional[str]:
     """
     if not text or not text.strip():
         return None
-    llm = ChatGroq(
-        model=os.getenv("LLM_MODEL"),
-        temperature=0,
-        api_key=os.getenv("GROQ_API_KEY"),
-    )
+    llm = get_llm()
     prompt = f"""
 You are extracting an Emirates ID number from text.
 Return ONLY the Emirates ID in this exact format: 784-YYYY-NNNNNNN-C
@@ -165,7 +162,8 @@ async def extract_emirates_id_from_documents(
                 )
             elif ext in (".txt", ".docx"):
                 content = await f.read()
-                extracted, eid = _process_txt_or_docx(filename, content)
+                # Parsing and the LLM fallback block, so keep them off the event loop
+                extracted, eid = await asyncio.to_thread(_process_txt_or_docx, filename, content)
                 results.append(
                     {
                         "filename": filename,
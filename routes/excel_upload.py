@@ -1,14 +1,14 @@
 from fastapi import APIRouter, File, UploadFile, HTTPException, Form
 import os
 import tempfile
-from cachetools import TTLCache
+from services import session_store
 from routes.utils import extract_excel_sme_census
 
 # Initialize Router
 router = APIRouter()
 
 # Track user states globally if needed
-user_states = TTLCache(maxsize=1000, ttl=3600)
+user_states = session_store.namespace("excel_upload")
 
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
 
@@ -21,10 +21,6 @@ async def upload_excel_file(file: UploadFile = File(...), user_id: str = Form(..
     """
     user_id = user_id.strip()
 
-    # Initialize user state if not already present
-    if user_id not in user_states:
-        user_states[user_id] = {"responses": {}}
-
     # Get file extension and convert to lowercase
     file_extension = os.path.splitext(file.filename)[1].lower()
 
@@ -52,7 +48,10 @@ async def upload_excel_file(file: UploadFile = File(...), user_id: str = Form(..
             result = await extract_excel_sme_census(temp_file.name)
 
             # Update user state with extracted data
-            user_states[user_id]["responses"]["excel_employee_data"] = result
+            async with user_states.checkout(user_id):
+                if user_id not in user_states:
+                    user_states[user_id] = {"responses": {}}
+                user_states[user_id]["responses"]["excel_employee_data"] = result
 
             return {
                 "message": "Excel file processed successfully",
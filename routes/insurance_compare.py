@@ -1,16 +1,49 @@
 import asyncio
+import contextlib
+import hashlib
+import json
 import os
 import tempfile
 from typing import Any
 
-from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi import APIRouter, File, Header, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
 
 from documentcomparison_parser import InsuranceComparisonParser
 from documentcomparison_parser.utils import normalize_json_keys
+from services.extraction_cache import ExtractionCache
+from services.job_queue import JobQueue, JobQueueFull
+from services.llm_clients import get_llm
+from services.llm_gateway import BULK, llm_lane
 
 router = APIRouter()
 
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
+# Chunks of one PDF sent to the LLM at the same time
+CHUNK_CONCURRENCY = int(os.getenv("INSURANCE_CHUNK_CONCURRENCY", "4"))
+# Chunks scoring below this skip the LLM (0 sends every chunk)
+MIN_RELEVANCE = float(os.getenv("INSURANCE_MIN_RELEVANCE", str(InsuranceComparisonParser.MIN_RELEVANCE)))
+
+# Parsed brochures, keyed by file hash and parser version (model, prompt, chunking)
+insurance_cache = ExtractionCache(
+    db_path=os.getenv("INSURANCE_CACHE_DB", "cache/insurance_pdfs.sqlite3"),
+    max_entries=int(os.getenv("INSURANCE_CACHE_MAX_ENTRIES", "10000")),
+    ttl=int(os.getenv("INSURANCE_CACHE_TTL", str(30 * 86400))),
+    max_bytes=int(os.getenv("INSURANCE_CACHE_MAX_BYTES", str(200 * 1024 * 1024))),
+)
+
+# Background comparison jobs: PDFs parsed at the same time across all jobs
+insurance_jobs = JobQueue(
+    name="insurance",
+    workers=int(os.getenv("INSURANCE_JOB_WORKERS", "4")),
+    max_queued=int(os.getenv("INSURANCE_JOB_MAX_QUEUED", "200")),
+    retention=int(os.getenv("INSURANCE_JOB_RETENTION", str(86400))),
+)
+# Upload bytes held by queued job items, across all jobs
+JOB_MAX_QUEUED_BYTES = int(os.getenv("INSURANCE_JOB_MAX_QUEUED_BYTES", str(200 * 1024 * 1024)))
+_queued_bytes = 0
+# Seconds between keep-alive messages on an idle job event stream
+JOB_STREAM_HEARTBEAT = float(os.getenv("INSURANCE_JOB_HEARTBEAT", "15"))
 
 SECTION_KEY_RENAMES = {
     "section_1_policy_scope": "benefits_section",
@@ -37,28 +70,49 @@ async def _parse_one_pdf(
     semaphore: asyncio.Semaphore,
 ) -> dict[str, Any]:
     filename = file.filename or "unknown.pdf"
+    try:
+        content = await file.read()
+    except Exception as e:
+        return {"filename": filename, "ok": False, "error": str(e)}
+    return await _parse_pdf_content(
+        filename=filename, content=content, parser=parser, semaphore=semaphore
+    )
 
+
+async def _parse_pdf_content(
+    *,
+    filename: str,
+    content: bytes,
+    parser: InsuranceComparisonParser,
+    semaphore: asyncio.Semaphore | None = None,
+) -> dict[str, Any]:
     if not filename.lower().endswith(".pdf"):
         return {"filename": filename, "ok": False, "error": "Only PDF files are allowed"}
 
     tmp_path: str | None = None
     try:
-        content = await file.read()
         if len(content) > MAX_FILE_SIZE:
             return {"filename": filename, "ok": False, "error": "File too large (max 10MB)"}
 
+        file_hash = await asyncio.to_thread(lambda: hashlib.sha256(content).hexdigest())
+        data = await insurance_cache.get(file_hash, "insurance_pdf", parser.cache_version)
+        if data is not None:
+            return {"filename": filename, "ok": True, "data": data, "cached": True}
+
         with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
             tmp.write(content)
             tmp.flush()
             tmp_path = tmp.name
 
-        async with semaphore:
+        async with semaphore or contextlib.nullcontext():
             data = await asyncio.to_thread(parser.extract, tmp_path)
             if isinstance(data, dict):
                 data = _rename_section_keys(data)
                 data = normalize_json_keys(data)
 
-        return {"filename": filename, "ok": True, "data": data}
+        if isinstance(data, dict) and data:
+            await insurance_cache.set(file_hash, "insurance_pdf", parser.cache_version, data)
+        return {"filename": filename, "ok": True, "data": data, "cached": False}
     except Exception as e:
         return {"filename": filename, "ok": False, "error": str(e)}
     finally:
@@ -69,6 +123,22 @@ async def _parse_one_pdf(
             pass
 
 
+async def _parse_queued_pdf(
+    *, filename: str, content: bytes, parser: InsuranceComparisonParser
+) -> dict[str, Any]:
+    global _queued_bytes
+    try:
+        return await _parse_pdf_content(filename=filename, content=content, parser=parser)
+    finally:
+        _queued_bytes -= len(content)
+
+
+def _make_parser() -> InsuranceComparisonParser:
+    return InsuranceComparisonParser(
+        llm_factory=get_llm, max_concurrency=CHUNK_CONCURRENCY, min_relevance=MIN_RELEVANCE
+    )
+
+
 @router.post("/insurance/compare-pdfs/", tags=["Insurance Comparison"])
 async def compare_insurance_pdfs(
     files: list[UploadFile] = File(...),
@@ -77,13 +147,16 @@ async def compare_insurance_pdfs(
     Upload multiple PDFs and parse each in parallel.
 
     Each successful result's ``data`` uses **snake_case** keys (e.g. ``company_name``, ``benefits_section``).
+    ``cached`` is true when the same file was parsed before with the current model and prompt.
 
     Returns per-file results so one failure doesn't fail the whole batch.
     """
     if not files:
         raise HTTPException(status_code=422, detail="No files provided")
 
-    parser = InsuranceComparisonParser()
+    # Let chat turns go ahead of the per-chunk extraction calls
+    llm_lane.set(BULK)
+    parser = _make_parser()
     cpu = os.cpu_count() or 4
     max_concurrency = max(1, min(20, len(files), cpu))
     semaphore = asyncio.Semaphore(max_concurrency)
@@ -96,3 +169,136 @@ async def compare_insurance_pdfs(
 
     return {"count": len(results), "results": results}
 
+
+@router.post("/insurance/compare-pdfs/jobs/", status_code=202, tags=["Insurance Comparison"])
+async def submit_insurance_comparison_job(
+    files: list[UploadFile] = File(...),
+):
+    """
+    Queue the PDFs for parsing and return a job ID without waiting.
+
+    Follow progress at ``events_url`` (Server-Sent Events, or NDJSON with ``?format=ndjson``):
+    one ``result`` event per file as soon as it is parsed, in completion order, then ``done``.
+    ``status_url`` returns the job's status and every result so far, in upload order,
+    and keeps returning them after the job has finished.
+
+    Non-PDF files are rejected with 422 and files over 10MB with 413, before anything is
+    queued; 429 means the queue is full.
+    """
+    global _queued_bytes
+    if not files:
+        raise HTTPException(status_code=422, detail="No files provided")
+    if not insurance_jobs.has_room(len(files)):
+        raise HTTPException(status_code=429, detail="Too many files queued, try again later")
+
+    # Uploads are closed when this request returns, so read them now: PDFs only,
+    # never more than MAX_FILE_SIZE + 1 bytes each
+    uploads = []
+    total_bytes = 0
+    for file in files:
+        filename = file.filename or "unknown.pdf"
+        if not filename.lower().endswith(".pdf"):
+            raise HTTPException(status_code=422, detail=f"{filename}: only PDF files are allowed")
+        content = await file.read(MAX_FILE_SIZE + 1)
+        if len(content) > MAX_FILE_SIZE:
+            raise HTTPException(status_code=413, detail=f"{filename}: file too large (max 10MB)")
+        uploads.append((filename, content))
+        total_bytes += len(content)
+    if _queued_bytes + total_bytes > JOB_MAX_QUEUED_BYTES:
+        raise HTTPException(status_code=429, detail="Too many uploads queued, try again later")
+
+    llm_lane.set(BULK)
+    parser = _make_parser()
+    try:
+        job = insurance_jobs.submit(
+            "insurance_compare",
+            [
+                (
+                    filename,
+                    lambda filename=filename, content=content: _parse_queued_pdf(
+                        filename=filename, content=content, parser=parser
+                    ),
+                )
+                for filename, content in uploads
+            ],
+        )
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=f"Too many files queued: {e}")
+    _queued_bytes += total_bytes
+
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "count": job.total,
+        "status_url": f"/insurance/compare-pdfs/jobs/{job.id}",
+        "events_url": f"/insurance/compare-pdfs/jobs/{job.id}/events",
+    }
+
+
+@router.get("/insurance/compare-pdfs/jobs/{job_id}", tags=["Insurance Comparison"])
+async def get_insurance_comparison_job(job_id: str):
+    """Status of a comparison job, with the results of the files parsed so far (``null`` while pending)."""
+    job = insurance_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    snapshot = job.snapshot()
+    return {**snapshot, "count": snapshot["total"]}
+
+
+@router.get("/insurance/compare-pdfs/jobs/{job_id}/events", tags=["Insurance Comparison"])
+async def stream_insurance_comparison_job(
+    job_id: str,
+    format: str = "sse",
+    since: int = 0,
+    last_event_id: str | None = Header(default=None),
+):
+    """
+    Stream a job's events until it is done.
+
+    Events already emitted are replayed first, so subscribing late loses nothing.
+    ``since`` (or the SSE ``Last-Event-ID`` header on reconnect) skips events already received.
+    """
+    job = insurance_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if format not in ("sse", "ndjson"):
+        raise HTTPException(status_code=422, detail="format must be 'sse' or 'ndjson'")
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id) + 1
+
+    async def stream():
+        async for event in job.follow(since=since, heartbeat=JOB_STREAM_HEARTBEAT):
+            if format == "ndjson":
+                payload = event if event is not None else {"event": "heartbeat", "job_id": job.id}
+                yield json.dumps(payload, ensure_ascii=False) + "\n"
+            elif event is None:
+                yield ": keep-alive\n\n"
+            else:
+                data = json.dumps(event, ensure_ascii=False)
+                yield f"id: {event['id']}\nevent: {event['event']}\ndata: {data}\n\n"
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/event-stream"
+    # Tell proxies (nginx) not to buffer the stream
+    return StreamingResponse(
+        stream(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/insurance/cache/stats/", tags=["Insurance Comparison"])
+async def insurance_cache_stats():
+    return {
+        **insurance_cache.stats(),
+        "jobs": {
+            **insurance_jobs.stats(),
+            "queued_bytes": _queued_bytes,
+            "max_queued_bytes": JOB_MAX_QUEUED_BYTES,
+        },
+    }
+
+
+@router.on_event("shutdown")
+async def stop_insurance_jobs():
+    await insurance_jobs.close()
+
@@ -5,7 +5,13 @@ Detects the language of text and optionally translates it
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from services.llm_services import translate_text, detect_language, get_language_code
+from services.llm_services import (
+    translate_batch,
+    translate_text,
+    detect_language,
+    get_language_code,
+)
+from services.translation_cache import translation_cache
 
 router = APIRouter()
 
@@ -20,7 +26,8 @@ class LanguageDetectionResponse(BaseModel):
     language_code: str
     text: str
     translated_text: str = None
-    confidence: str = "high"  # Can be enhanced with actual confidence scores
+    confidence: float = None  # 0-1 offline score; None when the LLM decided
+    detection_method: str = None  # script, ngram or llm
 
 
 @router.post("/detect-language/", response_model=LanguageDetectionResponse)
@@ -40,17 +47,19 @@ async def detect_text_language(request: LanguageDetectionRequest):
             raise HTTPException(status_code=400, detail="Text cannot be empty")
 
         # Detect language (returns dict with 'language' and 'code' keys)
-        detected_lang = detect_language(request.text)
+        detected_lang = await detect_language(request.text)
 
         response_data = {
             "detected_language": detected_lang.get("language", "English"),
             "language_code": detected_lang.get("code", "en"),
             "text": request.text,
+            "confidence": detected_lang.get("confidence"),
+            "detection_method": detected_lang.get("method"),
         }
 
         # Translate if requested
         if request.translate_to:
-            translated = translate_text(request.text, request.translate_to)
+            translated = await translate_text(request.text, request.translate_to)
             response_data["translated_text"] = translated
 
         return response_data
@@ -96,7 +105,7 @@ async def translate_endpoint(request: TranslationRequest):
         # Detect source language if not provided
         source_lang = request.source_language
         if not source_lang:
-            detected = detect_language(request.text)
+            detected = await detect_language(request.text)
             source_lang = detected.get("language", "English")
 
         # Get language codes
@@ -104,7 +113,9 @@ async def translate_endpoint(request: TranslationRequest):
         target_code = get_language_code(request.target_language)
 
         # Translate
-        translated = translate_text(request.text, request.target_language, source_lang)
+        translated = await translate_text(
+            request.text, request.target_language, source_lang
+        )
 
         return {
             "original_text": request.text,
@@ -147,23 +158,31 @@ async def normalize_texts(request: NormalizeTextRequest):
             raise HTTPException(status_code=400, detail="Texts list cannot be empty")
 
         normalized = []
-        for text in request.texts:
+        # Texts that need translating, grouped by detected source language
+        to_translate = {}
+        for index, text in enumerate(request.texts):
             if not text:
                 normalized.append("")
                 continue
 
             # Detect language and translate if needed
-            detected = detect_language(text)
+            detected = await detect_language(text)
             detected_lang = detected.get("language", "English")
 
-            if (
+            normalized.append(text)
+            if not (
                 detected_lang.lower() in [request.normalize_to.lower(), "english"]
                 and request.normalize_to.lower() == "english"
             ):
-                normalized.append(text)
-            else:
-                translated = translate_text(text, request.normalize_to, detected_lang)
-                normalized.append(translated)
+                to_translate.setdefault(detected_lang, []).append(index)
+
+        # One translation round-trip per source language
+        for detected_lang, indexes in to_translate.items():
+            translated = await translate_batch(
+                [request.texts[i] for i in indexes], request.normalize_to, detected_lang
+            )
+            for index, text in zip(indexes, translated):
+                normalized[index] = text
 
         return {
             "normalized_texts": normalized,
@@ -174,3 +193,11 @@ async def normalize_texts(request: NormalizeTextRequest):
         raise HTTPException(
             status_code=500, detail=f"Text normalization failed: {str(e)}"
         )
+
+
+@router.get("/translation-cache/stats/")
+async def translation_cache_stats():
+    """
+    Report hit/miss counters and size of the shared translation cache.
+    """
+    return translation_cache.stats()
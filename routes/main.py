@@ -1,14 +1,13 @@
 from json import load
 import logging
 import os
-import base64
-import io
 import mimetypes
 from pathlib import Path
 
 # Import libraries
 from langchain_core.messages import HumanMessage
-from langchain_groq import ChatGroq
+from services.llm_clients import get_llm
+from services.vision_encoder import encode_for_vision, render_zoom
 from PIL import Image
 import fitz  # PyMuPDF for PDF processing
 from dotenv import load_dotenv
@@ -36,27 +35,23 @@ class DocumentVisionOCR:
         if not self.model:
             raise ValueError("VISION_MODEL not found. Please specify a model.")
         
-        self.chat = ChatGroq(
-            groq_api_key=self.api_key,
-            model=self.model,
-            temperature=temperature,
-            max_tokens=max_tokens
+        # Shared across instances, so a per-upload DocumentVisionOCR reuses the pool
+        self.chat = get_llm(
+            self.model, temperature, max_tokens=max_tokens, api_key=self.api_key
         )
         logging.info(f"Initialized DocumentVisionOCR with model: {self.model}")
         
     def encode_image(self, image):
         """
-        Encode image to base64
+        Encode image to base64, cropped, downscaled and compressed for the vision model
         
         Args:
             image (PIL.Image): PIL Image object
             
         Returns:
-            str: Base64 encoded image
+            str: Base64 encoded image (see services.vision_encoder for the format)
         """
-        buffered = io.BytesIO()
-        image.save(buffered, format="PNG")
-        return base64.b64encode(buffered.getvalue()).decode('utf-8')
+        return encode_for_vision(image).data
         
     def extract_text_from_image(self, image, prompt=None):
         """
@@ -69,8 +64,8 @@ class DocumentVisionOCR:
         Returns:
             str: Extracted text from the image
         """
-        # Encode image
-        base64_image = self.encode_image(image)
+        # Crop, downscale and compress to the model's input resolution
+        encoded = encode_for_vision(image)
         
         # Use default or custom prompt
         text_prompt = prompt or (
@@ -85,7 +80,7 @@ class DocumentVisionOCR:
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:image/png;base64,{base64_image}"
+                            "url": encoded.data_url
                         }
                     },
                     {
@@ -96,7 +91,7 @@ class DocumentVisionOCR:
             )
             
             # Invoke OCR
-            logging.info("Sending image to vision model for text extraction")
+            logging.info(f"Sending image to vision model for text extraction ({encoded.size} bytes)")
             response = self.chat.invoke([msg])
             return response.content
         except Exception as e:
@@ -129,8 +124,9 @@ class DocumentVisionOCR:
                 page_number = page_num + 1
                 logging.info(f"Processing page {page_number} of {total_pages}")
                 
-                # Convert page to an image
-                pix = page.get_pixmap(matrix=fitz.Matrix(dpi/72, dpi/72))
+                # Convert page to an image, no larger than the vision model can use
+                zoom = render_zoom(page.rect.width, page.rect.height, dpi)
+                pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
                 
                 # Convert to PIL Image
                 img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
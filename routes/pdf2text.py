@@ -9,32 +9,22 @@ from routes.utils import (
     extract_pdf_driving_license,
     extract_pdf_info1,
     extract_pdf_mulkiya,
+    extraction_stats,
 )
 from typing import List, Optional
 from fastapi import APIRouter, File, UploadFile, HTTPException, Form
 import os
 import tempfile
-import asyncio
 import logging
-from cachetools import TTLCache
+from services import session_store
+from services.extraction_cache import extraction_cache
+from services.vision_encoder import vision_payload_stats
 
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
 # Initialize Route
 router = APIRouter()
 
-user_states = TTLCache(maxsize=1000, ttl=3600)
-
-
-async def clear_user_states():
-    while True:
-        await asyncio.sleep(86400)  # 24 hours in seconds
-        user_states.clear()
-        print("User states cleared")
-
-
-@router.on_event("startup")
-async def startup_event():
-    asyncio.create_task(clear_user_states())
+user_states = session_store.namespace("pdf2text")
 
 
 @router.post("/extract-pdf/", tags=["PDF Processing"])
@@ -42,8 +32,9 @@ async def upload_pdf(file: UploadFile = File(...), user_id: str = Form(...)):
     user_id = user_id.strip()
     print("pdf", user_id)
     # Initialize user state if not already present
-    if user_id not in user_states:
-        user_states[user_id] = {"document_name": file}
+    async with user_states.checkout(user_id):
+        if user_id not in user_states:
+            user_states[user_id] = {"document_name": file.filename}
 
     """
     Upload a PDF file and extract information from it.
@@ -86,8 +77,9 @@ async def upload_mulkiya_document(
     user_id = user_id.strip()
 
     # Initialize user state if not already present
-    if user_id not in user_states:
-        user_states[user_id] = {"document_name": file.filename}
+    async with user_states.checkout(user_id):
+        if user_id not in user_states:
+            user_states[user_id] = {"document_name": file.filename}
 
     # Get file extension and convert to lowercase
     file_extension = os.path.splitext(file.filename)[1].lower()
@@ -141,8 +133,9 @@ async def upload_emirate_document(
     user_id = user_id.strip()
 
     # Initialize user state if not already present
-    if user_id not in user_states:
-        user_states[user_id] = {"document_name": file.filename}
+    async with user_states.checkout(user_id):
+        if user_id not in user_states:
+            user_states[user_id] = {"document_name": file.filename}
 
     # Get file extension and convert to lowercase
     file_extension = os.path.splitext(file.filename)[1].lower()
@@ -196,8 +189,9 @@ async def upload_back_emirate_document(
     user_id = user_id.strip()
 
     # Initialize user state if not already present
-    if user_id not in user_states:
-        user_states[user_id] = {"document_name": file.filename}
+    async with user_states.checkout(user_id):
+        if user_id not in user_states:
+            user_states[user_id] = {"document_name": file.filename}
 
     # Get file extension and convert to lowercase
     file_extension = os.path.splitext(file.filename)[1].lower()
@@ -251,8 +245,9 @@ async def upload_front_emirate_document(
     user_id = user_id.strip()
 
     # Initialize user state if not already present
-    if user_id not in user_states:
-        user_states[user_id] = {"document_name": file.filename}
+    async with user_states.checkout(user_id):
+        if user_id not in user_states:
+            user_states[user_id] = {"document_name": file.filename}
 
     # Get file extension and convert to lowercase
     file_extension = os.path.splitext(file.filename)[1].lower()
@@ -325,6 +320,16 @@ def view_pdf():
 
 
 # Get all trhe pdf
+@router.get("/extraction/stats/", tags=["Document Processing"])
+async def get_extraction_stats():
+    """Per-stage timings (hash, preprocess, ocr, llm, parse) by document type, cache hits and vision payload sizes."""
+    return {
+        "stages": extraction_stats(),
+        "cache": extraction_cache.stats(),
+        "vision_payload": vision_payload_stats(),
+    }
+
+
 @router.get("/pdfs", tags=["PDF Processing"])
 def get_all_pdfs():
     pdf_directory = "pdf"
@@ -349,8 +354,9 @@ async def upload_licence_document(
     user_id = user_id.strip()
 
     # Initialize user state if not already present
-    if user_id not in user_states:
-        user_states[user_id] = {"document_name": file.filename}
+    async with user_states.checkout(user_id):
+        if user_id not in user_states:
+            user_states[user_id] = {"document_name": file.filename}
 
     # Get file extension and convert to lowercase
     file_extension = os.path.splitext(file.filename)[1].lower()
@@ -404,8 +410,9 @@ async def upload_mulkiya_document(
     user_id = user_id.strip()
 
     # Initialize user state if not already present
-    if user_id not in user_states:
-        user_states[user_id] = {"document_name": file.filename}
+    async with user_states.checkout(user_id):
+        if user_id not in user_states:
+            user_states[user_id] = {"document_name": file.filename}
 
     # Get file extension and convert to lowercase
     file_extension = os.path.splitext(file.filename)[1].lower()
@@ -1,7 +1,7 @@
 from fastapi import FastAPI, HTTPException,APIRouter
 from pydantic import BaseModel
 import os
-from langchain_groq.chat_models import ChatGroq
+from services.llm_clients import get_llm
 # from langchain_community.tools import DuckDuckGoSearchRun
 from langchain_core.tools import tool
 from langchain.agents import initialize_agent,load_tools
@@ -15,12 +15,7 @@ if not groq_api_key:
     raise RuntimeError("GROQ_API_KEY environment variable is not set")
 
 # Initialize Chat LLM and tools
-llm = ChatGroq(
-    model="llama-3.1-70b-versatile",
-    temperature=0,
-    api_key=groq_api_key,
-    groq_proxy=None
-)
+llm = get_llm("llama-3.1-70b-versatile", api_key=groq_api_key)
 
 @tool
 def chatgroq_tool(prompt: str) -> str:
@@ -49,7 +44,7 @@ class QueryRequest(BaseModel):
 @router.post("/ask/")
 async def ask(request: QueryRequest):
     try:
-        response = agent.invoke(request.message)
+        response = await agent.ainvoke(request.message)
         print(response)
         return {"response": response['output']}
     except Exception as e:
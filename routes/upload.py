@@ -1,6 +1,6 @@
 from fastapi import APIRouter, File, UploadFile, HTTPException
 import os
-from cachetools import TTLCache
+from services import session_store
 
 # Initialize Router
 router = APIRouter()
@@ -13,7 +13,7 @@ if not os.path.exists(UPLOAD_DIR):
     print(f"Created folder: {UPLOAD_DIR}")
 
 # Track user states globally if needed
-user_states = TTLCache(maxsize=1000, ttl=3600)
+user_states = session_store.namespace("upload")
 
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
 
@@ -35,9 +35,10 @@ async def upload_file(file: UploadFile = File(...), user_id: str = ""):
 
         # Update user state with file information
         if user_id:
-            if user_id not in user_states:
-                user_states[user_id] = {"responses": {}}
-            user_states[user_id]["responses"]["pre_existing_conditions_file"] = file_location
+            async with user_states.checkout(user_id):
+                if user_id not in user_states:
+                    user_states[user_id] = {"responses": {}}
+                user_states[user_id]["responses"]["pre_existing_conditions_file"] = file_location
 
         return {
             "message": "File uploaded successfully",
@@ -1,17 +1,16 @@
+import asyncio
+import hashlib
 import logging
 import re
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, NamedTuple, Optional
 from fastapi import HTTPException
-from langchain_groq import ChatGroq
+from services.extraction_cache import extraction_cache, file_sha256
+from services.llm_clients import get_llm
 from langchain.chains import create_extraction_chain
-from langchain_core.messages import HumanMessage
-from langchain_core.pydantic_v1 import BaseModel, Field
 import pytesseract
 from pdf2image import convert_from_path
-from PIL import Image, ImageFilter
-import os
-import io
-import base64
+from PIL import Image, ImageFilter, ImageOps
 import json
 
 from routes.VisionModel import DocumentVisionOCR
@@ -163,11 +162,7 @@ async def extract_pdf_drving_license(file_path: str):
         print(raw_text)
 
         # Initialize LLM and create extraction chain
-        llm = ChatGroq(
-            model=os.getenv("LLM_MODEL"),
-            temperature=0,
-            api_key=os.getenv("GROQ_API_KEY"),
-        )
+        llm = get_llm()
 
         schema = {
             "properties": {
@@ -199,8 +194,10 @@ async def extract_pdf_drving_license(file_path: str):
             ],
         }
 
-        # Extract information
-        extracted_content = create_extraction_chain(schema, llm).run(raw_text)
+        # Extract information (a blocking chain, so in a worker thread)
+        extracted_content = await asyncio.to_thread(
+            create_extraction_chain(schema, llm).run, raw_text
+        )
 
         # Combine results into a single dictionary
         result = {}
@@ -221,1165 +218,517 @@ async def extract_pdf_drving_license(file_path: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# ?Image
+# ==================== DOCUMENT EXTRACTION ENGINE ====================
+#
+# Every document type goes through the same pipeline:
+#   preprocess (images only) -> vision OCR -> LLM JSON extraction -> parse -> validate
+# Each stage is timed; extraction_stats() reports the averages per document type.
 
 
-# ?Tod just image extract
-async def extract_image_info1(file_path: str) -> Dict:
-    """
-    Extract information from  document and return as JSON
+class DocumentSpec(NamedTuple):
+    """What to extract from one kind of document."""
 
-    Args:
-        file_path (str): Path to the image file
+    name: str
+    # Prompt for the vision model (what to read off the document)
+    ocr_prompt: str
+    # Fields returned to the caller; missing ones are filled with ""
+    fields: tuple
+    # How the document is referred to in the extraction prompt
+    label: str = "this document"
+    # Fields asked for in the extraction prompt (defaults to fields)
+    prompt_fields: Optional[tuple] = None
+    # field -> callable that normalizes the extracted value (ValueError keeps the raw value)
+    validators: Optional[dict] = None
 
-    Returns:
-        Dict: Structured information extracted from the document
-    """
-    try:
-        # Preprocess the image
-        image = Image.open(file_path)
-        image = image.convert("L")  # Convert to grayscale
-        image = image.resize((
-            image.width * 2,
-            image.height * 2,
-        ))  # Resize to improve OCR accuracy
-        image = image.filter(
-            ImageFilter.SHARPEN
-        )  # Sharpen the image to improve OCR accuracy
-
-        # Extract text from JPG image
-        vision_model = DocumentVisionOCR()
-
-        # Create a specialized prompt for license documents
-        license_prompt = """
-        Extract ALL English text from this license.
-        Pay special attention to:
-        - Name
-        - Id Number
-        - Date of Birth
-        - Nationality
-        - Issuing Date
-        - Expiry Date
-        - Sex
-        - Card Number
-        - Occupation
-        - Employer
-        - Issuing Place
-        
-        Capture all text exactly as shown, preserving numbers and codes precisely.
-        If any mentioned information is missing, recheck and extract everything accurately.
-        """
 
-        # Use the extract_text_from_image method with the preprocessed image
-        vision_text = vision_model.extract_text_from_image(image, prompt=license_prompt)
-        logging.info("Extracted text from license document")
-
-        # Initialize LLM and create extraction chain
-        llm = ChatGroq(
-            model=os.getenv("LLM_MODEL"),
-            temperature=0,
-            api_key=os.getenv("GROQ_API_KEY"),
-        )
-
-        # Enhanced extraction prompt to ensure structured JSON output
-        extraction_prompt = f"""
-        Extract the following information from this document.
+EXTRACTION_PROMPT = """
+        Extract the following information from {label}.
         Respond with ONLY a valid JSON object - no explanations, no markdown formatting.
-        
+
         For dates, use format DD-MM-YYYY if possible.
         For numbers and codes, preserve exact formatting including any special characters.
         If a piece of information is not found, use an empty string.
-        
+
         Text to extract from:
-        {vision_text}
-        
+        {text}
+
         JSON format:
-        {{
-                "name": "",
-                "id_number": "",
-                "date_of_birth": "",
-                "nationality": "",
-                "issue_date": "",
-                "expiry_date": "",
-                "gender": "",
-                "card_number": "",
-                "occupation": "",
-                "employer": "",
-                "issuing_place": "",
-            }}
-        
-        
+        {json_format}
+
         IMPORTANT: Return ONLY the JSON object with no additional text, code blocks, or explanations.
         """
 
-        # Directly use the LLM to extract structured information
-        extraction_response = llm.invoke(extraction_prompt)
-        extracted_content = extraction_response.content
-        logging.info("LLM extraction completed")
-
-        # Create default empty result structure
-        default_result = {
-            "name": "",
-            "id_number": "",
-            "date_of_birth": "",
-            "nationality": "",
-            "issue_date": "",
-            "expiry_date": "",
-            "gender": "",
-            "card_number": "",
-            "occupation": "",
-            "employer": "",
-            "issuing_place": "",
-        }
-
-        # Try to parse the response as JSON
-        try:
-            # First, attempt to parse as a JSON string
-            result = json.loads(extracted_content)
-            logging.info("Successfully parsed JSON response")
-        except json.JSONDecodeError as e:
-            logging.warning(f"Direct JSON parsing failed: {e}")
-            try:
-                # Find JSON-like content between curly braces
-                start = extracted_content.find("{")
-                end = extracted_content.rfind("}") + 1
-
-                if start >= 0 and end > start:
-                    cleaned_content = extracted_content[start:end]
-                    # Replace potential newlines, tabs and fix common JSON format issues
-                    cleaned_content = cleaned_content.replace("\n", " ").replace(
-                        "\t", " "
-                    )
-                    cleaned_content = re.sub(
-                        r",\s*}", "}", cleaned_content
-                    )  # Remove trailing commas
-
-                    result = json.loads(cleaned_content)
-                    logging.info("Successfully parsed JSON after cleaning")
-                else:
-                    raise ValueError("No valid JSON structure found")
-            except (ValueError, json.JSONDecodeError) as e:
-                logging.warning(f"JSON parsing failed: {e}. Creating empty structure.")
-                result = default_result
-
-        # Ensure all expected keys are present in the result
-        for key in default_result:
-            if key not in result:
-                result[key] = ""
-
-        return result
-    except Exception as e:
-        logging.error(f"Error in extract_image_driving_license: {e}")
-        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
-
-
-async def extract_front_page_emirate(file_path: str) -> Dict:
-    """
-    Extract information from  document and return as JSON
-
-    Args:
-        file_path (str): Path to the image file
-
-    Returns:
-        Dict: Structured information extracted from the document
-    """
-    try:
-        # Preprocess the image
-        image = Image.open(file_path)
-        image = image.convert("L")  # Convert to grayscale
-        image = image.resize((
-            image.width * 2,
-            image.height * 2,
-        ))  # Resize to improve OCR accuracy
-        image = image.filter(
-            ImageFilter.SHARPEN
-        )  # Sharpen the image to improve OCR accuracy
-
-        # Extract text from JPG image
-        vision_model = DocumentVisionOCR()
-
-        # Create a specialized prompt for license documents
-        license_prompt = """
+_EMIRATES_ID_DIGITS = re.compile(r"^784\d{12}$")
+
+
+def normalize_emirates_id(value: str) -> str:
+    """Format a bare 15-digit Emirates ID as 784-YYYY-NNNNNNN-C."""
+    digits = re.sub(r"[\s-]", "", value)
+    if not _EMIRATES_ID_DIGITS.match(digits):
+        raise ValueError(f"not an Emirates ID: {value!r}")
+    return f"{digits[:3]}-{digits[3:7]}-{digits[7:14]}-{digits[14]}"
+
+
+EMIRATES_ID_FIELDS = (
+    "name",
+    "id_number",
+    "date_of_birth",
+    "nationality",
+    "issue_date",
+    "expiry_date",
+    "gender",
+    "card_number",
+    "occupation",
+    "employer",
+    "issuing_place",
+)
+DRIVING_LICENSE_FIELDS = (
+    "name",
+    "license_no",
+    "date_of_birth",
+    "nationality",
+    "issue_date",
+    "expiry_date",
+    "traffic_code_no",
+    "place_of_issue",
+    "permitted_vehicles",
+)
+MULKIYA_FIELDS = (
+    "owner",
+    "traffic_plate_no",
+    "tc_no",
+    "nationality",
+    "reg_date",
+    "expiry_date",
+    "ins_exp",
+    "policy_no",
+    "place_of_issue",
+    "model_no",
+    "number_of_pass",
+    "origin",
+    "vehicle_type",
+    "empty_weight",
+    "engine_no",
+    "chassis_no",
+)
+
+DRIVING_LICENSE_OCR_PROMPT = """
         Extract ALL English text from this license.
         Pay special attention to:
         - Name
-        - Id Number
+        - License No
         - Date of Birth
-        - Nationality
-        - Issuing Date
+        - Issue Date
         - Expiry Date
-        - Sex
-       
-        
+        - Nationality
+        - Place of Issue
+        - Traffic Code No
+        - Permitted Vehicles
+
         Capture all text exactly as shown, preserving numbers and codes precisely.
         If any mentioned information is missing, recheck and extract everything accurately.
         """
 
-        # Use the extract_text_from_image method with the preprocessed image
-        vision_text = vision_model.extract_text_from_image(image, prompt=license_prompt)
-        logging.info("Extracted text from license document")
-
-        # Initialize LLM and create extraction chain
-        llm = ChatGroq(
-            model=os.getenv("LLM_MODEL"),
-            temperature=0,
-            api_key=os.getenv("GROQ_API_KEY"),
-        )
+MULKIYA_OCR_PROMPT = """
+        Extract ALL English text from this driving license or mulkiya.
+        Pay special attention to:
+        - Owner
+        - Traffic Plate No
+        - T.C. No.
+        - Place of Issue
+        - Nationality
+        - Exp Date
+        - Reg Date
+        - Ins Exp
+        - Policy No
+        - Mortgage By
+        - Model
+        - Num of Pass
+        - Origin
+        - Vechile Type
+        - G V W
+        - Empty Weight
+        - Engine No
+        - Chassis No
 
-        # Enhanced extraction prompt to ensure structured JSON output
-        extraction_prompt = f"""
-        Extract the following information from this document.
-        Respond with ONLY a valid JSON object - no explanations, no markdown formatting.
-        
-        For dates, use format DD-MM-YYYY if possible.
-        For numbers and codes, preserve exact formatting including any special characters.
-        If a piece of information is not found, use an empty string.
-        
-        Text to extract from:
-        {vision_text}
-        
-        JSON format:
-        {{
-                "name": "",
-                "id_number": "",
-                "date_of_birth": "",
-                "nationality": "",
-                "issue_date": "",
-                "expiry_date": "",
-                "gender": "",
-              
-            }}
-        
-        
-        IMPORTANT: Return ONLY the JSON object with no additional text, code blocks, or explanations.
+        Capture all text exactly as shown, preserving numbers and codes precisely.
+        If any mentioned information is missing, recheck and extract everything accurately.
         """
 
-        # Directly use the LLM to extract structured information
-        extraction_response = llm.invoke(extraction_prompt)
-        extracted_content = extraction_response.content
-        logging.info("LLM extraction completed")
-
-        # Create default empty result structure
-        default_result = {
-            "name": "",
-            "id_number": "",
-            "date_of_birth": "",
-            "nationality": "",
-            "issue_date": "",
-            "expiry_date": "",
-            "gender": "",
-        }
-
-        # Try to parse the response as JSON
-        try:
-            # First, attempt to parse as a JSON string
-            result = json.loads(extracted_content)
-            logging.info("Successfully parsed JSON response")
-        except json.JSONDecodeError as e:
-            logging.warning(f"Direct JSON parsing failed: {e}")
-            try:
-                # Find JSON-like content between curly braces
-                start = extracted_content.find("{")
-                end = extracted_content.rfind("}") + 1
-
-                if start >= 0 and end > start:
-                    cleaned_content = extracted_content[start:end]
-                    # Replace potential newlines, tabs and fix common JSON format issues
-                    cleaned_content = cleaned_content.replace("\n", " ").replace(
-                        "\t", " "
-                    )
-                    cleaned_content = re.sub(
-                        r",\s*}", "}", cleaned_content
-                    )  # Remove trailing commas
-
-                    result = json.loads(cleaned_content)
-                    logging.info("Successfully parsed JSON after cleaning")
-                else:
-                    raise ValueError("No valid JSON structure found")
-            except (ValueError, json.JSONDecodeError) as e:
-                logging.warning(f"JSON parsing failed: {e}. Creating empty structure.")
-                result = default_result
-
-        # Ensure all expected keys are present in the result
-        for key in default_result:
-            if key not in result:
-                result[key] = ""
-
-        return result
-    except Exception as e:
-        logging.error(f"Error in extract_image_driving_license: {e}")
-        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
-
-
-async def extract_back_page_emirate(file_path: str) -> Dict:
-    """
-    Extract information from back page document and return as JSON
-
-    Args:
-        file_path (str): Path to the image file
-
-    Returns:
-        Dict: Structured information extracted from the document
-    """
-    try:
-        # Preprocess the image
-        image = Image.open(file_path)
-        image = image.convert("L")  # Convert to grayscale
-        image = image.resize((
-            image.width * 2,
-            image.height * 2,
-        ))  # Resize to improve OCR accuracy
-        image = image.filter(
-            ImageFilter.SHARPEN
-        )  # Sharpen the image to improve OCR accuracy
-
-        # Extract text from JPG image
-        vision_model = DocumentVisionOCR()
-
-        # Create a specialized prompt for license documents
-        license_prompt = """
+DOCUMENT_SPECS = {
+    "emirates_id": DocumentSpec(
+        name="emirates_id",
+        ocr_prompt="""
         Extract ALL English text from this license.
         Pay special attention to:
+        - Name
+        - Id Number
+        - Date of Birth
+        - Nationality
+        - Issuing Date
+        - Expiry Date
+        - Sex
         - Card Number
         - Occupation
         - Employer
         - Issuing Place
-        
+
         Capture all text exactly as shown, preserving numbers and codes precisely.
         If any mentioned information is missing, recheck and extract everything accurately.
-        """
-
-        # Use the extract_text_from_image method with the preprocessed image
-        vision_text = vision_model.extract_text_from_image(image, prompt=license_prompt)
-        logging.info("Extracted text from license document")
-
-        # Initialize LLM and create extraction chain
-        llm = ChatGroq(
-            model=os.getenv("LLM_MODEL"),
-            temperature=0,
-            api_key=os.getenv("GROQ_API_KEY"),
-        )
-
-        # Enhanced extraction prompt to ensure structured JSON output
-        extraction_prompt = f"""
-        Extract the following information from this document.
-        Respond with ONLY a valid JSON object - no explanations, no markdown formatting.
-        
-        For dates, use format DD-MM-YYYY if possible.
-        For numbers and codes, preserve exact formatting including any special characters.
-        If a piece of information is not found, use an empty string.
-        
-        Text to extract from:
-        {vision_text}
-        
-        JSON format:
-        {{
-                "card_number": "",
-                "occupation": "",
-                "employer": "",
-                "issuing_place": "",
-            }}
-        
-        
-        IMPORTANT: Return ONLY the JSON object with no additional text, code blocks, or explanations.
-        """
-
-        # Directly use the LLM to extract structured information
-        extraction_response = llm.invoke(extraction_prompt)
-        extracted_content = extraction_response.content
-        logging.info("LLM extraction completed")
-
-        # Create default empty result structure
-        default_result = {
-            "card_number": "",
-            "occupation": "",
-            "employer": "",
-            "issuing_place": "",
-        }
-
-        # Try to parse the response as JSON
-        try:
-            # First, attempt to parse as a JSON string
-            result = json.loads(extracted_content)
-            logging.info("Successfully parsed JSON response")
-        except json.JSONDecodeError as e:
-            logging.warning(f"Direct JSON parsing failed: {e}")
-            try:
-                # Find JSON-like content between curly braces
-                start = extracted_content.find("{")
-                end = extracted_content.rfind("}") + 1
-
-                if start >= 0 and end > start:
-                    cleaned_content = extracted_content[start:end]
-                    # Replace potential newlines, tabs and fix common JSON format issues
-                    cleaned_content = cleaned_content.replace("\n", " ").replace(
-                        "\t", " "
-                    )
-                    cleaned_content = re.sub(
-                        r",\s*}", "}", cleaned_content
-                    )  # Remove trailing commas
-
-                    result = json.loads(cleaned_content)
-                    logging.info("Successfully parsed JSON after cleaning")
-                else:
-                    raise ValueError("No valid JSON structure found")
-            except (ValueError, json.JSONDecodeError) as e:
-                logging.warning(f"JSON parsing failed: {e}. Creating empty structure.")
-                result = default_result
-
-        # Ensure all expected keys are present in the result
-        for key in default_result:
-            if key not in result:
-                result[key] = ""
-
-        return result
-    except Exception as e:
-        logging.error(f"Error in extract_image_driving_license: {e}")
-        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
-
-
-async def extract_pdf_info1(file_path: str) -> Dict:
-    """
-    Extract information from JPG License document and return as JSON
-
-    Args:
-        file_path (str): Path to the image file
-
-    Returns:
-        Dict: Structured information extracted from the driving license document
-    """
-    try:
-        # Preprocess the image
-
-        # Extract text from JPG image
-        vision_model = DocumentVisionOCR()
-
-        # Create a specialized prompt for license documents
-        emirate_prompt = """
-        Extract all English text from this license. 
+        """,
+        fields=EMIRATES_ID_FIELDS,
+        validators={"id_number": normalize_emirates_id},
+    ),
+    "emirates_id_pdf": DocumentSpec(
+        name="emirates_id_pdf",
+        ocr_prompt="""
+        Extract all English text from this license.
 
         Pay special attention to the following details:
-        - Name  
-        - ID Number (Ensure the ID number starts in the format: 784-YYYY-123456-9. This is an example.)  
-        - Date of Birth  
-        - Nationality  
-        - Issuing Date  
-        - Expiry Date  
-        - Sex  
-        - Card Number  
-        - Occupation  
-        - Employer  
-        - Issuing Place  
-
-        Capture all text exactly as shown, preserving numbers and codes precisely.  
-        Ensure that all the listed details are extracted from the given document.  
-        If any mentioned information is missing, recheck and extract everything accurately.
-        """
-
-        # Use the extract_text_from_image method with the preprocessed image
-        vision_text = vision_model.extract_text_to_string(
-            file_path, prompt=emirate_prompt
-        )
-        logging.info("Extracted text from license document")
-
-        # Initialize LLM and create extraction chain
-        llm = ChatGroq(
-            model=os.getenv("LLM_MODEL"),
-            temperature=0,
-            api_key=os.getenv("GROQ_API_KEY"),
-        )
-
-        # Enhanced extraction prompt to ensure structured JSON output
-        extraction_prompt = f"""
-        Extract the following information from this Emirate document
-        Respond with ONLY a valid JSON object - no explanations, no markdown formatting.
-        
-        For dates, use format DD-MM-YYYY if possible.
-        For numbers and codes, preserve exact formatting including any special characters.
-        If a piece of information is not found, use an empty string.
-        
-        Text to extract from:
-        {vision_text}
-        
-        JSON format:
-       {{
-                "name": "",
-                "id_number": "",
-                "date_of_birth": "",
-                "nationality": "",
-                "issue_date": "",
-                "expiry_date": "",
-                "gender": "",
-                "card_number": "",
-                "occupation": "",
-                "employer": "",
-                "issuing_place": "",
-            }}
-        
-        IMPORTANT: Return ONLY the JSON object with no additional text, code blocks, or explanations.
-        """
-
-        # Directly use the LLM to extract structured information
-        extraction_response = llm.invoke(extraction_prompt)
-        extracted_content = extraction_response.content
-        logging.info("LLM extraction completed")
-
-        # Create default empty result structure
-        default_result = {
-            "name": "",
-            "id_number": "",
-            "date_of_birth": "",
-            "nationality": "",
-            "issue_date": "",
-            "expiry_date": "",
-            "gender": "",
-            "card_number": "",
-            "occupation": "",
-            "employer": "",
-            "issuing_place": "",
-        }
-
-        # Try to parse the response as JSON
-        try:
-            # First, attempt to parse as a JSON string
-            result = json.loads(extracted_content)
-            logging.info("Successfully parsed JSON response")
-        except json.JSONDecodeError as e:
-            logging.warning(f"Direct JSON parsing failed: {e}")
-            try:
-                # Find JSON-like content between curly braces
-                start = extracted_content.find("{")
-                end = extracted_content.rfind("}") + 1
-
-                if start >= 0 and end > start:
-                    cleaned_content = extracted_content[start:end]
-                    # Replace potential newlines, tabs and fix common JSON format issues
-                    cleaned_content = cleaned_content.replace("\n", " ").replace(
-                        "\t", " "
-                    )
-                    cleaned_content = re.sub(
-                        r",\s*}", "}", cleaned_content
-                    )  # Remove trailing commas
-
-                    result = json.loads(cleaned_content)
-                    logging.info("Successfully parsed JSON after cleaning")
-                else:
-                    raise ValueError("No valid JSON structure found")
-            except (ValueError, json.JSONDecodeError) as e:
-                logging.warning(f"JSON parsing failed: {e}. Creating empty structure.")
-                result = default_result
-
-        # Ensure all expected keys are present in the result
-        for key in default_result:
-            if key not in result:
-                result[key] = ""
-
-        return result
-    except Exception as e:
-        logging.error(f"Error in extract_image_driving_license: {e}")
-        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
-
-
-# Todo
-async def extract_image_driving_license(file_path: str) -> Dict:
-    """
-    Extract information from JPG License document and return as JSON
-
-    Args:
-        file_path (str): Path to the image file
+        - Name
+        - ID Number (Ensure the ID number starts in the format: 784-YYYY-123456-9. This is an example.)
+        - Date of Birth
+        - Nationality
+        - Issuing Date
+        - Expiry Date
+        - Sex
+        - Card Number
+        - Occupation
+        - Employer
+        - Issuing Place
 
-    Returns:
-        Dict: Structured information extracted from the driving license document
-    """
-    try:
-        # Preprocess the image
-        image = Image.open(file_path)
-        image = image.convert("L")  # Convert to grayscale
-        image = image.resize((
-            image.width * 2,
-            image.height * 2,
-        ))  # Resize to improve OCR accuracy
-        image = image.filter(
-            ImageFilter.SHARPEN
-        )  # Sharpen the image to improve OCR accuracy
-
-        # Extract text from JPG image
-        vision_model = DocumentVisionOCR()
-
-        # Create a specialized prompt for license documents
-        license_prompt = """
+        Capture all text exactly as shown, preserving numbers and codes precisely.
+        Ensure that all the listed details are extracted from the given document.
+        If any mentioned information is missing, recheck and extract everything accurately.
+        """,
+        fields=EMIRATES_ID_FIELDS,
+        label="this Emirate document",
+        validators={"id_number": normalize_emirates_id},
+    ),
+    "emirates_id_front": DocumentSpec(
+        name="emirates_id_front",
+        ocr_prompt="""
         Extract ALL English text from this license.
         Pay special attention to:
         - Name
-        - License No
+        - Id Number
         - Date of Birth
-        - Issue Date
-        - Expiry Date
         - Nationality
-        - Place of Issue
-        - Traffic Code No
-        - Permitted Vehicles
-        
+        - Issuing Date
+        - Expiry Date
+        - Sex
+
         Capture all text exactly as shown, preserving numbers and codes precisely.
         If any mentioned information is missing, recheck and extract everything accurately.
-        """
-
-        # Use the extract_text_from_image method with the preprocessed image
-        vision_text = vision_model.extract_text_from_image(image, prompt=license_prompt)
-        logging.info("Extracted text from license document")
-
-        # Initialize LLM and create extraction chain
-        llm = ChatGroq(
-            model=os.getenv("LLM_MODEL"),
-            temperature=0,
-            api_key=os.getenv("GROQ_API_KEY"),
-        )
-
-        # Enhanced extraction prompt to ensure structured JSON output
-        extraction_prompt = f"""
-        Extract the following information from this Driving License.
-        Respond with ONLY a valid JSON object - no explanations, no markdown formatting.
-        
-        For dates, use format DD-MM-YYYY if possible.
-        For numbers and codes, preserve exact formatting including any special characters.
-        If a piece of information is not found, use an empty string.
-        
-        Text to extract from:
-        {vision_text}
-        
-        JSON format:
-        {{
-            "name": "",
-            "license_no": "",
-            "date_of_birth": "",
-            "nationality": "",
-            "issue_date": "",
-            "expiry_date": "",
-            "traffic_code_no": "",
-            "place_of_issue": "",
-            "permitted_vehicles": ""
-        }}
-        
-        IMPORTANT: Return ONLY the JSON object with no additional text, code blocks, or explanations.
-        """
-
-        # Directly use the LLM to extract structured information
-        extraction_response = llm.invoke(extraction_prompt)
-        extracted_content = extraction_response.content
-        logging.info("LLM extraction completed")
-
-        # Create default empty result structure
-        default_result = {
-            "name": "",
-            "license_no": "",
-            "date_of_birth": "",
-            "nationality": "",
-            "issue_date": "",
-            "expiry_date": "",
-            "traffic_code_no": "",
-            "place_of_issue": "",
-            "permitted_vehicles": "",
-        }
-
-        # Try to parse the response as JSON
-        try:
-            # First, attempt to parse as a JSON string
-            result = json.loads(extracted_content)
-            logging.info("Successfully parsed JSON response")
-        except json.JSONDecodeError as e:
-            logging.warning(f"Direct JSON parsing failed: {e}")
-            try:
-                # Find JSON-like content between curly braces
-                start = extracted_content.find("{")
-                end = extracted_content.rfind("}") + 1
-
-                if start >= 0 and end > start:
-                    cleaned_content = extracted_content[start:end]
-                    # Replace potential newlines, tabs and fix common JSON format issues
-                    cleaned_content = cleaned_content.replace("\n", " ").replace(
-                        "\t", " "
-                    )
-                    cleaned_content = re.sub(
-                        r",\s*}", "}", cleaned_content
-                    )  # Remove trailing commas
-
-                    result = json.loads(cleaned_content)
-                    logging.info("Successfully parsed JSON after cleaning")
-                else:
-                    raise ValueError("No valid JSON structure found")
-            except (ValueError, json.JSONDecodeError) as e:
-                logging.warning(f"JSON parsing failed: {e}. Creating empty structure.")
-                result = default_result
-
-        # Ensure all expected keys are present in the result
-        for key in default_result:
-            if key not in result:
-                result[key] = ""
-
-        return result
-    except Exception as e:
-        logging.error(f"Error in extract_image_driving_license: {e}")
-        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
-
+        """,
+        fields=EMIRATES_ID_FIELDS[:7],
+        validators={"id_number": normalize_emirates_id},
+    ),
+    "emirates_id_back": DocumentSpec(
+        name="emirates_id_back",
+        ocr_prompt="""
+        Extract ALL English text from this license.
+        Pay special attention to:
+        - Card Number
+        - Occupation
+        - Employer
+        - Issuing Place
 
-# Todo
-async def extract_pdf_driving_license(file_path: str) -> Dict:
+        Capture all text exactly as shown, preserving numbers and codes precisely.
+        If any mentioned information is missing, recheck and extract everything accurately.
+        """,
+        fields=EMIRATES_ID_FIELDS[7:],
+    ),
+    "driving_license": DocumentSpec(
+        name="driving_license",
+        ocr_prompt=DRIVING_LICENSE_OCR_PROMPT,
+        fields=DRIVING_LICENSE_FIELDS,
+        label="this Driving License",
+    ),
+    "driving_license_pdf": DocumentSpec(
+        name="driving_license_pdf",
+        ocr_prompt=DRIVING_LICENSE_OCR_PROMPT.replace(
+            "        If any mentioned",
+            "        make sure to extract all provided information in the give document\n"
+            "        If any mentioned",
+        ),
+        fields=DRIVING_LICENSE_FIELDS,
+        label="this Driving License",
+    ),
+    "mulkiya": DocumentSpec(
+        name="mulkiya",
+        ocr_prompt=MULKIYA_OCR_PROMPT,
+        fields=MULKIYA_FIELDS,
+        label="this Driving License",
+        prompt_fields=MULKIYA_FIELDS + ("gvw",),
+    ),
+}
+
+_vision_model = None
+_stage_stats = {}
+
+
+def _get_vision_model() -> DocumentVisionOCR:
+    global _vision_model
+    if _vision_model is None:
+        _vision_model = DocumentVisionOCR()
+    return _vision_model
+
+
+def preprocess_document_image(file_path: str) -> Image.Image:
     """
-    Extract information from JPG License document and return as JSON
+    Grayscale and sharpen an uploaded image to improve OCR accuracy.
 
-    Args:
-        file_path (str): Path to the image file
+    The image is not upscaled: the vision encoder sizes it to the model's
+    input resolution (services.vision_encoder).
+    """
+    image = Image.open(file_path)
+    image = ImageOps.exif_transpose(image).convert("L")
+    return image.filter(ImageFilter.SHARPEN)
+
+
+def build_extraction_prompt(spec: DocumentSpec, text: str) -> str:
+    fields = spec.prompt_fields or spec.fields
+    json_format = (
+        "{\n"
+        + ",\n".join(f'            "{field}": ""' for field in fields)
+        + "\n        }"
+    )
+    return EXTRACTION_PROMPT.format(
+        label=spec.label, text=text, json_format=json_format
+    )
+
+
+def spec_version(spec: DocumentSpec) -> str:
+    """Hash of everything that shapes a result, so cached results follow prompt and model changes."""
+    parts = [
+        _get_vision_model().model or "",
+        get_llm().model_name or "",
+        spec.ocr_prompt,
+        spec.label,
+        ",".join(spec.prompt_fields or spec.fields),
+        ",".join(spec.fields),
+        ",".join(
+            f"{field}:{validator.__name__}"
+            for field, validator in sorted((spec.validators or {}).items())
+        ),
+        EXTRACTION_PROMPT,
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def parse_llm_json(content: str) -> Optional[dict]:
+    """
+    Parse the JSON object in an LLM reply, tolerating surrounding text and trailing commas.
 
     Returns:
-        Dict: Structured information extracted from the driving license document
+        The parsed dict, or None if no JSON object could be recovered
     """
     try:
-        # Preprocess the image
-
-        # Extract text from JPG image
-        vision_model = DocumentVisionOCR()
-
-        # Create a specialized prompt for license documents
-        license_prompt = """
-        Extract ALL English text from this license.
-        Pay special attention to:
-        - Name
-        - License No
-        - Date of Birth
-        - Issue Date
-        - Expiry Date
-        - Nationality
-        - Place of Issue
-        - Traffic Code No
-        - Permitted Vehicles
-        
-        Capture all text exactly as shown, preserving numbers and codes precisely.
-        make sure to extract all provided information in the give document
-        If any mentioned information is missing, recheck and extract everything accurately.
-        """
-
-        # Use the extract_text_from_image method with the preprocessed image
-        vision_text = vision_model.extract_text_to_string(
-            file_path, prompt=license_prompt
-        )
-        logging.info("Extracted text from license document")
-
-        # Initialize LLM and create extraction chain
-        llm = ChatGroq(
-            model=os.getenv("LLM_MODEL"),
-            temperature=0,
-            api_key=os.getenv("GROQ_API_KEY"),
+        result = json.loads(content)
+        if isinstance(result, dict):
+            return result
+    except json.JSONDecodeError as e:
+        logging.warning(f"Direct JSON parsing failed: {e}")
+
+    start = content.find("{")
+    end = content.rfind("}") + 1
+    if start < 0 or end <= start:
+        logging.warning("No valid JSON structure found")
+        return None
+    cleaned = content[start:end].replace("\n", " ").replace("\t", " ")
+    cleaned = re.sub(r",\s*}", "}", cleaned)
+    try:
+        result = json.loads(cleaned)
+    except json.JSONDecodeError as e:
+        logging.warning(f"JSON parsing failed: {e}")
+        return None
+    logging.info("Successfully parsed JSON after cleaning")
+    return result if isinstance(result, dict) else None
+
+
+def apply_document_spec(spec: DocumentSpec, result: Optional[dict]) -> dict:
+    """Fill every spec field and run the field validators."""
+    result = dict(result or {})
+    for field in spec.fields:
+        result.setdefault(field, "")
+    for field, validator in (spec.validators or {}).items():
+        value = result.get(field)
+        if isinstance(value, str) and value:
+            try:
+                result[field] = validator(value)
+            except ValueError as e:
+                logging.info(f"[Extraction] {spec.name}.{field}: {e}")
+    return result
+
+
+def _record_timings(key: str, timings: dict, page_sources: list = (), partial: bool = False):
+    stats = _stage_stats.setdefault(
+        key, {"documents": 0, "partial": 0, "stages": {}, "pages": {}}
+    )
+    stats["documents"] += 1
+    stats["partial"] += partial
+    for page_source in page_sources:
+        stats["pages"][page_source] = stats["pages"].get(page_source, 0) + 1
+    for stage, seconds in timings.items():
+        stage_stats = stats["stages"].setdefault(
+            stage, {"total_ms": 0.0, "max_ms": 0.0}
         )
-
-        # Enhanced extraction prompt to ensure structured JSON output
-        extraction_prompt = f"""
-        Extract the following information from this Driving License.
-        Respond with ONLY a valid JSON object - no explanations, no markdown formatting.
-        
-        For dates, use format DD-MM-YYYY if possible.
-        For numbers and codes, preserve exact formatting including any special characters.
-        If a piece of information is not found, use an empty string.
-        
-        Text to extract from:
-        {vision_text}
-        
-        JSON format:
-        {{
-            "name": "",
-            "license_no": "",
-            "date_of_birth": "",
-            "nationality": "",
-            "issue_date": "",
-            "expiry_date": "",
-            "traffic_code_no": "",
-            "place_of_issue": "",
-            "permitted_vehicles": ""
-        }}
-        
-        IMPORTANT: Return ONLY the JSON object with no additional text, code blocks, or explanations.
-        """
-
-        # Directly use the LLM to extract structured information
-        extraction_response = llm.invoke(extraction_prompt)
-        extracted_content = extraction_response.content
-        logging.info("LLM extraction completed")
-
-        # Create default empty result structure
-        default_result = {
-            "name": "",
-            "license_no": "",
-            "date_of_birth": "",
-            "nationality": "",
-            "issue_date": "",
-            "expiry_date": "",
-            "traffic_code_no": "",
-            "place_of_issue": "",
-            "permitted_vehicles": "",
+        stage_stats["total_ms"] += seconds * 1000
+        stage_stats["max_ms"] = max(stage_stats["max_ms"], seconds * 1000)
+
+
+def extraction_stats() -> dict:
+    """Average and worst time per pipeline stage, and PDF page paths, by document type and source."""
+    report = {}
+    for key, stats in _stage_stats.items():
+        count = stats["documents"]
+        report[key] = {
+            "documents": count,
+            # Documents whose OCR timed out or failed on some page (not cached)
+            "partial": stats["partial"],
+            # PDF pages read from the text layer ("text") vs sent to vision OCR ("ocr")
+            "pages": dict(stats["pages"]),
+            "stages": {
+                stage: {
+                    "avg_ms": round(values["total_ms"] / count, 1),
+                    "max_ms": round(values["max_ms"], 1),
+                }
+                for stage, values in stats["stages"].items()
+            },
         }
+    return report
 
-        # Try to parse the response as JSON
-        try:
-            # First, attempt to parse as a JSON string
-            result = json.loads(extracted_content)
-            logging.info("Successfully parsed JSON response")
-        except json.JSONDecodeError as e:
-            logging.warning(f"Direct JSON parsing failed: {e}")
-            try:
-                # Find JSON-like content between curly braces
-                start = extracted_content.find("{")
-                end = extracted_content.rfind("}") + 1
-
-                if start >= 0 and end > start:
-                    cleaned_content = extracted_content[start:end]
-                    # Replace potential newlines, tabs and fix common JSON format issues
-                    cleaned_content = cleaned_content.replace("\n", " ").replace(
-                        "\t", " "
-                    )
-                    cleaned_content = re.sub(
-                        r",\s*}", "}", cleaned_content
-                    )  # Remove trailing commas
-
-                    result = json.loads(cleaned_content)
-                    logging.info("Successfully parsed JSON after cleaning")
-                else:
-                    raise ValueError("No valid JSON structure found")
-            except (ValueError, json.JSONDecodeError) as e:
-                logging.warning(f"JSON parsing failed: {e}. Creating empty structure.")
-                result = default_result
-
-        # Ensure all expected keys are present in the result
-        for key in default_result:
-            if key not in result:
-                result[key] = ""
 
-        return result
-    except Exception as e:
-        logging.error(f"Error in extract_image_driving_license: {e}")
-        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
-
-
-# Todo Mulkiya
-async def extract_image_mulkiya(file_path: str) -> Dict:
+async def extract_document(spec: DocumentSpec, file_path: str, source: str) -> Dict:
     """
-    Extract information from JPG License document and return as JSON
+    Run the extraction pipeline for one uploaded document.
 
     Args:
-        file_path (str): Path to the image file
+        spec: Document type to extract
+        file_path: Path to the uploaded file
+        source: 'image' (preprocessed before OCR) or 'file' (images or PDFs, by extension)
 
     Returns:
-        Dict: Structured information extracted from the driving license document
+        Dict with every field in spec.fields
     """
+    document_type = f"{spec.name}/{source}"
+    timings = {}
+    page_sources = []
     try:
-        # Preprocess the image
-        image = Image.open(file_path)
-        image = image.convert("L")  # Convert to grayscale
-        image = image.resize((
-            image.width * 2,
-            image.height * 2,
-        ))  # Resize to improve OCR accuracy
-        image = image.filter(
-            ImageFilter.SHARPEN
-        )  # Sharpen the image to improve OCR accuracy
-
-        # Extract text from JPG image
-        vision_model = DocumentVisionOCR()
-
-        # Create a specialized prompt for license documents
-        license_prompt = """
-        Extract ALL English text from this driving license or mulkiya.
-        Pay special attention to:
-        - Owner
-        - Traffic Plate No 
-        - T.C. No.
-        - Place of Issue
-        - Nationality
-        - Exp Date
-        - Reg Date
-        - Ins Exp
-        - Policy No
-        - Mortgage By
-        - Model
-        - Num of Pass
-        - Origin
-        - Vechile Type
-        - G V W
-        - Empty Weight
-        - Engine No
-        - Chassis No
-        
-        Capture all text exactly as shown, preserving numbers and codes precisely.
-        If any mentioned information is missing, recheck and extract everything accurately.
-        """
-
-        # Use the extract_text_from_image method with the preprocessed image
-        vision_text = vision_model.extract_text_from_image(image, prompt=license_prompt)
-        logging.info("Extracted text from license document")
-
-        # Initialize LLM and create extraction chain
-        llm = ChatGroq(
-            model=os.getenv("LLM_MODEL"),
-            temperature=0,
-            api_key=os.getenv("GROQ_API_KEY"),
+        started = time.perf_counter()
+        file_hash = await asyncio.to_thread(file_sha256, file_path)
+        timings["hash"] = time.perf_counter() - started
+
+        version = spec_version(spec)
+        cached = await extraction_cache.get(file_hash, document_type, version)
+        if cached is not None:
+            logging.info(
+                f"[Extraction] {document_type}: cache hit in "
+                f"{(time.perf_counter() - started) * 1000:.0f}ms"
+            )
+            return cached
+
+        vision_model = _get_vision_model()
+        partial = False
+        started = time.perf_counter()
+        if source == "image":
+            image = await asyncio.to_thread(preprocess_document_image, file_path)
+            timings["preprocess"] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            vision_text = await asyncio.to_thread(
+                vision_model.extract_text_from_image, image, spec.ocr_prompt
+            )
+        elif file_path.lower().endswith(".pdf"):
+            # Pages with a text layer are read directly; only scanned pages are OCR'd
+            pages, partial = await asyncio.to_thread(
+                vision_model.extract_pdf_pages, file_path, prompt=spec.ocr_prompt
+            )
+            page_sources = [page["source"] for page in (pages or {}).values()]
+            vision_text = vision_model.pages_to_string({
+                page_number: page["text"] for page_number, page in (pages or {}).items()
+            })
+        else:
+            vision_text = await asyncio.to_thread(
+                vision_model.extract_text_to_string, file_path, prompt=spec.ocr_prompt
+            )
+        timings["ocr"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        response = await get_llm().ainvoke(build_extraction_prompt(spec, vision_text))
+        timings["llm"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        result = apply_document_spec(spec, parse_llm_json(response.content))
+        timings["parse"] = time.perf_counter() - started
+
+        # An all-empty result usually means OCR failed, and a partial one that
+        # OCR timed out; let a retry run again
+        partial = partial or vision_text is None
+        if partial:
+            logging.warning(f"[Extraction] {document_type}: incomplete OCR, not cached")
+        elif any(result.get(field) for field in spec.fields):
+            await extraction_cache.set(file_hash, document_type, version, result)
+
+        _record_timings(document_type, timings, page_sources, partial)
+        logging.info(
+            f"[Extraction] {document_type}: "
+            + " ".join(
+                f"{stage}={seconds * 1000:.0f}ms" for stage, seconds in timings.items()
+            )
+            + (f" pages={','.join(page_sources)}" if page_sources else "")
         )
+        return result
+    except Exception as e:
+        logging.error(f"Error extracting {spec.name} from {source}: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
-        # Enhanced extraction prompt to ensure structured JSON output
-        extraction_prompt = f"""
-        Extract the following information from this Driving License.
-        Respond with ONLY a valid JSON object - no explanations, no markdown formatting.
-        
-        For dates, use format DD-MM-YYYY if possible.
-        For numbers and codes, preserve exact formatting including any special characters.
-        If a piece of information is not found, use an empty string.
-        
-        Text to extract from:
-        {vision_text}
-        
-        JSON format:
-        {{
-            "owner": "",
-         "traffic_plate_no": "",
-        "tc_no": "",
-        "nationality": "",
-         "reg_date": "",
-         "expiry_date": "",
-         "ins_exp": "",
-         "policy_no": "",
-        "place_of_issue": "",
-        "model_no": "",
-        "number_of_pass": "",
-         "origin": "",
-         "vehicle_type": "",
-         "empty_weight": "",
-         "engine_no": "",
-         "chassis_no": ""
-         "gvw": "",
-        }}
-        
-        IMPORTANT: Return ONLY the JSON object with no additional text, code blocks, or explanations.
-        """
 
-        # Directly use the LLM to extract structured information
-        extraction_response = llm.invoke(extraction_prompt)
-        extracted_content = extraction_response.content
-        logging.info("LLM extraction completed")
-
-        # Create default empty result structure
-        default_result = {
-            "owner": "",
-            "traffic_plate_no": "",
-            "tc_no": "",
-            "nationality": "",
-            "reg_date": "",
-            "expiry_date": "",
-            "ins_exp": "",
-            "policy_no": "",
-            "place_of_issue": "",
-            "model_no": "",
-            "number_of_pass": "",
-            "origin": "",
-            "vehicle_type": "",
-            "empty_weight": "",
-            "engine_no": "",
-            "chassis_no": "",
-        }
+async def extract_image_info1(file_path: str) -> Dict:
+    """Extract both sides of an Emirates ID from an image."""
+    return await extract_document(DOCUMENT_SPECS["emirates_id"], file_path, "image")
 
-        # Try to parse the response as JSON
-        try:
-            # First, attempt to parse as a JSON string
-            result = json.loads(extracted_content)
-            logging.info("Successfully parsed JSON response")
-        except json.JSONDecodeError as e:
-            logging.warning(f"Direct JSON parsing failed: {e}")
-            try:
-                # Find JSON-like content between curly braces
-                start = extracted_content.find("{")
-                end = extracted_content.rfind("}") + 1
-
-                if start >= 0 and end > start:
-                    cleaned_content = extracted_content[start:end]
-                    # Replace potential newlines, tabs and fix common JSON format issues
-                    cleaned_content = cleaned_content.replace("\n", " ").replace(
-                        "\t", " "
-                    )
-                    cleaned_content = re.sub(
-                        r",\s*}", "}", cleaned_content
-                    )  # Remove trailing commas
-
-                    result = json.loads(cleaned_content)
-                    logging.info("Successfully parsed JSON after cleaning")
-                else:
-                    raise ValueError("No valid JSON structure found")
-            except (ValueError, json.JSONDecodeError) as e:
-                logging.warning(f"JSON parsing failed: {e}. Creating empty structure.")
-                result = default_result
-
-        # Ensure all expected keys are present in the result
-        for key in default_result:
-            if key not in result:
-                result[key] = ""
 
-        return result
-    except Exception as e:
-        logging.error(f"Error in extract_image_driving_license: {e}")
-        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+async def extract_front_page_emirate(file_path: str) -> Dict:
+    """Extract the front side of an Emirates ID from an image."""
+    return await extract_document(
+        DOCUMENT_SPECS["emirates_id_front"], file_path, "image"
+    )
 
 
-async def extract_pdf_mulkiya(file_path: str) -> Dict:
-    """
-    Extract information from JPG License document and return as JSON
+async def extract_back_page_emirate(file_path: str) -> Dict:
+    """Extract the back side of an Emirates ID from an image."""
+    return await extract_document(
+        DOCUMENT_SPECS["emirates_id_back"], file_path, "image"
+    )
 
-    Args:
-        file_path (str): Path to the image file
 
-    Returns:
-        Dict: Structured information extracted from the driving license document
-    """
-    try:
-        # Preprocess the image
+async def extract_pdf_info1(file_path: str) -> Dict:
+    """Extract an Emirates ID from a PDF (or image) file."""
+    return await extract_document(DOCUMENT_SPECS["emirates_id_pdf"], file_path, "file")
 
-        # Extract text from JPG image
-        vision_model = DocumentVisionOCR()
 
-        # Create a specialized prompt for license documents
-        mulkiya_prompt = """
-        Extract ALL English text from this driving license or mulkiya.
-        Pay special attention to:
-        - Owner
-        - Traffic Plate No  
-        - T.C. No.
-        - Place of Issue
-        - Nationality
-        - Exp Date
-        - Reg Date
-        - Ins Exp
-        - Policy No
-        - Mortgage By
-        - Model
-        - Num of Pass
-        - Origin
-        - Vechile Type
-        - G V W
-        - Empty Weight
-        - Engine No
-        - Chassis No
-        
-        Capture all text exactly as shown, preserving numbers and codes precisely.
-        If any mentioned information is missing, recheck and extract everything accurately.
-        """
+async def extract_image_driving_license(file_path: str) -> Dict:
+    """Extract a driving license from an image."""
+    return await extract_document(DOCUMENT_SPECS["driving_license"], file_path, "image")
 
-        # Use the extract_text_from_image method with the preprocessed image
-        vision_text = vision_model.extract_text_to_string(
-            file_path, prompt=mulkiya_prompt
-        )
-        logging.info("Extracted text from license document")
 
-        # Initialize LLM and create extraction chain
-        llm = ChatGroq(
-            model=os.getenv("LLM_MODEL"),
-            temperature=0,
-            api_key=os.getenv("GROQ_API_KEY"),
-        )
+async def extract_pdf_driving_license(file_path: str) -> Dict:
+    """Extract a driving license from a PDF (or image) file."""
+    return await extract_document(
+        DOCUMENT_SPECS["driving_license_pdf"], file_path, "file"
+    )
 
-        # Enhanced extraction prompt to ensure structured JSON output
-        extraction_prompt = f"""
-        Extract the following information from this Driving License.
-        Respond with ONLY a valid JSON object - no explanations, no markdown formatting.
-        
-        For dates, use format DD-MM-YYYY if possible.
-        For numbers and codes, preserve exact formatting including any special characters.
-        If a piece of information is not found, use an empty string.
-        
-        Text to extract from:
-        {vision_text}
-        
-        JSON format:
-        {{
-            "owner": "",
-         "traffic_plate_no": "",
-        "tc_no": "",
-        "nationality": "",
-         "reg_date": "",
-         "expiry_date": "",
-         "ins_exp": "",
-         "policy_no": "",
-        "place_of_issue": "",
-        "model_no": "",
-        "number_of_pass": "",
-         "origin": "",
-         "vehicle_type": "",
-         "empty_weight": "",
-         "engine_no": "",
-         "chassis_no": ""
-         "gvw": "",
-        }}
-        
-        IMPORTANT: Return ONLY the JSON object with no additional text, code blocks, or explanations.
-        """
 
-        # Directly use the LLM to extract structured information
-        extraction_response = llm.invoke(extraction_prompt)
-        extracted_content = extraction_response.content
-        logging.info("LLM extraction completed")
-
-        # Create default empty result structure
-        default_result = {
-            "owner": "",
-            "traffic_plate_no": "",
-            "tc_no": "",
-            "nationality": "",
-            "reg_date": "",
-            "expiry_date": "",
-            "ins_exp": "",
-            "policy_no": "",
-            "place_of_issue": "",
-            "model_no": "",
-            "number_of_pass": "",
-            "origin": "",
-            "vehicle_type": "",
-            "empty_weight": "",
-            "engine_no": "",
-            "chassis_no": "",
-        }
+async def extract_image_mulkiya(file_path: str) -> Dict:
+    """Extract a vehicle registration card (mulkiya) from an image."""
+    return await extract_document(DOCUMENT_SPECS["mulkiya"], file_path, "image")
 
-        # Try to parse the response as JSON
-        try:
-            # First, attempt to parse as a JSON string
-            result = json.loads(extracted_content)
-            logging.info("Successfully parsed JSON response")
-        except json.JSONDecodeError as e:
-            logging.warning(f"Direct JSON parsing failed: {e}")
-            try:
-                # Find JSON-like content between curly braces
-                start = extracted_content.find("{")
-                end = extracted_content.rfind("}") + 1
-
-                if start >= 0 and end > start:
-                    cleaned_content = extracted_content[start:end]
-                    # Replace potential newlines, tabs and fix common JSON format issues
-                    cleaned_content = cleaned_content.replace("\n", " ").replace(
-                        "\t", " "
-                    )
-                    cleaned_content = re.sub(
-                        r",\s*}", "}", cleaned_content
-                    )  # Remove trailing commas
-
-                    result = json.loads(cleaned_content)
-                    logging.info("Successfully parsed JSON after cleaning")
-                else:
-                    raise ValueError("No valid JSON structure found")
-            except (ValueError, json.JSONDecodeError) as e:
-                logging.warning(f"JSON parsing failed: {e}. Creating empty structure.")
-                result = default_result
-
-        # Ensure all expected keys are present in the result
-        for key in default_result:
-            if key not in result:
-                result[key] = ""
 
-        return result
-    except Exception as e:
-        logging.error(f"Error in extract_image_driving_license: {e}")
-        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+async def extract_pdf_mulkiya(file_path: str) -> Dict:
+    """Extract a vehicle registration card (mulkiya) from a PDF (or image) file."""
+    return await extract_document(DOCUMENT_SPECS["mulkiya"], file_path, "file")
 
 
 async def extract_excel_sme_census(file_path: str) -> dict:
@@ -0,0 +1,143 @@
+"""
+Chat Load Test
+Fires concurrent /chat/ sessions at the app against a local stand-in for the
+Groq API that answers every completion after a fixed delay, and compares the
+wall time with the same sessions run one after another.
+
+If the /chat/ pipeline blocks the event loop on LLM calls, the concurrent run
+takes about as long as the serial one; if it is async end to end, it takes
+about as long as the slowest single session. Exits with status 1 when the
+concurrent run is not at least twice as fast.
+
+Usage (from the project root):
+    python scripts/chat_load_test.py --sessions 20 --delay 0.5
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeGroq(BaseHTTPRequestHandler):
+    """OpenAI-compatible /chat/completions endpoint that replies after `delay` seconds."""
+
+    protocol_version = "HTTP/1.1"
+    delay = 0.5
+    calls = itertools.count()
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        next(self.calls)
+        time.sleep(self.delay)
+        body = json.dumps({
+            "id": "load-test",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "load-test"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {
+                        "role": "assistant",
+                        "content": "Health insurance covers medical treatment.",
+                    },
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_fake_groq(delay: float) -> ThreadingHTTPServer:
+    FakeGroq.delay = delay
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGroq)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run(sessions: int, message: str) -> dict:
+    import httpx
+    from fastapi import FastAPI
+
+    from routes import chat
+
+    # Only the chat router: main.app also mounts routes that need other API keys
+    app = FastAPI()
+    app.include_router(chat.router)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://load-test", timeout=120
+    ) as client:
+
+        async def session(user_id: str) -> float:
+            # Greeting (welcome menu, no LLM), then a question answered by the LLM;
+            # the user id keeps each question out of the assistant reply cache
+            started = time.perf_counter()
+            for text in ("Hi", f"{message} ({user_id})"):
+                response = await client.post(
+                    "/chat/", json={"user_id": user_id, "message": text}
+                )
+                response.raise_for_status()
+            return time.perf_counter() - started
+
+        # Warm up imports, clients and caches outside the measurement
+        await session("load-warmup")
+
+        started = time.perf_counter()
+        serial = [await session(f"load-serial-{i}") for i in range(sessions)]
+        serial_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        concurrent = await asyncio.gather(
+            *(session(f"load-concurrent-{i}") for i in range(sessions))
+        )
+        concurrent_seconds = time.perf_counter() - started
+
+    return {
+        "sessions": sessions,
+        "serial_seconds": round(serial_seconds, 2),
+        "concurrent_seconds": round(concurrent_seconds, 2),
+        "speedup": round(serial_seconds / concurrent_seconds, 1),
+        "slowest_session_seconds": round(max(serial + list(concurrent)), 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument(
+        "--delay", type=float, default=0.5, help="Seconds per LLM completion"
+    )
+    parser.add_argument("--message", default="What does health insurance cover?")
+    args = parser.parse_args()
+
+    server = start_fake_groq(args.delay)
+    # Must be set before the app (and its Groq clients) is imported
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ["GROQ_API_KEY"] = "load-test"
+    os.environ.setdefault("LLM_MODEL", "load-test")
+    # The gateway's default request budget would throttle the burst; measure the pipeline
+    os.environ.setdefault("LLM_DEFAULT_RPM", "100000")
+
+    report = asyncio.run(run(args.sessions, args.message))
+    report["llm_calls"] = next(FakeGroq.calls)
+    print(f"[Load Test] {json.dumps(report)}")
+    server.shutdown()
+    # Sessions that serialize on the event loop show no speedup at all
+    sys.exit(0 if report["speedup"] >= 2 else 1)
@@ -0,0 +1,146 @@
+"""
+Completion Sink
+Append-only log of completed applications, written off the request path.
+
+Handlers call record_completion(responses) when a flow finishes. The record
+is serialized immediately (so later changes to the session do not leak into
+it) and queued; a background writer appends everything that is queued in
+one batch and fsyncs once per batch.
+
+COMPLETION_LOG selects the output:
+    data/completed_applications.jsonl      one JSON object per line (default)
+    data/completed_applications.sqlite3    SQLite table 'completions'
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+from typing import Optional
+
+COMPLETION_LOG = os.getenv("COMPLETION_LOG", "data/completed_applications.jsonl")
+COMPLETION_BATCH_SIZE = int(os.getenv("COMPLETION_BATCH_SIZE", "100"))
+
+# User id of the conversation turn being processed (set by process_user_input)
+current_user_id = contextvars.ContextVar("current_user_id", default=None)
+
+
+class CompletionSink:
+    """
+    Single background writer fed by an asyncio queue.
+
+    Records that arrive while a batch is being written are picked up by the
+    next batch, so under load many completions share one fsync.
+    """
+
+    def __init__(
+        self, path: str = COMPLETION_LOG, batch_size: int = COMPLETION_BATCH_SIZE
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.use_sqlite = path.endswith((".sqlite3", ".sqlite", ".db"))
+        self._queue = None
+        self._writer = None
+        self._file = None
+        self._conn = None
+        self.stats_counters = {"submitted": 0, "written": 0, "batches": 0, "failed": 0}
+
+    def submit(self, responses: dict, user_id: Optional[str] = None):
+        """
+        Queue a completed application. Never blocks on disk I/O.
+
+        Args:
+            responses: The session's collected responses
+            user_id: Defaults to the user of the current conversation turn
+        """
+        record = {
+            "user_id": user_id or current_user_id.get(),
+            "completed_at": datetime.now(timezone.utc).isoformat(),
+            "responses": responses,
+        }
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.get_running_loop().create_task(self._run())
+        self._queue.put_nowait((record["user_id"], record["completed_at"], line))
+        self.stats_counters["submitted"] += 1
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+                self.stats_counters["written"] += len(batch)
+                self.stats_counters["batches"] += 1
+            except Exception as e:
+                self.stats_counters["failed"] += len(batch)
+                print(f"[Completion Sink] Failed to write {len(batch)} records: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: list):
+        if self.use_sqlite:
+            self._write_sqlite(batch)
+            return
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write("".join(f"{line}\n" for _, _, line in batch))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _write_sqlite(self, batch: list):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS completions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT,
+                    completed_at TEXT NOT NULL,
+                    record TEXT NOT NULL
+                )"""
+            )
+        self._conn.executemany(
+            "INSERT INTO completions (user_id, completed_at, record) VALUES (?, ?, ?)",
+            batch,
+        )
+        self._conn.commit()
+
+    async def close(self):
+        """Write everything still queued, then stop the writer."""
+        if self._queue is not None and self._writer is not None:
+            await self._queue.join()
+            self._writer.cancel()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def stats(self) -> dict:
+        return {
+            **self.stats_counters,
+            "path": self.path,
+            "queued": self._queue.qsize() if self._queue else 0,
+        }
+
+
+completion_sink = CompletionSink()
+
+
+def record_completion(responses: dict, user_id: Optional[str] = None):
+    """Queue a finished application for the completion log."""
+    completion_sink.submit(responses, user_id)
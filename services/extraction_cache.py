@@ -0,0 +1,227 @@
+"""
+Extraction Cache
+Content-addressed cache for document extraction results (Emirates ID,
+driving license, mulkiya, parsed insurance PDFs).
+
+Entries are keyed by the SHA-256 of the uploaded file's bytes, the document
+type and a version hash of the prompts that produced the result, so
+re-uploading the same file skips vision OCR and LLM extraction, while a
+prompt change invalidates old results automatically.
+
+The store is a SQLite file bounded to EXTRACTION_CACHE_MAX_ENTRIES rows
+(and, optionally, a total result size); least recently used rows are
+evicted first. ID document results contain personal data, so rows expire
+EXTRACTION_CACHE_TTL seconds after they were written, whether they are
+used or not. Set EXTRACTION_CACHE_DB to an empty string to disable the
+cache.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+EXTRACTION_CACHE_DB = os.getenv("EXTRACTION_CACHE_DB", "cache/extractions.sqlite3")
+EXTRACTION_CACHE_MAX_ENTRIES = int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "5000"))
+EXTRACTION_CACHE_TTL = int(os.getenv("EXTRACTION_CACHE_TTL", str(86400)))
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """SQLite-backed LRU cache with a hard TTL, safe to use from worker threads."""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = EXTRACTION_CACHE_DB,
+        max_entries: int = EXTRACTION_CACHE_MAX_ENTRIES,
+        ttl: int = EXTRACTION_CACHE_TTL,
+        max_bytes: int = 0,
+    ):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # Total size of the stored results (0 = bounded by max_entries only)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+        self.stats_counters = {"hits": 0, "misses": 0, "writes": 0, "evicted": 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        # Called with the lock held; the database is opened on first use
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS extractions (
+                    file_hash TEXT NOT NULL,
+                    document_type TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    size INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (file_hash, document_type, prompt_version)
+                )"""
+            )
+            try:
+                self._conn.execute(
+                    "ALTER TABLE extractions ADD COLUMN size INTEGER NOT NULL DEFAULT 0"
+                )
+            except sqlite3.OperationalError:
+                pass  # Column already present
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_extractions_last_used "
+                "ON extractions (last_used)"
+            )
+            self._purge_expired()
+            self._conn.commit()
+            print(f"[Extraction Cache] Using {self.db_path}")
+        return self._conn
+
+    def _purge_expired(self):
+        cursor = self._conn.execute(
+            "DELETE FROM extractions WHERE created_at < ?", (time.time() - self.ttl,)
+        )
+        self.stats_counters["evicted"] += cursor.rowcount
+
+    def _get(self, key: tuple) -> Optional[dict]:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT result, created_at FROM extractions "
+                "WHERE file_hash = ? AND document_type = ? AND prompt_version = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if row[1] < now - self.ttl:
+                conn.execute(
+                    "DELETE FROM extractions "
+                    "WHERE file_hash = ? AND document_type = ? AND prompt_version = ?",
+                    key,
+                )
+                conn.commit()
+                self.stats_counters["evicted"] += 1
+                return None
+            conn.execute(
+                "UPDATE extractions SET last_used = ? "
+                "WHERE file_hash = ? AND document_type = ? AND prompt_version = ?",
+                (now, *key),
+            )
+            conn.commit()
+        return json.loads(row[0])
+
+    def _set(self, key: tuple, result: dict):
+        with self._lock:
+            conn = self._connection()
+            now = time.time()
+            payload = json.dumps(result, ensure_ascii=False)
+            conn.execute(
+                "INSERT OR REPLACE INTO extractions "
+                "(file_hash, document_type, prompt_version, result, size, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, payload, len(payload.encode("utf-8")), now, now),
+            )
+            self._purge_expired()
+            cursor = conn.execute(
+                "DELETE FROM extractions WHERE rowid IN ("
+                "SELECT rowid FROM extractions ORDER BY last_used DESC "
+                "LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self.stats_counters["evicted"] += cursor.rowcount
+            if self.max_bytes:
+                self._evict_to_size()
+            conn.commit()
+
+    def _evict_to_size(self):
+        # Drop least recently used rows until the stored results fit max_bytes
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM extractions"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for rowid, size in self._conn.execute(
+            "SELECT rowid, size FROM extractions ORDER BY last_used ASC"
+        ):
+            if total <= self.max_bytes:
+                break
+            doomed.append((rowid,))
+            total -= size
+        self._conn.executemany("DELETE FROM extractions WHERE rowid = ?", doomed)
+        self.stats_counters["evicted"] += len(doomed)
+
+    async def get(
+        self, file_hash: str, document_type: str, prompt_version: str
+    ) -> Optional[dict]:
+        """
+        Look up a cached extraction.
+
+        Args:
+            file_hash: SHA-256 of the uploaded file (see file_sha256)
+            document_type: Document type and source, e.g. 'emirates_id/image'
+            prompt_version: Version hash of the prompts used for the extraction
+
+        Returns:
+            The cached result, or None on a miss
+        """
+        if not self.db_path:
+            return None
+        result = await asyncio.to_thread(
+            self._get, (file_hash, document_type, prompt_version)
+        )
+        self.stats_counters["hits" if result is not None else "misses"] += 1
+        return result
+
+    async def set(
+        self, file_hash: str, document_type: str, prompt_version: str, result: dict
+    ):
+        """Store an extraction result, evicting expired and least recently used rows."""
+        if not self.db_path:
+            return
+        await asyncio.to_thread(
+            self._set, (file_hash, document_type, prompt_version), result
+        )
+        self.stats_counters["writes"] += 1
+
+    def stats(self) -> dict:
+        lookups = self.stats_counters["hits"] + self.stats_counters["misses"]
+        entries = stored_bytes = None
+        if self._conn is not None:
+            with self._lock:
+                entries, stored_bytes = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extractions"
+                ).fetchone()
+        return {
+            **self.stats_counters,
+            "enabled": bool(self.db_path),
+            "entries": entries,
+            "bytes": stored_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hit_rate": round(self.stats_counters["hits"] / lookups, 4)
+            if lookups
+            else 0.0,
+        }
+
+
+extraction_cache = ExtractionCache()
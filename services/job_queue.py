@@ -0,0 +1,276 @@
+"""
+Job Queue
+Background jobs for batch work that is too slow to hold a request open for
+(parsing a set of insurance PDFs).
+
+A job is a list of items, each an async callable. submit() queues every
+item and returns the Job immediately; a fixed pool of JOB_QUEUE_WORKERS
+asyncio workers, shared by all jobs, runs the items. Each finished item is
+recorded on the job as an event:
+
+    {"id": 0, "event": "started", ...}
+    {"id": 1, "event": "result", "index": 2, "result": {...}, "completed": 1, "total": 3}
+    ...
+    {"id": 4, "event": "done", "completed": 3, "total": 3, "failed": 0}
+
+Job.follow() replays the events from a given id and then waits for new
+ones, so a client can subscribe late or reconnect without losing results.
+Finished jobs are kept for JOB_QUEUE_RETENTION seconds (at most
+JOB_QUEUE_MAX_JOBS of them) for later retrieval. Jobs live in the memory of
+the process that accepted them.
+"""
+
+import asyncio
+import contextvars
+import os
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+JOB_QUEUE_WORKERS = int(os.getenv("JOB_QUEUE_WORKERS", "4"))
+# Items waiting for a worker, across all jobs, before submit() is refused
+JOB_QUEUE_MAX_QUEUED = int(os.getenv("JOB_QUEUE_MAX_QUEUED", "200"))
+JOB_QUEUE_MAX_JOBS = int(os.getenv("JOB_QUEUE_MAX_JOBS", "500"))
+JOB_QUEUE_RETENTION = int(os.getenv("JOB_QUEUE_RETENTION", str(86400)))
+
+
+class JobQueueFull(Exception):
+    """Raised by submit() when the queue cannot take the job's items."""
+
+
+class Job:
+    """Progress, results and event log of one submitted job."""
+
+    def __init__(self, kind: str, labels: list):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.labels = labels
+        self.status = "queued"
+        self.created_at = time.time()
+        self.finished_at = None
+        self.completed = 0
+        self.failed = 0
+        self.results = [None] * len(labels)
+        self.events = []
+        self._changed = asyncio.Event()
+
+    @property
+    def total(self) -> int:
+        return len(self.labels)
+
+    @property
+    def finished(self) -> bool:
+        return self.status == "done"
+
+    def _emit(self, event: str, **data):
+        self.events.append({
+            "id": len(self.events),
+            "event": event,
+            "job_id": self.id,
+            **data,
+        })
+        # Wake every follower, then start a new generation
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def _start(self):
+        if self.status == "queued":
+            self.status = "running"
+            self._emit("started", total=self.total)
+
+    def _record(self, index: int, result):
+        self.results[index] = result
+        self.completed += 1
+        if isinstance(result, dict) and result.get("ok") is False:
+            self.failed += 1
+        self._emit(
+            "result",
+            index=index,
+            label=self.labels[index],
+            result=result,
+            completed=self.completed,
+            total=self.total,
+        )
+        if self.completed == self.total:
+            self.status = "done"
+            self.finished_at = time.time()
+            self._emit(
+                "done", completed=self.completed, total=self.total, failed=self.failed
+            )
+
+    async def follow(self, since: int = 0, heartbeat: float = 15.0):
+        """
+        Yield the job's events from id `since` until the job is done.
+
+        Args:
+            since: First event id to send (0 replays everything)
+            heartbeat: Seconds without an event after which None is yielded,
+                so the caller can keep the connection alive
+
+        Yields:
+            Event dicts, or None as a heartbeat
+        """
+        cursor = max(0, since)
+        while True:
+            # Taken before reading, so an event emitted meanwhile is not missed
+            changed = self._changed
+            while cursor < len(self.events):
+                yield self.events[cursor]
+                cursor += 1
+            if self.finished:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+
+    def snapshot(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "total": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "results": self.results,
+        }
+
+
+class JobQueue:
+    """Fixed pool of asyncio workers fed by one queue of job items."""
+
+    def __init__(
+        self,
+        name: str,
+        workers: int = JOB_QUEUE_WORKERS,
+        max_queued: int = JOB_QUEUE_MAX_QUEUED,
+        max_jobs: int = JOB_QUEUE_MAX_JOBS,
+        retention: int = JOB_QUEUE_RETENTION,
+    ):
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.max_jobs = max_jobs
+        self.retention = retention
+        self._queue = None
+        self._workers = []
+        self._jobs = {}
+        self.stats_counters = {"submitted": 0, "items": 0, "finished": 0, "expired": 0}
+
+    def _start_workers(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._workers = [task for task in self._workers if not task.done()]
+        while len(self._workers) < self.workers:
+            # Workers start in an empty context; each item runs in its submitter's
+            worker = contextvars.Context().run(
+                asyncio.get_running_loop().create_task, self._run()
+            )
+            self._workers.append(worker)
+
+    def has_room(self, count: int) -> bool:
+        """Whether a job of count items would be accepted right now."""
+        queued = self._queue.qsize() if self._queue else 0
+        return queued + count <= self.max_queued
+
+    def submit(
+        self, kind: str, items: list[tuple[str, Callable[[], Awaitable]]]
+    ) -> Job:
+        """
+        Queue a job and return it without waiting for any item.
+
+        Args:
+            kind: Job type, reported in the job snapshot
+            items: (label, async callable) pairs; each callable's return value
+                becomes that item's result. Context variables of the caller
+                (e.g. the LLM lane) apply to every item.
+
+        Returns:
+            The queued Job
+
+        Raises:
+            JobQueueFull: More than max_queued items would be waiting
+        """
+        if not items:
+            raise ValueError("A job needs at least one item")
+        self._start_workers()
+        if self._queue.qsize() + len(items) > self.max_queued:
+            raise JobQueueFull(
+                f"{self._queue.qsize()} items already queued (max {self.max_queued})"
+            )
+        self._prune()
+
+        job = Job(kind, [label for label, _ in items])
+        self._jobs[job.id] = job
+        context = contextvars.copy_context()
+        for index, (_, run) in enumerate(items):
+            self._queue.put_nowait((job, index, run, context))
+        self.stats_counters["submitted"] += 1
+        self.stats_counters["items"] += len(items)
+        print(f"[Job Queue] {self.name} job {job.id}: {job.total} items queued")
+        return job
+
+    async def _run(self):
+        while True:
+            job, index, run, context = await self._queue.get()
+            job._start()
+            started = time.perf_counter()
+            try:
+                # A task per item keeps the item's context changes out of the worker
+                result = await context.run(asyncio.ensure_future, run())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                result = {"ok": False, "error": str(e)}
+            finally:
+                self._queue.task_done()
+            job._record(index, result)
+            print(
+                f"[Job Queue] {self.name} job {job.id}: item {index + 1}/{job.total} "
+                f"in {time.perf_counter() - started:.2f}s"
+            )
+            if job.finished:
+                self.stats_counters["finished"] += 1
+
+    def _prune(self):
+        # Drop expired finished jobs, then the oldest finished ones over max_jobs
+        now = time.time()
+        finished = sorted(
+            (job for job in self._jobs.values() if job.finished),
+            key=lambda job: job.finished_at,
+        )
+        excess = max(0, len(self._jobs) - self.max_jobs)
+        for job in finished:
+            if job.finished_at >= now - self.retention and excess <= 0:
+                break
+            del self._jobs[job.id]
+            excess -= 1
+            self.stats_counters["expired"] += 1
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """The job with this id, or None if unknown or expired."""
+        self._prune()
+        return self._jobs.get(job_id)
+
+    async def close(self):
+        """Stop the workers; items still queued are dropped."""
+        for worker in self._workers:
+            worker.cancel()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def stats(self) -> dict:
+        statuses = {"queued": 0, "running": 0, "done": 0}
+        for job in self._jobs.values():
+            statuses[job.status] += 1
+        return {
+            **self.stats_counters,
+            "jobs": statuses,
+            "queued_items": self._queue.qsize() if self._queue else 0,
+            "workers": self.workers,
+            "max_queued": self.max_queued,
+            "retention": self.retention,
+        }
@@ -0,0 +1,350 @@
+"""
+Language Identification
+Offline language detection for the languages in LANGUAGE_CODES.
+
+Non-Latin scripts are decided by Unicode block; Latin-script text is scored
+with a character trigram model stored in services/data/language_ngrams.json.
+
+Most Latin-script input here is short English (names, car models, option
+labels), which a trigram model easily mistakes for Italian or Spanish. So
+English gets a prior, and a non-English guess is only trusted when the text
+has at least LATIN_MIN_TRIGRAMS trigrams; no guess is trusted when the model
+knows too few of its trigrams. Romanized Hindi, Urdu and Arabic are modelled
+too, but only so they are recognised: they always go to the LLM. An
+untrusted guess has confidence 0 and the caller falls back to the LLM.
+
+Rebuild the model after editing services/data/language_corpus.json with:
+    python -m services.language_id --build
+Pick the confidence threshold from the labelled samples in
+services/data/language_benchmark.json with:
+    python -m services.language_id --calibrate
+Compare against the LLM detector with:
+    python -m services.language_id --benchmark texts.txt
+"""
+
+import asyncio
+import json
+import math
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+CORPUS_FILE = os.path.join(DATA_DIR, "language_corpus.json")
+MODEL_FILE = os.path.join(DATA_DIR, "language_ngrams.json")
+BENCHMARK_FILE = os.path.join(DATA_DIR, "language_benchmark.json")
+MODEL_TOP_K = 400
+
+# Romanized text in languages normally written in another script (chat
+# Hindi/Urdu, Arabizi). These are modelled so they are not mistaken for
+# English or Spanish, but always confirmed by the LLM.
+ROMANIZED_LANGUAGES = {
+    "Romanized Hindi": "Hindi",
+    "Romanized Urdu": "Urdu",
+    "Romanized Arabic": "Arabic",
+}
+
+# Log-odds added to English, the language most conversations are in
+LATIN_ENGLISH_PRIOR = 4.0
+# Below this many trigrams a non-English guess is not trusted
+LATIN_MIN_TRIGRAMS = 16
+# Below this share of trigrams known to the winning language, no guess is
+# trusted (English included)
+LATIN_MIN_COVERAGE = 0.5
+
+# Supported languages (name -> ISO 639-1 code)
+LANGUAGE_CODES = {
+    "english": "en",
+    "arabic": "ar",
+    "hindi": "hi",
+    "urdu": "ur",
+    "french": "fr",
+    "spanish": "es",
+    "german": "de",
+    "italian": "it",
+    "portuguese": "pt",
+    "russian": "ru",
+    "chinese": "zh",
+    "japanese": "ja",
+    "korean": "ko",
+}
+
+# (first, last, script)
+SCRIPT_RANGES = [
+    (0x0041, 0x005A, "latin"),
+    (0x0061, 0x007A, "latin"),
+    (0x00C0, 0x024F, "latin"),
+    (0x0400, 0x04FF, "cyrillic"),
+    (0x0600, 0x06FF, "arabic"),
+    (0x0750, 0x077F, "arabic"),
+    (0x0900, 0x097F, "devanagari"),
+    (0x1100, 0x11FF, "hangul"),
+    (0x3040, 0x30FF, "kana"),
+    (0x3130, 0x318F, "hangul"),
+    (0x3400, 0x4DBF, "han"),
+    (0x4E00, 0x9FFF, "han"),
+    (0xAC00, 0xD7AF, "hangul"),
+    (0xFB50, 0xFDFF, "arabic"),
+    (0xFE70, 0xFEFF, "arabic"),
+]
+
+SCRIPT_LANGUAGES = {
+    "cyrillic": "Russian",
+    "devanagari": "Hindi",
+    "hangul": "Korean",
+    "kana": "Japanese",
+    "han": "Chinese",
+}
+
+# Letters used in Urdu but not in Arabic (ٹ ڈ ڑ ں ھ ہ ے ۓ ک گ ی پ چ)
+URDU_LETTERS = set("ٹڈڑںھہےۓکگیپچ")
+# Letters used in Arabic but not in Urdu (ة ك ي ى)
+ARABIC_LETTERS = set("ةكيى")
+
+_NON_LETTERS = re.compile(r"[^\w]+|[\d_]+")
+
+
+def _script_of(char: str):
+    point = ord(char)
+    for first, last, script in SCRIPT_RANGES:
+        if first <= point <= last:
+            return script
+    return None
+
+
+def _trigrams(text: str) -> list:
+    words = _NON_LETTERS.sub(" ", text.lower()).split()
+    grams = []
+    for word in words:
+        padded = f" {word} "
+        grams.extend(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def build_model(
+    corpus_path: str = CORPUS_FILE,
+    model_path: str = MODEL_FILE,
+    top_k: int = MODEL_TOP_K,
+) -> dict:
+    """
+    Build the Latin-script trigram model from the sample corpus.
+
+    Args:
+        corpus_path: JSON file mapping language name to a list of sample sentences
+        model_path: Output model file
+        top_k: Number of trigrams kept per language
+
+    Returns:
+        The model dict that was written
+    """
+    with open(corpus_path, "r", encoding="utf-8") as file:
+        corpus = json.load(file)
+
+    model = {"top_k": top_k, "languages": {}}
+    for language, sentences in corpus.items():
+        counts = Counter(_trigrams(" ".join(sentences)))
+        total = sum(counts.values())
+        kept = counts.most_common(top_k)
+        # Add-one smoothing; everything outside the kept set shares the floor
+        denominator = total + top_k + 1
+        model["languages"][language] = {
+            "unseen": round(math.log(1 / denominator), 4),
+            "logprobs": {
+                gram: round(math.log((count + 1) / denominator), 4)
+                for gram, count in kept
+            },
+        }
+
+    with open(model_path, "w", encoding="utf-8") as file:
+        json.dump(model, file, ensure_ascii=False, indent=1, sort_keys=True)
+    return model
+
+
+def _load_model(model_path: str = MODEL_FILE) -> dict:
+    try:
+        with open(model_path, "r", encoding="utf-8") as file:
+            return json.load(file)["languages"]
+    except (OSError, json.JSONDecodeError, KeyError) as e:
+        print(
+            f"[Language ID] Could not load {model_path}: {e}. Latin text will go to the LLM."
+        )
+        return {}
+
+
+_model = _load_model()
+
+
+def _result(language: str, confidence: float, method: str) -> dict:
+    return {
+        "language": language,
+        "code": LANGUAGE_CODES[language.lower()],
+        "confidence": round(max(0.0, min(1.0, confidence)), 3),
+        "method": method,
+    }
+
+
+def _identify_latin(text: str) -> dict:
+    grams = _trigrams(text)
+    if not _model or not grams:
+        return _result("English", 0.0, "ngram")
+
+    scores = {
+        language: sum(
+            profile["logprobs"].get(gram, profile["unseen"]) for gram in grams
+        )
+        for language, profile in _model.items()
+    }
+    if "English" in scores:
+        scores["English"] += LATIN_ENGLISH_PRIOR
+    best = max(scores, key=scores.get)
+    # Text made of trigrams the model has rarely seen (e.g. romanized Hindi/Urdu)
+    # is probably not any of these languages
+    coverage = sum(gram in _model[best]["logprobs"] for gram in grams) / len(grams)
+    if best in ROMANIZED_LANGUAGES:
+        return _result(ROMANIZED_LANGUAGES[best], 0.0, "ngram")
+    if coverage < LATIN_MIN_COVERAGE or (
+        best != "English" and len(grams) < LATIN_MIN_TRIGRAMS
+    ):
+        return _result(best, 0.0, "ngram")
+
+    # Posterior over the Latin-script languages, damped for very short input
+    top = scores[best]
+    total = sum(math.exp(score - top) for score in scores.values())
+    posterior = 1 / total
+    length_factor = min(1.0, len(grams) / 12)
+    coverage_factor = min(1.0, coverage / 0.6)
+    return _result(best, posterior * length_factor * coverage_factor, "ngram")
+
+
+def identify_language(text: str) -> dict:
+    """
+    Identify the language of text without any network call.
+
+    Args:
+        text: The text to classify
+
+    Returns:
+        dict with 'language', 'code', 'confidence' (0-1) and 'method' ('script' or 'ngram')
+    """
+    scripts = Counter()
+    for char in text:
+        if char.isalpha():
+            script = _script_of(char)
+            if script:
+                scripts[script] += 1
+
+    letters = sum(scripts.values())
+    if not letters:
+        return _result("English", 0.0, "script")
+
+    script, count = scripts.most_common(1)[0]
+    share = count / letters
+    length_factor = min(1.0, letters / 4)
+
+    if script == "latin":
+        result = _identify_latin(text)
+        result["confidence"] = round(result["confidence"] * share, 3)
+        return result
+
+    if script in ["han", "kana"] and scripts["kana"]:
+        # Japanese mixes kanji with kana; kana never appears in Chinese
+        share = (scripts["han"] + scripts["kana"]) / letters
+        return _result("Japanese", share * length_factor, "script")
+
+    if script == "arabic":
+        urdu_marks = sum(1 for char in text if char in URDU_LETTERS)
+        arabic_marks = sum(1 for char in text if char in ARABIC_LETTERS)
+        if urdu_marks > arabic_marks:
+            return _result("Urdu", share * length_factor, "script")
+        if arabic_marks:
+            return _result("Arabic", share * length_factor, "script")
+        # No distinguishing letters: Arabic is far more common here
+        return _result("Arabic", 0.8 * share * length_factor, "script")
+
+    return _result(SCRIPT_LANGUAGES[script], share * length_factor, "script")
+
+
+async def benchmark(texts: list) -> dict:
+    """
+    Compare identify_language against the LLM detector.
+
+    Args:
+        texts: Sample texts
+
+    Returns:
+        Agreement rate and mean latency of both detectors
+    """
+    from services.llm_services import llm_detect_language
+
+    agree = 0
+    local_seconds = 0.0
+    llm_seconds = 0.0
+    for text in texts:
+        start = time.perf_counter()
+        local = identify_language(text)
+        local_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        remote = await llm_detect_language(text)
+        llm_seconds += time.perf_counter() - start
+
+        matched = local["code"] == remote.get("code")
+        agree += matched
+        if not matched:
+            print(
+                f"[Language ID] {text[:60]!r}: local={local['code']} ({local['confidence']}) llm={remote.get('code')}"
+            )
+
+    count = len(texts) or 1
+    return {
+        "samples": len(texts),
+        "agreement": round(agree / count, 4),
+        "local_ms": round(local_seconds / count * 1000, 3),
+        "llm_ms": round(llm_seconds / count * 1000, 1),
+    }
+
+
+def calibrate(samples: list, thresholds: list = None) -> dict:
+    """
+    Measure identify_language on labelled samples at each confidence threshold.
+
+    Args:
+        samples: [{"text": ..., "code": ...}] (see BENCHMARK_FILE)
+        thresholds: Thresholds to evaluate (default 0.50 to 0.95 in 0.05 steps)
+
+    Returns:
+        Per-threshold share of samples decided locally and wrong local
+        decisions, and 'recommended': the lowest threshold with none wrong
+    """
+    thresholds = thresholds or [round(0.5 + 0.05 * step, 2) for step in range(10)]
+    results = [(identify_language(s["text"]), s["code"]) for s in samples]
+    rows = []
+    for threshold in thresholds:
+        accepted = [(r, code) for r, code in results if r["confidence"] >= threshold]
+        wrong = [r for r, code in accepted if r["code"] != code]
+        rows.append({
+            "threshold": threshold,
+            "local_share": round(len(accepted) / (len(results) or 1), 3),
+            "wrong": len(wrong),
+        })
+    safe = [row["threshold"] for row in rows if not row["wrong"]]
+    return {
+        "samples": len(results),
+        "thresholds": rows,
+        "recommended": min(safe) if safe else None,
+    }
+
+
+if __name__ == "__main__":
+    if "--build" in sys.argv:
+        built = build_model()
+        print(f"[Language ID] Built model for {', '.join(built['languages'])}")
+    elif "--calibrate" in sys.argv:
+        with open(BENCHMARK_FILE, encoding="utf-8") as f:
+            print(json.dumps(calibrate(json.load(f)), indent=1))
+    elif "--benchmark" in sys.argv:
+        with open(sys.argv[sys.argv.index("--benchmark") + 1], encoding="utf-8") as f:
+            samples = [line.strip() for line in f if line.strip()]
+        print(asyncio.run(benchmark(samples)))
@@ -0,0 +1,172 @@
+"""
+LLM Clients
+Process-wide registry of ChatGroq instances.
+
+Every ChatGroq returned by get_llm shares one pooled sync and one pooled
+async HTTP client, so a document request reuses a warm keep-alive connection
+to the Groq API instead of opening (and TLS-handshaking) a new one. Instances
+are cached by model, temperature, max_tokens and API key, and send their
+requests through services.llm_gateway (concurrency, rate limits, retries).
+
+HTTP/2 is used when the 'h2' package is installed. Connection reuse can be
+checked with pool_stats() (served at GET /llm/pool/stats/).
+"""
+
+import importlib.util
+import os
+import threading
+from typing import Optional
+
+import httpx
+from langchain_groq.chat_models import ChatGroq
+
+from services.llm_gateway import GatewayChatGroq
+
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "50"))
+LLM_POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "20"))
+LLM_POOL_KEEPALIVE_EXPIRY = float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "120"))
+LLM_HTTP_TIMEOUT = float(os.getenv("LLM_HTTP_TIMEOUT", "60"))
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "true").lower() not in ("0", "false", "no")
+
+_http2_available = importlib.util.find_spec("h2") is not None
+
+_lock = threading.Lock()
+_llms = {}
+_sync_client = None
+_async_client = None
+
+_counters = {
+    "llm_instances": 0,
+    "llm_cache_hits": 0,
+    "requests": 0,
+    "connections_opened": 0,
+    "tls_handshakes": 0,
+}
+
+
+def _count(event_name: str):
+    if event_name == "connection.connect_tcp.complete":
+        _counters["connections_opened"] += 1
+    elif event_name == "connection.start_tls.complete":
+        _counters["tls_handshakes"] += 1
+
+
+def _trace(event_name: str, info: dict):
+    _count(event_name)
+
+
+async def _atrace(event_name: str, info: dict):
+    _count(event_name)
+
+
+def _on_request(request: httpx.Request):
+    _counters["requests"] += 1
+    request.extensions["trace"] = _trace
+
+
+async def _on_async_request(request: httpx.Request):
+    _counters["requests"] += 1
+    request.extensions["trace"] = _atrace
+
+
+def _client_options() -> dict:
+    return {
+        "http2": LLM_HTTP2 and _http2_available,
+        "limits": httpx.Limits(
+            max_connections=LLM_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=LLM_POOL_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(LLM_HTTP_TIMEOUT, connect=10.0),
+    }
+
+
+def _http_clients():
+    global _sync_client, _async_client
+    if _sync_client is None:
+        if LLM_HTTP2 and not _http2_available:
+            print("[LLM Clients] 'h2' is not installed. Falling back to HTTP/1.1.")
+        _sync_client = httpx.Client(
+            event_hooks={"request": [_on_request]}, **_client_options()
+        )
+        _async_client = httpx.AsyncClient(
+            event_hooks={"request": [_on_async_request]}, **_client_options()
+        )
+    return _sync_client, _async_client
+
+
+def get_llm(
+    model: Optional[str] = None,
+    temperature: float = 0,
+    max_tokens: Optional[int] = None,
+    api_key: Optional[str] = None,
+) -> ChatGroq:
+    """
+    Return the shared ChatGroq for these settings, creating it on first use.
+
+    Args:
+        model: Groq model name (defaults to LLM_MODEL)
+        temperature: Sampling temperature
+        max_tokens: Completion token limit (None for the model default)
+        api_key: Groq API key (defaults to GROQ_API_KEY)
+
+    Returns:
+        ChatGroq backed by the shared connection pool
+    """
+    model = model or os.getenv("LLM_MODEL")
+    api_key = api_key or os.getenv("GROQ_API_KEY")
+    key = (model, float(temperature), max_tokens, api_key)
+
+    llm = _llms.get(key)
+    if llm is not None:
+        _counters["llm_cache_hits"] += 1
+        return llm
+
+    with _lock:
+        llm = _llms.get(key)
+        if llm is None:
+            sync_client, async_client = _http_clients()
+            # Retries are handled by the gateway, not the Groq SDK
+            llm = GatewayChatGroq(
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                api_key=api_key,
+                max_retries=0,
+                http_client=sync_client,
+                http_async_client=async_client,
+            )
+            _llms[key] = llm
+            _counters["llm_instances"] += 1
+    return llm
+
+
+def pool_stats() -> dict:
+    """Connection reuse across every LLM call made through the registry."""
+    requests = _counters["requests"]
+    opened = _counters["connections_opened"]
+    return {
+        **_counters,
+        "reused_requests": max(0, requests - opened),
+        "reuse_ratio": round(1 - opened / requests, 4) if requests else None,
+        "http2": LLM_HTTP2 and _http2_available,
+        "models": sorted({str(key[0]) for key in _llms}),
+        "limits": {
+            "max_connections": LLM_POOL_MAX_CONNECTIONS,
+            "max_keepalive_connections": LLM_POOL_MAX_KEEPALIVE,
+            "keepalive_expiry": LLM_POOL_KEEPALIVE_EXPIRY,
+        },
+    }
+
+
+async def close_clients():
+    """Close the pooled HTTP clients (application shutdown)."""
+    global _sync_client, _async_client
+    with _lock:
+        sync_client, async_client = _sync_client, _async_client
+        _sync_client = _async_client = None
+        _llms.clear()
+    if async_client is not None:
+        await async_client.aclose()
+    if sync_client is not None:
+        sync_client.close()
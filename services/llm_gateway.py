@@ -0,0 +1,371 @@
+"""
+LLM Gateway
+Admission control for every Groq call made through services.llm_clients.
+
+Each call:
+    1. waits for its model's request and token buckets (requests / tokens
+       per minute), settling the token bucket with the real usage afterwards;
+    2. takes a concurrency slot (LLM_MAX_CONCURRENCY in total). Waiting
+       interactive calls are admitted before waiting bulk calls, and bulk
+       calls never hold more than LLM_BULK_MAX_CONCURRENCY slots;
+    3. is retried with jittered exponential backoff on 429, 5xx and
+       connection errors, honouring Retry-After.
+
+Synchronous calls (invoke, chain.run) block their thread while waiting, so
+they are refused on the event loop thread: use ainvoke() there, or run the
+call with asyncio.to_thread().
+
+The lane is taken from a context variable, so a route marks all the calls
+it causes (including ones made in worker threads) with
+    llm_lane.set(BULK)
+
+Per-model limits:
+    LLM_RATE_LIMITS='{"llama-3.3-70b-versatile": {"rpm": 1000, "tpm": 300000}}'
+Models not listed use LLM_DEFAULT_RPM / LLM_DEFAULT_TPM (0 disables a bucket).
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+import groq
+from langchain_groq.chat_models import ChatGroq
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+LANE_PRIORITY = {INTERACTIVE: 0, BULK: 1}
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+LLM_BULK_MAX_CONCURRENCY = int(
+    os.getenv("LLM_BULK_MAX_CONCURRENCY", str(max(1, LLM_MAX_CONCURRENCY // 2)))
+)
+LLM_DEFAULT_RPM = float(os.getenv("LLM_DEFAULT_RPM", "1000"))
+LLM_DEFAULT_TPM = float(os.getenv("LLM_DEFAULT_TPM", "300000"))
+LLM_RATE_LIMITS = json.loads(os.getenv("LLM_RATE_LIMITS", "{}"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "20"))
+# Completion tokens assumed when a call does not set max_tokens
+LLM_COMPLETION_TOKEN_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKEN_ESTIMATE", "512"))
+
+llm_lane = contextvars.ContextVar("llm_lane", default=INTERACTIVE)
+
+
+class TokenBucket:
+    """
+    Per-minute budget that callers reserve from, going into debt if needed.
+
+    reserve() always succeeds and returns how long the caller must wait
+    before using what it reserved, so waiters are served in arrival order.
+    """
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60
+        self.level = per_minute
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.per_minute, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            self._refill()
+            self.level -= amount
+            return max(0.0, -self.level / self.rate)
+
+    def adjust(self, amount: float):
+        """Give back (positive) or take (negative) after the real cost is known."""
+        with self._lock:
+            self._refill()
+            self.level = min(self.per_minute, self.level + amount)
+
+
+class _Waiter:
+    __slots__ = ("lane", "wake", "cancelled")
+
+    def __init__(self, lane: str, wake):
+        self.lane = lane
+        self.wake = wake
+        self.cancelled = False
+
+
+class PrioritySlots:
+    """
+    Concurrency limit shared by event-loop code and worker threads.
+
+    A released slot is handed directly to the best waiter: interactive
+    before bulk, then first come first served.
+    """
+
+    def __init__(self, limit: int, bulk_limit: int):
+        self.limit = limit
+        self.bulk_limit = bulk_limit
+        self.active = {INTERACTIVE: 0, BULK: 0}
+        self._heap = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _has_room(self, lane: str) -> bool:
+        if sum(self.active.values()) >= self.limit:
+            return False
+        return lane != BULK or self.active[BULK] < self.bulk_limit
+
+    def _admit(self, lane: str) -> bool:
+        # Called with the lock held; never overtakes a waiter of the same or higher priority
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+        if self._heap and self._heap[0][0] <= LANE_PRIORITY[lane]:
+            return False
+        if not self._has_room(lane):
+            return False
+        self.active[lane] += 1
+        return True
+
+    def _enqueue(self, lane: str, wake) -> _Waiter:
+        waiter = _Waiter(lane, wake)
+        heapq.heappush(self._heap, (LANE_PRIORITY[lane], next(self._seq), waiter))
+        return waiter
+
+    def release(self, lane: str):
+        granted = []
+        with self._lock:
+            self.active[lane] -= 1
+            while self._heap:
+                waiter = self._heap[0][2]
+                if waiter.cancelled:
+                    heapq.heappop(self._heap)
+                    continue
+                if not self._has_room(waiter.lane):
+                    break
+                heapq.heappop(self._heap)
+                self.active[waiter.lane] += 1
+                granted.append(waiter)
+        for waiter in granted:
+            waiter.wake()
+
+    def acquire(self, lane: str):
+        with self._lock:
+            if self._admit(lane):
+                return
+            event = threading.Event()
+            self._enqueue(lane, event.set)
+        event.wait()
+
+    async def acquire_async(self, lane: str):
+        with self._lock:
+            if self._admit(lane):
+                return
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            waiter = self._enqueue(
+                lane,
+                lambda: loop.call_soon_threadsafe(self._resolve, future, lane),
+            )
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                waiter.cancelled = True
+            if future.done() and not future.cancelled():
+                # The slot was granted just before the cancellation landed
+                self.release(lane)
+            raise
+
+    def _resolve(self, future: asyncio.Future, lane: str):
+        if future.cancelled():
+            self.release(lane)
+        else:
+            future.set_result(None)
+
+    def waiting(self) -> dict:
+        with self._lock:
+            counts = {INTERACTIVE: 0, BULK: 0}
+            for _, _, waiter in self._heap:
+                if not waiter.cancelled:
+                    counts[waiter.lane] += 1
+            return counts
+
+
+class _ModelLimits:
+    def __init__(self, model: str):
+        limits = LLM_RATE_LIMITS.get(model, {})
+        rpm = float(limits.get("rpm", LLM_DEFAULT_RPM))
+        tpm = float(limits.get("tpm", LLM_DEFAULT_TPM))
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+
+    def reserve(self, tokens: int) -> float:
+        wait = 0.0
+        if self.requests:
+            wait = self.requests.reserve(1)
+        if self.tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        return wait
+
+    def settle(self, estimated: int, actual: Optional[int]):
+        if self.tokens and actual is not None:
+            self.tokens.adjust(estimated - actual)
+
+
+_slots = PrioritySlots(LLM_MAX_CONCURRENCY, LLM_BULK_MAX_CONCURRENCY)
+_models = {}
+_models_lock = threading.Lock()
+_counters = {
+    "calls": {INTERACTIVE: 0, BULK: 0},
+    "retries": 0,
+    "rate_limited": 0,
+    "failed": 0,
+    "throttled_seconds": 0.0,
+    "queued_seconds": 0.0,
+}
+
+
+def _limits_for(model: str) -> _ModelLimits:
+    limits = _models.get(model)
+    if limits is None:
+        with _models_lock:
+            limits = _models.setdefault(model, _ModelLimits(model))
+    return limits
+
+
+def _estimate_tokens(messages: list, max_tokens: Optional[int]) -> int:
+    chars = sum(len(str(message.content)) for message in messages)
+    return chars // 4 + (max_tokens or LLM_COMPLETION_TOKEN_ESTIMATE)
+
+
+def _used_tokens(result) -> Optional[int]:
+    usage = (result.llm_output or {}).get("token_usage") or {}
+    return usage.get("total_tokens")
+
+
+def _retry_delay(error: Exception, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying, or None if the error is not retryable."""
+    if isinstance(error, groq.APIStatusError):
+        if error.status_code != 429 and error.status_code < 500:
+            return None
+        if error.status_code == 429:
+            _counters["rate_limited"] += 1
+        retry_after = error.response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return float(retry_after) + random.uniform(0, LLM_RETRY_BASE_DELAY)
+            except ValueError:
+                pass
+    elif not isinstance(error, groq.APIConnectionError):
+        return None
+    # Full jitter
+    return random.uniform(
+        0, min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * 2**attempt)
+    )
+
+
+def _ensure_off_event_loop():
+    # A blocking call on the loop thread would wait for slots that only the
+    # blocked loop can release, and would stall every request while it sleeps
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    raise RuntimeError(
+        "Synchronous LLM call on the event loop thread; "
+        "use ainvoke() or run it with asyncio.to_thread()"
+    )
+
+
+class GatewayChatGroq(ChatGroq):
+    """ChatGroq whose requests go through the gateway's slots, buckets and retries."""
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        _ensure_off_event_loop()
+        lane = llm_lane.get()
+        limits = _limits_for(self.model_name)
+        estimated = _estimate_tokens(messages, self.max_tokens)
+        _counters["calls"][lane] += 1
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            # Throttle before taking a slot, so a throttled call does not hold one
+            wait = limits.reserve(estimated)
+            if wait:
+                _counters["throttled_seconds"] += wait
+                time.sleep(wait)
+            queued = time.monotonic()
+            _slots.acquire(lane)
+            try:
+                _counters["queued_seconds"] += time.monotonic() - queued
+                result = super()._generate(messages, stop, run_manager, **kwargs)
+                limits.settle(estimated, _used_tokens(result))
+                return result
+            except Exception as e:
+                delay = _retry_delay(e, attempt)
+                if delay is None or attempt == LLM_MAX_RETRIES:
+                    _counters["failed"] += 1
+                    raise
+                _counters["retries"] += 1
+                print(
+                    f"[LLM Gateway] {self.model_name}: {type(e).__name__}, retry {attempt + 1} in {delay:.2f}s"
+                )
+            finally:
+                _slots.release(lane)
+            time.sleep(delay)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        lane = llm_lane.get()
+        limits = _limits_for(self.model_name)
+        estimated = _estimate_tokens(messages, self.max_tokens)
+        _counters["calls"][lane] += 1
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            wait = limits.reserve(estimated)
+            if wait:
+                _counters["throttled_seconds"] += wait
+                await asyncio.sleep(wait)
+            queued = time.monotonic()
+            await _slots.acquire_async(lane)
+            try:
+                _counters["queued_seconds"] += time.monotonic() - queued
+                result = await super()._agenerate(messages, stop, run_manager, **kwargs)
+                limits.settle(estimated, _used_tokens(result))
+                return result
+            except Exception as e:
+                delay = _retry_delay(e, attempt)
+                if delay is None or attempt == LLM_MAX_RETRIES:
+                    _counters["failed"] += 1
+                    raise
+                _counters["retries"] += 1
+                print(
+                    f"[LLM Gateway] {self.model_name}: {type(e).__name__}, retry {attempt + 1} in {delay:.2f}s"
+                )
+            finally:
+                _slots.release(lane)
+            await asyncio.sleep(delay)
+
+
+def gateway_stats() -> dict:
+    models = {}
+    for model, limits in list(_models.items()):
+        models[model] = {
+            "requests_available": round(limits.requests.level, 1)
+            if limits.requests
+            else None,
+            "tokens_available": round(limits.tokens.level) if limits.tokens else None,
+        }
+    return {
+        **_counters,
+        "calls": dict(_counters["calls"]),
+        "throttled_seconds": round(_counters["throttled_seconds"], 3),
+        "queued_seconds": round(_counters["queued_seconds"], 3),
+        "active": dict(_slots.active),
+        "waiting": _slots.waiting(),
+        "max_concurrency": LLM_MAX_CONCURRENCY,
+        "bulk_max_concurrency": LLM_BULK_MAX_CONCURRENCY,
+        "models": models,
+    }
@@ -29,40 +29,145 @@ from utils.question_helper import (
     handle_visa_issued_emirate_question,
     handle_what_would_you_do_today_question,
     handle_yes_or_no,
+    is_current_question,
 )
-from langchain_groq.chat_models import ChatGroq
+from services.llm_clients import get_llm
 from fastapi import FastAPI, File, UploadFile
 from langchain_core.messages import HumanMessage, SystemMessage
 from models.model import UserInput
+from services.language_id import LANGUAGE_CODES, identify_language
+from services.question_catalog import QuestionCatalog, build_catalog
+from services.question_plan import QuestionPlan, compile_flows
+from services.response_cache import cached_reply
+from services import session_store
+from services.completion_sink import current_user_id, record_completion
+from services.translation_cache import translation_cache
 from langchain_community.tools import DuckDuckGoSearchRun
 from langchain_core.tools import tool
 from langchain.agents import initialize_agent
 from random import choice
-import requests
+import hashlib
+import httpx
+import time
 import json
 import re
 import os
 from dotenv import load_dotenv
-from cachetools import TTLCache
+from rapidfuzz import fuzz, process as fuzz_process
 
 load_dotenv()
 
+# Local language identification below this confidence is confirmed by the LLM
+# (from `python -m services.language_id --calibrate`: no wrong local decisions
+# on services/data/language_benchmark.json, romanized Hindi/Urdu/Arabic
+# included, at 0.4 and above; errors at 0.3)
+LANGUAGE_ID_CONFIDENCE = float(os.getenv("LANGUAGE_ID_CONFIDENCE", "0.5"))
+
 # API Configuration - Base URLs for InsuranceLab
 INSURANCE_LAB_BASE_URL = "https://insurancelab.ae"
 INSURANCE_LAB_API_BASE_URL = f"{INSURANCE_LAB_BASE_URL}/Api"
 INSURANCE_LAB_SME_ADD_API = f"{INSURANCE_LAB_API_BASE_URL}/sme_add/"
 INSURANCE_LAB_SME_PLAN_BASE = f"{INSURANCE_LAB_BASE_URL}/sme_plan"
 # Updated
-llm = ChatGroq(
-    model="llama-3.3-70b-versatile",
-    temperature=0,
-    api_key=os.getenv("GROQ_API_KEY"),
-    groq_proxy=None,
-)
+llm = get_llm("llama-3.3-70b-versatile")
 
 
 # ==================== MULTI-LANGUAGE SUPPORT FUNCTIONS ====================
 
+# Pre-translated static prompts (see services/question_catalog.py)
+question_catalog = QuestionCatalog.load()
+
+
+async def refresh_question_catalog():
+    """Rebuild the question catalog file and start serving it."""
+    global question_catalog
+    await build_catalog()
+    question_catalog = QuestionCatalog.load()
+
+
+# Fixed Takaful Emarat Silver answers. The LLM only rewords each one, so the
+# reworded variants are generated offline into the question catalog
+# (python -m services.question_catalog --answers) and picked at random.
+# Set LIVE_ANSWER_REWRITES=true to reword them on every turn instead.
+LIVE_ANSWER_REWRITES = os.getenv("LIVE_ANSWER_REWRITES", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+TAKAFUL_GREETING_SYSTEM = "You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to greet customers warmly and make them feel welcome and comfortable. Keep responses short (1-3 lines) and maintain the exact same information while making it sound natural."
+TAKAFUL_EXPLAIN_SYSTEM = "You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to explain insurance terms in a warm, conversational manner. Keep responses short (1-3 lines) and maintain the exact same information while making it sound natural."
+TAKAFUL_FOLLOWUP_SYSTEM = "You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to communicate in a warm, conversational manner that makes customers feel comfortable and well-cared for. Keep responses short (1-3 lines) and maintain the exact same information while making it sound natural."
+FIXED_ANSWER_REWRITES = {
+    "takaful_welcome": (
+        TAKAFUL_GREETING_SYSTEM,
+        "Rewrite this welcome message in a friendly, conversational way as if a real insurance agent is greeting a customer. Keep the same content but make it sound natural and warm. Use only 1-3 lines maximum: 'Welcome to the Takaful Emarat Silver plan! What do you need to know about the Takaful Emarat Silver plan? Please let me know, I am here to help you!'",
+    ),
+    "takaful_chronic_conditions": (
+        TAKAFUL_EXPLAIN_SYSTEM,
+        "Rewrite this exact information about pre-existing and chronic conditions coverage in a friendly, conversational way as if a real insurance agent is speaking to a customer. Keep the same content but make it sound natural and warm. Use only 1-3 lines maximum: This is the content(answer)'Covered only if declared in the Application Form and the terms, and additional premium to be agreed.'",
+    ),
+    "takaful_coverage": (
+        TAKAFUL_EXPLAIN_SYSTEM,
+        "Rewrite this exact information about area of coverage in a friendly, conversational way as if a real insurance agent is speaking to a customer. Keep the same content but make it sound natural and warm. Use only 1-3 lines maximum: This is the content(answer)'Worldwide'",
+    ),
+    "takaful_medicine": (
+        TAKAFUL_EXPLAIN_SYSTEM,
+        "Rewrite this exact information about annual medicine limit in a friendly, conversational way as if a real insurance agent is speaking to a customer. Keep the same content but make it sound natural and warm. Use only 1-3 lines maximum: This is the content(answer)'AED 5,000'",
+    ),
+    "takaful_consultation": (
+        TAKAFUL_EXPLAIN_SYSTEM,
+        "Rewrite this exact information about consultation fee in a friendly, conversational way as if a real insurance agent is speaking to a customer. Keep the same content but make it sound natural and warm. Use only 1-3 lines maximum: This is the content(answer)'AED 50'",
+    ),
+    "takaful_network": (
+        TAKAFUL_EXPLAIN_SYSTEM,
+        "Rewrite this exact information about network in a friendly, conversational way as if a real insurance agent is speaking to a customer. Keep the same content but make it sound natural and warm. Use only 1-3 lines maximum: This is the content(answer)'Nextcare'",
+    ),
+    "takaful_dental": (
+        TAKAFUL_EXPLAIN_SYSTEM,
+        "Rewrite this exact information about dental treatment coverage in a friendly, conversational way as if a real insurance agent is speaking to a customer. Keep the same content but make it sound natural and warm. Use only 1-3 lines maximum: This is the content(answer)'Routine Dental is not covered. Cover only Emergency, injury cases & surgeries.'",
+    ),
+    "takaful_access": (
+        TAKAFUL_EXPLAIN_SYSTEM,
+        "Rewrite this exact information about direct access to hospital in a friendly, conversational way as if a real insurance agent is speaking to a customer. Keep the same content but make it sound natural and warm. Use only 1-3 lines maximum: This is the content(answer)'Yes'",
+    ),
+    "takaful_followup": (
+        TAKAFUL_FOLLOWUP_SYSTEM,
+        "Rewrite this response in a friendly, conversational way as if a real insurance agent is speaking to a customer. Keep the same content but make it sound natural and warm. Use only 1-3 lines maximum: 'I'm here to help with any questions about the Takaful Emarat Silver plan. Please ask your specific question and I'll provide you with the most accurate information.'",
+    ),
+}
+
+
+def answer_source(key: str) -> str:
+    """Digest of the prompt behind a fixed answer, used to detect stale variants."""
+    system_prompt, prompt = FIXED_ANSWER_REWRITES[key]
+    return hashlib.sha256(f"{system_prompt}\n{prompt}".encode("utf-8")).hexdigest()[:16]
+
+
+async def fixed_answer(key: str, user_language: str) -> str:
+    """
+    Return a friendly wording of a fixed answer.
+
+    Args:
+        key: Key in FIXED_ANSWER_REWRITES
+        user_language: Language of the pre-written variant to prefer
+
+    Returns:
+        A random pre-written variant, or a live LLM rewrite when there is none
+    """
+    if not LIVE_ANSWER_REWRITES:
+        variants = question_catalog.answer_variants(
+            key, answer_source(key), user_language
+        )
+        if variants:
+            return choice(variants)
+
+    system_prompt, prompt = FIXED_ANSWER_REWRITES[key]
+    response = await llm.ainvoke([
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=prompt),
+    ])
+    return response.content.strip()
+
 
 def get_language_code(language_name: str) -> str:
     """
@@ -74,30 +179,18 @@ def get_language_code(language_name: str) -> str:
     Returns:
         Language code (e.g., 'ar', 'en', 'hi')
     """
-    language_map = {
-        "english": "en",
-        "arabic": "ar",
-        "hindi": "hi",
-        "urdu": "ur",
-        "french": "fr",
-        "spanish": "es",
-        "german": "de",
-        "italian": "it",
-        "portuguese": "pt",
-        "russian": "ru",
-        "chinese": "zh",
-        "japanese": "ja",
-        "korean": "ko",
-    }
-
     # Normalize to lowercase and get code, default to 'en' if not found
-    return language_map.get(language_name.lower(), "en")
+    return LANGUAGE_CODES.get(language_name.lower(), "en")
 
 
-def detect_language(text: str) -> dict:
+async def detect_language(text: str) -> dict:
     """
-    Detect the language of the user's input using LLM.
-    Returns a dict with 'language' (e.g., 'Arabic', 'English') and 'code' (e.g., 'ar', 'en')
+    Detect the language of the user's input.
+
+    The offline identifier in services/language_id.py is tried first; the LLM is
+    only asked when its confidence is below LANGUAGE_ID_CONFIDENCE.
+    Returns a dict with 'language' (e.g., 'Arabic', 'English'), 'code' (e.g., 'ar', 'en'),
+    'confidence' (0-1, None when the LLM decided) and 'method' ('script', 'ngram' or 'llm')
     """
     # Skip language detection for numeric inputs, very short text, or common responses
     text_clean = text.strip()
@@ -112,6 +205,21 @@ def detect_language(text: str) -> dict:
         )
         return {"language": "English", "code": "en"}
 
+    local = identify_language(text_clean)
+    if local["confidence"] >= LANGUAGE_ID_CONFIDENCE:
+        return local
+
+    print(
+        f"[Language Detection] Local guess {local['language']} ({local['confidence']}) below threshold, asking LLM"
+    )
+    return await llm_detect_language(text)
+
+
+async def llm_detect_language(text: str) -> dict:
+    """
+    Detect the language of the user's input using LLM.
+    Returns a dict with 'language' (e.g., 'Arabic', 'English') and 'code' (e.g., 'ar', 'en')
+    """
     detection_prompt = f"""Detect the language of this text: "{text}"
 
 Respond ONLY in this exact JSON format:
@@ -131,7 +239,7 @@ If mixed languages, identify the dominant one.
 If the text is mostly numbers or very short, default to English."""
 
     try:
-        response = llm.invoke([
+        response = await llm.ainvoke([
             SystemMessage(
                 content="You are a language detection expert. Respond ONLY with valid JSON as instructed. For numeric inputs or very short text, default to English."
             ),
@@ -140,6 +248,7 @@ If the text is mostly numbers or very short, default to English."""
 
         # Parse the response
         result = json.loads(response.content.strip())
+        result.update({"confidence": None, "method": "llm"})
         return result
     except (json.JSONDecodeError, Exception) as e:
         # Default to English if detection fails
@@ -147,7 +256,21 @@ If the text is mostly numbers or very short, default to English."""
         return {"language": "English", "code": "en"}
 
 
-def translate_text(
+async def _known_translation(
+    text: str, target_language: str, source_language: str
+) -> str:
+    """Return a translation from the question catalog or the cache, or None."""
+    if source_language.lower() in ["auto", "english", "en"] and (
+        target_language.lower() not in ["english", "en"]
+    ):
+        localized = question_catalog.lookup(text, target_language)
+        if localized is not None:
+            return localized
+
+    return await translation_cache.get(text, source_language, target_language)
+
+
+async def translate_text(
     text: str, target_language: str, source_language: str = "auto"
 ) -> str:
     """
@@ -161,6 +284,13 @@ def translate_text(
     Returns:
         Translated text
     """
+    if not text or not text.strip():
+        return text
+
+    known = await _known_translation(text, target_language, source_language)
+    if known is not None:
+        return known
+
     if source_language == "auto":
         translation_prompt = f"""Translate this text to {target_language}. Maintain the same tone and meaning.
 
@@ -175,34 +305,214 @@ Text to translate: "{text}"
 Respond ONLY with the translated text, nothing else."""
 
     try:
-        response = llm.invoke([
+        response = await llm.ainvoke([
             SystemMessage(
                 content=f"You are a professional translator. Translate accurately while maintaining the original meaning and tone. For insurance and technical terms, use appropriate terminology in {target_language}."
             ),
             HumanMessage(content=translation_prompt),
         ])
 
-        return response.content.strip()
+        translated = response.content.strip()
+        await translation_cache.set(text, source_language, target_language, translated)
+        return translated
     except Exception as e:
         # Return original text if translation fails
         print(f"[Translation] Error: {e}. Returning original text.")
         return text
 
 
-def validate_response_multilingual(
+async def translate_batch(
+    texts: list, target_language: str, source_language: str = "auto"
+) -> list:
+    """
+    Translate several strings with a single LLM call.
+
+    Strings already in the question catalog or the translation cache are
+    resolved locally. The rest are sent as one JSON array; any item the model
+    fails to return is retried individually with translate_text.
+
+    Args:
+        texts: The texts to translate
+        target_language: Target language (e.g., 'Arabic', 'English', 'Hindi')
+        source_language: Source language (default 'auto' for auto-detection)
+
+    Returns:
+        Translated texts, in the same order as texts
+    """
+    results = list(texts)
+    pending = {}
+    for index, text in enumerate(texts):
+        if not text or not text.strip():
+            continue
+        known = await _known_translation(text, target_language, source_language)
+        if known is not None:
+            results[index] = known
+        else:
+            pending.setdefault(text, []).append(index)
+
+    if not pending:
+        return results
+
+    unique_texts = list(pending)
+    if len(unique_texts) == 1:
+        translated_items = [
+            await translate_text(unique_texts[0], target_language, source_language)
+        ]
+    else:
+        source_clause = "" if source_language == "auto" else f" from {source_language}"
+        batch_prompt = f"""Translate each string in this JSON array{source_clause} to {target_language}. Maintain the same tone and meaning.
+
+{json.dumps(unique_texts, ensure_ascii=False)}
+
+Respond ONLY with a JSON array of {len(unique_texts)} translated strings, in the same order, nothing else."""
+
+        translated_items = [None] * len(unique_texts)
+        try:
+            response = await llm.ainvoke([
+                SystemMessage(
+                    content=f"You are a professional translator. Translate accurately while maintaining the original meaning and tone. For insurance and technical terms, use appropriate terminology in {target_language}. Respond ONLY with valid JSON."
+                ),
+                HumanMessage(content=batch_prompt),
+            ])
+            content = response.content.strip()
+            content = re.sub(r"^```(?:json)?\s*|\s*```$", "", content)
+            parsed = json.loads(content)
+            if isinstance(parsed, list) and len(parsed) == len(unique_texts):
+                translated_items = [
+                    item.strip() if isinstance(item, str) and item.strip() else None
+                    for item in parsed
+                ]
+            else:
+                print(
+                    f"[Translation] Batch returned {len(parsed) if isinstance(parsed, list) else 'non-list'} items for {len(unique_texts)} texts"
+                )
+        except Exception as e:
+            print(f"[Translation] Batch error: {e}. Falling back to per-item calls.")
+
+        for text, translated in zip(unique_texts, translated_items):
+            if translated is not None:
+                await translation_cache.set(
+                    text, source_language, target_language, translated
+                )
+
+        # Retry only the items the batch did not return
+        failed = [i for i, item in enumerate(translated_items) if item is None]
+        retried = await asyncio.gather(*[
+            translate_text(unique_texts[i], target_language, source_language)
+            for i in failed
+        ])
+        for i, translated in zip(failed, retried):
+            translated_items[i] = translated
+
+    for text, translated in zip(unique_texts, translated_items):
+        for index in pending[text]:
+            results[index] = translated
+    return results
+
+
+# Minimum RapidFuzz ratio, and lead over the runner-up, for a local fuzzy match
+FUZZY_MATCH_THRESHOLD = 88
+FUZZY_MATCH_MARGIN = 6
+
+
+def _normalize_option_text(text: str) -> str:
+    return re.sub(r"[\s.,!?؟।]+", " ", text).strip().casefold()
+
+
+async def match_option_locally(
+    user_response: str, expected_values: list, user_language: str
+) -> tuple:
+    """
+    Match a response against the expected options without calling the LLM.
+
+    Tiers, cheapest first: exact, case-folded, option number, translated option
+    label (question catalog / translation cache), RapidFuzz score.
+
+    Args:
+        user_response: The user's response in any language
+        expected_values: List of expected values in English
+        user_language: The language the user is speaking
+
+    Returns:
+        (matched English value, tier name), or (None, None) if inconclusive
+    """
+    response = user_response.strip()
+    if not response or not expected_values:
+        return None, None
+
+    if response in expected_values:
+        return response, "exact"
+
+    normalized = _normalize_option_text(response)
+    folded = {}
+    for value in expected_values:
+        folded.setdefault(_normalize_option_text(value), value)
+    if normalized in folded:
+        return folded[normalized], "casefold"
+
+    if response.isdigit() and 1 <= int(response) <= len(expected_values):
+        return expected_values[int(response) - 1], "index"
+
+    translated_match = question_catalog.match_translated_option(
+        response, expected_values
+    )
+    if translated_match is None and user_language.lower() not in ["english", "en"]:
+        # Options shown to this user were translated live and cached
+        labels = await asyncio.gather(*[
+            translation_cache.get(value, "auto", user_language)
+            for value in expected_values
+        ])
+        candidates = [
+            value
+            for value, label in zip(expected_values, labels)
+            if label and _normalize_option_text(label) == normalized
+        ]
+        if len(candidates) == 1:
+            translated_match = candidates[0]
+    if translated_match is not None:
+        return translated_match, "translated"
+
+    if len(normalized) >= 3:
+        scored = fuzz_process.extract(
+            normalized, list(folded), scorer=fuzz.ratio, limit=2
+        )
+        if scored and scored[0][1] >= FUZZY_MATCH_THRESHOLD:
+            runner_up = scored[1][1] if len(scored) > 1 else 0
+            if scored[0][1] - runner_up >= FUZZY_MATCH_MARGIN:
+                return folded[scored[0][0]], "fuzzy"
+
+    return None, None
+
+
+async def validate_response_multilingual(
     user_response: str, expected_values: list, user_language: str
 ) -> dict:
     """
     Validate user response against expected values, supporting multiple languages.
 
+    Local tiers (see match_option_locally) are tried first; the LLM is only
+    asked when none of them is conclusive.
+
     Args:
         user_response: The user's response in any language
         expected_values: List of expected values in English
         user_language: The language the user is speaking
 
     Returns:
-        dict with 'is_valid' (bool), 'matched_value' (English version), 'explanation' (str)
+        dict with 'is_valid' (bool), 'matched_value' (English version), 'explanation' (str),
+        'match_tier' (which tier matched: exact, casefold, index, translated, fuzzy or llm)
     """
+    matched_value, match_tier = await match_option_locally(
+        user_response, expected_values, user_language
+    )
+    if matched_value is not None:
+        return {
+            "is_valid": True,
+            "matched_value": matched_value,
+            "explanation": f"Matched locally ({match_tier})",
+            "match_tier": match_tier,
+        }
+
     validation_prompt = f"""You are validating a user's response for an insurance chatbot.
 
 User's response: "{user_response}"
@@ -223,7 +533,7 @@ Respond ONLY in this exact JSON format:
 }}"""
 
     try:
-        response = llm.invoke([
+        response = await llm.ainvoke([
             SystemMessage(
                 content="You are a validation expert for a multilingual insurance chatbot. Be accurate and consider language variations."
             ),
@@ -231,31 +541,38 @@ Respond ONLY in this exact JSON format:
         ])
 
         result = json.loads(response.content.strip())
+        result["match_tier"] = "llm"
         return result
     except Exception as e:
         return {
             "is_valid": False,
             "matched_value": None,
             "explanation": f"Validation error: {str(e)}",
+            "match_tier": "llm",
         }
 
 
-def format_response_in_language(
+async def format_response_in_language(
     response_text: str,
     options: list,
     user_language: str,
     message_type: str = None,
     document_type: str = None,
+    localized_response: str = None,
 ) -> dict:
     """
     Format the bot's response in the user's preferred language.
 
+    Static question text and options are served from the question catalog when
+    it has been built; anything else is translated live.
+
     Args:
         response_text: The response text in English
         options: List of options in English (if any)
         user_language: The target language
         message_type: Optional metadata indicating message type (e.g., 'document_upload_request', 'confirmation', 'question')
         document_type: Optional metadata indicating document type (e.g., 'emirates_id_front', 'driving_license', 'mulkiya', 'emirates_id_back', 'excel')
+        localized_response: Optional response already in user_language; skips translating response_text
 
     Returns:
         dict with 'response' and optionally 'options', 'message_type', 'document_type'
@@ -280,8 +597,12 @@ def format_response_in_language(
         print(f"[DEBUG format_response_in_language] English result: {result}")
         return result
 
-    # Translate response
-    translated_response = translate_text(response_text, user_language)
+    # Translate the response and its options in one round-trip
+    pending = list(options or [])
+    if not localized_response:
+        pending.insert(0, response_text)
+    translated = await translate_batch(pending, user_language)
+    translated_response = localized_response or translated.pop(0)
     print(
         f"[DEBUG format_response_in_language] Translated response: {translated_response}"
     )
@@ -289,7 +610,7 @@ def format_response_in_language(
 
     # Translate options if present
     if options:
-        translated_options = [translate_text(opt, user_language) for opt in options]
+        translated_options = translated
         result["options"] = ", ".join(translated_options)
         print(
             f"[DEBUG format_response_in_language] Translated options: {translated_options}"
@@ -309,7 +630,7 @@ def format_response_in_language(
     return result
 
 
-def translate_to_english_for_storage(text: str, detected_language: str) -> str:
+async def translate_to_english_for_storage(text: str, detected_language: str) -> str:
     """
     Translate user's response to English for storage if not already in English.
 
@@ -324,7 +645,7 @@ def translate_to_english_for_storage(text: str, detected_language: str) -> str:
         return text
 
     # Translate to English
-    return translate_text(text, "English", detected_language)
+    return await translate_text(text, "English", detected_language)
 
 
 def detect_document_type_from_question(question_text: str) -> tuple:
@@ -364,7 +685,7 @@ def detect_document_type_from_question(question_text: str) -> tuple:
 # ==================== END MULTI-LANGUAGE SUPPORT ====================
 
 
-def handle_option_validation_multilingual(
+async def handle_option_validation_multilingual(
     user_message: str,
     valid_options: list,
     question: str,
@@ -391,7 +712,7 @@ def handle_option_validation_multilingual(
         Response dictionary
     """
     # Validate using multilingual validation
-    validation_result = validate_response_multilingual(
+    validation_result = await validate_response_multilingual(
         user_message, valid_options, user_language
     )
 
@@ -415,25 +736,24 @@ def handle_option_validation_multilingual(
                 msg_type, doc_type = detect_document_type_from_question(
                     next_question_text
                 )
-                return format_response_in_language(
+                return await format_response_in_language(
                     response_message, next_options, user_language, msg_type, doc_type
                 )
             else:
                 response_message = f"Thank you! Now, let's move on to: {next_question}"
                 # Detect document type from question
                 msg_type, doc_type = detect_document_type_from_question(next_question)
-                return format_response_in_language(
+                return await format_response_in_language(
                     response_message, [], user_language, msg_type, doc_type
                 )
         else:
             # Save responses
-            with open("user_responses.json", "w") as file:
-                json.dump(responses, file, indent=4)
+            record_completion(responses)
             if user_id in user_states:
                 del user_states[user_id]
 
             final_message = "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask."
-            result = format_response_in_language(final_message, [], user_language)
+            result = await format_response_in_language(final_message, [], user_language)
             result["final_responses"] = responses
             return result
     else:
@@ -442,7 +762,7 @@ def handle_option_validation_multilingual(
             f"The user said '{user_message}' but needs to choose from: {', '.join(valid_options)}. "
             "Provide a brief, helpful message explaining they need to select a valid option."
         )
-        error_response = llm.invoke([
+        error_response = await llm.ainvoke([
             SystemMessage(
                 content=f"You are Insura, a friendly insurance assistant. Respond in {user_language}. "
                 "Be brief and helpful."
@@ -451,12 +771,10 @@ def handle_option_validation_multilingual(
         ])
 
         retry_message = f"Let's try again: {question}"
-        retry_translated = translate_text(retry_message, user_language)
+        retry_translated = await translate_text(retry_message, user_language)
 
         # Translate options for display
-        translated_options = [
-            translate_text(opt, user_language) for opt in valid_options
-        ]
+        translated_options = await translate_batch(valid_options, user_language)
 
         return {
             "response": error_response.content.strip(),
@@ -470,7 +788,8 @@ def list_pdfs(directory="pdf"):
     return [os.path.splitext(f)[0] for f in os.listdir(directory) if f.endswith(".pdf")]
 
 
-user_states = TTLCache(maxsize=1000, ttl=3600)
+# Conversation state per user id, shared with every worker through SESSION_STORE_URL
+user_states = session_store.namespace("chat")
 
 
 def load_questions(file_path="questions/questions.json"):
@@ -488,2952 +807,2714 @@ def load_questions(file_path="questions/questions.json"):
 # Load questions from the questions folder
 questions_data = load_questions()
 
+# conversation_state["current_flow"] -> question list in questions.json
+FLOW_QUESTION_KEYS = {
+    "initial": "initial_questions",
+    "medical_insurance": "medical_questions",
+    "individual": "individual_questions",
+    "sma": "sma_questions",
+    # "new_policy": "new_policy_questions",
+    "existing_policy": "existing_policy_questions",
+    "motor_insurance": "motor_insurance_questions",
+    "car_questions": "car_questions",
+    "bike_questions": "bike_questions",
+    "motor_claim": "motor_claim",
+}
+
+# Shared, read-only base flows. Sessions branch through get_question_plan().
+base_flows = compile_flows(questions_data, list(FLOW_QUESTION_KEYS.values()))
+
 # Access questions in your logic
-initial_questions = questions_data["initial_questions"]
-medical_questions = questions_data["medical_questions"]
-individual_questions = questions_data["individual_questions"]
-sma_questions = questions_data["sma_questions"]
-# new_policy_questions = questions_data["new_policy_questions"]
-existing_policy_questions = questions_data["existing_policy_questions"]
-motor_insurance_questions = questions_data["motor_insurance_questions"]
-car_questions = questions_data["car_questions"]
-bike_questions = questions_data["bike_questions"]
-motor_claim = questions_data["motor_claim"]
+initial_questions = base_flows["initial_questions"]
+medical_questions = base_flows["medical_questions"]
+individual_questions = base_flows["individual_questions"]
+sma_questions = base_flows["sma_questions"]
+existing_policy_questions = base_flows["existing_policy_questions"]
+motor_insurance_questions = base_flows["motor_insurance_questions"]
+car_questions = base_flows["car_questions"]
+bike_questions = base_flows["bike_questions"]
+motor_claim = base_flows["motor_claim"]
 greeting_templates = questions_data["greeting_templates"]
 
 
-def process_user_input(user_input: UserInput):
-    user_id = user_input.user_id.strip()
-    user_message = user_input.message.strip()
-    # Initialize user state if not already presents
-    if user_id not in user_states:
-        user_states[user_id] = {
-            "current_question_index": 0,
-            "responses": {},
-            "current_flow": "initial",
-            "welcome_shown": False,
-            "awaiting_document_name": False,
-            "document_name": "",
-            "last_takaful_query_time": None,
-            "awaiting_takaful_followup": False,
-            "last_chronic_conditions_time": None,
-            "awaiting_chronic_conditions_followup": False,
-            "takaful_emarat_asked": False,
-            "preferred_language": "English",  # Default language
-            "language_code": "en",
-            "language_explicitly_set": False,  # Track if user explicitly set language
-        }
+def get_question_plan(conversation_state: dict, default_flow: str = None):
+    """
+    Return the session's copy-on-write view of its current question flow.
 
-    conversation_state = user_states[user_id]
-    user_name = get_user_name(user_id)
+    Args:
+        conversation_state: The user's conversation state
+        default_flow: Flow to use when current_flow has no question list
 
-    # ==================== LANGUAGE DETECTION ====================
-    # Check for explicit language requests first
-    language_requests = {
-        "say in arabic": {"language": "Arabic", "code": "ar"},
-        "speak in arabic": {"language": "Arabic", "code": "ar"},
-        "change language to arabic": {"language": "Arabic", "code": "ar"},
-        "arabic": {"language": "Arabic", "code": "ar"},
-        "عربي": {"language": "Arabic", "code": "ar"},
-        "بالعربية": {"language": "Arabic", "code": "ar"},
-        "say in hindi": {"language": "Hindi", "code": "hi"},
-        "hindi": {"language": "Hindi", "code": "hi"},
-        "हिंदी": {"language": "Hindi", "code": "hi"},
-        "say in urdu": {"language": "Urdu", "code": "ur"},
-        "urdu": {"language": "Urdu", "code": "ur"},
-        "اردو": {"language": "Urdu", "code": "ur"},
-        "say in english": {"language": "English", "code": "en"},
-        "english": {"language": "English", "code": "en"},
-    }
+    Returns:
+        QuestionPlan (empty when neither flow has a question list)
+    """
+    flow = conversation_state.get("current_flow", "initial")
+    key = FLOW_QUESTION_KEYS.get(flow) or FLOW_QUESTION_KEYS.get(default_flow)
+    overlays = conversation_state.setdefault("question_overlays", {})
+    return QuestionPlan(base_flows.get(key, ()), overlays, key)
 
-    # Check if this is a document upload success message (define this before the if/else block)
-    is_document_upload_success = (
-        "document upload successfully" in user_message.lower()
-        or "upload successfully" in user_message.lower()
-        or "file uploaded" in user_message.lower()
-        or "document uploaded" in user_message.lower()
-    )
 
-    # Check if user is making an explicit language request
-    user_message_lower = user_message.lower().strip()
-    if user_message_lower in language_requests:
-        requested_lang = language_requests[user_message_lower]
-        conversation_state["preferred_language"] = requested_lang["language"]
-        conversation_state["language_code"] = requested_lang["code"]
-        conversation_state["language_explicitly_set"] = True  # Mark as explicitly set
-        print(
-            f"[Language Request] User {user_id} explicitly requested {requested_lang['language']}"
-        )
-        user_language = requested_lang["language"]
-    else:
-        # Only detect language for the first few messages or when user explicitly changes language
-        # Don't change language for numeric inputs, short responses, or when already in a flow
-        current_flow = conversation_state.get("current_flow", "initial")
-        current_question_index = conversation_state.get("current_question_index", 0)
+# Answer handlers for questions that need custom validation, keyed by the exact
+# question text and grouped by the flow that asks them. Every handler receives the
+# turn state as keyword arguments (ignoring the ones it does not use) and returns
+# the response dict, or NOT_HANDLED to fall through to the generic LLM evaluation
+# in process_user_input.
+NOT_HANDLED = object()
 
-        # Check if this is a numeric input, very short response, or document upload success message
-        is_numeric_or_short = (
-            user_message.strip().isdigit()
-            or len(user_message.strip()) <= 3
-            or user_message.strip().lower() in ["yes", "no", "y", "n", "ok", "okay"]
-        )
 
-        # Only detect language if:
-        # 1. Language was not explicitly set by user
-        # 2. We're still in initial flow (first few questions)
-        # 3. User hasn't established a language preference yet
-        # 4. The input is not numeric/short
-        # 5. The input is not a document upload success message (regardless of current language)
-        should_detect_language = (
-            not conversation_state.get("language_explicitly_set", False)
-            and current_flow == "initial"
-            and current_question_index < 3
-            and not is_numeric_or_short
-            and not is_document_upload_success  # This prevents language detection for document upload messages in ANY language
-            and conversation_state.get("preferred_language", "English") == "English"
-        )
+async def _answer_passkey(
+    question, user_message, user_language, conversation_state, questions, responses, **_
+):
+    responses[question] = user_message
 
-        if should_detect_language:
-            detected_lang = detect_language(user_message)
-            print(f"[DEBUG] Detected language: {detected_lang}")
+    if user_message == "5514":
+        conversation_state["current_question_index"] += 1
+        if conversation_state["current_question_index"] < len(questions):
+            next_question = questions[conversation_state["current_question_index"]]
 
-            # Update the user's preferred language if it's different
-            if detected_lang["language"] != conversation_state.get(
-                "preferred_language", "English"
-            ):
-                conversation_state["preferred_language"] = detected_lang["language"]
-                conversation_state["language_code"] = detected_lang["code"]
-                print(
-                    f"[Language Detection] User {user_id} switched to {detected_lang['language']}"
+            if "options" in next_question:
+                options = next_question["options"]
+                next_question_text = next_question["question"]
+                response_message = f"Great choice! {next_question_text}"
+                return await format_response_in_language(
+                    response_message, options, user_language
+                )
+            else:
+                next_question_text = (
+                    next_question["question"]
+                    if isinstance(next_question, dict)
+                    else next_question
+                )
+                response_message = f"Great choice! {next_question_text}"
+                return await format_response_in_language(
+                    response_message, [], user_language
                 )
         else:
-            reason = "unknown"
-            if conversation_state.get("language_explicitly_set", False):
-                reason = "language explicitly set by user"
-            elif current_flow != "initial":
-                reason = "not in initial flow"
-            elif current_question_index >= 3:
-                reason = "beyond initial questions"
-            elif is_numeric_or_short:
-                reason = "numeric or short input"
-            elif is_document_upload_success:
-                reason = "document upload success message"
-            elif conversation_state.get("preferred_language", "English") != "English":
-                reason = "language already established"
+            record_completion(responses)
+            final_message = "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask."
+            result = await format_response_in_language(final_message, [], user_language)
+            result["final_responses"] = responses
+            return result
+    else:
+        error_message = "Incorrect passkey. Please try again. Please Enter Your PassKey"
+        return await format_response_in_language(error_message, [], user_language)
 
-            print(
-                f"[DEBUG] Skipping language detection ({reason}) - preserving current language: {conversation_state.get('preferred_language', 'English')}"
-            )
 
-        user_language = conversation_state.get("preferred_language", "English")
+async def _answer_emaf_name(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    responses[question] = user_message
+    conversation_state["current_question_index"] += 1
 
-    print(f"[DEBUG] Final user language: {user_language}")
-    # ==================== END LANGUAGE DETECTION ====================
+    if conversation_state["current_question_index"] < len(questions):
+        next_question = questions[conversation_state["current_question_index"]]
+        next_questions = next_question["question"]
+        return {
+            "response": f"Thanks a lot for providing your name! Alright, moving on {next_questions}"
+        }
+    else:
+        record_completion(responses)
+        return {
+            "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
+            "final_responses": responses,
+        }
 
-    # Handle document upload success messages - maintain current language flow
-    if is_document_upload_success:
-        print(
-            f"[DEBUG] Document upload success detected - maintaining current language: {user_language}"
-        )
-        # Continue with the current flow without changing language
-        # The system will proceed to the next question in the same language
 
-    # Handle language requests - present current question in new language
-    if user_message_lower in language_requests:
-        # Get current question
-        current_question_index = conversation_state.get("current_question_index", 0)
-        current_flow = conversation_state.get("current_flow", "initial")
+async def _answer_emaf_phone_number(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    responses[question] = user_message
+    conversation_state["current_question_index"] += 1
 
-        # Get the appropriate questions list based on current flow
-        if current_flow == "initial":
-            questions_list = initial_questions
-        elif current_flow == "medical" or current_flow == "medical_insurance":
-            questions_list = medical_questions
-        elif current_flow == "individual":
-            questions_list = individual_questions
-        elif current_flow == "sma":
-            questions_list = sma_questions
-        elif current_flow == "motor" or current_flow == "motor_insurance":
-            questions_list = motor_insurance_questions
-        elif current_flow == "car" or current_flow == "car_questions":
-            questions_list = car_questions
-        elif current_flow == "bike" or current_flow == "bike_questions":
-            questions_list = bike_questions
-        elif current_flow == "existing_policy":
-            questions_list = existing_policy_questions
-        elif current_flow == "motor_claim":
-            questions_list = motor_claim
+    if conversation_state["current_question_index"] < len(questions):
+        next_question = questions[conversation_state["current_question_index"]]
+        if "options" in next_question:
+            options = ", ".join(next_question["options"])
+            next_questions = next_question["question"]
+            return {
+                "response": f"Thank you so much! I'd really appreciate it {next_questions}",
+                "dropdown": options,
+            }
         else:
-            questions_list = initial_questions
+            return {
+                "response": f"Thank you so much! I'd really appreciate it {next_question}"
+            }
+    else:
+        record_completion(responses)
+        return {
+            "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
+            "final_responses": responses,
+        }
 
-        # Present current question in new language
-        if current_question_index < len(questions_list):
-            current_question = questions_list[current_question_index]
-            if isinstance(current_question, dict):
-                question_text = current_question["question"]
-                options = current_question.get("options", [])
-                return format_response_in_language(
-                    question_text, options, user_language
-                )
-            else:
-                return format_response_in_language(current_question, [], user_language)
-        else:
-            # No current question, show welcome
-            first_question = initial_questions[0]
-            if isinstance(first_question, dict):
-                question_text = first_question["question"]
-                options = first_question.get("options", [])
-                return format_response_in_language(
-                    question_text, options, user_language
-                )
-            else:
-                return format_response_in_language(first_question, [], user_language)
-
-    # Handle cancel command - reset everything and start fresh
-    if user_message.lower() in ["cancel", "restart", "reset", "start over"]:
-        # Save the language preference before resetting
-        saved_language = conversation_state.get("preferred_language", "English")
-        saved_language_code = conversation_state.get("language_code", "en")
-        saved_language_explicitly_set = conversation_state.get(
-            "language_explicitly_set", False
-        )
-
-        # Reset the entire conversation state
-        user_states[user_id] = {
-            "current_question_index": 0,
-            "responses": {},
-            "current_flow": "initial",
-            "welcome_shown": True,  # Set to True to prevent duplicate greeting
-            "awaiting_document_name": False,
-            "document_name": "",
-            "last_takaful_query_time": None,
-            "awaiting_takaful_followup": False,
-            "last_chronic_conditions_time": None,
-            "awaiting_chronic_conditions_followup": False,
-            "takaful_emarat_asked": False,
-            "preferred_language": saved_language,  # Preserve language
-            "language_code": saved_language_code,
-            "language_explicitly_set": saved_language_explicitly_set,  # Preserve explicit setting
-        }
-
-        # Return the first initial question
-        first_question = initial_questions[0]
-        if isinstance(first_question, dict):
-            question_text = first_question["question"]
-            options = first_question.get("options", [])
-            reset_message = (
-                "Your conversation has been reset. Let's start fresh! " + question_text
-            )
-
-            # Format response in user's language
-            return format_response_in_language(reset_message, options, saved_language)
-        else:
-            reset_message = (
-                "Your conversation has been reset. Let's start fresh! " + first_question
-            )
-            return format_response_in_language(reset_message, [], saved_language)
 
-    # Handle Takaful Emarat Silver query
-    if "takaful emarat silver" in user_message.lower():
-        conversation_state["last_takaful_query_time"] = datetime.now()
-        conversation_state["awaiting_takaful_followup"] = True
-        conversation_state["takaful_emarat_asked"] = (
-            True  # Set flag to indicate Takaful Emarat was asked
-        )
-        # Generate a more natural welcome response using LLM
-        welcome_prompt = "Rewrite this welcome message in a friendly, conversational way as if a real insurance agent is greeting a customer. Keep the same content but make it sound natural and warm. Use only 1-3 lines maximum: 'Welcome to the Takaful Emarat Silver plan! What do you need to know about the Takaful Emarat Silver plan? Please let me know, I am here to help you!'"
-        welcome_response = llm.invoke([
-            SystemMessage(
-                content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to greet customers warmly and make them feel welcome and comfortable. Keep responses short (1-3 lines) and maintain the exact same information while making it sound natural."
-            ),
-            HumanMessage(content=welcome_prompt),
-        ])
-        return {
-            "response": f"{welcome_response.content.strip()}",
-        }
+async def _answer_emaf_insurance_company(
+    question, user_message, user_id, conversation_state, questions, responses, **_
+):
+    # responses[question] =  user_message
+    # conversation_state["current_question_index"]+=1
+
+    valid_options = [
+        "Takaful Emarat (Ecare)",
+        "National Life & General Insurance (Innayah)",
+        "Takaful Emarat (Aafiya)",
+        "National Life & General Insurance (NAS)",
+        "Orient UNB Takaful (Nextcare)",
+        "Orient Mednet (Mednet)",
+        "Al Sagr Insurance (Nextcare)",
+        "RAK Insurance (Mednet)",
+        "Dubai Insurance (Dubai Care)",
+        "Fidelity United (Nextcare)",
+        "Salama April International (Salama)",
+        "Sukoon (Sukoon)",
+        "Orient basic",
+        "Daman",
+        "Dubai insurance(Mednet)",
+        "Takaful Emarat(NAS)",
+        "Takaful emarat(Nextcare)",
+    ]
+    company_number_mapping = {
+        "Takaful Emarat (Ecare)": 1,
+        "National Life & General Insurance (Innayah)": 2,
+        "Takaful Emarat (Aafiya)": 3,
+        "National Life & General Insurance (NAS)": 4,
+        "Orient UNB Takaful (Nextcare)": 6,
+        "Orient Mednet (Mednet)": 7,
+        "Al Sagr Insurance (Nextcare)": 8,
+        "RAK Insurance (Mednet)": 9,
+        "Dubai Insurance (Dubai Care)": 10,
+        "Fidelity United (Nextcare)": 11,
+        "Salama April International (Salama)": 12,
+        "Sukoon (Sukoon)": 13,
+        "Orient basic": 14,
+        "Daman": 15,
+        "Dubai insurance(Mednet)": 16,
+        "Takaful Emarat(NAS)": 17,
+        "Takaful emarat(Nextcare)": 18,
+    }
 
-    # Handle Pre-existing & Chronic conditions query (only if Takaful Emarat Silver was asked first)
-    if "pre existing & chronic conditions" in user_message.lower():
-        # Check if user has already asked about Takaful Emarat Silver
-        if conversation_state.get("takaful_emarat_asked", False):
-            conversation_state["last_chronic_conditions_time"] = datetime.now()
-            conversation_state["awaiting_chronic_conditions_followup"] = True
-            conversation_state["chronic_conditions_shown"] = (
-                True  # Flag to track that response was shown
-            )
-            # Generate a more natural response using LLM
-            chronic_conditions_prompt = "Rewrite this exact information about pre-existing and chronic conditions coverage in a friendly, conversational way as if a real insurance agent is speaking to a customer. Keep the same content but make it sound natural and warm. Use only 1-3 lines maximum: This is the content(answer)'Covered only if declared in the Application Form and the terms, and additional premium to be agreed.'"
-            chronic_conditions_response = llm.invoke([
-                SystemMessage(
-                    content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to explain insurance terms in a warm, conversational manner. Keep responses short (1-3 lines) and maintain the exact same information while making it sound natural."
-                ),
-                HumanMessage(content=chronic_conditions_prompt),
-            ])
-            return {
-                "response": f"{chronic_conditions_response.content.strip()}",
-                "pdf_link": "/pdf-view/",
-            }
-        else:
-            # If Takaful Emarat Silver wasn't asked first, provide a general response
-            return {
-                "response": "I'd be happy to help you with information about pre-existing and chronic conditions. However, to provide you with the most accurate and specific information, could you please first ask about the Takaful Emarat Silver plan? This will help me give you the most relevant details for your situation."
-            }
+    if user_message in valid_options:
+        # Update the Response
+        responses[question] = user_message
+        selected_company_number = company_number_mapping.get(user_message)
+        responses["emaf_company_id"] = selected_company_number
+        conversation_state["current_question_index"] += 1
+        emaf_id = await emaf_document(responses)
 
-    # Handle Area of Coverage query (only if Takaful Emarat Silver was asked first)
-    if "area of coverage" in user_message.lower():
-        # Check if user has already asked about Takaful Emarat Silver
-        if conversation_state.get("takaful_emarat_asked", False):
-            conversation_state["awaiting_takaful_followup"] = True
-            # Generate a more natural response using LLM
-            coverage_prompt = "Rewrite this exact information about area of coverage in a friendly, conversational way as if a real insurance agent is speaking to a customer. Keep the same content but make it sound natural and warm. Use only 1-3 lines maximum: This is the content(answer)'Worldwide'"
-            coverage_response = llm.invoke([
-                SystemMessage(
-                    content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to explain insurance terms in a warm, conversational manner. Keep responses short (1-3 lines) and maintain the exact same information while making it sound natural."
-                ),
-                HumanMessage(content=coverage_prompt),
-            ])
+        if conversation_state["current_question_index"] < len(questions):
+            next_question = questions[conversation_state["current_question_index"]]
+            del user_states[user_id]
             return {
-                "response": f"{coverage_response.content.strip()}.",
-                "pdf_link": "/pdf-view/",
+                "response": f"Thank you! That was helpful. Now, let's move on to: {next_question}"
             }
         else:
-            # If Takaful Emarat Silver wasn't asked first, provide a general response
+            if isinstance(emaf_id, int):
+                del user_states[user_id]
+                return {
+                    "response": f"Thank you for sharing the details. Please find the link below to view your emaf document:",
+                    "link": f"https://www.insuranceclub.ae/medical_form/view/{emaf_id}",
+                }
+            else:
+                return {
+                    "response": "Thank you for sharing the details. If you have any questions, please contact support@insuranceclub.ae."
+                }
+    else:
+        general_assistant_prompt = (
+            f"The user entered '{user_message}', . Please assist."
+        )
+        general_assistant_response = await cached_reply(
+            llm, [HumanMessage(content=general_assistant_prompt)], user_message
+        )
+        next_question = questions[conversation_state["current_question_index"]]
+        if "options" in next_question:
+            options = ", ".join(next_question["options"])
             return {
-                "response": "I'd be happy to help you with information about area of coverage. However, to provide you with the most accurate and specific information, could you please first ask about the Takaful Emarat Silver plan? This will help me give you the most relevant details for your situation."
+                "response": f"{general_assistant_response.content.strip()}",
+                "question": f"Let's Move Back {question}",
+                "options": options,
             }
 
-    # Handle Annual Medicine Limit query (only if Takaful Emarat Silver was asked first)
-    if (
-        "annual medicine limit" in user_message.lower()
-        or "medicine limit" in user_message.lower()
-    ):
-        # Check if user has already asked about Takaful Emarat Silver
-        if conversation_state.get("takaful_emarat_asked", False):
-            conversation_state["awaiting_takaful_followup"] = True
-            # Generate a more natural response using LLMs
-            medicine_prompt = "Rewrite this exact information about annual medicine limit in a friendly, conversational way as if a real insurance agent is speaking to a customer. Keep the same content but make it sound natural and warm. Use only 1-3 lines maximum: This is the content(answer)'AED 5,000'"
-            medicine_response = llm.invoke([
-                SystemMessage(
-                    content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to explain insurance terms in a warm, conversational manner. Keep responses short (1-3 lines) and maintain the exact same information while making it sound natural."
-                ),
-                HumanMessage(content=medicine_prompt),
-            ])
-            return {
-                "response": f"{medicine_response.content.strip()}.",
-                "pdf_link": "/pdf-view/",
-            }
         else:
-            # If Takaful Emarat Silver wasn't asked first, provide a general response
             return {
-                "response": "I'd be happy to help you with information about annual medicine limit. However, to provide you with the most accurate and specific information, could you please first ask about the Takaful Emarat Silver plan? This will help me give you the most relevant details for your situation."
+                "response": f"{general_assistant_response.content.strip()}",
+                "question": f"Let's Move Back {question}",
             }
 
-    # Handle Consultation Fee query (only if Takaful Emarat Silver was asked first)
-    if "consultation fee" in user_message.lower() or "fee" in user_message.lower():
-        # Check if user has already asked about Takaful Emarat Silver
-        if conversation_state.get("takaful_emarat_asked", False):
-            conversation_state["awaiting_takaful_followup"] = True
-            # Generate a more natural response using LLM
-            consultation_prompt = "Rewrite this exact information about consultation fee in a friendly, conversational way as if a real insurance agent is speaking to a customer. Keep the same content but make it sound natural and warm. Use only 1-3 lines maximum: This is the content(answer)'AED 50'"
-            consultation_response = llm.invoke([
-                SystemMessage(
-                    content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to explain insurance terms in a warm, conversational manner. Keep responses short (1-3 lines) and maintain the exact same information while making it sound natural."
-                ),
-                HumanMessage(content=consultation_prompt),
-            ])
-            return {
-                "response": f"{consultation_response.content.strip()}.",
-                "pdf_link": "/pdf-view/",
-            }
-        else:
-            # If Takaful Emarat Silver wasn't asked first, provide a general response
-            return {
-                "response": "I'd be happy to help you with information about consultation fee. However, to provide you with the most accurate and specific information, could you please first ask about the Takaful Emarat Silver plan? This will help me give you the most relevant details for your situation."
-            }
 
-    # Handle Network query (only if Takaful Emarat Silver was asked first)
-    if "network" in user_message.lower():
-        # Check if user has already asked about Takaful Emarat Silver
-        if conversation_state.get("takaful_emarat_asked", False):
-            conversation_state["awaiting_takaful_followup"] = True
-            # Generate a more natural response using LLM
-            network_prompt = "Rewrite this exact information about network in a friendly, conversational way as if a real insurance agent is speaking to a customer. Keep the same content but make it sound natural and warm. Use only 1-3 lines maximum: This is the content(answer)'Nextcare'"
-            network_response = llm.invoke([
-                SystemMessage(
-                    content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to explain insurance terms in a warm, conversational manner. Keep responses short (1-3 lines) and maintain the exact same information while making it sound natural."
-                ),
-                HumanMessage(content=network_prompt),
-            ])
-            return {
-                "response": f"{network_response.content.strip()}.",
-                "pdf_link": "/pdf-view/",
-            }
-        else:
-            # If Takaful Emarat Silver wasn't asked first, provide a general response
-            return {
-                "response": "I'd be happy to help you with information about the network. However, to provide you with the most accurate and specific information, could you please first ask about the Takaful Emarat Silver plan? This will help me give you the most relevant details for your situation."
-            }
+async def _answer_plan_type(
+    question,
+    user_message,
+    user_language,
+    user_id,
+    conversation_state,
+    questions,
+    responses,
+    **_,
+):
+    # Use multilingual validation for plan type selection
+    valid_options = [
+        "Basic Plan",
+        "Enhanced Plan",
+        "Enhanced Plan Standalone",
+        "Flexi Plan",
+    ]
+    return await handle_option_validation_multilingual(
+        user_message,
+        valid_options,
+        question,
+        user_language,
+        conversation_state,
+        questions,
+        responses,
+        user_id,
+    )
 
-    # Handle Dental Treatment query (only if Takaful Emarat Silver was asked first)
-    if "dental treatment" in user_message.lower() or "dental" in user_message.lower():
-        # Check if user has already asked about Takaful Emarat Silver
-        if conversation_state.get("takaful_emarat_asked", False):
-            conversation_state["awaiting_takaful_followup"] = True
-            # Generate a more natural response using LLM
-            dental_prompt = "Rewrite this exact information about dental treatment coverage in a friendly, conversational way as if a real insurance agent is speaking to a customer. Keep the same content but make it sound natural and warm. Use only 1-3 lines maximum: This is the content(answer)'Routine Dental is not covered. Cover only Emergency, injury cases & surgeries.'"
-            dental_response = llm.invoke([
-                SystemMessage(
-                    content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to explain insurance terms in a warm, conversational manner. Keep responses short (1-3 lines) and maintain the exact same information while making it sound natural."
-                ),
-                HumanMessage(content=dental_prompt),
-            ])
-            return {
-                "response": f"{dental_response.content.strip()}.",
-                "pdf_link": "/pdf-view/",
-            }
-        else:
-            # If Takaful Emarat Silver wasn't asked first, provide a general response
-            return {
-                "response": "I'd be happy to help you with information about dental treatment coverage. However, to provide you with the most accurate and specific information, could you please first ask about the Takaful Emarat Silver plan? This will help me give you the most relevant details for your situation."
-            }
 
-    # Handle Direct Access to Hospital query (only if Takaful Emarat Silver was asked first)
-    if (
-        "direct access" in user_message.lower()
-        or "hospital access" in user_message.lower()
-    ):
-        # Check if user has already asked about Takaful Emarat Silver
-        if conversation_state.get("takaful_emarat_asked", False):
-            conversation_state["awaiting_takaful_followup"] = True
-            # Generate a more natural response using LLM
-            access_prompt = "Rewrite this exact information about direct access to hospital in a friendly, conversational way as if a real insurance agent is speaking to a customer. Keep the same content but make it sound natural and warm. Use only 1-3 lines maximum: This is the content(answer)'Yes'"
-            access_response = llm.invoke([
-                SystemMessage(
-                    content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to explain insurance terms in a warm, conversational manner. Keep responses short (1-3 lines) and maintain the exact same information while making it sound natural."
-                ),
-                HumanMessage(content=access_prompt),
-            ])
-            return {
-                "response": f"{access_response.content.strip()}.",
-                "pdf_link": "/pdf-view/",
-            }
-        else:
-            # If Takaful Emarat Silver wasn't asked first, provide a general response
-            return {
-                "response": "I'd be happy to help you with information about direct access to hospital. However, to provide you with the most accurate and specific information, could you please first ask about the Takaful Emarat Silver plan? This will help me give you the most relevant details for your situation."
-            }
+async def _answer_document_upload(
+    question, user_message, user_language, conversation_state, questions, responses, **_
+):
+    try:
+        # Try to parse as JSON first
+        document_data = json.loads(user_message)
+        print(f"Parsed document data: {document_data}")
+
+        # Store the document data
+        if isinstance(document_data, dict):
+            responses[question] = document_data
+
+        # Initialize flags if they don't exist
+        if "back_page_received" not in responses:
+            responses["back_page_received"] = False
+        if "front_page_received" not in responses:
+            responses["front_page_received"] = False
+
+        back_page_question = {"question": "Please Upload Back Page of Your Document"}
+        front_page_question = {"question": "Please Upload Front Page of Your Document"}
+
+        # Check if card_number is present - indicates back page information
+        if "card_number" in document_data and document_data.get("card_number"):
+            # Mark that we've received the back page information
+            responses["back_page_received"] = True
+            responses["Card Number"] = document_data.get("card_number")
+
+        # Check if date_of_birth and name are present - indicates front page information
+        if (
+            "date_of_birth" in document_data
+            and document_data.get("date_of_birth")
+            and "name" in document_data
+            and document_data.get("name")
+        ):
+            # Mark that we've received the front page information
+            responses["front_page_received"] = True
+
+            # Store these important details in the main responses
+            responses[
+                "Next, we need the details of the member for whom the policy is being purchased. Please provide Name"
+            ] = document_data.get("name")
+            responses["Date of Birth (DOB)"] = document_data.get("date_of_birth")
+            if "gender" in document_data and document_data.get("gender"):
+                responses["Please confirm this gender of"] = document_data.get("gender")
 
-    # Check for Takaful questions follow-up (show options after response)
-    if (
-        conversation_state.get("awaiting_takaful_followup")
-        and not user_message.lower() in ["yes", "no"]
-        and any(
-            keyword in user_message.lower()
-            for keyword in [
-                "area of coverage",
-                "annual medicine limit",
-                "medicine limit",
-                "consultation fee",
-                "fee",
-                "network",
-                "dental treatment",
-                "dental",
-                "direct access",
-                "hospital access",
-            ]
-        )
-    ):
-        # This means user just got a Takaful question response, show follow-up options
-        return {
-            "response": "Is there anything else you want me to help you with related to Takaful Emarat Silver?",
-            "options": "Yes, No",
-        }
+        # First document upload storage for reference
+        if "first_document_upload" not in responses:
+            responses["first_document_upload"] = document_data
+
+        # Determine if we need to ask for additional pages
+        if not responses["back_page_received"]:
+            # Need to ask for back page
+            if back_page_question not in questions:
+                questions.insert(
+                    conversation_state["current_question_index"] + 1,
+                    back_page_question,
+                )
+                responses[back_page_question["question"]] = None
 
-    # Handle Yes/No response for Chronic conditions follow-up
-    if conversation_state.get(
-        "awaiting_chronic_conditions_followup"
-    ) and user_message.lower() in ["yes", "no"]:
-        if user_message.lower() == "yes":
-            conversation_state["awaiting_chronic_conditions_followup"] = False
-            conversation_state["awaiting_takaful_followup"] = True
-            conversation_state["chronic_conditions_shown"] = False  # Reset the flag
-            return {
-                "response": "Great! Please ask your question about the Takaful Emarat Silver plan, and I'll assist you."
-            }
-        else:
-            conversation_state["awaiting_chronic_conditions_followup"] = False
-            conversation_state["current_flow"] = "initial"
-            conversation_state["current_question_index"] = 0
-            conversation_state["chronic_conditions_shown"] = False  # Reset the flag
-            first_question = initial_questions[0]
-            next_options = first_question.get("options", [])
             response_message = (
-                f"Alright, let's go back to the main menu. {first_question['question']}"
+                "We couldn't detect the Back Page in the uploaded document"
             )
-
-            # Translate to user's language
-            return format_response_in_language(
-                response_message, next_options, user_language
+            result = await format_response_in_language(
+                response_message,
+                [],
+                user_language,
+                message_type="document_upload_request",
+                document_type="emirates_id_back",
             )
+            result["question"] = await translate_text(
+                back_page_question["question"], user_language
+            )
+            return result
+        elif not responses["front_page_received"]:
+            # Need to ask for front page
+            if front_page_question not in questions:
+                questions.insert(
+                    conversation_state["current_question_index"] + 1,
+                    front_page_question,
+                )
+                responses[front_page_question["question"]] = None
 
-    # Check for Chronic conditions follow-up (show options after response)
-    if (
-        conversation_state.get("awaiting_chronic_conditions_followup")
-        and conversation_state.get("chronic_conditions_shown", False)
-        and not user_message.lower() in ["yes", "no"]
-    ):
-        # This means user just got the chronic conditions response, show follow-up options
-        conversation_state["chronic_conditions_shown"] = False  # Reset the flag
-        return {
-            "response": "Is there anything else you want me to help you with?",
-            "options": "Yes, No",
-        }
+            response_message = (
+                "We couldn't detect the Front Page in the uploaded document"
+            )
+            result = await format_response_in_language(
+                response_message,
+                [],
+                user_language,
+                message_type="document_upload_request",
+                document_type="emirates_id_front",
+            )
+            result["question"] = await translate_text(
+                front_page_question["question"], user_language
+            )
+            return result
 
-    # Handle Yes/No response for Takaful follow-up
-    if conversation_state.get("awaiting_takaful_followup") and user_message.lower() in [
-        "yes",
-        "no",
-    ]:
-        if user_message.lower() == "yes":
-            conversation_state["awaiting_takaful_followup"] = True
-            return {
-                "response": "Is there anything else Please ask, I am here to help you. realted to Takaful Emarat Silver",
-            }
-        else:
-            conversation_state["awaiting_takaful_followup"] = False
-            conversation_state["current_flow"] = "initial"
-            conversation_state["current_question_index"] = 0
-            first_question = initial_questions[0]
-            next_options = first_question.get("options", [])
-            response_message = f"Alright, let's move on. {first_question['question']}"
+        # If both pages have been received, continue with normal flow
+        conversation_state["current_question_index"] += 1
 
-            # Translate to user's language
-            return format_response_in_language(
-                response_message, next_options, user_language
-            )
+        # Remove the page questions if they exist in the question list
+        for q in [back_page_question, front_page_question]:
+            if q in questions:
+                questions.remove(q)
 
-    # Check for Takaful follow-up (handle questions after initial response)
-    if conversation_state.get(
-        "awaiting_takaful_followup"
-    ) and not user_message.lower() in ["yes", "no"]:
-        # User is asking a question after the initial Takaful response
-        # Generate a more natural response using LLM
-        takaful_prompt = "Rewrite this response in a friendly, conversational way as if a real insurance agent is speaking to a customer. Keep the same content but make it sound natural and warm. Use only 1-3 lines maximum: 'I'm here to help with any questions about the Takaful Emarat Silver plan. Please ask your specific question and I'll provide you with the most accurate information.'"
-        takaful_response = llm.invoke([
-            SystemMessage(
-                content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to communicate in a warm, conversational manner that makes customers feel comfortable and well-cared for. Keep responses short (1-3 lines) and maintain the exact same information while making it sound natural."
-            ),
-            HumanMessage(content=takaful_prompt),
-        ])
+        # Check if there are more questions
+        if conversation_state["current_question_index"] < len(questions):
+            next_question = questions[conversation_state["current_question_index"]]
+            if isinstance(next_question, dict) and "options" in next_question:
+                options = next_question["options"]
+                next_question_text = next_question["question"]
+                response_message = f"Thank you for uploading the document. Now, let's move on to: {next_question_text}"
+                # Detect document type from next question
+                msg_type, doc_type = detect_document_type_from_question(
+                    next_question_text
+                )
+                return await format_response_in_language(
+                    response_message, options, user_language, msg_type, doc_type
+                )
+            else:
+                next_question_text = (
+                    next_question["question"]
+                    if isinstance(next_question, dict)
+                    else next_question
+                )
+                response_message = f"Thank you for uploading the document. Now, let's move on to: {next_question_text}"
+                # Detect document type from next question
+                msg_type, doc_type = detect_document_type_from_question(
+                    next_question_text
+                )
+                return await format_response_in_language(
+                    response_message, [], user_language, msg_type, doc_type
+                )
+        else:
+            record_completion(responses)
+            final_message = "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask."
+            result = await format_response_in_language(final_message, [], user_language)
+            result["final_responses"] = responses
+            return result
+
+    except json.JSONDecodeError:
+        # Handle invalid JSON input
+        general_assistant_prompt = (
+            f"user response: {user_message}. Please assist them in {user_language}."
+        )
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
+        retry_question = await translate_text(
+            f"Let's try again: {question}", user_language
+        )
+        example_message = await translate_text(
+            "Please ensure that the document is in JPEG format.", user_language
+        )
         return {
-            "response": f"{takaful_response.content.strip()} Do you need to know anything else related Takaful Emarat Silver plan?",
-            "options": "Yes, No",
+            "response": f"{general_assistant_response.content.strip()} \n\n",
+            "example": example_message,
+            "question": retry_question,
         }
-
-    # Show welcome message with the first question if not already shown
-    if not conversation_state["welcome_shown"]:
-        conversation_state["welcome_shown"] = True
-        first_question = initial_questions[0]
-        next_options = first_question.get("options", [])
-        greeting = choice(greeting_templates).format(
-            user_name=user_name, first_question=first_question["question"]
+    except ValueError as e:
+        general_assistant_prompt = (
+            f"user response: {user_message}. Please assist them in {user_language}."
+        )
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
+        retry_question = await translate_text(
+            f"Let's try again: {question}", user_language
         )
+        example_message = await translate_text(
+            "Please ensure the document is in the correct format and try uploading again.",
+            user_language,
+        )
+        return {
+            "response": f"{general_assistant_response.content.strip()} \n\n",
+            "example": example_message,
+            "question": retry_question,
+        }
 
-        # Translate greeting and options to user's language
-        return format_response_in_language(greeting, next_options, user_language)
 
-    # Determine the current flow and questions
-    current_flow = conversation_state["current_flow"]
-    if current_flow == "initial":
-        questions = initial_questions
-    elif current_flow == "medical_insurance":
-        questions = medical_questions
-    elif current_flow == "individual":
-        questions = individual_questions
-    elif current_flow == "sma":
-        questions = sma_questions
-    elif current_flow == "motor_insurance":
-        questions = motor_insurance_questions
-    elif current_flow == "car_questions":
-        questions = car_questions
-    elif current_flow == "bike_questions":
-        questions = bike_questions
-    # elif current_flow == "new_policy":
-    #     questions = new_policy_questions
-    elif current_flow == "existing_policy":
-        questions = existing_policy_questions
-    elif current_flow == "motor_claim":
-        questions = motor_claim
-    else:
-        questions = []
+async def _answer_document_back_page(
+    question, user_message, user_language, conversation_state, questions, responses, **_
+):
+    try:
+        document_data = json.loads(user_message)
+        responses["Card Number"] = document_data.get("card_number")
 
-    # Get current question index
-    current_index = conversation_state["current_question_index"]
-    responses = conversation_state["responses"]
+        print(user_message)
+        if isinstance(document_data, dict):
+            responses[question] = document_data
+            print(document_data)
+            conversation_state["current_question_index"] += 1
 
-    if current_index < len(questions):
-        # Current question
-        question_data = questions[current_index]
-        if isinstance(question_data, dict):
-            question = question_data["question"]
-            options = question_data.get("options", [])
+            # Check if there are more questions
+            if conversation_state["current_question_index"] < len(questions):
+                next_question = questions[conversation_state["current_question_index"]]
+                if "options" in next_question:
+                    options = next_question["options"]
+                    next_question_text = next_question["question"]
+                    response_message = f"Thank you for uploading the document. Now, let's move on to: {next_question_text}"
+                    # Detect document type from next question
+                    msg_type, doc_type = detect_document_type_from_question(
+                        next_question_text
+                    )
+                    return await format_response_in_language(
+                        response_message,
+                        options,
+                        user_language,
+                        msg_type,
+                        doc_type,
+                    )
+                else:
+                    next_question_text = (
+                        next_question["question"]
+                        if isinstance(next_question, dict)
+                        else next_question
+                    )
+                    response_message = f"Thank you for uploading the document. Now, let's move on to: {next_question_text}"
+                    # Detect document type from next question
+                    msg_type, doc_type = detect_document_type_from_question(
+                        next_question_text
+                    )
+                    return await format_response_in_language(
+                        response_message, [], user_language, msg_type, doc_type
+                    )
+            else:
+                record_completion(responses)
+                final_message = "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask."
+                result = await format_response_in_language(
+                    final_message, [], user_language
+                )
+                result["final_responses"] = responses
+                return result
         else:
-            question = question_data
-            options = []
+            raise ValueError("Please Upload Again")
+    except json.JSONDecodeError:
+        # Handle invalid JSON input
+        general_assistant_prompt = (
+            f"user response: {user_message}. Please assist them in {user_language}."
+        )
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
+        retry_question = await translate_text(
+            f"Let's try again: {question}", user_language
+        )
+        example_message = await translate_text(
+            "Please ensure that the document is in JPEG format.", user_language
+        )
 
-        # Handle options
-        if options:
-            # Validate user response against options using multilingual validation
-            validation_result = validate_response_multilingual(
-                user_message, options, user_language
-            )
+        return {
+            "response": (f"{general_assistant_response.content.strip()} \n\n"),
+            "example": example_message,
+            "question": retry_question,
+        }
+    except ValueError as e:
+        general_assistant_prompt = (
+            f"user response: {user_message}. Please assist them in {user_language}."
+        )
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
+        retry_question = await translate_text(
+            f"Let's try again: {question}", user_language
+        )
+        example_message = await translate_text(
+            "Please ensure the document is in the correct format and try uploading again.",
+            user_language,
+        )
 
-            if validation_result["is_valid"]:
-                # Store the English version
-                matched_option = validation_result["matched_value"]
-                responses[question] = matched_option
+        return {
+            "response": (f"{general_assistant_response.content.strip()} \n\n"),
+            "example": example_message,
+            "question": retry_question,
+        }
 
-                if matched_option == "Purchase a Medical Insurance":
-                    conversation_state["current_flow"] = "medical_insurance"
-                    conversation_state["current_question_index"] = 0
 
-                    # Check if medical_questions is a list of dictionaries
-                    if isinstance(medical_questions[0], dict):
-                        next_options = medical_questions[0].get("options", [])
-                        response_message = (
-                            f"Great choice! {medical_questions[0]['question']}"
-                        )
-                        # Translate to user's language
-                        return format_response_in_language(
-                            response_message, next_options, user_language
-                        )
-                    # If medical_questions is a list of strings
-                    else:
-                        response_message = f"Great choice! {medical_questions[0]}"
-                        return format_response_in_language(
-                            response_message, [], user_language
-                        )
-                elif matched_option == "Purchase a Motor Insurance":
-                    conversation_state["current_flow"] = "motor_insurance"
-                    conversation_state["current_question_index"] = 0
-                    next_options = motor_insurance_questions[0].get("options", [])
-                    response_message = (
-                        f"Great choice! {motor_insurance_questions[0]['question']}"
-                    )
+async def _answer_document_front_page(
+    question, user_message, user_language, conversation_state, questions, responses, **_
+):
+    try:
+        document_data = json.loads(user_message)
+        responses[
+            "Next, we need the details of the member for whom the policy is being purchased. Please provide Name"
+        ] = document_data.get("name")
+        responses["Date of Birth (DOB)"] = document_data.get("date_of_birth")
+        responses["Please confirm this gender of"] = document_data.get("gender")
+
+        print(user_message)
+        if isinstance(document_data, dict):
+            responses[question] = document_data
+            print(document_data)
+            conversation_state["current_question_index"] += 1
 
-                    # Translate to user's language
-                    return format_response_in_language(
-                        response_message, next_options, user_language
+            # Check if there are more questions
+            if conversation_state["current_question_index"] < len(questions):
+                next_question = questions[conversation_state["current_question_index"]]
+                if "options" in next_question:
+                    options = next_question["options"]
+                    next_question_text = next_question["question"]
+                    response_message = f"Thank you for uploading the document. Now, let's move on to: {next_question_text}"
+                    # Detect document type from next question
+                    msg_type, doc_type = detect_document_type_from_question(
+                        next_question_text
                     )
-                elif matched_option == "Purchase a Car Insurance":
-                    conversation_state["current_flow"] = "car_questions"
-                    conversation_state["current_question_index"] = 0
-                    # Check if car_questions is a list of dictionaries
-                    if isinstance(car_questions[0], dict):
-                        next_options = car_questions[0].get("options", [])
-                        response_message = (
-                            f"Great choice! {car_questions[0]['question']}"
-                        )
-                    else:
-                        next_options = []
-                        response_message = f"Great choice! {car_questions[0]}"
-
-                    # Translate to user's language
-                    return format_response_in_language(
-                        response_message, next_options, user_language
+                    return await format_response_in_language(
+                        response_message,
+                        options,
+                        user_language,
+                        msg_type,
+                        doc_type,
                     )
-
-                elif matched_option == "Purchase a Bike Insurance":
-                    conversation_state["current_flow"] = "bike_questions"
-                    conversation_state["current_question_index"] = 0
-                    # Check if bike_questions is a list of dictionaries
-                    if isinstance(bike_questions[0], dict):
-                        next_options = bike_questions[0].get("options", [])
-                        response_message = (
-                            f"Great choice! {bike_questions[0]['question']}"
-                        )
-                    else:
-                        next_options = []
-                        response_message = f"Great choice! {bike_questions[0]}"
-
-                    # Translate to user's language
-                    return format_response_in_language(
-                        response_message, next_options, user_language
+                else:
+                    next_question_text = (
+                        next_question["question"]
+                        if isinstance(next_question, dict)
+                        else next_question
                     )
-                # elif matched_option == "Purchase a new policy":
-                #     conversation_state["current_flow"] = "new_policy"
-                #     conversation_state["current_question_index"] = 0
-                #     return {
-                #         "response": f"Great choice! {new_policy_questions[0]}"
-                #     }
-                elif matched_option == "Renew my existing policy":
-                    conversation_state["current_flow"] = "existing_policy"
-                    conversation_state["current_question_index"] = 0
-                    # Check if existing_policy_questions is a list of dictionaries
-                    if isinstance(existing_policy_questions[0], dict):
-                        next_options = existing_policy_questions[0].get("options", [])
-                        response_message = (
-                            f"Great choice! {existing_policy_questions[0]['question']}"
-                        )
-                    else:
-                        next_options = []
-                        response_message = (
-                            f"Great choice! {existing_policy_questions[0]}"
-                        )
-
-                    # Translate to user's language
-                    return format_response_in_language(
-                        response_message, next_options, user_language
+                    response_message = f"Thank you for uploading the document. Now, let's move on to: {next_question_text}"
+                    # Detect document type from next question
+                    msg_type, doc_type = detect_document_type_from_question(
+                        next_question_text
                     )
-                elif matched_option == "Claim a Motor Insurance":
-                    conversation_state["current_flow"] = "motor_claim"
-                    conversation_state["current_question_index"] = 0
-                    # Get the first motor_claim question
-                    if isinstance(motor_claim[0], dict):
-                        next_options = motor_claim[0].get("options", [])
-                        response_message = f"Great choice! {motor_claim[0]['question']}"
-                    else:
-                        next_options = []
-                        response_message = f"Great choice! {motor_claim[0]}"
-
-                    # Translate to user's language
-                    return format_response_in_language(
-                        response_message, next_options, user_language
+                    return await format_response_in_language(
+                        response_message, [], user_language, msg_type, doc_type
                     )
             else:
-                # Invalid option - provide helpful error in user's language
-                error_prompt = f"The user said '{user_message}' but needs to choose from: {', '.join(options)}. Provide a brief, helpful message."
-                error_response = llm.invoke([
-                    SystemMessage(
-                        content=f"You are Insura, a friendly insurance assistant. Respond in {user_language}. Be brief and helpful."
-                    ),
-                    HumanMessage(content=error_prompt),
-                ])
-
-                retry_message = f"Let's try again: {question}"
-                retry_translated = translate_text(retry_message, user_language)
-                translated_options = [
-                    translate_text(opt, user_language) for opt in options
-                ]
-
-                return {
-                    "response": error_response.content.strip(),
-                    "question": retry_translated,
-                    "options": ", ".join(translated_options),
-                }
-
-        if question in [
-            "Let's start with your Medical insurance details. Choose your Visa issued Emirate?",
-            "Tell me your Emirate sponsor located in?",
-        ]:
-            # Use multilingual validation for emirate selection
-            valid_options = [
-                "Abudhabi",
-                "Ajman",
-                "Dubai",
-                "Fujairah",
-                "Ras Al Khaimah",
-                "Sharjah",
-                "Umm Al Quwain",
-            ]
-            return handle_option_validation_multilingual(
-                user_message,
-                valid_options,
-                question,
-                user_language,
-                conversation_state,
-                questions,
-                responses,
-                user_id,
-            )
-
-        elif "emaf" in user_message.lower() or "from" in user_message.lower():
-            return handle_emaf_document(
-                question, user_message, responses, conversation_state, questions
-            )
-        elif "post a review" in user_message.lower():
-            user_message = user_message.lower()  # Convert user_message to lowercase
-            if "post a review" in user_message:
-                return {
-                    "review_message": "If you are satisfied with Wehbe(Broker) services, please leave a review for sharing happiness to others!!😊",
-                    "review_link": "https://www.google.com/search?client=ms-android-samsung-ss&sca_esv=4eb717e6f42bf628&sxsrf=AHTn8zprabdPVFL3C2gXo4guY8besI3jqQ:1744004771562&q=wehbe+insurance+services+llc+reviews&uds=ABqPDvy-z0dcsfm2PY76_gjn-YWou9-AAVQ4iWjuLR6vmDV0vf3KpBMNjU5ZkaHGmSY0wBrWI3xO9O55WuDmXbDq6a3SqlwKf2NJ5xQAjebIw44UNEU3t4CpFvpLt9qFPlVh2F8Gfv8sMuXXSo2Qq0M_ZzbXbg2c323G_bE4tVi7Ue7d_sW0CrnycpJ1CvV-OyrWryZw_TeQ3gLGDgzUuHD04MpSHquYZaSQ0_mIHLWjnu7fu8c7nb6_aGDb_H1Q-86fD2VmWluYA5jxRkC9U2NsSwSSXV4FPW9w1Q2T_Wjt6koJvLgtikd66MqwYiJPX2x9MwLhoGYlpTbKtkJuHwE9eM6wQgieChskow6tJCVjQ75I315dT8n3tUtasGdBkprOlUK9ibPrYr9HqRz4AwzEQaxAq9_EDcsSG_XW0CHuqi2lRKHw592MlGlhjyQibXKSZJh-v3KW4wIVqa-2x0k1wfbZdpaO3BZaKYCacLOxwUKTnXPbQqDPLQDeYgDBwaTLvaCN221H&si=APYL9bvoDGWmsM6h2lfKzIb8LfQg_oNQyUOQgna9TyfQHAoqUvvaXjJhb-NHEJtDKiWdK3OqRhtZNP2EtNq6veOxTLUq88TEa2J8JiXE33-xY1b8ohiuDLBeOOGhuI1U6V4mDc9jmZkDoxLC9b6s6V8MAjPhY-EC_g%3D%3D&sa=X&sqi=2&ved=2ahUKEwi05JSHnMWMAxUw8bsIHRRCDd0Qk8gLegQIHxAB&ictx=1&stq=1&cs=0&lei=o2bzZ_SGIrDi7_UPlIS16A0#ebo=1",
-                }
-            else:
-                general_assistant_prompt = (
-                    f"user response: {user_message}. Please assist."
+                record_completion(responses)
+                final_message = "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask."
+                result = await format_response_in_language(
+                    final_message, [], user_language
                 )
-                general_assistant_response = llm.invoke([
-                    SystemMessage(
-                        content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-                    ),
-                    HumanMessage(content=general_assistant_prompt),
-                ])
-
-                # Safely access the next question
-                if conversation_state["current_question_index"] < len(questions):
-                    next_question = questions[
-                        conversation_state["current_question_index"]
-                    ]
-                    if isinstance(next_question, dict) and "options" in next_question:
-                        options = ", ".join(next_question["options"])
-                        return {
-                            "response": f"{general_assistant_response.content.strip()}",
-                            "question": f"Let's try again: {next_question['question']}",
-                            "options": options,
-                        }
-                    else:
-                        question_text = (
-                            next_question["question"]
-                            if isinstance(next_question, dict)
-                            else next_question
-                        )
-                        return {
-                            "response": f"{general_assistant_response.content.strip()}",
-                            "question": f"Let's try again: {question_text}",
-                        }
-                else:
-                    return {
-                        "response": f"{general_assistant_response.content.strip()}",
-                        "question": "It seems we have reached the end of the questions.",
-                    }
-        # elif "post a review" in user_message.lower():
-        #     user_message = user_message.lower()  # Convert user_message to lowercase
-        #     next_question = questions[conversation_state["current_question_index"]]
-        #     if "post a review" in user_message:
-        #         if "options" in next_question:
-        #             options = ", ".join(next_question["options"])
-        #             return {
-        #                 return {
-        #             "review_message": "If you are satisfied with Wehbe(Broker) services, please leave a review for sharing happiness to others!!😊",
-        #             "review_link": "https://www.google.com/search?client=ms-android-samsung-ss&sca_esv=4eb717e6f42bf628&sxsrf=AHTn8zprabdPVFL3C2gXo4guY8besI3jqQ:1744004771562&q=wehbe+insurance+services+llc+reviews&uds=ABqPDvy-z0dcsfm2PY76_gjn-YWou9-AAVQ4iWjuLR6vmDV0vf3KpBMNjU5ZkaHGmSY0wBrWI3xO9O55WuDmXbDq6a3SqlwKf2NJ5xQAjebIw44UNEU3t4CpFvpLt9qFPlVh2F8Gfv8sMuXXSo2Qq0M_ZzbXbg2c323G_bE4tVi7Ue7d_sW0CrnycpJ1CvV-OyrWryZw_TeQ3gLGDgzUuHD04MpSHquYZaSQ0_mIHLWjnu7fu8c7nb6_aGDb_H1Q-86fD2VmWluYA5jxRkC9U2NsSwSSXV4FPW9w1Q2T_Wjt6koJvLgtikd66MqwYiJPX2x9MwLhoGYlpTbKtkJuHwE9eM6wQgieChskow6tJCVjQ75I315dT8n3tUtasGdBkprOlUK9ibPrYr9HqRz4AwzEQaxAq9_EDcsSG_XW0CHuqi2lRKHw592MlGlhjyQibXKSZJh-v3KW4wIVqa-2x0k1wfbZdpaO3BZaKYCacLOxwUKTnXPbQqDPLQDeYgDBwaTLvaCN221H&si=APYL9bvoDGWmsM6h2lfKzIb8LfQg_oNQyUOQgna9TyfQHAoqUvvaXjJhb-NHEJtDKiWdK3OqRhtZNP2EtNq6veOxTLUq88TEa2J8JiXE33-xY1b8ohiuDLBeOOGhuI1U6V4mDc9jmZkDoxLC9b6s6V8MAjPhY-EC_g%3D%3D&sa=X&sqi=2&ved=2ahUKEwi05JSHnMWMAxUw8bsIHRRCDd0Qk8gLegQIHxAB&ictx=1&stq=1&cs=0&lei=o2bzZ_SGIrDi7_UPlIS16A0#ebo=1"
-        #         }
-        #                 "question": f"Let's Move Back {question}",
-        #                 "options": options
-        #             }
-
-        #         else:
-        #                 return {
-        #                 return {
-        #             "review_message": "If you are satisfied with Wehbe(Broker) services, please leave a review for sharing happiness to others!!😊",
-        #             "review_link": "https://www.google.com/search?client=ms-android-samsung-ss&sca_esv=4eb717e6f42bf628&sxsrf=AHTn8zprabdPVFL3C2gXo4guY8besI3jqQ:1744004771562&q=wehbe+insurance+services+llc+reviews&uds=ABqPDvy-z0dcsfm2PY76_gjn-YWou9-AAVQ4iWjuLR6vmDV0vf3KpBMNjU5ZkaHGmSY0wBrWI3xO9O55WuDmXbDq6a3SqlwKf2NJ5xQAjebIw44UNEU3t4CpFvpLt9qFPlVh2F8Gfv8sMuXXSo2Qq0M_ZzbXbg2c323G_bE4tVi7Ue7d_sW0CrnycpJ1CvV-OyrWryZw_TeQ3gLGDgzUuHD04MpSHquYZaSQ0_mIHLWjnu7fu8c7nb6_aGDb_H1Q-86fD2VmWluYA5jxRkC9U2NsSwSSXV4FPW9w1Q2T_Wjt6koJvLgtikd66MqwYiJPX2x9MwLhoGYlpTbKtkJuHwE9eM6wQgieChskow6tJCVjQ75I315dT8n3tUtasGdBkprOlUK9ibPrYr9HqRz4AwzEQaxAq9_EDcsSG_XW0CHuqi2lRKHw592MlGlhjyQibXKSZJh-v3KW4wIVqa-2x0k1wfbZdpaO3BZaKYCacLOxwUKTnXPbQqDPLQDeYgDBwaTLvaCN221H&si=APYL9bvoDGWmsM6h2lfKzIb8LfQg_oNQyUOQgna9TyfQHAoqUvvaXjJhb-NHEJtDKiWdK3OqRhtZNP2EtNq6veOxTLUq88TEa2J8JiXE33-xY1b8ohiuDLBeOOGhuI1U6V4mDc9jmZkDoxLC9b6s6V8MAjPhY-EC_g%3D%3D&sa=X&sqi=2&ved=2ahUKEwi05JSHnMWMAxUw8bsIHRRCDd0Qk8gLegQIHxAB&ictx=1&stq=1&cs=0&lei=o2bzZ_SGIrDi7_UPlIS16A0#ebo=1"
-        #         }
-        #                 "question": f"Let's Move Back {question}",
-        #                 }
+                result["final_responses"] = responses
+                return result
+        else:
+            raise ValueError("Please Upload Again")
+    except json.JSONDecodeError:
+        # Handle invalid JSON input
+        general_assistant_prompt = (
+            f"user response: {user_message}. Please assist them in {user_language}."
+        )
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
+        retry_question = await translate_text(
+            f"Let's try again: {question}", user_language
+        )
+        example_message = await translate_text(
+            "Please ensure that the document is in JPEG format.", user_language
+        )
 
-        #     else:
-        #         general_assistant_prompt = f"user response: {user_message}. Please assist."
-        #         general_assistant_response = llm.invoke([
-        #             SystemMessage(content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."),
-        #             HumanMessage(content=general_assistant_prompt)
-        #         ])
+        return {
+            "response": (f"{general_assistant_response.content.strip()} \n\n"),
+            "example": example_message,
+            "question": retry_question,
+        }
+    except ValueError as e:
+        general_assistant_prompt = (
+            f"user response: {user_message}. Please assist them in {user_language}."
+        )
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
+        retry_question = await translate_text(
+            f"Let's try again: {question}", user_language
+        )
+        example_message = await translate_text(
+            "Please ensure the document is in the correct format and try uploading again.",
+            user_language,
+        )
 
-        #         # Safely access the next question
-        #         if conversation_state["current_question_index"] < len(questions):
-        #             next_question = questions[conversation_state["current_question_index"]]
-        #             if isinstance(next_question, dict) and "options" in next_question:
-        #                 options = ", ".join(next_question["options"])
-        #                 return {
-        #                     "response": f"{general_assistant_response.content.strip()}",
-        #                     "question": f"Let's try again: {next_question['question']}",
-        #                     "options": options
-        #                 }
-        #             else:
-        #                 question_text = next_question["question"] if isinstance(next_question, dict) else next_question
-        #                 return {
-        #                     "response": f"{general_assistant_response.content.strip()}",
-        #                     "question": f"Let's try again: {question_text}"
-        #                 }
-        #         else:
-        #             return {
-        #                 "response": f"{general_assistant_response.content.strip()}",
-        #                 "question": "It seems we have reached the end of the questions."
-        #             }
+        return {
+            "response": (f"{general_assistant_response.content.strip()} \n\n"),
+            "example": example_message,
+            "question": retry_question,
+        }
 
-        elif question == "Please Enter Your PassKey":
-            responses[question] = user_message
 
-            if user_message == "5514":
-                conversation_state["current_question_index"] += 1
-                if conversation_state["current_question_index"] < len(questions):
-                    next_question = questions[
-                        conversation_state["current_question_index"]
-                    ]
+async def _answer_driving_license_upload(
+    question,
+    user_message,
+    user_language,
+    user_id,
+    conversation_state,
+    questions,
+    responses,
+    **_,
+):
+    try:
+        document_data = json.loads(user_message)
+        responses["driving license Name in the License"] = document_data.get("name")
+        responses["Date of Birth (DOB) in the License"] = document_data.get(
+            "date_of_birth"
+        )
+        responses["License No in the License"] = document_data.get("license_no")
+        responses["Nationality in the License"] = document_data.get("nationality")
+        responses["Issue Date in the License"] = document_data.get("issue_date")
+        responses["Expiry Date in the License"] = document_data.get("expiry_date")
+        responses["Place Of Issue in the License"] = document_data.get("place_of_issue")
+
+        print(user_message)
+        if isinstance(document_data, dict):
+            responses[question] = document_data
+            print(document_data)
+            conversation_state["current_question_index"] += 1
 
-                    if "options" in next_question:
-                        options = next_question["options"]
-                        next_question_text = next_question["question"]
-                        response_message = f"Great choice! {next_question_text}"
-                        return format_response_in_language(
-                            response_message, options, user_language
-                        )
-                    else:
-                        next_question_text = (
-                            next_question["question"]
-                            if isinstance(next_question, dict)
-                            else next_question
-                        )
-                        response_message = f"Great choice! {next_question_text}"
-                        return format_response_in_language(
-                            response_message, [], user_language
-                        )
+            # Check if there are more questions
+            if conversation_state["current_question_index"] < len(questions):
+                next_question = questions[conversation_state["current_question_index"]]
+                if "options" in next_question:
+                    options = next_question["options"]
+                    next_question_text = next_question["question"]
+                    response_message = f"Thank you for uploading the document. Now, let's move on to: {next_question_text}"
+                    # Detect document type from next question
+                    msg_type, doc_type = detect_document_type_from_question(
+                        next_question_text
+                    )
+                    return await format_response_in_language(
+                        response_message,
+                        options,
+                        user_language,
+                        msg_type,
+                        doc_type,
+                    )
                 else:
-                    with open("user_responses.json", "w") as file:
-                        json.dump(responses, file, indent=4)
-                    final_message = "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask."
-                    result = format_response_in_language(
-                        final_message, [], user_language
+                    next_question_text = (
+                        next_question["question"]
+                        if isinstance(next_question, dict)
+                        else next_question
+                    )
+                    response_message = f"Thank you for uploading the document. Now, let's move on to: {next_question_text}"
+                    # Detect document type from next question
+                    msg_type, doc_type = detect_document_type_from_question(
+                        next_question_text
+                    )
+                    return await format_response_in_language(
+                        response_message, [], user_language, msg_type, doc_type
                     )
-                    result["final_responses"] = responses
-                    return result
             else:
-                error_message = (
-                    "Incorrect passkey. Please try again. Please Enter Your PassKey"
+                record_completion(responses)
+                del user_states[user_id]
+                final_message = "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask."
+                result = await format_response_in_language(
+                    final_message, [], user_language
                 )
-                return format_response_in_language(error_message, [], user_language)
+                result["final_responses"] = responses
+                return result
+        else:
+            raise ValueError("Please Upload Again")
+    except json.JSONDecodeError:
+        # Handle invalid JSON input
+        general_assistant_prompt = (
+            f"user response: {user_message}. Please assist them in {user_language}."
+        )
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
+        retry_question = await translate_text(
+            f"Let's try again: {question}", user_language
+        )
+        example_message = await translate_text(
+            "Please ensure that the document is in JPEG format.", user_language
+        )
 
-        elif question == "May I know your name, please?":
-            responses[question] = user_message
-            conversation_state["current_question_index"] += 1
-
-            if conversation_state["current_question_index"] < len(questions):
-                next_question = questions[conversation_state["current_question_index"]]
-                next_questions = next_question["question"]
-                return {
-                    "response": f"Thanks a lot for providing your name! Alright, moving on {next_questions}"
-                }
-            else:
-                with open("user_responses.json", "w") as file:
-                    json.dump(responses, file, indent=4)
-                return {
-                    "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
-                    "final_responses": responses,
-                }
-        elif question == "May I kindly ask for your phone number, please?":
-            responses[question] = user_message
+        return {
+            "response": (f"{general_assistant_response.content.strip()} \n\n"),
+            "example": example_message,
+            "question": retry_question,
+        }
+    except ValueError as e:
+        general_assistant_prompt = (
+            f"user response: {user_message}. Please assist them in {user_language}."
+        )
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
+        retry_question = await translate_text(
+            f"Let's try again: {question}", user_language
+        )
+        example_message = await translate_text(
+            "Please ensure the document is in the correct format and try uploading again.",
+            user_language,
+        )
+
+        return {
+            "response": (f"{general_assistant_response.content.strip()} \n\n"),
+            "example": example_message,
+            "question": retry_question,
+        }
+
+
+async def _answer_mulkiya_upload(
+    question,
+    user_message,
+    user_language,
+    user_id,
+    conversation_state,
+    questions,
+    responses,
+    **_,
+):
+    try:
+        document_data = json.loads(user_message)
+        responses["Owner in the Vehicle Mulkiya"] = document_data.get("owner")
+        responses["Place of Issues in the Vehicle License"] = document_data.get(
+            "place_of_issue"
+        )
+        responses["Traffic Plate No in the Vehicle License"] = document_data.get(
+            "traffic_plate_no"
+        )
+        responses["T.C.NO in the Vehicle Mulkiya"] = document_data.get("nationality")
+        responses["Nationality in the Vehicle Mulkiya"] = document_data.get(
+            "nationality"
+        )
+        responses["Expiry Date in the Vehicle Mulkiya"] = document_data.get(
+            "expiry_date"
+        )
+        responses["Registertion Date in the Vehicle Mulkiya"] = document_data.get(
+            "reg_date"
+        )
+        responses["Issues Date in the Vehicle Mulkiya"] = document_data.get("ins_exp")
+        responses["Policy No in the Vehicle Mulkiya"] = document_data.get("policy_no")
+        responses["Model in the Vehicle Mulkiya"] = document_data.get("model_no")
+        responses["Origin in the Vehicle Mulkiya"] = document_data.get("origin")
+        responses["Vehicle Type in the Vehicle Mulkiya"] = document_data.get(
+            "vehicle_type"
+        )
+        responses["Num of pass in the Vehicle Mulkiya"] = document_data.get(
+            "number_of_pass"
+        )
+        responses["G V M in the Vehicle Mulkiya"] = document_data.get("gvw")
+        responses["Empty Weight in the Vehicle Mulkiya"] = document_data.get(
+            "empty_weight"
+        )
+        responses["Engine Number in the Vehicle Mulkiya"] = document_data.get(
+            "engine_no"
+        )
+        responses["Chassis Number in the Vehicle Mulkiya"] = document_data.get(
+            "chassis_no"
+        )
+
+        print(user_message)
+        if isinstance(document_data, dict):
+            responses[question] = document_data
+            print(document_data)
             conversation_state["current_question_index"] += 1
 
+            # Check if there are more questions
             if conversation_state["current_question_index"] < len(questions):
                 next_question = questions[conversation_state["current_question_index"]]
                 if "options" in next_question:
-                    options = ", ".join(next_question["options"])
-                    next_questions = next_question["question"]
-                    return {
-                        "response": f"Thank you so much! I'd really appreciate it {next_questions}",
-                        "dropdown": options,
-                    }
-                else:
-                    return {
-                        "response": f"Thank you so much! I'd really appreciate it {next_question}"
-                    }
-            else:
-                with open("user_responses.json", "w") as file:
-                    json.dump(responses, file, indent=4)
-                return {
-                    "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
-                    "final_responses": responses,
-                }
-        # Handled Emaf
-        elif (
-            question
-            == "Could you kindly confirm the name of your insurance company, please?"
-        ):
-            # responses[question] =  user_message
-            # conversation_state["current_question_index"]+=1
-
-            valid_options = [
-                "Takaful Emarat (Ecare)",
-                "National Life & General Insurance (Innayah)",
-                "Takaful Emarat (Aafiya)",
-                "National Life & General Insurance (NAS)",
-                "Orient UNB Takaful (Nextcare)",
-                "Orient Mednet (Mednet)",
-                "Al Sagr Insurance (Nextcare)",
-                "RAK Insurance (Mednet)",
-                "Dubai Insurance (Dubai Care)",
-                "Fidelity United (Nextcare)",
-                "Salama April International (Salama)",
-                "Sukoon (Sukoon)",
-                "Orient basic",
-                "Daman",
-                "Dubai insurance(Mednet)",
-                "Takaful Emarat(NAS)",
-                "Takaful emarat(Nextcare)",
-            ]
-            company_number_mapping = {
-                "Takaful Emarat (Ecare)": 1,
-                "National Life & General Insurance (Innayah)": 2,
-                "Takaful Emarat (Aafiya)": 3,
-                "National Life & General Insurance (NAS)": 4,
-                "Orient UNB Takaful (Nextcare)": 6,
-                "Orient Mednet (Mednet)": 7,
-                "Al Sagr Insurance (Nextcare)": 8,
-                "RAK Insurance (Mednet)": 9,
-                "Dubai Insurance (Dubai Care)": 10,
-                "Fidelity United (Nextcare)": 11,
-                "Salama April International (Salama)": 12,
-                "Sukoon (Sukoon)": 13,
-                "Orient basic": 14,
-                "Daman": 15,
-                "Dubai insurance(Mednet)": 16,
-                "Takaful Emarat(NAS)": 17,
-                "Takaful emarat(Nextcare)": 18,
-            }
-
-            if user_message in valid_options:
-                # Update the Response
-                responses[question] = user_message
-                selected_company_number = company_number_mapping.get(user_message)
-                responses["emaf_company_id"] = selected_company_number
-                conversation_state["current_question_index"] += 1
-                emaf_id = emaf_document(responses)
-
-                if conversation_state["current_question_index"] < len(questions):
-                    next_question = questions[
-                        conversation_state["current_question_index"]
-                    ]
-                    del user_states[user_id]
-                    return {
-                        "response": f"Thank you! That was helpful. Now, let's move on to: {next_question}"
-                    }
+                    options = next_question["options"]
+                    next_question_text = next_question["question"]
+                    response_message = f"Thank you for uploading the document. Now, let's move on to: {next_question_text}"
+                    # Detect document type from next question
+                    msg_type, doc_type = detect_document_type_from_question(
+                        next_question_text
+                    )
+                    return await format_response_in_language(
+                        response_message,
+                        options,
+                        user_language,
+                        msg_type,
+                        doc_type,
+                    )
                 else:
-                    if isinstance(emaf_id, int):
-                        del user_states[user_id]
-                        return {
-                            "response": f"Thank you for sharing the details. Please find the link below to view your emaf document:",
-                            "link": f"https://www.insuranceclub.ae/medical_form/view/{emaf_id}",
-                        }
-                    else:
-                        return {
-                            "response": "Thank you for sharing the details. If you have any questions, please contact support@insuranceclub.ae."
-                        }
+                    next_question_text = (
+                        next_question["question"]
+                        if isinstance(next_question, dict)
+                        else next_question
+                    )
+                    response_message = f"Thank you for uploading the document. Now, let's move on to: {next_question_text}"
+                    # Detect document type from next question
+                    msg_type, doc_type = detect_document_type_from_question(
+                        next_question_text
+                    )
+                    return await format_response_in_language(
+                        response_message, [], user_language, msg_type, doc_type
+                    )
             else:
-                general_assistant_prompt = (
-                    f"The user entered '{user_message}', . Please assist."
+                record_completion(responses)
+                del user_states[user_id]
+                final_message = "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask."
+                result = await format_response_in_language(
+                    final_message, [], user_language
                 )
-                general_assistant_response = llm.invoke([
-                    HumanMessage(content=general_assistant_prompt)
-                ])
-                next_question = questions[conversation_state["current_question_index"]]
-                if "options" in next_question:
-                    options = ", ".join(next_question["options"])
-                    return {
-                        "response": f"{general_assistant_response.content.strip()}",
-                        "question": f"Let's Move Back {question}",
-                        "options": options,
-                    }
+                result["final_responses"] = responses
+                return result
+        else:
+            raise ValueError("Please Upload Again")
+    except json.JSONDecodeError:
+        # Handle invalid JSON input
+        general_assistant_prompt = (
+            f"user response: {user_message}. Please assist them in {user_language}."
+        )
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
+        retry_question = await translate_text(
+            f"Let's try again: {question}", user_language
+        )
+        example_message = await translate_text(
+            "Please ensure that the document is in JPEG format.", user_language
+        )
 
-                else:
-                    return {
-                        "response": f"{general_assistant_response.content.strip()}",
-                        "question": f"Let's Move Back {question}",
-                    }
+        return {
+            "response": (f"{general_assistant_response.content.strip()} \n\n"),
+            "example": example_message,
+            "question": retry_question,
+        }
+    except ValueError as e:
+        general_assistant_prompt = (
+            f"user response: {user_message}. Please assist them in {user_language}."
+        )
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
+        retry_question = await translate_text(
+            f"Let's try again: {question}", user_language
+        )
+        example_message = await translate_text(
+            "Please ensure the document is in the correct format and try uploading again.",
+            user_language,
+        )
 
-        elif question == "What type of plan are you looking for?":
-            # Use multilingual validation for plan type selection
-            valid_options = [
-                "Basic Plan",
-                "Enhanced Plan",
-                "Enhanced Plan Standalone",
-                "Flexi Plan",
-            ]
-            return handle_option_validation_multilingual(
-                user_message,
-                valid_options,
-                question,
-                user_language,
-                conversation_state,
-                questions,
-                responses,
-                user_id,
-            )
+        return {
+            "response": (f"{general_assistant_response.content.strip()} \n\n"),
+            "example": example_message,
+            "question": retry_question,
+        }
 
-        elif question == "Please Upload Your Document":
-            try:
-                # Try to parse as JSON first
-                document_data = json.loads(user_message)
-                print(f"Parsed document data: {document_data}")
-
-                # Store the document data
-                if isinstance(document_data, dict):
-                    responses[question] = document_data
-
-                # Initialize flags if they don't exist
-                if "back_page_received" not in responses:
-                    responses["back_page_received"] = False
-                if "front_page_received" not in responses:
-                    responses["front_page_received"] = False
-
-                back_page_question = {
-                    "question": "Please Upload Back Page of Your Document"
-                }
-                front_page_question = {
-                    "question": "Please Upload Front Page of Your Document"
-                }
 
-                # Check if card_number is present - indicates back page information
-                if "card_number" in document_data and document_data.get("card_number"):
-                    # Mark that we've received the back page information
-                    responses["back_page_received"] = True
-                    responses["Card Number"] = document_data.get("card_number")
+async def _answer_gender_confirmation(
+    question,
+    user_message,
+    user_language,
+    user_id,
+    conversation_state,
+    questions,
+    responses,
+    **_,
+):
+    # Use multilingual validation for gender selection
+    valid_options = ["Male", "Female"]
+    return await handle_option_validation_multilingual(
+        user_message,
+        valid_options,
+        question,
+        user_language,
+        conversation_state,
+        questions,
+        responses,
+        user_id,
+    )
 
-                # Check if date_of_birth and name are present - indicates front page information
-                if (
-                    "date_of_birth" in document_data
-                    and document_data.get("date_of_birth")
-                    and "name" in document_data
-                    and document_data.get("name")
-                ):
-                    # Mark that we've received the front page information
-                    responses["front_page_received"] = True
-
-                    # Store these important details in the main responses
-                    responses[
-                        "Next, we need the details of the member for whom the policy is being purchased. Please provide Name"
-                    ] = document_data.get("name")
-                    responses["Date of Birth (DOB)"] = document_data.get(
-                        "date_of_birth"
-                    )
-                    if "gender" in document_data and document_data.get("gender"):
-                        responses["Please confirm this gender of"] = document_data.get(
-                            "gender"
-                        )
 
-                # First document upload storage for reference
-                if "first_document_upload" not in responses:
-                    responses["first_document_upload"] = document_data
-
-                # Determine if we need to ask for additional pages
-                if not responses["back_page_received"]:
-                    # Need to ask for back page
-                    if back_page_question not in questions:
-                        questions.insert(
-                            conversation_state["current_question_index"] + 1,
-                            back_page_question,
-                        )
-                        responses[back_page_question["question"]] = None
+async def _answer_member_id_choice(
+    question, user_message, user_language, conversation_state, questions, responses, **_
+):
+    # Use the Emirates ID upload handler with multilingual support
+    return await handle_emirate_upload_document(
+        user_message,
+        conversation_state,
+        questions,
+        responses,
+        question,
+        user_language,
+    )
 
-                    response_message = (
-                        "We couldn't detect the Back Page in the uploaded document"
-                    )
-                    result = format_response_in_language(
-                        response_message,
-                        [],
-                        user_language,
-                        message_type="document_upload_request",
-                        document_type="emirates_id_back",
-                    )
-                    result["question"] = translate_text(
-                        back_page_question["question"], user_language
-                    )
-                    return result
-                elif not responses["front_page_received"]:
-                    # Need to ask for front page
-                    if front_page_question not in questions:
-                        questions.insert(
-                            conversation_state["current_question_index"] + 1,
-                            front_page_question,
-                        )
-                        responses[front_page_question["question"]] = None
 
-                    response_message = (
-                        "We couldn't detect the Front Page in the uploaded document"
-                    )
-                    result = format_response_in_language(
-                        response_message,
-                        [],
-                        user_language,
-                        message_type="document_upload_request",
-                        document_type="emirates_id_front",
-                    )
-                    result["question"] = translate_text(
-                        front_page_question["question"], user_language
-                    )
-                    return result
+async def _answer_car_owner_id_choice(
+    question, user_message, user_language, conversation_state, questions, responses, **_
+):
+    # Use multilingual validation for Yes/No questions
+    valid_options = ["Yes", "No"]
+    return await handle_emirate_upload_document_car_insurance(
+        user_message,
+        conversation_state,
+        questions,
+        responses,
+        question,
+        user_language,
+    )
 
-                # If both pages have been received, continue with normal flow
-                conversation_state["current_question_index"] += 1
 
-                # Remove the page questions if they exist in the question list
-                for q in [back_page_question, front_page_question]:
-                    if q in questions:
-                        questions.remove(q)
+async def _answer_car_purchase_type(
+    question,
+    user_message,
+    user_language,
+    user_id,
+    conversation_state,
+    questions,
+    responses,
+    **_,
+):
+    valid_options = ["Comprehensive (Full Cover)", "Third Party"]
+
+    # Use multilingual validation
+    validation_result = await validate_response_multilingual(
+        user_message, valid_options, user_language
+    )
 
-                # Check if there are more questions
-                if conversation_state["current_question_index"] < len(questions):
-                    next_question = questions[
-                        conversation_state["current_question_index"]
-                    ]
-                    if isinstance(next_question, dict) and "options" in next_question:
-                        options = next_question["options"]
-                        next_question_text = next_question["question"]
-                        response_message = f"Thank you for uploading the document. Now, let's move on to: {next_question_text}"
-                        # Detect document type from next question
-                        msg_type, doc_type = detect_document_type_from_question(
-                            next_question_text
-                        )
-                        return format_response_in_language(
-                            response_message, options, user_language, msg_type, doc_type
-                        )
-                    else:
-                        next_question_text = (
-                            next_question["question"]
-                            if isinstance(next_question, dict)
-                            else next_question
-                        )
-                        response_message = f"Thank you for uploading the document. Now, let's move on to: {next_question_text}"
-                        # Detect document type from next question
-                        msg_type, doc_type = detect_document_type_from_question(
-                            next_question_text
-                        )
-                        return format_response_in_language(
-                            response_message, [], user_language, msg_type, doc_type
-                        )
-                else:
-                    with open("user_responses.json", "w") as file:
-                        json.dump(responses, file, indent=4)
-                    final_message = "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask."
-                    result = format_response_in_language(
-                        final_message, [], user_language
-                    )
-                    result["final_responses"] = responses
-                    return result
+    if validation_result["is_valid"]:
+        # Store the English version of the response
+        english_value = validation_result["matched_value"]
+        responses[question] = english_value
+        conversation_state["current_question_index"] += 1
 
-            except json.JSONDecodeError:
-                # Handle invalid JSON input
-                general_assistant_prompt = f"user response: {user_message}. Please assist them in {user_language}."
-                general_assistant_response = llm.invoke([
-                    SystemMessage(
-                        content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-                    ),
-                    HumanMessage(content=general_assistant_prompt),
-                ])
-                retry_question = translate_text(
-                    f"Let's try again: {question}", user_language
+        if conversation_state["current_question_index"] < len(questions):
+            next_question = questions[conversation_state["current_question_index"]]
+            if "options" in next_question:
+                next_questions_text = next_question["question"]
+                next_options = next_question["options"]
+                response_message = (
+                    f"Thank you! Now, let's move on to: {next_questions_text}"
                 )
-                example_message = translate_text(
-                    "Please ensure that the document is in JPEG format.", user_language
+
+                # Format in user's language
+                return await format_response_in_language(
+                    response_message, next_options, user_language
                 )
-                return {
-                    "response": f"{general_assistant_response.content.strip()} \n\n",
-                    "example": example_message,
-                    "question": retry_question,
-                }
-            except ValueError as e:
-                general_assistant_prompt = f"user response: {user_message}. Please assist them in {user_language}."
-                general_assistant_response = llm.invoke([
-                    SystemMessage(
-                        content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-                    ),
-                    HumanMessage(content=general_assistant_prompt),
-                ])
-                retry_question = translate_text(
-                    f"Let's try again: {question}", user_language
+            else:
+                next_question_text = (
+                    next_question
+                    if isinstance(next_question, str)
+                    else next_question.get("question", "")
                 )
-                example_message = translate_text(
-                    "Please ensure the document is in the correct format and try uploading again.",
-                    user_language,
+                response_message = (
+                    f"Thank you. Now, let's move on to: {next_question_text}"
                 )
-                return {
-                    "response": f"{general_assistant_response.content.strip()} \n\n",
-                    "example": example_message,
-                    "question": retry_question,
-                }
-        elif question == "Please Upload Back Page of Your Document":
-            try:
-                document_data = json.loads(user_message)
-                responses["Card Number"] = document_data.get("card_number")
+                return await format_response_in_language(
+                    response_message, [], user_language
+                )
+        else:
+            record_completion(responses)
+            del user_states[user_id]
 
-                print(user_message)
-                if isinstance(document_data, dict):
-                    responses[question] = document_data
-                    print(document_data)
-                    conversation_state["current_question_index"] += 1
+            final_message = "Thank you for sharing the details. We will inform Shafeeque Shanavas from Wehbe Insurance to assist you further with your enquiry. Please wait for further assistance. If you have any questions, please contact support@insuranceclub.ae."
 
-                    # Check if there are more questions
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        if "options" in next_question:
-                            options = next_question["options"]
-                            next_question_text = next_question["question"]
-                            response_message = f"Thank you for uploading the document. Now, let's move on to: {next_question_text}"
-                            # Detect document type from next question
-                            msg_type, doc_type = detect_document_type_from_question(
-                                next_question_text
-                            )
-                            return format_response_in_language(
-                                response_message,
-                                options,
-                                user_language,
-                                msg_type,
-                                doc_type,
-                            )
-                        else:
-                            next_question_text = (
-                                next_question["question"]
-                                if isinstance(next_question, dict)
-                                else next_question
-                            )
-                            response_message = f"Thank you for uploading the document. Now, let's move on to: {next_question_text}"
-                            # Detect document type from next question
-                            msg_type, doc_type = detect_document_type_from_question(
-                                next_question_text
-                            )
-                            return format_response_in_language(
-                                response_message, [], user_language, msg_type, doc_type
-                            )
-                    else:
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                        final_message = "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask."
-                        result = format_response_in_language(
-                            final_message, [], user_language
-                        )
-                        result["final_responses"] = responses
-                        return result
-                else:
-                    raise ValueError("Please Upload Again")
-            except json.JSONDecodeError:
-                # Handle invalid JSON input
-                general_assistant_prompt = f"user response: {user_message}. Please assist them in {user_language}."
-                general_assistant_response = llm.invoke([
-                    SystemMessage(
-                        content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-                    ),
-                    HumanMessage(content=general_assistant_prompt),
-                ])
-                retry_question = translate_text(
-                    f"Let's try again: {question}", user_language
-                )
-                example_message = translate_text(
-                    "Please ensure that the document is in JPEG format.", user_language
-                )
+            result = await format_response_in_language(final_message, [], user_language)
+            result["final_responses"] = responses
+            return result
+    else:
+        # Handle invalid responses or unrelated queries
+        general_assistant_prompt = (
+            f"user response: {user_message}. Please assist in a helpful manner. "
+            f"Explain that they need to choose from: {', '.join(valid_options)}"
+        )
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content=f"You are Insura, a friendly insurance assistant. Respond in {user_language}. "
+                    "Help the user understand they need to select a valid option."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
 
-                return {
-                    "response": (f"{general_assistant_response.content.strip()} \n\n"),
-                    "example": example_message,
-                    "question": retry_question,
-                }
-            except ValueError as e:
-                general_assistant_prompt = f"user response: {user_message}. Please assist them in {user_language}."
-                general_assistant_response = llm.invoke([
-                    SystemMessage(
-                        content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-                    ),
-                    HumanMessage(content=general_assistant_prompt),
-                ])
-                retry_question = translate_text(
-                    f"Let's try again: {question}", user_language
-                )
-                example_message = translate_text(
-                    "Please ensure the document is in the correct format and try uploading again.",
-                    user_language,
-                )
+        error_message = general_assistant_response.content.strip()
+        retry_question = await translate_text(
+            f"Let's try again: {question}\nPlease choose from the following options: {', '.join(valid_options)}",
+            user_language,
+        )
 
-                return {
-                    "response": (f"{general_assistant_response.content.strip()} \n\n"),
-                    "example": example_message,
-                    "question": retry_question,
-                }
-        elif question == "Please Upload Front Page of Your Document":
-            try:
-                document_data = json.loads(user_message)
-                responses[
-                    "Next, we need the details of the member for whom the policy is being purchased. Please provide Name"
-                ] = document_data.get("name")
-                responses["Date of Birth (DOB)"] = document_data.get("date_of_birth")
-                responses["Please confirm this gender of"] = document_data.get("gender")
+        return {
+            "response": error_message,
+            "question": retry_question,
+        }
 
-                print(user_message)
-                if isinstance(document_data, dict):
-                    responses[question] = document_data
-                    print(document_data)
-                    conversation_state["current_question_index"] += 1
 
-                    # Check if there are more questions
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        if "options" in next_question:
-                            options = next_question["options"]
-                            next_question_text = next_question["question"]
-                            response_message = f"Thank you for uploading the document. Now, let's move on to: {next_question_text}"
-                            # Detect document type from next question
-                            msg_type, doc_type = detect_document_type_from_question(
-                                next_question_text
-                            )
-                            return format_response_in_language(
-                                response_message,
-                                options,
-                                user_language,
-                                msg_type,
-                                doc_type,
-                            )
-                        else:
-                            next_question_text = (
-                                next_question["question"]
-                                if isinstance(next_question, dict)
-                                else next_question
-                            )
-                            response_message = f"Thank you for uploading the document. Now, let's move on to: {next_question_text}"
-                            # Detect document type from next question
-                            msg_type, doc_type = detect_document_type_from_question(
-                                next_question_text
-                            )
-                            return format_response_in_language(
-                                response_message, [], user_language, msg_type, doc_type
-                            )
-                    else:
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                        final_message = "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask."
-                        result = format_response_in_language(
-                            final_message, [], user_language
-                        )
-                        result["final_responses"] = responses
-                        return result
-                else:
-                    raise ValueError("Please Upload Again")
-            except json.JSONDecodeError:
-                # Handle invalid JSON input
-                general_assistant_prompt = f"user response: {user_message}. Please assist them in {user_language}."
-                general_assistant_response = llm.invoke([
-                    SystemMessage(
-                        content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-                    ),
-                    HumanMessage(content=general_assistant_prompt),
-                ])
-                retry_question = translate_text(
-                    f"Let's try again: {question}", user_language
-                )
-                example_message = translate_text(
-                    "Please ensure that the document is in JPEG format.", user_language
-                )
+async def _answer_car_make(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    if is_current_question(conversation_state, questions, question):
+        # Prompt LLM for additional validation
+        check_prompt = (
+            f"The user has responded with: '{user_message}'. Determine if this is a valid car make name. "
+            "Respond only with 'Yes' or 'No'."
+        )
+        llm_response = await llm.ainvoke([
+            SystemMessage(
+                content="You are Insura, an AI assistant specialized in insurance-related tasks. "
+                "Your task is to act as a car maker agency. You can handle lots of car makes, so your job is to check if the given name is a car maker."
+            ),
+            HumanMessage(content=check_prompt),
+        ])
+        is_valid_car_make = llm_response.content.strip().lower() == "yes"
+
+        if is_valid_car_make:
+            # Store the name
+            responses[question] = user_message
+            conversation_state["current_question_index"] += 1
 
+            if conversation_state["current_question_index"] < len(questions):
+                next_question = questions[conversation_state["current_question_index"]]
+                return {
+                    "response": f"Thank you for providing the car make. Now, let's move on to: {next_question}"
+                }
+            else:
+                # All questions completed
+                record_completion(responses)
                 return {
-                    "response": (f"{general_assistant_response.content.strip()} \n\n"),
-                    "example": example_message,
-                    "question": retry_question,
+                    "response": "Thank you for using Insura. Your request has been processed. Have a great day!",
+                    "final_responses": responses,
                 }
-            except ValueError as e:
-                general_assistant_prompt = f"user response: {user_message}. Please assist them in {user_language}."
-                general_assistant_response = llm.invoke([
+        else:
+            # Use general assistant for invalid LLM validation
+            general_assistant_prompt = (
+                f"The user entered '{user_message}', which was not validated as a car make by Insura. "
+                "Please assist them in correcting their input."
+            )
+            general_assistant_response = await cached_reply(
+                llm,
+                [
                     SystemMessage(
-                        content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                        content="You are Insura, an AI assistant created by CloudSubset. "
+                        "Your role is to assist users with their inquiries and guide them appropriately."
                     ),
                     HumanMessage(content=general_assistant_prompt),
-                ])
-                retry_question = translate_text(
-                    f"Let's try again: {question}", user_language
-                )
-                example_message = translate_text(
-                    "Please ensure the document is in the correct format and try uploading again.",
-                    user_language,
-                )
+                ],
+                user_message,
+            )
+            return {
+                "response": general_assistant_response.content.strip(),
+                "question": f"Let's try agin {question}",
+            }
+    return NOT_HANDLED
 
-                return {
-                    "response": (f"{general_assistant_response.content.strip()} \n\n"),
-                    "example": example_message,
-                    "question": retry_question,
-                }
-        elif question == "Please Upload Your Driving license":
-            try:
-                document_data = json.loads(user_message)
-                responses["driving license Name in the License"] = document_data.get(
-                    "name"
-                )
-                responses["Date of Birth (DOB) in the License"] = document_data.get(
-                    "date_of_birth"
-                )
-                responses["License No in the License"] = document_data.get("license_no")
-                responses["Nationality in the License"] = document_data.get(
-                    "nationality"
-                )
-                responses["Issue Date in the License"] = document_data.get("issue_date")
-                responses["Expiry Date in the License"] = document_data.get(
-                    "expiry_date"
-                )
-                responses["Place Of Issue in the License"] = document_data.get(
-                    "place_of_issue"
-                )
 
-                print(user_message)
-                if isinstance(document_data, dict):
-                    responses[question] = document_data
-                    print(document_data)
-                    conversation_state["current_question_index"] += 1
+async def _answer_bike_make(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    if is_current_question(conversation_state, questions, question):
+        # Prompt LLM for additional validation
+        check_prompt = (
+            f"The user has responded with: '{user_message}'. Determine if this is a valid bike make name. "
+            "Respond only with 'Yes' or 'No'."
+        )
+        llm_response = await llm.ainvoke([
+            SystemMessage(
+                content="You are Insura, an AI assistant specialized in insurance-related tasks. "
+                "Your task is to act as a bike maker agency. You can handle lots of bike makes, so your job is to check if the given name is a bike maker."
+            ),
+            HumanMessage(content=check_prompt),
+        ])
+        is_valid_bike_make = llm_response.content.strip().lower() == "yes"
 
-                    # Check if there are more questions
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        if "options" in next_question:
-                            options = next_question["options"]
-                            next_question_text = next_question["question"]
-                            response_message = f"Thank you for uploading the document. Now, let's move on to: {next_question_text}"
-                            # Detect document type from next question
-                            msg_type, doc_type = detect_document_type_from_question(
-                                next_question_text
-                            )
-                            return format_response_in_language(
-                                response_message,
-                                options,
-                                user_language,
-                                msg_type,
-                                doc_type,
-                            )
-                        else:
-                            next_question_text = (
-                                next_question["question"]
-                                if isinstance(next_question, dict)
-                                else next_question
-                            )
-                            response_message = f"Thank you for uploading the document. Now, let's move on to: {next_question_text}"
-                            # Detect document type from next question
-                            msg_type, doc_type = detect_document_type_from_question(
-                                next_question_text
-                            )
-                            return format_response_in_language(
-                                response_message, [], user_language, msg_type, doc_type
-                            )
-                    else:
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                            del user_states[user_id]
-                        final_message = "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask."
-                        result = format_response_in_language(
-                            final_message, [], user_language
-                        )
-                        result["final_responses"] = responses
-                        return result
-                else:
-                    raise ValueError("Please Upload Again")
-            except json.JSONDecodeError:
-                # Handle invalid JSON input
-                general_assistant_prompt = f"user response: {user_message}. Please assist them in {user_language}."
-                general_assistant_response = llm.invoke([
-                    SystemMessage(
-                        content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-                    ),
-                    HumanMessage(content=general_assistant_prompt),
-                ])
-                retry_question = translate_text(
-                    f"Let's try again: {question}", user_language
-                )
-                example_message = translate_text(
-                    "Please ensure that the document is in JPEG format.", user_language
-                )
+        if is_valid_bike_make:
+            # Store the name
+            responses[question] = user_message
+            conversation_state["current_question_index"] += 1
 
+            if conversation_state["current_question_index"] < len(questions):
+                next_question = questions[conversation_state["current_question_index"]]
                 return {
-                    "response": (f"{general_assistant_response.content.strip()} \n\n"),
-                    "example": example_message,
-                    "question": retry_question,
+                    "response": f"Thank you for providing the bike make. Now, let's move on to: {next_question}"
+                }
+            else:
+                # All questions completed
+                record_completion(responses)
+                return {
+                    "response": "Thank you for using Insura. Your request has been processed. Have a great day!",
+                    "final_responses": responses,
                 }
-            except ValueError as e:
-                general_assistant_prompt = f"user response: {user_message}. Please assist them in {user_language}."
-                general_assistant_response = llm.invoke([
+        else:
+            # Use general assistant for invalid LLM validation
+            general_assistant_prompt = (
+                f"The user entered '{user_message}', which was not validated as a bike make by Insura. "
+                "Please assist them in correcting their input."
+            )
+            general_assistant_response = await cached_reply(
+                llm,
+                [
                     SystemMessage(
-                        content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                        content="You are Insura, an AI assistant created by CloudSubset. "
+                        "Your role is to assist users with their inquiries and guide them appropriately."
                     ),
                     HumanMessage(content=general_assistant_prompt),
-                ])
-                retry_question = translate_text(
-                    f"Let's try again: {question}", user_language
-                )
-                example_message = translate_text(
-                    "Please ensure the document is in the correct format and try uploading again.",
-                    user_language,
-                )
+                ],
+                user_message,
+            )
+            return {
+                "response": general_assistant_response.content.strip(),
+                "question": f"Let's try agin {question}",
+            }
+    return NOT_HANDLED
 
-                return {
-                    "response": (f"{general_assistant_response.content.strip()} \n\n"),
-                    "example": example_message,
-                    "question": retry_question,
-                }
 
-        elif question == "Please Upload Mulkiya":
-            try:
-                document_data = json.loads(user_message)
-                responses["Owner in the Vehicle Mulkiya"] = document_data.get("owner")
-                responses["Place of Issues in the Vehicle License"] = document_data.get(
-                    "place_of_issue"
-                )
-                responses["Traffic Plate No in the Vehicle License"] = (
-                    document_data.get("traffic_plate_no")
-                )
-                responses["T.C.NO in the Vehicle Mulkiya"] = document_data.get(
-                    "nationality"
-                )
-                responses["Nationality in the Vehicle Mulkiya"] = document_data.get(
-                    "nationality"
-                )
-                responses["Expiry Date in the Vehicle Mulkiya"] = document_data.get(
-                    "expiry_date"
-                )
-                responses["Registertion Date in the Vehicle Mulkiya"] = (
-                    document_data.get("reg_date")
-                )
-                responses["Issues Date in the Vehicle Mulkiya"] = document_data.get(
-                    "ins_exp"
-                )
-                responses["Policy No in the Vehicle Mulkiya"] = document_data.get(
-                    "policy_no"
-                )
-                responses["Model in the Vehicle Mulkiya"] = document_data.get(
-                    "model_no"
-                )
-                responses["Origin in the Vehicle Mulkiya"] = document_data.get("origin")
-                responses["Vehicle Type in the Vehicle Mulkiya"] = document_data.get(
-                    "vehicle_type"
-                )
-                responses["Num of pass in the Vehicle Mulkiya"] = document_data.get(
-                    "number_of_pass"
-                )
-                responses["G V M in the Vehicle Mulkiya"] = document_data.get("gvw")
-                responses["Empty Weight in the Vehicle Mulkiya"] = document_data.get(
-                    "empty_weight"
-                )
-                responses["Engine Number in the Vehicle Mulkiya"] = document_data.get(
-                    "engine_no"
-                )
-                responses["Chassis Number in the Vehicle Mulkiya"] = document_data.get(
-                    "chassis_no"
-                )
+async def _answer_car_model(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    if is_current_question(conversation_state, questions, question):
+        # Prompt LLM for additional validation
+        check_prompt = (
+            f"The user has responded with: '{user_message}'. Determine if this is a valid car model number. "
+            "Respond only with 'Yes' or 'No'."
+        )
+        llm_response = await llm.ainvoke([
+            SystemMessage(
+                content="You are Insura, an AI assistant specialized in insurance-related tasks. "
+                "Your task is to act as a car maker agency. You can handle lots of car models, so your job is to check if the given name is a car model."
+            ),
+            HumanMessage(content=check_prompt),
+        ])
+        is_valid_car_model = llm_response.content.strip().lower() == "yes"
 
-                print(user_message)
-                if isinstance(document_data, dict):
-                    responses[question] = document_data
-                    print(document_data)
-                    conversation_state["current_question_index"] += 1
+        if is_valid_car_model:
+            # Store the model number
+            responses[question] = user_message
+            conversation_state["current_question_index"] += 1
 
-                    # Check if there are more questions
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        if "options" in next_question:
-                            options = next_question["options"]
-                            next_question_text = next_question["question"]
-                            response_message = f"Thank you for uploading the document. Now, let's move on to: {next_question_text}"
-                            # Detect document type from next question
-                            msg_type, doc_type = detect_document_type_from_question(
-                                next_question_text
-                            )
-                            return format_response_in_language(
-                                response_message,
-                                options,
-                                user_language,
-                                msg_type,
-                                doc_type,
-                            )
-                        else:
-                            next_question_text = (
-                                next_question["question"]
-                                if isinstance(next_question, dict)
-                                else next_question
-                            )
-                            response_message = f"Thank you for uploading the document. Now, let's move on to: {next_question_text}"
-                            # Detect document type from next question
-                            msg_type, doc_type = detect_document_type_from_question(
-                                next_question_text
-                            )
-                            return format_response_in_language(
-                                response_message, [], user_language, msg_type, doc_type
-                            )
-                    else:
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                            del user_states[user_id]
-                        final_message = "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask."
-                        result = format_response_in_language(
-                            final_message, [], user_language
-                        )
-                        result["final_responses"] = responses
-                        return result
-                else:
-                    raise ValueError("Please Upload Again")
-            except json.JSONDecodeError:
-                # Handle invalid JSON input
-                general_assistant_prompt = f"user response: {user_message}. Please assist them in {user_language}."
-                general_assistant_response = llm.invoke([
+            if conversation_state["current_question_index"] < len(questions):
+                next_question = questions[conversation_state["current_question_index"]]
+                return {
+                    "response": f"Thank you for providing the car model number. Now, let's move on to: {next_question}"
+                }
+            else:
+                # All questions completed
+                record_completion(responses)
+                return {
+                    "response": "Thank you for using Insura. Your request has been processed. Have a great day!",
+                    "final_responses": responses,
+                }
+        else:
+            # Use general assistant for invalid LLM validation
+            general_assistant_prompt = (
+                f"The user entered '{user_message}', which was not validated as a car model number by Insura. "
+                "Please assist them in correcting their input."
+            )
+            general_assistant_response = await cached_reply(
+                llm,
+                [
                     SystemMessage(
-                        content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                        content="You are Insura, an AI assistant created by CloudSubset. "
+                        "Your role is to assist users with their inquiries and guide them appropriately."
                     ),
                     HumanMessage(content=general_assistant_prompt),
-                ])
-                retry_question = translate_text(
-                    f"Let's try again: {question}", user_language
-                )
-                example_message = translate_text(
-                    "Please ensure that the document is in JPEG format.", user_language
-                )
+                ],
+                user_message,
+            )
+            return {
+                "response": general_assistant_response.content.strip(),
+                "question": f"Let's try again: {question}",
+            }
+    return NOT_HANDLED
+
+
+async def _answer_bike_model(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    if is_current_question(conversation_state, questions, question):
+        # Prompt LLM for additional validation
+        check_prompt = (
+            f"The user has responded with: '{user_message}'. Determine if this is a valid bike model number. "
+            "Respond only with 'Yes' or 'No'."
+        )
+        llm_response = await llm.ainvoke([
+            SystemMessage(
+                content="You are Insura, an AI assistant specialized in insurance-related tasks. "
+                "Your task is to act as a bike maker agency. You can handle lots of car models, so your job is to check if the given name is a bike model."
+            ),
+            HumanMessage(content=check_prompt),
+        ])
+        is_valid_bike_model = llm_response.content.strip().lower() == "yes"
+
+        if is_valid_bike_model:
+            # Store the model number
+            responses[question] = user_message
+            conversation_state["current_question_index"] += 1
 
+            if conversation_state["current_question_index"] < len(questions):
+                next_question = questions[conversation_state["current_question_index"]]
+                return {
+                    "response": f"Thank you for providing the bike model number. Now, let's move on to: {next_question}"
+                }
+            else:
+                # All questions completed
+                record_completion(responses)
                 return {
-                    "response": (f"{general_assistant_response.content.strip()} \n\n"),
-                    "example": example_message,
-                    "question": retry_question,
+                    "response": "Thank you for using Insura. Your request has been processed. Have a great day!",
+                    "final_responses": responses,
                 }
-            except ValueError as e:
-                general_assistant_prompt = f"user response: {user_message}. Please assist them in {user_language}."
-                general_assistant_response = llm.invoke([
+        else:
+            # Use general assistant for invalid LLM validation
+            general_assistant_prompt = (
+                f"The user entered '{user_message}', which was not validated as a bike model number by Insura. "
+                "Please assist them in correcting their input."
+            )
+            general_assistant_response = await cached_reply(
+                llm,
+                [
                     SystemMessage(
-                        content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                        content="You are Insura, an AI assistant created by CloudSubset. "
+                        "Your role is to assist users with their inquiries and guide them appropriately."
                     ),
                     HumanMessage(content=general_assistant_prompt),
-                ])
-                retry_question = translate_text(
-                    f"Let's try again: {question}", user_language
-                )
-                example_message = translate_text(
-                    "Please ensure the document is in the correct format and try uploading again.",
-                    user_language,
-                )
-
-                return {
-                    "response": (f"{general_assistant_response.content.strip()} \n\n"),
-                    "example": example_message,
-                    "question": retry_question,
-                }
-
-        elif question in ["Please confirm this gender of"]:
-            # Use multilingual validation for gender selection
-            valid_options = ["Male", "Female"]
-            return handle_option_validation_multilingual(
+                ],
                 user_message,
-                valid_options,
-                question,
-                user_language,
-                conversation_state,
-                questions,
-                responses,
-                user_id,
             )
+            return {
+                "response": general_assistant_response.content.strip(),
+                "question": f"Let's try again: {question}",
+            }
+    return NOT_HANDLED
 
-        elif (
-            question
-            == "Next, we need the details of the member. Would you like to upload their Emirates ID or manually enter the information?"
-        ):
-            # Use the Emirates ID upload handler with multilingual support
-            return handle_emirate_upload_document(
-                user_message,
-                conversation_state,
-                questions,
-                responses,
-                question,
-                user_language,
-            )
-        elif (
-            question
-            == "Next, we need the details of the car owner. Would you like to upload their Emirates ID or manually enter the information?"
-        ):
-            # Use multilingual validation for Yes/No questions
-            valid_options = ["Yes", "No"]
-            return handle_emirate_upload_document_car_insurance(
-                user_message,
-                conversation_state,
-                questions,
-                responses,
-                question,
-                user_language,
-            )
 
-        elif question == "You Wish to Buy":
-            valid_options = ["Comprehensive (Full Cover)", "Third Party"]
+async def _answer_car_variant(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    if is_current_question(conversation_state, questions, question):
+        # Prompt LLM for additional validation
+        check_prompt = (
+            f"The user has responded with: '{user_message}'. Determine if this is a valid car variant. "
+            "Respond only with 'Yes' or 'No'."
+        )
+        llm_response = await llm.ainvoke([
+            SystemMessage(
+                content="You are Insura, an AI assistant specialized in insurance-related tasks. "
+                "Your task is to act as a car maker agency. You can handle lots of car variants, so your job is to check if the given name is a car variant."
+            ),
+            HumanMessage(content=check_prompt),
+        ])
+        is_valid_car_variant = llm_response.content.strip().lower() == "yes"
 
-            # Use multilingual validation
-            validation_result = validate_response_multilingual(
-                user_message, valid_options, user_language
-            )
+        if is_valid_car_variant:
+            # Store the variant
+            responses[question] = user_message
+            conversation_state["current_question_index"] += 1
 
-            if validation_result["is_valid"]:
-                # Store the English version of the response
-                english_value = validation_result["matched_value"]
-                responses[question] = english_value
-                conversation_state["current_question_index"] += 1
+            if conversation_state["current_question_index"] < len(questions):
+                next_question = questions[conversation_state["current_question_index"]]
+                return {
+                    "response": f"Thank you for providing the car variant. Now, let's move on to: {next_question}"
+                }
+            else:
+                # All questions completed
+                record_completion(responses)
+                return {
+                    "response": "Thank you for using Insura. Your request has been processed. Have a great day!",
+                    "final_responses": responses,
+                }
+        else:
+            # Use general assistant for invalid LLM validation
+            general_assistant_prompt = (
+                f"The user entered '{user_message}', which was not validated as a car variant by Insura. "
+                "Please assist them in correcting their input."
+            )
+            general_assistant_response = await cached_reply(
+                llm,
+                [
+                    SystemMessage(
+                        content="You are Insura, an AI assistant created by CloudSubset. "
+                        "Your role is to assist users with their inquiries and guide them appropriately."
+                    ),
+                    HumanMessage(content=general_assistant_prompt),
+                ],
+                user_message,
+            )
+            return {
+                "response": general_assistant_response.content.strip(),
+                "question": f"Let's try again: {question}",
+            }
+    return NOT_HANDLED
 
-                if conversation_state["current_question_index"] < len(questions):
-                    next_question = questions[
-                        conversation_state["current_question_index"]
-                    ]
-                    if "options" in next_question:
-                        next_questions_text = next_question["question"]
-                        next_options = next_question["options"]
-                        response_message = (
-                            f"Thank you! Now, let's move on to: {next_questions_text}"
-                        )
 
-                        # Format in user's language
-                        return format_response_in_language(
-                            response_message, next_options, user_language
-                        )
-                    else:
-                        next_question_text = (
-                            next_question
-                            if isinstance(next_question, str)
-                            else next_question.get("question", "")
-                        )
-                        response_message = (
-                            f"Thank you. Now, let's move on to: {next_question_text}"
-                        )
-                        return format_response_in_language(
-                            response_message, [], user_language
-                        )
-                else:
-                    with open("user_responses.json", "w") as file:
-                        json.dump(responses, file, indent=4)
-                    del user_states[user_id]
+async def _answer_bike_variant(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    if is_current_question(conversation_state, questions, question):
+        # Prompt LLM for additional validation
+        check_prompt = (
+            f"The user has responded with: '{user_message}'. Determine if this is a valid bike variant. "
+            "Respond only with 'Yes' or 'No'."
+        )
+        llm_response = await llm.ainvoke([
+            SystemMessage(
+                content="You are Insura, an AI assistant specialized in insurance-related tasks. "
+                "Your task is to act as a bike maker agency. You can handle lots of bike variants, so your job is to check if the given name is a bike variant."
+            ),
+            HumanMessage(content=check_prompt),
+        ])
+        is_valid_bike_variant = llm_response.content.strip().lower() == "yes"
 
-                    final_message = "Thank you for sharing the details. We will inform Shafeeque Shanavas from Wehbe Insurance to assist you further with your enquiry. Please wait for further assistance. If you have any questions, please contact support@insuranceclub.ae."
+        if is_valid_bike_variant:
+            # Store the variant
+            responses[question] = user_message
+            conversation_state["current_question_index"] += 1
 
-                    result = format_response_in_language(
-                        final_message, [], user_language
-                    )
-                    result["final_responses"] = responses
-                    return result
+            if conversation_state["current_question_index"] < len(questions):
+                next_question = questions[conversation_state["current_question_index"]]
+                return {
+                    "response": f"Thank you for providing the bike variant. Now, let's move on to: {next_question}"
+                }
             else:
-                # Handle invalid responses or unrelated queries
-                general_assistant_prompt = (
-                    f"user response: {user_message}. Please assist in a helpful manner. "
-                    f"Explain that they need to choose from: {', '.join(valid_options)}"
-                )
-                general_assistant_response = llm.invoke([
+                # All questions completed
+                record_completion(responses)
+                return {
+                    "response": "Thank you for using Insura. Your request has been processed. Have a great day!",
+                    "final_responses": responses,
+                }
+        else:
+            # Use general assistant for invalid LLM validation
+            general_assistant_prompt = (
+                f"The user entered '{user_message}', which was not validated as a bike variant by Insura. "
+                "Please assist them in correcting their input."
+            )
+            general_assistant_response = await cached_reply(
+                llm,
+                [
                     SystemMessage(
-                        content=f"You are Insura, a friendly insurance assistant. Respond in {user_language}. "
-                        "Help the user understand they need to select a valid option."
+                        content="You are Insura, an AI assistant created by CloudSubset. "
+                        "Your role is to assist users with their inquiries and guide them appropriately."
                     ),
                     HumanMessage(content=general_assistant_prompt),
-                ])
+                ],
+                user_message,
+            )
+            return {
+                "response": general_assistant_response.content.strip(),
+                "question": f"Let's try again: {question}",
+            }
+    return NOT_HANDLED
+
+
+async def _answer_sponsor_mobile_number(
+    question,
+    user_message,
+    user_language,
+    conversation_state,
+    questions,
+    responses,
+    options,
+    **_,
+):
+    is_mobile_number = is_valid_mobile_number(user_message)
+
+    if is_mobile_number:
+        # Store the mobile number
+        responses[question] = user_message
+        conversation_state["current_question_index"] += 1
 
-                error_message = general_assistant_response.content.strip()
-                retry_question = translate_text(
-                    f"Let's try again: {question}\nPlease choose from the following options: {', '.join(valid_options)}",
-                    user_language,
-                )
+        # Check if there are more questions
+        if conversation_state["current_question_index"] < len(questions):
+            next_question = questions[conversation_state["current_question_index"]]
+
+            # Get the next question text
+            next_question_text = (
+                next_question["question"]
+                if isinstance(next_question, dict)
+                else next_question
+            )
+
+            # Translate response to user's language
+            response_msg = await translate_text(
+                f"Thank you for providing the mobile number! 📱 Now, let's move on to: {next_question_text}",
+                user_language,
+            )
 
+            # Handle options if they exist
+            if isinstance(next_question, dict) and "options" in next_question:
+                translated_options = await translate_batch(
+                    next_question["options"], user_language
+                )
                 return {
-                    "response": error_message,
-                    "question": retry_question,
+                    "response": response_msg,
+                    "options": ", ".join(translated_options),
+                    "language": user_language,
+                    "language_code": get_language_code(user_language),
                 }
 
-        elif question == "Let me know the make of the car":
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Prompt LLM for additional validation
-                check_prompt = (
-                    f"The user has responded with: '{user_message}'. Determine if this is a valid car make name. "
-                    "Respond only with 'Yes' or 'No'."
-                )
-                llm_response = llm.invoke([
-                    SystemMessage(
-                        content="You are Insura, an AI assistant specialized in insurance-related tasks. "
-                        "Your task is to act as a car maker agency. You can handle lots of car makes, so your job is to check if the given name is a car maker."
-                    ),
-                    HumanMessage(content=check_prompt),
-                ])
-                is_valid_car_make = llm_response.content.strip().lower() == "yes"
+            return {
+                "response": response_msg,
+                "language": user_language,
+                "language_code": get_language_code(user_language),
+            }
+        else:
+            record_completion(responses)
 
-                if is_valid_car_make:
-                    # Store the name
-                    responses[question] = user_message
-                    conversation_state["current_question_index"] += 1
+            completion_msg = await translate_text(
+                "You're all set! 🎉 Thank you for providing your details. If you need further assistance, feel free to ask.",
+                user_language,
+            )
+            return {
+                "response": completion_msg,
+                "final_responses": responses,
+                "language": user_language,
+                "language_code": get_language_code(user_language),
+            }
+    else:
+        general_assistant_prompt = (
+            f"The user entered '{user_message}'. Please assist them in {user_language}."
+        )
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
+        next_question = questions[conversation_state["current_question_index"]]
+        if isinstance(next_question, dict) and "options" in next_question:
+            next_question_text = next_question["question"]
+            translated_options = await translate_batch(
+                next_question["options"], user_language
+            )
+            retry_msg = await translate_text(
+                f"Let's Move Back: {next_question_text}", user_language
+            )
+            return {
+                "response": f"{general_assistant_response.content.strip()}",
+                "question": retry_msg,
+                "options": options,
+            }
 
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        return {
-                            "response": f"Thank you for providing the car make. Now, let's move on to: {next_question}"
-                        }
-                    else:
-                        # All questions completed
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                        return {
-                            "response": "Thank you for using Insura. Your request has been processed. Have a great day!",
-                            "final_responses": responses,
-                        }
-                else:
-                    # Use general assistant for invalid LLM validation
-                    general_assistant_prompt = (
-                        f"The user entered '{user_message}', which was not validated as a car make by Insura. "
-                        "Please assist them in correcting their input."
-                    )
-                    general_assistant_response = llm.invoke([
-                        SystemMessage(
-                            content="You are Insura, an AI assistant created by CloudSubset. "
-                            "Your role is to assist users with their inquiries and guide them appropriately."
-                        ),
-                        HumanMessage(content=general_assistant_prompt),
-                    ])
-                    return {
-                        "response": general_assistant_response.content.strip(),
-                        "question": f"Let's try agin {question}",
-                    }
+        else:
+            return {
+                "response": f"{general_assistant_response.content.strip()}",
+                "question": f"Let's Move Back {question}",
+            }
 
-        elif (
-            question
-            == "Now, let's gather some details about your bike. Let me know the make of the bike."
-        ):
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Prompt LLM for additional validation
-                check_prompt = (
-                    f"The user has responded with: '{user_message}'. Determine if this is a valid bike make name. "
-                    "Respond only with 'Yes' or 'No'."
-                )
-                llm_response = llm.invoke([
-                    SystemMessage(
-                        content="You are Insura, an AI assistant specialized in insurance-related tasks. "
-                        "Your task is to act as a bike maker agency. You can handle lots of bike makes, so your job is to check if the given name is a bike maker."
-                    ),
-                    HumanMessage(content=check_prompt),
-                ])
-                is_valid_bike_make = llm_response.content.strip().lower() == "yes"
 
-                if is_valid_bike_make:
-                    # Store the name
-                    responses[question] = user_message
-                    conversation_state["current_question_index"] += 1
+async def _answer_client_name(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    return handle_client_name_question(
+        question,
+        user_message,
+        conversation_state,
+        questions,
+        responses,
+        is_valid_name,
+    )
 
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        return {
-                            "response": f"Thank you for providing the bike make. Now, let's move on to: {next_question}"
-                        }
-                    else:
-                        # All questions completed
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                        return {
-                            "response": "Thank you for using Insura. Your request has been processed. Have a great day!",
-                            "final_responses": responses,
-                        }
-                else:
-                    # Use general assistant for invalid LLM validation
-                    general_assistant_prompt = (
-                        f"The user entered '{user_message}', which was not validated as a bike make by Insura. "
-                        "Please assist them in correcting their input."
-                    )
-                    general_assistant_response = llm.invoke([
-                        SystemMessage(
-                            content="You are Insura, an AI assistant created by CloudSubset. "
-                            "Your role is to assist users with their inquiries and guide them appropriately."
-                        ),
-                        HumanMessage(content=general_assistant_prompt),
-                    ])
-                    return {
-                        "response": general_assistant_response.content.strip(),
-                        "question": f"Let's try agin {question}",
-                    }
 
-        elif question == "May I know the model number of your car, please?":
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Prompt LLM for additional validation
-                check_prompt = (
-                    f"The user has responded with: '{user_message}'. Determine if this is a valid car model number. "
-                    "Respond only with 'Yes' or 'No'."
-                )
-                llm_response = llm.invoke([
-                    SystemMessage(
-                        content="You are Insura, an AI assistant specialized in insurance-related tasks. "
-                        "Your task is to act as a car maker agency. You can handle lots of car models, so your job is to check if the given name is a car model."
-                    ),
-                    HumanMessage(content=check_prompt),
-                ])
-                is_valid_car_model = llm_response.content.strip().lower() == "yes"
+async def _answer_client_mobile_number(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    is_mobile_number = is_valid_mobile_number(user_message)
 
-                if is_valid_car_model:
-                    # Store the model number
-                    responses[question] = user_message
-                    conversation_state["current_question_index"] += 1
+    if is_mobile_number:
+        # Store the mobile number
+        responses[question] = user_message
+        conversation_state["current_question_index"] += 1
 
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        return {
-                            "response": f"Thank you for providing the car model number. Now, let's move on to: {next_question}"
-                        }
-                    else:
-                        # All questions completed
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                        return {
-                            "response": "Thank you for using Insura. Your request has been processed. Have a great day!",
-                            "final_responses": responses,
-                        }
-                else:
-                    # Use general assistant for invalid LLM validation
-                    general_assistant_prompt = (
-                        f"The user entered '{user_message}', which was not validated as a car model number by Insura. "
-                        "Please assist them in correcting their input."
-                    )
-                    general_assistant_response = llm.invoke([
-                        SystemMessage(
-                            content="You are Insura, an AI assistant created by CloudSubset. "
-                            "Your role is to assist users with their inquiries and guide them appropriately."
-                        ),
-                        HumanMessage(content=general_assistant_prompt),
-                    ])
-                    return {
-                        "response": general_assistant_response.content.strip(),
-                        "question": f"Let's try again: {question}",
-                    }
+        # Check if there are more questions
+        if conversation_state["current_question_index"] < len(questions):
+            next_question = questions[conversation_state["current_question_index"]]
+            return {
+                "response": f"Thank you for providing the mobile number. Now, let's move on to: {next_question}"
+            }
+        else:
+            record_completion(responses)
+            return {
+                "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
+                "final_responses": responses,
+            }
+    else:
+        general_assistant_prompt = (
+            f"The user entered '{user_message}', . Please assist."
+        )
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+        )
+        next_question = questions[conversation_state["current_question_index"]]
+        if "options" in next_question:
+            next_question = next_question["question"]
+            options = ", ".join(next_question["options"])
+            return {
+                "response": f"{general_assistant_response.content.strip()}",
+                "question": f"Let's Move Back {next_question}",
+                "options": options,
+            }
 
-        elif question == "Could you please tell me the model number of your bike":
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Prompt LLM for additional validation
-                check_prompt = (
-                    f"The user has responded with: '{user_message}'. Determine if this is a valid bike model number. "
-                    "Respond only with 'Yes' or 'No'."
-                )
-                llm_response = llm.invoke([
-                    SystemMessage(
-                        content="You are Insura, an AI assistant specialized in insurance-related tasks. "
-                        "Your task is to act as a bike maker agency. You can handle lots of car models, so your job is to check if the given name is a bike model."
-                    ),
-                    HumanMessage(content=check_prompt),
-                ])
-                is_valid_bike_model = llm_response.content.strip().lower() == "yes"
+        else:
+            return {
+                "response": f"{general_assistant_response.content.strip()}",
+                "question": f"Let's Move Back {question}",
+            }
 
-                if is_valid_bike_model:
-                    # Store the model number
-                    responses[question] = user_message
-                    conversation_state["current_question_index"] += 1
 
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        return {
-                            "response": f"Thank you for providing the bike model number. Now, let's move on to: {next_question}"
-                        }
-                    else:
-                        # All questions completed
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                        return {
-                            "response": "Thank you for using Insura. Your request has been processed. Have a great day!",
-                            "final_responses": responses,
-                        }
-                else:
-                    # Use general assistant for invalid LLM validation
-                    general_assistant_prompt = (
-                        f"The user entered '{user_message}', which was not validated as a bike model number by Insura. "
-                        "Please assist them in correcting their input."
-                    )
-                    general_assistant_response = llm.invoke([
-                        SystemMessage(
-                            content="You are Insura, an AI assistant created by CloudSubset. "
-                            "Your role is to assist users with their inquiries and guide them appropriately."
-                        ),
-                        HumanMessage(content=general_assistant_prompt),
-                    ])
-                    return {
-                        "response": general_assistant_response.content.strip(),
-                        "question": f"Let's try again: {question}",
-                    }
+async def _answer_main_menu(
+    question, user_message, user_language, conversation_state, questions, responses, **_
+):
+    return await handle_what_would_you_do_today_question(
+        user_message,
+        conversation_state,
+        questions,
+        responses,
+        question,
+        user_language,
+    )
 
-        elif question == "May I know the variant of your car, please?":
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Prompt LLM for additional validation
-                check_prompt = (
-                    f"The user has responded with: '{user_message}'. Determine if this is a valid car variant. "
-                    "Respond only with 'Yes' or 'No'."
-                )
-                llm_response = llm.invoke([
-                    SystemMessage(
-                        content="You are Insura, an AI assistant specialized in insurance-related tasks. "
-                        "Your task is to act as a car maker agency. You can handle lots of car variants, so your job is to check if the given name is a car variant."
-                    ),
-                    HumanMessage(content=check_prompt),
-                ])
-                is_valid_car_variant = llm_response.content.strip().lower() == "yes"
 
-                if is_valid_car_variant:
-                    # Store the variant
-                    responses[question] = user_message
-                    conversation_state["current_question_index"] += 1
+async def _answer_medical_plan_choice(
+    question, user_message, user_language, conversation_state, questions, responses, **_
+):
+    return await handle_individual_sma_choice(
+        user_message,
+        conversation_state,
+        questions,
+        responses,
+        question,
+        user_language,
+    )
 
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        return {
-                            "response": f"Thank you for providing the car variant. Now, let's move on to: {next_question}"
-                        }
-                    else:
-                        # All questions completed
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                        return {
-                            "response": "Thank you for using Insura. Your request has been processed. Have a great day!",
-                            "final_responses": responses,
-                        }
-                else:
-                    # Use general assistant for invalid LLM validation
-                    general_assistant_prompt = (
-                        f"The user entered '{user_message}', which was not validated as a car variant by Insura. "
-                        "Please assist them in correcting their input."
-                    )
-                    general_assistant_response = llm.invoke([
-                        SystemMessage(
-                            content="You are Insura, an AI assistant created by CloudSubset. "
-                            "Your role is to assist users with their inquiries and guide them appropriately."
-                        ),
-                        HumanMessage(content=general_assistant_prompt),
-                    ])
-                    return {
-                        "response": general_assistant_response.content.strip(),
-                        "question": f"Let's try again: {question}",
-                    }
 
-        elif question == "Could you please tell me the Variant of your bike":
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Prompt LLM for additional validation
-                check_prompt = (
-                    f"The user has responded with: '{user_message}'. Determine if this is a valid bike variant. "
-                    "Respond only with 'Yes' or 'No'."
-                )
-                llm_response = llm.invoke([
-                    SystemMessage(
-                        content="You are Insura, an AI assistant specialized in insurance-related tasks. "
-                        "Your task is to act as a bike maker agency. You can handle lots of bike variants, so your job is to check if the given name is a bike variant."
-                    ),
-                    HumanMessage(content=check_prompt),
-                ])
-                is_valid_bike_variant = llm_response.content.strip().lower() == "yes"
+async def _answer_member_marital_status(
+    question,
+    user_message,
+    user_language,
+    user_id,
+    conversation_state,
+    questions,
+    responses,
+    **_,
+):
+    # Use multilingual validation for marital status
+    valid_options = ["Single", "Married"]
+    return await handle_option_validation_multilingual(
+        user_message,
+        valid_options,
+        question,
+        user_language,
+        conversation_state,
+        questions,
+        responses,
+        user_id,
+    )
 
-                if is_valid_bike_variant:
-                    # Store the variant
-                    responses[question] = user_message
-                    conversation_state["current_question_index"] += 1
 
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        return {
-                            "response": f"Thank you for providing the bike variant. Now, let's move on to: {next_question}"
-                        }
-                    else:
-                        # All questions completed
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                        return {
-                            "response": "Thank you for using Insura. Your request has been processed. Have a great day!",
-                            "final_responses": responses,
-                        }
-                else:
-                    # Use general assistant for invalid LLM validation
-                    general_assistant_prompt = (
-                        f"The user entered '{user_message}', which was not validated as a bike variant by Insura. "
-                        "Please assist them in correcting their input."
-                    )
-                    general_assistant_response = llm.invoke([
-                        SystemMessage(
-                            content="You are Insura, an AI assistant created by CloudSubset. "
-                            "Your role is to assist users with their inquiries and guide them appropriately."
-                        ),
-                        HumanMessage(content=general_assistant_prompt),
-                    ])
-                    return {
-                        "response": general_assistant_response.content.strip(),
-                        "question": f"Let's try again: {question}",
-                    }
+async def _answer_sponsor_marital_status(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    valid_options = ["Single", "Married"]
+    if user_message in valid_options:
+        responses[question] = user_message
+        conversation_state["current_question_index"] += 1
+
+        if conversation_state["current_question_index"] < len(questions):
+            next_question = questions[conversation_state["current_question_index"]]
+            if "options" in next_question:
+                options = ", ".join(next_question["options"])
+                next_questions = next_question["question"]
+                return {
+                    "response": f"Thank you for your response. Now, let's move on to: {next_questions}",
+                    "options": options,
+                }
+            return {
+                "response": f"Thank you for your response. Now, let's move on to: {next_question}"
+            }
+        else:
+            record_completion(responses)
+            return {
+                "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
+                "final_responses": responses,
+            }
+    else:
+        # Handle invalid responses or unrelated queries
+        general_assistant_prompt = f"user response: {user_message}. Please assist."
+        general_assistant_response = await cached_reply(
+            llm, [HumanMessage(content=general_assistant_prompt)], user_message
+        )
+        return {
+            "response": f"{general_assistant_response.content.strip()}",
+            "question": f"Let's try again: {question}\nPlease choose from the following options: {', '.join(valid_options)}",
+        }
+
 
-        elif question == "May I have the sponsor's mobile number, please?":
-            is_mobile_number = is_valid_mobile_number(user_message)
+async def _answer_height(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    if is_current_question(conversation_state, questions, question):
+        # Validate user input using regex (only numerical values)
+        if not re.match(r"^\d+$", user_message):
+            height_assistant_prompt = (
+                f"The user entered '{user_message}', which does not appear to be a valid height in cm. "
+                "Please assist them in providing a valid height."
+            )
+            height_assistant_response = await llm.ainvoke([
+                SystemMessage(
+                    content="You are Insura, an AI assistant created by CloudSubset. "
+                    "Your role is to assist users with their inquiries and guide them appropriately."
+                ),
+                HumanMessage(content=height_assistant_prompt),
+            ])
+            return {
+                "response": f"{height_assistant_response.content.strip()}",
+                "question": f" Let's try again: {question}",
+            }
 
-            if is_mobile_number:
-                # Store the mobile number
+        # Convert the height to an integer and check for a valid range
+        try:
+            height = int(user_message)
+            if 50 <= height <= 300:  # Assuming a realistic height range in cm
+                # Store the height
                 responses[question] = user_message
                 conversation_state["current_question_index"] += 1
 
-                # Check if there are more questions
                 if conversation_state["current_question_index"] < len(questions):
                     next_question = questions[
                         conversation_state["current_question_index"]
                     ]
-
-                    # Get the next question text
-                    next_question_text = (
-                        next_question["question"]
-                        if isinstance(next_question, dict)
-                        else next_question
-                    )
-
-                    # Translate response to user's language
-                    response_msg = translate_text(
-                        f"Thank you for providing the mobile number! 📱 Now, let's move on to: {next_question_text}",
-                        user_language,
-                    )
-
-                    # Handle options if they exist
-                    if isinstance(next_question, dict) and "options" in next_question:
-                        translated_options = [
-                            translate_text(opt, user_language)
-                            for opt in next_question["options"]
-                        ]
-                        return {
-                            "response": response_msg,
-                            "options": ", ".join(translated_options),
-                            "language": user_language,
-                            "language_code": get_language_code(user_language),
-                        }
-
                     return {
-                        "response": response_msg,
-                        "language": user_language,
-                        "language_code": get_language_code(user_language),
+                        "response": f"Thank you for providing your height. Now, let's move on to: {next_question}"
                     }
                 else:
-                    with open("user_responses.json", "w") as file:
-                        json.dump(responses, file, indent=4)
-
-                    completion_msg = translate_text(
-                        "You're all set! 🎉 Thank you for providing your details. If you need further assistance, feel free to ask.",
-                        user_language,
-                    )
+                    # All questions completed
+                    record_completion(responses)
                     return {
-                        "response": completion_msg,
+                        "response": "Thank you for using Insura. Your request has been processed. Have a great day!",
                         "final_responses": responses,
-                        "language": user_language,
-                        "language_code": get_language_code(user_language),
                     }
             else:
-                general_assistant_prompt = f"The user entered '{user_message}'. Please assist them in {user_language}."
-                general_assistant_response = llm.invoke([
+                return {
+                    "response": "The height you entered seems unrealistic. Please enter your height in cm (e.g., 170).",
+                    "question": f" Let's try again: {question}",
+                }
+        except ValueError:
+            general_assistant_prompt = (
+                f"The user entered '{user_message}', which is not a valid numerical value for height. "
+                "Please assist them in providing a valid height in cm."
+            )
+            general_assistant_response = await cached_reply(
+                llm,
+                [
                     SystemMessage(
-                        content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                        content="You are Insura, an AI assistant created by CloudSubset. "
+                        "Your role is to assist users with their inquiries and guide them appropriately."
                     ),
                     HumanMessage(content=general_assistant_prompt),
-                ])
-                next_question = questions[conversation_state["current_question_index"]]
-                if isinstance(next_question, dict) and "options" in next_question:
-                    next_question_text = next_question["question"]
-                    translated_options = [
-                        translate_text(opt, user_language)
-                        for opt in next_question["options"]
-                    ]
-                    retry_msg = translate_text(
-                        f"Let's Move Back: {next_question_text}", user_language
-                    )
-                    return {
-                        "response": f"{general_assistant_response.content.strip()}",
-                        "question": retry_msg,
-                        "options": options,
-                    }
-
-                else:
-                    return {
-                        "response": f"{general_assistant_response.content.strip()}",
-                        "question": f"Let's Move Back {question}",
-                    }
-
-        elif question == "May I have the Client Name, please?":
-            return handle_client_name_question(
-                question,
+                ],
                 user_message,
-                conversation_state,
-                questions,
-                responses,
-                is_valid_name,
             )
+            return {
+                "response": f"{general_assistant_response.content.strip()}",
+                "question": f" Let's try again: {question}",
+            }
+    return NOT_HANDLED
+
+
+async def _answer_weight(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    if is_current_question(conversation_state, questions, question):
+        # Validate user input using regex (only numerical values)
+        if not re.match(r"^\d+$", user_message):
+            weight_assistant_prompt = (
+                f"The user entered '{user_message}', which does not appear to be a valid weight in kg. "
+                "Please assist them in providing a valid weight."
+            )
+            weight_assistant_response = await llm.ainvoke([
+                SystemMessage(
+                    content="You are Insura, an AI assistant created by CloudSubset. "
+                    "Your role is to assist users with their inquiries and guide them appropriately."
+                ),
+                HumanMessage(content=weight_assistant_prompt),
+            ])
+            return {
+                "response": f"{weight_assistant_response.content.strip()}",
+                "question": f" Let's try again: {question}",
+            }
 
-        elif question == "May I have the Client mobile number, please?":
-            is_mobile_number = is_valid_mobile_number(user_message)
-
-            if is_mobile_number:
-                # Store the mobile number
+        # Convert the weight to an integer and check for a valid range
+        try:
+            weight = int(user_message)
+            if 20 <= weight <= 300:  # Assuming a realistic weight range in kg
+                # Store the weight
                 responses[question] = user_message
                 conversation_state["current_question_index"] += 1
 
-                # Check if there are more questions
                 if conversation_state["current_question_index"] < len(questions):
                     next_question = questions[
                         conversation_state["current_question_index"]
                     ]
-                    return {
-                        "response": f"Thank you for providing the mobile number. Now, let's move on to: {next_question}"
-                    }
+                    if "options" in next_question:
+                        options = ", ".join(next_question["options"])
+                        next_questions = next_question["question"]
+                        return {
+                            "response": f"Thank you! Now, let's move on to: {next_questions}",
+                            "options": options,
+                        }
+                    else:
+                        return {
+                            "response": f"Thank you for providing your weight. Now, let's move on to: {next_question}"
+                        }
                 else:
-                    with open("user_responses.json", "w") as file:
-                        json.dump(responses, file, indent=4)
+                    # All questions completed
+                    record_completion(responses)
                     return {
-                        "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
+                        "response": "Thank you for using Insura. Your request has been processed. Have a great day!",
                         "final_responses": responses,
                     }
             else:
-                general_assistant_prompt = (
-                    f"The user entered '{user_message}', . Please assist."
-                )
-                general_assistant_response = llm.invoke([
+                return {
+                    "response": "The weight you entered seems unrealistic. Please enter your weight in kg (e.g., 70).",
+                    "question": f" Let's try again: {question}",
+                }
+        except ValueError:
+            general_assistant_prompt = (
+                f"The user entered '{user_message}', which is not a valid numerical value for weight. "
+                "Please assist them in providing a valid weight in kg."
+            )
+            general_assistant_response = await cached_reply(
+                llm,
+                [
                     SystemMessage(
-                        content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                        content="You are Insura, an AI assistant created by CloudSubset. "
+                        "Your role is to assist users with their inquiries and guide them appropriately."
                     ),
                     HumanMessage(content=general_assistant_prompt),
-                ])
-                next_question = questions[conversation_state["current_question_index"]]
-                if "options" in next_question:
-                    next_question = next_question["question"]
-                    options = ", ".join(next_question["options"])
-                    return {
-                        "response": f"{general_assistant_response.content.strip()}",
-                        "question": f"Let's Move Back {next_question}",
-                        "options": options,
-                    }
+                ],
+                user_message,
+            )
+            return {
+                "response": f"{general_assistant_response.content.strip()}",
+                "question": f" Let's try again: {question}",
+            }
+    return NOT_HANDLED
 
-                else:
-                    return {
-                        "response": f"{general_assistant_response.content.strip()}",
-                        "question": f"Let's Move Back {question}",
-                    }
 
-        elif question == "What would you like to do today?":
-            return handle_what_would_you_do_today_question(
+async def _answer_insurance_expiry_year(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    # Store the user-provided year
+    if user_message.isdigit() and len(user_message) == 4:  # Ensure valid year format
+        responses[question] = user_message
+        conversation_state["current_question_index"] += 1
+
+        # Check if there are more questions to ask
+        if conversation_state["current_question_index"] < len(questions):
+            next_question = questions[conversation_state["current_question_index"]]
+            options = ", ".join(next_question["options"])
+            return {
+                "response": f"Thank you! Now, let's move on to: {next_question['question']}",
+                "options": options,
+            }
+        else:
+            # All questions have been answered
+            record_completion(responses)
+            return {
+                "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!.",
+                "final_responses": responses,
+            }
+    else:
+        # Redirect to general assistant for help
+        general_assistant_prompt = f"User response: {user_message}. Please assist."
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content="You are Insura, a friendly Insurances assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+        )
+        return {
+            "response": f"{general_assistant_response.content.strip()}",
+            "question": f"Let's Move back to {question}",
+        }
+
+
+async def _answer_sponsor_company(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    if is_current_question(conversation_state, questions, question):
+        # Check if the input is a company name using LLM
+        check_prompt = f"This is the company name: '{user_message}'. Please check if that name could be a company name and respond with 'Yes' or 'No'"
+        llm_response = await llm.ainvoke([
+            SystemMessage(
+                content="You are a friendly assistant working in Isuran's company department. Your primary task is to verify the user provided input could be a company name. The input might include examples such as 'Fallout Private Limited' or 'Fallout Technologies'. Your role is to validate and identify whether the given input is a valid company name "
+            ),
+            HumanMessage(content=check_prompt),
+        ])
+        is_company_name = llm_response.content.strip().lower() == "yes"
+
+        if is_company_name:
+            # Store the company name
+            responses[question] = user_message
+            conversation_state["current_question_index"] += 1
+
+            # Check if there are more questions
+            if conversation_state["current_question_index"] < len(questions):
+                next_question = questions[conversation_state["current_question_index"]]
+                return {
+                    "response": f"Thank you for providing the company name. Now, let's move on to: {next_question}"
+                }
+            else:
+                record_completion(responses)
+                return {
+                    "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
+                    "final_responses": responses,
+                }
+        else:
+            # Handle invalid or unrelated input
+            general_assistant_prompt = f"User response: {user_message}. Please assist."
+            general_assistant_response = await cached_reply(
+                llm,
+                [
+                    SystemMessage(
+                        content="You are Insura, a friendly AI assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                    ),
+                    HumanMessage(content=general_assistant_prompt),
+                ],
                 user_message,
-                conversation_state,
-                questions,
-                responses,
-                question,
-                user_language,
             )
+            return {
+                "response": f"{general_assistant_response.content.strip()}",
+                "question": f"Let's move back to: {question}",
+            }
+    return NOT_HANDLED
+
+
+async def _answer_current_insurer(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    if is_current_question(conversation_state, questions, question):
+        # Check if the input is a company name using LLM
+        check_prompt = f"This is the company name: '{user_message}'. Please check if that name could be a company name and respond with 'Yes' or 'No'"
+        llm_response = await llm.ainvoke([
+            SystemMessage(
+                content="You are a friendly assistant working in Isuran's company department. Your primary task is to verify the user provided input could be a company name. The input might include examples such as 'Fallout Private Limited' or 'Fallout Technologies'. Your role is to validate and identify whether the given input is a valid company name "
+            ),
+            HumanMessage(content=check_prompt),
+        ])
+        is_company_name = llm_response.content.strip().lower() == "yes"
 
-        elif question == "Please choose which one would you like to":
-            return handle_individual_sma_choice(
+        if is_company_name:
+            # Store the company name
+            responses[question] = user_message
+            conversation_state["current_question_index"] += 1
+
+            # Check if there are more questions
+            if conversation_state["current_question_index"] < len(questions):
+                next_question = questions[conversation_state["current_question_index"]]
+                return {
+                    "response": f"Thank you for providing the company name. Now, let's move on to: {next_question}"
+                }
+            else:
+                record_completion(responses)
+                return {
+                    "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
+                    "final_responses": responses,
+                }
+        else:
+            # Handle invalid or unrelated input
+            general_assistant_prompt = f"User response: {user_message}. Please assist."
+            general_assistant_response = await cached_reply(
+                llm,
+                [
+                    SystemMessage(
+                        content="You are Insura, a friendly AI assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                    ),
+                    HumanMessage(content=general_assistant_prompt),
+                ],
                 user_message,
-                conversation_state,
-                questions,
-                responses,
-                question,
-                user_language,
+            )
+            return {
+                "response": f"{general_assistant_response.content.strip()}",
+                "question": f"Let's move back to: {question}",
+            }
+    return NOT_HANDLED
+
+
+async def _answer_covid_vaccination(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    valid_options = ["Yes", "No"]
+    if user_message in valid_options:
+        responses[question] = user_message  # Store the response
+
+        if user_message == "Yes":
+            # Dynamically add follow-up questions for dose dates
+            first_dose_question = "Can you please tell me the date of your first dose?"
+            second_dose_question = (
+                "Can you please tell me the date of your second dose?"
             )
 
-        elif question == "Please Confirm the marital status of":
-            # Use multilingual validation for marital status
-            valid_options = ["Single", "Married"]
-            return handle_option_validation_multilingual(
-                user_message,
-                valid_options,
-                question,
-                user_language,
-                conversation_state,
-                questions,
-                responses,
-                user_id,
+            # Insert follow-up questions into the list if not already present
+            if first_dose_question not in questions:
+                responses[first_dose_question] = None
+                questions.insert(
+                    conversation_state["current_question_index"] + 1,
+                    first_dose_question,
+                )
+
+            if second_dose_question not in questions:
+                responses[second_dose_question] = None
+                questions.insert(
+                    conversation_state["current_question_index"] + 2,
+                    second_dose_question,
+                )
+
+            # Move to the next question
+            conversation_state["current_question_index"] += 1
+            next_question = questions[conversation_state["current_question_index"]]
+            return {"response": f"Thank you! Now, let's move on to: {next_question}"}
+        elif user_message == "No":
+            # Remove the questions about first and second doses if they exist
+            first_dose_question = "Can you please tell me the date of your first dose?"
+            second_dose_question = (
+                "Can you please tell me the date of your second dose?"
+            )
+
+            if first_dose_question in questions:
+                questions.remove(first_dose_question)
+            if second_dose_question in questions:
+                questions.remove(second_dose_question)
+
+            # Proceed to the next predefined question
+            conversation_state["current_question_index"] += 1
+            if conversation_state["current_question_index"] < len(questions):
+                next_question = questions[conversation_state["current_question_index"]]
+                options = ", ".join(next_question["options"])
+                next_questions = next_question["question"]
+
+                return {
+                    "response": f"Thank you for your response. Now, let's move on to: {next_questions}",
+                    "options": options,
+                }
+            else:
+                # All predefined questions have been answered
+                record_completion(responses)
+                return {
+                    "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
+                    "final_responses": responses,
+                }
+    return NOT_HANDLED
+
+
+async def _answer_first_dose_date(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    # Validate and store the first dose date
+    if valid_date_format(user_message):  # Replace with your date validation function
+        responses[question] = user_message
+        conversation_state["current_question_index"] += 1
+
+        # Check if there are more questions to ask
+        if conversation_state["current_question_index"] < len(questions):
+            next_question = questions[conversation_state["current_question_index"]]
+            return {"response": f"Thank you! Now, let's move on to: {next_question}"}
+        else:
+            # All questions have been answered
+            record_completion(responses)
+            return {
+                "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
+                "final_responses": responses,
+            }
+    else:
+        return {
+            "response": "Invalid date format. Please provide the date in the format DD/MM/YYYY or MM-DD-YYYY."
+        }
+
+
+async def _answer_second_dose_date(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    # Validate and store the second dose date
+    if valid_date_format(user_message):  # Replace with your date validation function
+        responses[question] = user_message
+        conversation_state["current_question_index"] += 1
+
+        # Check if there are more questions to ask
+        if conversation_state["current_question_index"] < len(questions):
+            next_question = questions[conversation_state["current_question_index"]]
+            options = ", ".join(next_question["options"])
+            return {
+                "response": f"Thank you! Now, let's move on to: {next_question['question']}",
+                "options": options,
+            }
+        else:
+            # All questions have been answered
+            record_completion(responses)
+            return {
+                "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
+                "final_responses": responses,
+            }
+    else:
+        return {
+            "response": "Invalid date format. Please provide the date in the format DD/MM/YYYY or MM-DD-YYYY."
+        }
+
+
+async def _answer_policy_renewal(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    valid_options = ["Yes", "No"]
+    if user_message in valid_options:
+        responses[question] = user_message  # Store the response
+
+        if user_message == "Yes":
+            # Proceed to the next predefined question
+            conversation_state["current_question_index"] += 1
+            if conversation_state["current_question_index"] < len(questions):
+                next_question = questions[conversation_state["current_question_index"]]
+                return {
+                    "response": f"Thank you! Now, let's move on to: {next_question}"
+                }
+            else:
+                # All predefined questions have been answered
+                record_completion(responses)
+                return {
+                    "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
+                    "final_responses": responses,
+                }
+
+        elif user_message == "No":
+            # Update the responses and return the final response
+            record_completion(responses)
+            return {
+                "response": "Thank you for your response. Your request has been updated accordingly. If you need further assistance, feel free to ask.",
+                "final_responses": responses,
+            }
+    else:
+        return {"response": "Invalid response. Please answer with 'Yes' or 'No'."}
+    return NOT_HANDLED
+
+
+async def _answer_person_name(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    return await handle_validate_name(
+        question,
+        user_message,
+        conversation_state,
+        questions,
+        responses,
+        is_valid_name,
+    )
+
+
+async def _answer_member_name(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    responses[question] = user_message
+    conversation_state["current_question_index"] += 1
+
+    if conversation_state["current_question_index"] < len(questions):
+        next_question = questions[conversation_state["current_question_index"]]
+        if "options" in next_question:
+            options = ", ".join(next_question["options"])
+            next_questions = next_question["question"]
+            member_name = responses.get[
+                "Next, we need the details of the member for whom the policy is being purchased. Please provide Name"
+            ]
+            return {
+                "response": f"Thank you,May I know the {next_question} of {member_name}.Please ensure it is in the format DD/MM/YYYY.",
+                "options": options,
+            }
+        else:
+            member_name = responses.get(
+                "Next, we need the details of the member for whom the policy is being purchased. Please provide Name"
             )
 
-        elif question == "May I know sponsor's marital status?":
-            valid_options = ["Single", "Married"]
-            if user_message in valid_options:
+            return {
+                "response": f"Thank you,May I know the {next_question} of {member_name}.Please ensure it is in the format DD/MM/YYYY."
+            }
+    else:
+        record_completion(responses)
+        return {
+            "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
+            "final_responses": responses,
+        }
+
+    # if is_current_question(conversation_state, questions, question):
+    #     # Prompt LLM to check if the input is a valid person name
+    #     check_prompt = f"The user has responded with: '{user_message}'. Is this a valid person's name? Respond with 'Yes' or 'No'."
+    #     llm_response = llm.invoke([
+    #         SystemMessage(content="You are Insura, an AI assistant specialized in insurance-related tasks. Your task is to determine if the input provided by the user is a valid person's name.Make sure it a valide name for a person"),
+    #         HumanMessage(content=check_prompt)
+    #     ])
+    #     is_person_name = llm_response.content.strip().lower() == "yes"
+
+    #     if is_person_name:
+    #         # Store the person's name
+    #         responses[question] = user_message
+    #         conversation_state["current_question_index"] += 1
+
+    #         # Check if there are more questions
+    #         if conversation_state["current_question_index"] < len(questions):
+    #             next_question = questions[conversation_state["current_question_index"]]
+    #             return {
+    #                 "response": f"Thank you for providing the sponsor's name. Now, let's move on to: {next_question}"
+    #             }
+    #         else:
+    #             # If all questions are completed, save responses and end conversation
+    #             with open("user_responses.json", "w") as file:
+    #                 json.dump(responses, file, indent=4)
+    #             return {
+    #                 "response": "Thank you for using Insura. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
+    #                 "final_responses": responses
+    #             }
+    #     else:
+    #         # Handle invalid or unrelated input
+    #         general_assistant_prompt = f"The user entered '{user_message}', which does not appear to be a person's name. Please assist."
+    #         general_assistant_response = llm.invoke([
+    #             SystemMessage(content="You are Insura, an AI assistant created by CloudSubset. Your role is to assist users with their inquiries. Your task here is to redirect or assist the user appropriately."),
+    #             HumanMessage(content=general_assistant_prompt)
+    #         ])
+    #         return {
+    #             "response": f"{general_assistant_response.content.strip()}",
+    #             "question": f"Let's move back to: {question}"
+    #         }
+
+
+async def _answer_driving_experience(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    valid_options = ["0-1 year", "1-2 years", "2+ years"]
+    if user_message in valid_options:
+        responses[question] = user_message
+        conversation_state["current_question_index"] += 1
+
+        # Check if there are more questions
+        if conversation_state["current_question_index"] < len(questions):
+            next_question = questions[conversation_state["current_question_index"]]
+            return {
+                "response": f"Thank you for your response. Now, let's move on to: {next_question}"
+            }
+        else:
+            record_completion(responses)
+            return {
+                "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
+                "final_responses": responses,
+            }
+    else:
+        # Handle invalid responses or unrelated queries
+        general_assistant_prompt = f"user response: {user_message}. Please assist."
+        general_assistant_response = await cached_reply(
+            llm, [HumanMessage(content=general_assistant_prompt)], user_message
+        )
+        return {
+            "response": f"{general_assistant_response.content.strip()}",
+            "question": f"Let's try again: {question}\nPlease choose from the following options: {', '.join(valid_options)}",
+        }
+
+
+async def _answer_car_manufacture_year(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    if is_current_question(conversation_state, questions, question):
+        # Check if the input is a valid year
+        try:
+            year = int(user_message)
+            current_year = datetime.now().year
+            if 1886 <= year <= current_year:  # Cars were invented in 1886
+                # Valid year
                 responses[question] = user_message
                 conversation_state["current_question_index"] += 1
 
+                # Check if there are more questions
                 if conversation_state["current_question_index"] < len(questions):
                     next_question = questions[
                         conversation_state["current_question_index"]
                     ]
-                    if "options" in next_question:
-                        options = ", ".join(next_question["options"])
-                        next_questions = next_question["question"]
-                        return {
-                            "response": f"Thank you for your response. Now, let's move on to: {next_questions}",
-                            "options": options,
-                        }
+
                     return {
-                        "response": f"Thank you for your response. Now, let's move on to: {next_question}"
+                        "response": f"Thank you for providing the year. Now, let's move on to: {next_question}",
                     }
                 else:
-                    with open("user_responses.json", "w") as file:
-                        json.dump(responses, file, indent=4)
+                    # Save responses and end the conversation
+                    record_completion(responses)
                     return {
-                        "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
+                        "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
                         "final_responses": responses,
                     }
             else:
-                # Handle invalid responses or unrelated queries
-                general_assistant_prompt = (
-                    f"user response: {user_message}. Please assist."
-                )
-                general_assistant_response = llm.invoke([
-                    HumanMessage(content=general_assistant_prompt)
-                ])
-                return {
-                    "response": f"{general_assistant_response.content.strip()}",
-                    "question": f"Let's try again: {question}\nPlease choose from the following options: {', '.join(valid_options)}",
-                }
-
-        elif question == "Tell me you Height in Cm":
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Validate user input using regex (only numerical values)
-                if not re.match(r"^\d+$", user_message):
-                    height_assistant_prompt = (
-                        f"The user entered '{user_message}', which does not appear to be a valid height in cm. "
-                        "Please assist them in providing a valid height."
-                    )
-                    height_assistant_response = llm.invoke([
-                        SystemMessage(
-                            content="You are Insura, an AI assistant created by CloudSubset. "
-                            "Your role is to assist users with their inquiries and guide them appropriately."
-                        ),
-                        HumanMessage(content=height_assistant_prompt),
-                    ])
-                    return {
-                        "response": f"{height_assistant_response.content.strip()}",
-                        "question": f" Let's try again: {question}",
-                    }
-
-                # Convert the height to an integer and check for a valid range
-                try:
-                    height = int(user_message)
-                    if 50 <= height <= 300:  # Assuming a realistic height range in cm
-                        # Store the height
-                        responses[question] = user_message
-                        conversation_state["current_question_index"] += 1
-
-                        if conversation_state["current_question_index"] < len(
-                            questions
-                        ):
-                            next_question = questions[
-                                conversation_state["current_question_index"]
-                            ]
-                            return {
-                                "response": f"Thank you for providing your height. Now, let's move on to: {next_question}"
-                            }
-                        else:
-                            # All questions completed
-                            with open("user_responses.json", "w") as file:
-                                json.dump(responses, file, indent=4)
-                            return {
-                                "response": "Thank you for using Insura. Your request has been processed. Have a great day!",
-                                "final_responses": responses,
-                            }
-                    else:
-                        return {
-                            "response": "The height you entered seems unrealistic. Please enter your height in cm (e.g., 170).",
-                            "question": f" Let's try again: {question}",
-                        }
-                except ValueError:
-                    general_assistant_prompt = (
-                        f"The user entered '{user_message}', which is not a valid numerical value for height. "
-                        "Please assist them in providing a valid height in cm."
-                    )
-                    general_assistant_response = llm.invoke([
-                        SystemMessage(
-                            content="You are Insura, an AI assistant created by CloudSubset. "
-                            "Your role is to assist users with their inquiries and guide them appropriately."
-                        ),
-                        HumanMessage(content=general_assistant_prompt),
-                    ])
-                    return {
-                        "response": f"{general_assistant_response.content.strip()}",
-                        "question": f" Let's try again: {question}",
-                    }
-
-        elif question == "Tell me you Weight in Kg":
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Validate user input using regex (only numerical values)
-                if not re.match(r"^\d+$", user_message):
-                    weight_assistant_prompt = (
-                        f"The user entered '{user_message}', which does not appear to be a valid weight in kg. "
-                        "Please assist them in providing a valid weight."
-                    )
-                    weight_assistant_response = llm.invoke([
-                        SystemMessage(
-                            content="You are Insura, an AI assistant created by CloudSubset. "
-                            "Your role is to assist users with their inquiries and guide them appropriately."
-                        ),
-                        HumanMessage(content=weight_assistant_prompt),
-                    ])
-                    return {
-                        "response": f"{weight_assistant_response.content.strip()}",
-                        "question": f" Let's try again: {question}",
-                    }
-
-                # Convert the weight to an integer and check for a valid range
-                try:
-                    weight = int(user_message)
-                    if 20 <= weight <= 300:  # Assuming a realistic weight range in kg
-                        # Store the weight
-                        responses[question] = user_message
-                        conversation_state["current_question_index"] += 1
-
-                        if conversation_state["current_question_index"] < len(
-                            questions
-                        ):
-                            next_question = questions[
-                                conversation_state["current_question_index"]
-                            ]
-                            if "options" in next_question:
-                                options = ", ".join(next_question["options"])
-                                next_questions = next_question["question"]
-                                return {
-                                    "response": f"Thank you! Now, let's move on to: {next_questions}",
-                                    "options": options,
-                                }
-                            else:
-                                return {
-                                    "response": f"Thank you for providing your weight. Now, let's move on to: {next_question}"
-                                }
-                        else:
-                            # All questions completed
-                            with open("user_responses.json", "w") as file:
-                                json.dump(responses, file, indent=4)
-                            return {
-                                "response": "Thank you for using Insura. Your request has been processed. Have a great day!",
-                                "final_responses": responses,
-                            }
-                    else:
-                        return {
-                            "response": "The weight you entered seems unrealistic. Please enter your weight in kg (e.g., 70).",
-                            "question": f" Let's try again: {question}",
-                        }
-                except ValueError:
-                    general_assistant_prompt = (
-                        f"The user entered '{user_message}', which is not a valid numerical value for weight. "
-                        "Please assist them in providing a valid weight in kg."
-                    )
-                    general_assistant_response = llm.invoke([
-                        SystemMessage(
-                            content="You are Insura, an AI assistant created by CloudSubset. "
-                            "Your role is to assist users with their inquiries and guide them appropriately."
-                        ),
-                        HumanMessage(content=general_assistant_prompt),
-                    ])
-                    return {
-                        "response": f"{general_assistant_response.content.strip()}",
-                        "question": f" Let's try again: {question}",
-                    }
-
-        elif question == "Can you please tell me the year your insurance expired?":
-            # Store the user-provided year
-            if (
-                user_message.isdigit() and len(user_message) == 4
-            ):  # Ensure valid year format
+                # Year is out of range
+                raise ValueError("Invalid year range")
+        except ValueError:
+            # Handle invalid or unrelated input
+            general_assistant_prompt = f"The user entered '{user_message}' when asked for the year their car was made. Please assist."
+            general_assistant_response = await cached_reply(
+                llm,
+                [
+                    SystemMessage(
+                        content="You are Insura, a friendly AI assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                    ),
+                    HumanMessage(content=general_assistant_prompt),
+                ],
+                user_message,
+            )
+            return {
+                "response": f"{general_assistant_response.content.strip()}",
+                "question": f"Let's revisit: {question}",
+            }
+    return NOT_HANDLED
+
+
+async def _answer_car_registration_year(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    if is_current_question(conversation_state, questions, question):
+        # Check if the input is a valid year
+        try:
+            year = int(user_message)
+            current_year = datetime.now().year
+            if 1886 <= year <= current_year:  # Cars were invented in 1886
+                # Valid year
                 responses[question] = user_message
                 conversation_state["current_question_index"] += 1
 
-                # Check if there are more questions to ask
+                # Check if there are more questions
                 if conversation_state["current_question_index"] < len(questions):
                     next_question = questions[
                         conversation_state["current_question_index"]
                     ]
-                    options = ", ".join(next_question["options"])
+
                     return {
-                        "response": f"Thank you! Now, let's move on to: {next_question['question']}",
-                        "options": options,
+                        "response": f"Thank you for providing the year. Now, let's move on to: {next_question}",
                     }
                 else:
-                    # All questions have been answered
-                    with open("user_responses.json", "w") as file:
-                        json.dump(responses, file, indent=4)
+                    # Save responses and end the conversation
+                    record_completion(responses)
                     return {
-                        "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!.",
+                        "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
                         "final_responses": responses,
                     }
             else:
-                # Redirect to general assistant for help
-                general_assistant_prompt = (
-                    f"User response: {user_message}. Please assist."
-                )
-                general_assistant_response = llm.invoke([
+                # Year is out of range
+                raise ValueError("Invalid year range")
+        except ValueError:
+            # Handle invalid or unrelated input
+            general_assistant_prompt = f"The user entered '{user_message}' when asked for the year their car was made. Please assist."
+            general_assistant_response = await cached_reply(
+                llm,
+                [
                     SystemMessage(
-                        content="You are Insura, a friendly Insurances assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                        content="You are Insura, a friendly AI assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
                     ),
                     HumanMessage(content=general_assistant_prompt),
-                ])
+                ],
+                user_message,
+            )
+            return {
+                "response": f"{general_assistant_response.content.strip()}",
+                "question": f"Let's revisit: {question}",
+            }
+    return NOT_HANDLED
+
+
+async def _answer_no_claim_certificate(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    valid_options = ["No", "1 Year", "2 Years", "3+ Years"]
+    if user_message in valid_options:
+        responses[question] = user_message
+        conversation_state["current_question_index"] += 1
+
+        # Check if there are more questions
+        if conversation_state["current_question_index"] < len(questions):
+            next_question = questions[conversation_state["current_question_index"]]
+            return {
+                "response": f"Thank you for your response. Now, let's move on to: {next_question}"
+            }
+        else:
+            record_completion(responses)
+            return {
+                "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
+                "final_responses": responses,
+            }
+    else:
+        # Handle invalid responses or unrelated queries
+        general_assistant_prompt = f"user response: {user_message}. Please assist."
+        general_assistant_response = await cached_reply(
+            llm, [HumanMessage(content=general_assistant_prompt)], user_message
+        )
+        return {
+            "response": f"{general_assistant_response.content.strip()}",
+            "question": f"Let's try again: {question}\nPlease choose from the following options: {', '.join(valid_options)}",
+        }
+
+
+async def _answer_sponsor_emirates_id(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    # Validate sponsor Emirates ID
+    if valid_emirates_id(user_message):
+        responses[question] = user_message
+        conversation_state["current_question_index"] += 1
+
+        # Move to the next question or finalize responses
+        if conversation_state["current_question_index"] < len(questions):
+            next_question = questions[conversation_state["current_question_index"]]
+
+            return {"response": f"Thank you! Now, let's move on to: {next_question}"}
+        else:
+            # All questions answered
+            try:
+                record_completion(responses)
+                return {
+                    "response": "Thank you for using Insura. Your responses have been recorded. "
+                    "Feel free to ask any other questions. Have a great day!",
+                    "final_responses": responses,
+                }
+            except Exception as e:
                 return {
-                    "response": f"{general_assistant_response.content.strip()}",
-                    "question": f"Let's Move back to {question}",
+                    "response": f"An error occurred while saving your responses: {str(e)}"
                 }
+    else:
+        # Handle invalid Emirates ID or unrelated query
+        general_assistant_prompt = f"user response: {user_message}. Please assist."
+        general_assistant_response = await cached_reply(
+            llm, [HumanMessage(content=general_assistant_prompt)], user_message
+        )
 
-        elif question == "What company does the sponsor work for?":
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Check if the input is a company name using LLM
-                check_prompt = f"This is the company name: '{user_message}'. Please check if that name could be a company name and respond with 'Yes' or 'No'"
-                llm_response = llm.invoke([
-                    SystemMessage(
-                        content="You are a friendly assistant working in Isuran's company department. Your primary task is to verify the user provided input could be a company name. The input might include examples such as 'Fallout Private Limited' or 'Fallout Technologies'. Your role is to validate and identify whether the given input is a valid company name "
-                    ),
-                    HumanMessage(content=check_prompt),
-                ])
-                is_company_name = llm_response.content.strip().lower() == "yes"
+        # Example of a valid Emirates ID
+        emirates_id_example = "784-1990-1234567-0"
 
-                if is_company_name:
-                    # Store the company name
-                    responses[question] = user_message
-                    conversation_state["current_question_index"] += 1
+        return {
+            "response": (f"{general_assistant_response.content.strip()} \n\n"),
+            "example": f"Here's an example of a valid Emirates ID for your reference: {emirates_id_example}.",
+            "question": f"Let's try again: {question}",
+        }
 
-                    # Check if there are more questions
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        return {
-                            "response": f"Thank you for providing the company name. Now, let's move on to: {next_question}"
-                        }
-                    else:
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                        return {
-                            "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
-                            "final_responses": responses,
-                        }
-                else:
-                    # Handle invalid or unrelated input
-                    general_assistant_prompt = (
-                        f"User response: {user_message}. Please assist."
-                    )
-                    general_assistant_response = llm.invoke([
-                        SystemMessage(
-                            content="You are Insura, a friendly AI assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-                        ),
-                        HumanMessage(content=general_assistant_prompt),
-                    ])
-                    return {
-                        "response": f"{general_assistant_response.content.strip()}",
-                        "question": f"Let's move back to: {question}",
-                    }
-        elif question == "Which insurance company is your current policy with?":
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Check if the input is a company name using LLM
-                check_prompt = f"This is the company name: '{user_message}'. Please check if that name could be a company name and respond with 'Yes' or 'No'"
-                llm_response = llm.invoke([
-                    SystemMessage(
-                        content="You are a friendly assistant working in Isuran's company department. Your primary task is to verify the user provided input could be a company name. The input might include examples such as 'Fallout Private Limited' or 'Fallout Technologies'. Your role is to validate and identify whether the given input is a valid company name "
-                    ),
-                    HumanMessage(content=check_prompt),
-                ])
-                is_company_name = llm_response.content.strip().lower() == "yes"
 
-                if is_company_name:
-                    # Store the company name
-                    responses[question] = user_message
-                    conversation_state["current_question_index"] += 1
+async def _answer_vehicle_test_certificate(
+    question, user_message, user_language, conversation_state, questions, responses, **_
+):
+    return await handle_yes_or_no(
+        user_message,
+        conversation_state,
+        questions,
+        responses,
+        question,
+        user_language,
+    )
 
-                    # Check if there are more questions
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        return {
-                            "response": f"Thank you for providing the company name. Now, let's move on to: {next_question}"
-                        }
-                    else:
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                        return {
-                            "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
-                            "final_responses": responses,
-                        }
-                else:
-                    # Handle invalid or unrelated input
-                    general_assistant_prompt = (
-                        f"User response: {user_message}. Please assist."
-                    )
-                    general_assistant_response = llm.invoke([
-                        SystemMessage(
-                            content="You are Insura, a friendly AI assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-                        ),
-                        HumanMessage(content=general_assistant_prompt),
-                    ])
-                    return {
-                        "response": f"{general_assistant_response.content.strip()}",
-                        "question": f"Let's move back to: {question}",
-                    }
 
-        elif question == "Have you been vaccinated for Covid-19?":
-            valid_options = ["Yes", "No"]
-            if user_message in valid_options:
-                responses[question] = user_message  # Store the response
+async def _answer_comprehensive_cover(
+    question, user_message, user_language, conversation_state, questions, responses, **_
+):
+    return await handle_yes_or_no(
+        user_message,
+        conversation_state,
+        questions,
+        responses,
+        question,
+        user_language,
+    )
 
-                if user_message == "Yes":
-                    # Dynamically add follow-up questions for dose dates
-                    first_dose_question = (
-                        "Can you please tell me the date of your first dose?"
-                    )
-                    second_dose_question = (
-                        "Can you please tell me the date of your second dose?"
-                    )
 
-                    # Insert follow-up questions into the list if not already present
-                    if first_dose_question not in questions:
-                        responses[first_dose_question] = None
-                        questions.insert(
-                            conversation_state["current_question_index"] + 1,
-                            first_dose_question,
-                        )
+async def _answer_agency_repair(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    valid_options = ["Yes", "No"]
+    if user_message in valid_options:
+        responses[question] = user_message
+        conversation_state["current_question_index"] += 1
+
+        # Check if there are more questions
+        if conversation_state["current_question_index"] < len(questions):
+            next_question = questions[conversation_state["current_question_index"]]
+            options = ", ".join(next_question["options"])
+            next_questions = next_question["question"]
+
+            return {
+                "response": f"Thank you for your response. Now, let's move on to: {next_questions}",
+                "options": options,
+            }
+
+        else:
+            record_completion(responses)
+            return {
+                "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
+                "final_responses": responses,
+            }
+    else:
+        # Handle invalid responses or unrelated queries
+        general_assistant_prompt = f"user response: {user_message}. Please assist."
+        general_assistant_response = await cached_reply(
+            llm, [HumanMessage(content=general_assistant_prompt)], user_message
+        )
+        return {
+            "response": f"{general_assistant_response.content.strip()}",
+            "question": f"Let's try again: {question}\nPlease choose from the following options: {', '.join(valid_options)}",
+        }
+
+
+async def _answer_advisor_code_entry(
+    question,
+    user_message,
+    user_language,
+    user_id,
+    conversation_state,
+    questions,
+    responses,
+    **_,
+):
+    if valid_adivisor_code(user_message):
+        responses[question] = user_message
+        conversation_state["current_question_index"] += 1
+
+        # Move to the next question or finalize responsess
+        if conversation_state["current_question_index"] < len(questions):
+            next_question = questions[conversation_state["current_question_index"]]
+            response_message = f"Thank you! Now, let's move on to: {next_question}"
+            return await format_response_in_language(
+                response_message, [], user_language
+            )
+        else:
+            try:
+                if responses.get("Do you have an Insurance Advisor code?") == "Yes":
+                    medical_detail_response = await fetching_medical_detail(responses)
+                    print(medical_detail_response)
+                    del user_states[user_id]
+                    if isinstance(medical_detail_response, int):
+                        # Translate the success response to user's language
+                        success_message = "Thank you for sharing the details. We will inform Shafeeque Shanavas from Wehbe Insurance to assist you further with your enquiry. Please find the link below to view your quotation:"
+                        review_message = "If you are satisfied with Wehbe(Broker) services, please leave a review for sharing happiness to others!!😊"
 
-                    if second_dose_question not in questions:
-                        responses[second_dose_question] = None
-                        questions.insert(
-                            conversation_state["current_question_index"] + 2,
-                            second_dose_question,
+                        translated_success = await translate_text(
+                            success_message, user_language
+                        )
+                        translated_review = await translate_text(
+                            review_message, user_language
                         )
 
-                    # Move to the next question
-                    conversation_state["current_question_index"] += 1
-                    next_question = questions[
-                        conversation_state["current_question_index"]
-                    ]
-                    return {
-                        "response": f"Thank you! Now, let's move on to: {next_question}"
-                    }
-                elif user_message == "No":
-                    # Remove the questions about first and second doses if they exist
-                    first_dose_question = (
-                        "Can you please tell me the date of your first dose?"
-                    )
-                    second_dose_question = (
-                        "Can you please tell me the date of your second dose?"
-                    )
+                        # Build the customer plan link using the medical detail response ID
+                        customer_plan_link = f"{INSURANCE_LAB_BASE_URL}/customer_plan/{medical_detail_response}"
 
-                    if first_dose_question in questions:
-                        questions.remove(first_dose_question)
-                    if second_dose_question in questions:
-                        questions.remove(second_dose_question)
+                        # Reset conversation state to allow starting a new inquiry (same as SME flow)
+                        saved_language = conversation_state.get(
+                            "preferred_language", "English"
+                        )
+                        saved_language_code = conversation_state.get(
+                            "language_code", "en"
+                        )
+                        saved_language_explicitly_set = conversation_state.get(
+                            "language_explicitly_set", False
+                        )
 
-                    # Proceed to the next predefined question
-                    conversation_state["current_question_index"] += 1
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        options = ", ".join(next_question["options"])
-                        next_questions = next_question["question"]
+                        user_states[user_id] = {
+                            "current_question_index": 0,
+                            "responses": {},
+                            "current_flow": "initial",
+                            "welcome_shown": False,  # Set to False to allow new greeting on restart
+                            "awaiting_document_name": False,
+                            "document_name": "",
+                            "last_takaful_query_time": None,
+                            "awaiting_takaful_followup": False,
+                            "last_chronic_conditions_time": None,
+                            "awaiting_chronic_conditions_followup": False,
+                            "takaful_emarat_asked": False,
+                            "preferred_language": saved_language,
+                            "language_code": saved_language_code,
+                            "language_explicitly_set": saved_language_explicitly_set,
+                        }
 
                         return {
-                            "response": f"Thank you for your response. Now, let's move on to: {next_questions}",
-                            "options": options,
+                            "response": translated_success,
+                            "link": customer_plan_link,
+                            "review_message": translated_review,
+                            "review_link": "https://www.google.com/search?client=ms-android-samsung-ss&sca_esv=4eb717e6f42bf628&sxsrf=AHTn8zprabdPVFL3C2gXo4guY8besI3jqQ:1744004771562&q=wehbe+insurance+services+llc+reviews&uds=ABqPDvy-z0dcsfm2PY76_gjn-YWou9-AAVQ4iWjuLR6vmDV0vf3KpBMNjU5ZkaHGmSY0wBrWI3xO9O55WuDmXbDq6a3SqlwKf2NJ5xQAjebIw44UNEU3t4CpFvpLt9qFPlVh2F8Gfv8sMuXXSo2Qq0M_ZzbXbg2c323G_bE4tVi7Ue7d_sW0CrnycpJ1CvV-OyrWryZw_TeQ3gLGDgzUuHD04MpSHquYZaSQ0_mIHLWjnu7fu8c7nb6_aGDb_H1Q-86fD2VmWluYA5jxRkC9U2NsSwSSXV4FPW9w1Q2T_Wjt6koJvLgtikd66MqwYiJPX2x9MwLhoGYlpTbKtkJuHwE9eM6wQgieChskow6tJCVjQ75I315dT8n3tUtasGdBkprOlUK9ibPrYr9HqRz4AwzEQaxAq9_EDcsSG_XW0CHuqi2lRKHw592MlGlhjyQibXKSZJh-v3KW4wIVqa-2x0k1wfbZdpaO3BZaKYCacLOxwUKTnXPbQqDPLQDeYgDBwaTLvaCN221H&si=APYL9bvoDGWmsM6h2lfKzIb8LfQg_oNQyUOQgna9TyfQHAoqUvvaXjJhb-NHEJtDKiWdK3OqRhtZNP2EtNq6veOxTLUq88TEa2J8JiXE33-xY1b8ohiuDLBeOOGhuI1U6V4mDc9jmZkDoxLC9b6s6V8MAjPhY-EC_g%3D%3D&sa=X&sqi=2&ved=2ahUKEwi05JSHnMWMAxUw8bsIHRRCDd0Qk8gLegQIHxAB&ictx=1&stq=1&cs=0&lei=o2bzZ_SGIrDi7_UPlIS16A0#ebo=1",
+                            "language": user_language,
+                            "language_code": get_language_code(user_language),
+                            "restart_conversation": True,  # Signal to frontend to restart
                         }
                     else:
-                        # All predefined questions have been answered
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
+                        # Translate the fallback response to user's language
+                        fallback_message = "Thank you for sharing the details. We will inform Shafeeque Shanavas from Wehbe Insurance to assist you further with your enquiry. Please wait for further assistance. If you have any questions, please contact support@insuranceclub.ae."
+                        translated_fallback = await translate_text(
+                            fallback_message, user_language
+                        )
                         return {
-                            "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
-                            "final_responses": responses,
+                            "response": translated_fallback,
+                            "language": user_language,
+                            "language_code": get_language_code(user_language),
                         }
-
-        elif question == "Can you please tell me the date of your first dose?":
-            # Validate and store the first dose date
-            if valid_date_format(
-                user_message
-            ):  # Replace with your date validation function
-                responses[question] = user_message
-                conversation_state["current_question_index"] += 1
-
-                # Check if there are more questions to ask
-                if conversation_state["current_question_index"] < len(questions):
-                    next_question = questions[
-                        conversation_state["current_question_index"]
-                    ]
-                    return {
-                        "response": f"Thank you! Now, let's move on to: {next_question}"
-                    }
-                else:
-                    # All questions have been answered
-                    with open("user_responses.json", "w") as file:
-                        json.dump(responses, file, indent=4)
-                    return {
-                        "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
-                        "final_responses": responses,
-                    }
-            else:
+            except Exception as e:
+                # Translate the error message to user's language
+                error_message = (
+                    f"An error occurred while fetching medical details: {str(e)}"
+                )
+                translated_error = await translate_text(error_message, user_language)
                 return {
-                    "response": "Invalid date format. Please provide the date in the format DD/MM/YYYY or MM-DD-YYYY."
+                    "response": translated_error,
+                    "language": user_language,
+                    "language_code": get_language_code(user_language),
                 }
 
-        elif question == "Can you please tell me the date of your second dose?":
-            # Validate and store the second dose date
-            if valid_date_format(
-                user_message
-            ):  # Replace with your date validation function
-                responses[question] = user_message
-                conversation_state["current_question_index"] += 1
-
-                # Check if there are more questions to ask
-                if conversation_state["current_question_index"] < len(questions):
-                    next_question = questions[
-                        conversation_state["current_question_index"]
-                    ]
-                    options = ", ".join(next_question["options"])
-                    return {
-                        "response": f"Thank you! Now, let's move on to: {next_question['question']}",
-                        "options": options,
-                    }
-                else:
-                    # All questions have been answered
-                    with open("user_responses.json", "w") as file:
-                        json.dump(responses, file, indent=4)
-                    return {
-                        "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
-                        "final_responses": responses,
-                    }
-            else:
+            try:
+                record_completion(responses)
+                # Translate the no agent code message to user's language
+                no_agent_message = "Since you don't have an agent code, we will arrange a callback from the next available agent to assist you further. Thank you!"
+                translated_no_agent = await translate_text(
+                    no_agent_message, user_language
+                )
                 return {
-                    "response": "Invalid date format. Please provide the date in the format DD/MM/YYYY or MM-DD-YYYY."
+                    "response": translated_no_agent,
+                    "final_responses": responses,
+                    "language": user_language,
+                    "language_code": get_language_code(user_language),
                 }
-
-        elif (
-            question
-            == "Your policy is up for renewal. Would you like to proceed with renewing it?"
-        ):
-            valid_options = ["Yes", "No"]
-            if user_message in valid_options:
-                responses[question] = user_message  # Store the response
-
-                if user_message == "Yes":
-                    # Proceed to the next predefined question
-                    conversation_state["current_question_index"] += 1
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        return {
-                            "response": f"Thank you! Now, let's move on to: {next_question}"
-                        }
-                    else:
-                        # All predefined questions have been answered
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                        return {
-                            "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
-                            "final_responses": responses,
-                        }
-
-                elif user_message == "No":
-                    # Update the responses and return the final response
-                    with open("user_responses.json", "w") as file:
-                        json.dump(responses, file, indent=4)
-                    return {
-                        "response": "Thank you for your response. Your request has been updated accordingly. If you need further assistance, feel free to ask.",
-                        "final_responses": responses,
-                    }
-            else:
+            except Exception as e:
+                # Translate the save error message to user's language
+                save_error_message = (
+                    f"An error occurred while saving your responses: {str(e)}"
+                )
+                translated_save_error = await translate_text(
+                    save_error_message, user_language
+                )
                 return {
-                    "response": "Invalid response. Please answer with 'Yes' or 'No'."
+                    "response": translated_save_error,
+                    "language": user_language,
+                    "language_code": get_language_code(user_language),
                 }
+    else:
+        # Handle invalid advisor code or unrelated query
+        general_assistant_prompt = (
+            f"user response: {user_message}. Please assist in {user_language}."
+        )
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
 
-        elif question in [
-            "Now, let's move to the sponsor details. Please provide the Sponsor Name?",
-            # "Next, we need the details of the member for whom the policy is being purchased. Please provide Name",
-            "Please provide the member's details.Please tell me the Name",
-            "Next, Please provide the member's details.Please tell me the Name",
-            "Could you please provide your full name",
-            "Could you kindly share your contact details with me? To start, may I know your name, please?",
-        ]:
-            return handle_validate_name(
-                question,
-                user_message,
-                conversation_state,
-                questions,
-                responses,
-                is_valid_name,
-            )
+        # Translate the example message to user's language
+        example_message = "The Advisor code should be a 4-digit numeric value. Please enter a valid code"
+        translated_example = await translate_text(example_message, user_language)
 
-        elif (
-            question
-            == "Next, we need the details of the member for whom the policy is being purchased. Please provide Name"
-        ):
-            responses[question] = user_message
-            conversation_state["current_question_index"] += 1
+        retry_question = await translate_text(
+            f"Let's try again: {question}", user_language
+        )
 
-            if conversation_state["current_question_index"] < len(questions):
-                next_question = questions[conversation_state["current_question_index"]]
-                if "options" in next_question:
-                    options = ", ".join(next_question["options"])
-                    next_questions = next_question["question"]
-                    member_name = responses.get[
-                        "Next, we need the details of the member for whom the policy is being purchased. Please provide Name"
-                    ]
-                    return {
-                        "response": f"Thank you,May I know the {next_question} of {member_name}.Please ensure it is in the format DD/MM/YYYY.",
-                        "options": options,
-                    }
-                else:
-                    member_name = responses.get(
-                        "Next, we need the details of the member for whom the policy is being purchased. Please provide Name"
-                    )
+        return {
+            "response": f"{general_assistant_response.content.strip()}",
+            "example": translated_example,
+            "question": retry_question,
+            "language": user_language,
+            "language_code": get_language_code(user_language),
+        }
 
-                    return {
-                        "response": f"Thank you,May I know the {next_question} of {member_name}.Please ensure it is in the format DD/MM/YYYY."
-                    }
-            else:
-                with open("user_responses.json", "w") as file:
-                    json.dump(responses, file, indent=4)
-                return {
-                    "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
-                    "final_responses": responses,
-                }
 
-            # if conversation_state["current_question_index"] == questions.index(question):
-            #     # Prompt LLM to check if the input is a valid person name
-            #     check_prompt = f"The user has responded with: '{user_message}'. Is this a valid person's name? Respond with 'Yes' or 'No'."
-            #     llm_response = llm.invoke([
-            #         SystemMessage(content="You are Insura, an AI assistant specialized in insurance-related tasks. Your task is to determine if the input provided by the user is a valid person's name.Make sure it a valide name for a person"),
-            #         HumanMessage(content=check_prompt)
-            #     ])
-            #     is_person_name = llm_response.content.strip().lower() == "yes"
-
-            #     if is_person_name:
-            #         # Store the person's name
-            #         responses[question] = user_message
-            #         conversation_state["current_question_index"] += 1
-
-            #         # Check if there are more questions
-            #         if conversation_state["current_question_index"] < len(questions):
-            #             next_question = questions[conversation_state["current_question_index"]]
-            #             return {
-            #                 "response": f"Thank you for providing the sponsor's name. Now, let's move on to: {next_question}"
-            #             }
-            #         else:
-            #             # If all questions are completed, save responses and end conversation
-            #             with open("user_responses.json", "w") as file:
-            #                 json.dump(responses, file, indent=4)
-            #             return {
-            #                 "response": "Thank you for using Insura. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
-            #                 "final_responses": responses
-            #             }
-            #     else:
-            #         # Handle invalid or unrelated input
-            #         general_assistant_prompt = f"The user entered '{user_message}', which does not appear to be a person's name. Please assist."
-            #         general_assistant_response = llm.invoke([
-            #             SystemMessage(content="You are Insura, an AI assistant created by CloudSubset. Your role is to assist users with their inquiries. Your task here is to redirect or assist the user appropriately."),
-            #             HumanMessage(content=general_assistant_prompt)
-            #         ])
-            #         return {
-            #             "response": f"{general_assistant_response.content.strip()}",
-            #             "question": f"Let's move back to: {question}"
-            #         }
-
-        elif question == "How many years of driving experience do you have in the UAE?":
-            valid_options = ["0-1 year", "1-2 years", "2+ years"]
-            if user_message in valid_options:
+async def _answer_bike_manufacture_year(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    if is_current_question(conversation_state, questions, question):
+        # Check if the input is a valid year
+        try:
+            year = int(user_message)
+            current_year = datetime.now().year
+            if 1886 <= year <= current_year:  # Cars were invented in 1886
+                # Valid year
                 responses[question] = user_message
                 conversation_state["current_question_index"] += 1
 
@@ -3442,133 +3523,50 @@ def process_user_input(user_input: UserInput):
                     next_question = questions[
                         conversation_state["current_question_index"]
                     ]
+
                     return {
-                        "response": f"Thank you for your response. Now, let's move on to: {next_question}"
+                        "response": f"Thank you for providing the year. Now, let's move on to: {next_question}",
                     }
                 else:
-                    with open("user_responses.json", "w") as file:
-                        json.dump(responses, file, indent=4)
+                    # Save responses and end the conversation
+                    record_completion(responses)
                     return {
-                        "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
+                        "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
                         "final_responses": responses,
                     }
             else:
-                # Handle invalid responses or unrelated queries
-                general_assistant_prompt = (
-                    f"user response: {user_message}. Please assist."
-                )
-                general_assistant_response = llm.invoke([
-                    HumanMessage(content=general_assistant_prompt)
-                ])
-                return {
-                    "response": f"{general_assistant_response.content.strip()}",
-                    "question": f"Let's try again: {question}\nPlease choose from the following options: {', '.join(valid_options)}",
-                }
-
-        elif question == "Could you please let me know the year your car was made?":
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Check if the input is a valid year
-                try:
-                    year = int(user_message)
-                    current_year = datetime.now().year
-                    if 1886 <= year <= current_year:  # Cars were invented in 1886
-                        # Valid year
-                        responses[question] = user_message
-                        conversation_state["current_question_index"] += 1
-
-                        # Check if there are more questions
-                        if conversation_state["current_question_index"] < len(
-                            questions
-                        ):
-                            next_question = questions[
-                                conversation_state["current_question_index"]
-                            ]
-
-                            return {
-                                "response": f"Thank you for providing the year. Now, let's move on to: {next_question}",
-                            }
-                        else:
-                            # Save responses and end the conversation
-                            with open("user_responses.json", "w") as file:
-                                json.dump(responses, file, indent=4)
-                            return {
-                                "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
-                                "final_responses": responses,
-                            }
-                    else:
-                        # Year is out of range
-                        raise ValueError("Invalid year range")
-                except ValueError:
-                    # Handle invalid or unrelated input
-                    general_assistant_prompt = f"The user entered '{user_message}' when asked for the year their car was made. Please assist."
-                    general_assistant_response = llm.invoke([
-                        SystemMessage(
-                            content="You are Insura, a friendly AI assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-                        ),
-                        HumanMessage(content=general_assistant_prompt),
-                    ])
-                    return {
-                        "response": f"{general_assistant_response.content.strip()}",
-                        "question": f"Let's revisit: {question}",
-                    }
-
-        elif (
-            question
-            == "Could you please provide the registration details? When was your car first registered?"
-        ):
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Check if the input is a valid year
-                try:
-                    year = int(user_message)
-                    current_year = datetime.now().year
-                    if 1886 <= year <= current_year:  # Cars were invented in 1886
-                        # Valid year
-                        responses[question] = user_message
-                        conversation_state["current_question_index"] += 1
-
-                        # Check if there are more questions
-                        if conversation_state["current_question_index"] < len(
-                            questions
-                        ):
-                            next_question = questions[
-                                conversation_state["current_question_index"]
-                            ]
-
-                            return {
-                                "response": f"Thank you for providing the year. Now, let's move on to: {next_question}",
-                            }
-                        else:
-                            # Save responses and end the conversation
-                            with open("user_responses.json", "w") as file:
-                                json.dump(responses, file, indent=4)
-                            return {
-                                "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
-                                "final_responses": responses,
-                            }
-                    else:
-                        # Year is out of range
-                        raise ValueError("Invalid year range")
-                except ValueError:
-                    # Handle invalid or unrelated input
-                    general_assistant_prompt = f"The user entered '{user_message}' when asked for the year their car was made. Please assist."
-                    general_assistant_response = llm.invoke([
-                        SystemMessage(
-                            content="You are Insura, a friendly AI assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-                        ),
-                        HumanMessage(content=general_assistant_prompt),
-                    ])
-                    return {
-                        "response": f"{general_assistant_response.content.strip()}",
-                        "question": f"Let's revisit: {question}",
-                    }
-
-        elif question == "Do you have a No Claim certificate?":
-            valid_options = ["No", "1 Year", "2 Years", "3+ Years"]
-            if user_message in valid_options:
+                # Year is out of range
+                raise ValueError("Invalid year range")
+        except ValueError:
+            # Handle invalid or unrelated input
+            general_assistant_prompt = f"The user entered '{user_message}' when asked for the year their car was made. Please assist."
+            general_assistant_response = await cached_reply(
+                llm,
+                [
+                    SystemMessage(
+                        content="You are Insura, a friendly AI assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                    ),
+                    HumanMessage(content=general_assistant_prompt),
+                ],
+                user_message,
+            )
+            return {
+                "response": f"{general_assistant_response.content.strip()}",
+                "question": f"Let's revisit: {question}",
+            }
+    return NOT_HANDLED
+
+
+async def _answer_bike_registration_year(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    if is_current_question(conversation_state, questions, question):
+        # Check if the input is a valid year
+        try:
+            year = int(user_message)
+            current_year = datetime.now().year
+            if 1886 <= year <= current_year:  # Cars were invented in 1886
+                # Valid year
                 responses[question] = user_message
                 conversation_state["current_question_index"] += 1
 
@@ -3577,623 +3575,976 @@ def process_user_input(user_input: UserInput):
                     next_question = questions[
                         conversation_state["current_question_index"]
                     ]
+
                     return {
-                        "response": f"Thank you for your response. Now, let's move on to: {next_question}"
+                        "response": f"Thank you for providing the year. Now, let's move on to: {next_question}",
                     }
                 else:
-                    with open("user_responses.json", "w") as file:
-                        json.dump(responses, file, indent=4)
+                    # Save responses and end the conversation
+                    record_completion(responses)
                     return {
-                        "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
+                        "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
                         "final_responses": responses,
                     }
             else:
-                # Handle invalid responses or unrelated queries
-                general_assistant_prompt = (
-                    f"user response: {user_message}. Please assist."
-                )
-                general_assistant_response = llm.invoke([
-                    HumanMessage(content=general_assistant_prompt)
-                ])
-                return {
-                    "response": f"{general_assistant_response.content.strip()}",
-                    "question": f"Let's try again: {question}\nPlease choose from the following options: {', '.join(valid_options)}",
-                }
+                # Year is out of range
+                raise ValueError("Invalid year range")
+        except ValueError:
+            # Handle invalid or unrelated input
+            general_assistant_prompt = f"The user entered '{user_message}' when asked for the year their car was made. Please assist."
+            general_assistant_response = await cached_reply(
+                llm,
+                [
+                    SystemMessage(
+                        content="You are Insura, a friendly AI assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                    ),
+                    HumanMessage(content=general_assistant_prompt),
+                ],
+                user_message,
+            )
+            return {
+                "response": f"{general_assistant_response.content.strip()}",
+                "question": f"Let's revisit: {question}",
+            }
+    return NOT_HANDLED
 
-        elif question == "Could you provide the sponsor's Emirates ID?":
-            # Validate sponsor Emirates ID
-            if valid_emirates_id(user_message):
-                responses[question] = user_message
-                conversation_state["current_question_index"] += 1
 
-                # Move to the next question or finalize responses
-                if conversation_state["current_question_index"] < len(questions):
-                    next_question = questions[
-                        conversation_state["current_question_index"]
-                    ]
+async def _answer_sponsor_income_source(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    valid_options = ["Business", "Salary"]
+    if user_message in valid_options:
+        responses[question] = user_message
+        conversation_state["current_question_index"] += 1
 
-                    return {
-                        "response": f"Thank you! Now, let's move on to: {next_question}"
-                    }
-                else:
-                    # All questions answered
-                    try:
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                        return {
-                            "response": "Thank you for using Insura. Your responses have been recorded. "
-                            "Feel free to ask any other questions. Have a great day!",
-                            "final_responses": responses,
-                        }
-                    except Exception as e:
-                        return {
-                            "response": f"An error occurred while saving your responses: {str(e)}"
-                        }
+        # Check if there are more questions
+        if conversation_state["current_question_index"] < len(questions):
+            next_question = questions[conversation_state["current_question_index"]]
+            if "options" in next_question:
+                options = ", ".join(next_question["options"])
+                next_questions = next_question["question"]
+                return {
+                    "response": f"Thank you! Now, let's move on to: {next_questions}",
+                    "options": options,
+                }
             else:
-                # Handle invalid Emirates ID or unrelated query
-                general_assistant_prompt = (
-                    f"user response: {user_message}. Please assist."
-                )
-                general_assistant_response = llm.invoke([
-                    HumanMessage(content=general_assistant_prompt)
-                ])
-
-                # Example of a valid Emirates ID
-                emirates_id_example = "784-1990-1234567-0"
-
                 return {
-                    "response": (f"{general_assistant_response.content.strip()} \n\n"),
-                    "example": f"Here's an example of a valid Emirates ID for your reference: {emirates_id_example}.",
-                    "question": f"Let's try again: {question}",
+                    "response": f"Thank you. Now, let's move on to: {next_question}"
                 }
+        else:
+            record_completion(responses)
+            return {
+                "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
+                "final_responses": responses,
+            }
+    else:
+        # Handle invalid responses or unrelated queries
+        general_assistant_prompt = f"user response: {user_message}. Please assist."
+        general_assistant_response = await cached_reply(
+            llm, [HumanMessage(content=general_assistant_prompt)], user_message
+        )
+        return {
+            "response": f"{general_assistant_response.content.strip()}",
+            "question": f"Let's try again: {question}\nPlease choose from the following options: {', '.join(valid_options)}",
+        }
 
-        elif question == "Do you have a vehicle test passing certificate?":
-            return handle_yes_or_no(
-                user_message,
-                conversation_state,
-                questions,
-                responses,
-                question,
-                user_language,
-            )
-
-        elif question == "Does your current policy have comprehensive cover?":
-            return handle_yes_or_no(
-                user_message,
-                conversation_state,
-                questions,
-                responses,
-                question,
-                user_language,
-            )
 
-        elif question == "Does your policy include agency repair?":
-            valid_options = ["Yes", "No"]
-            if user_message in valid_options:
-                responses[question] = user_message
-                conversation_state["current_question_index"] += 1
+async def _answer_chronic_conditions(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    valid_options = ["Yes", "No"]
+    if user_message in valid_options:
+        responses[question] = user_message  # Store the response
 
-                # Check if there are more questions
-                if conversation_state["current_question_index"] < len(questions):
-                    next_question = questions[
-                        conversation_state["current_question_index"]
-                    ]
-                    options = ", ".join(next_question["options"])
-                    next_questions = next_question["question"]
+        if user_message == "No":
+            # Check if the follow-up question is already in the list
+            follow_up_question = "Please provide us with the details of your Chronic Conditions Medical Report"
+            if follow_up_question in questions:
+                # If the follow-up question exists, skip it and proceed
+                questions.remove(follow_up_question)
 
-                    return {
-                        "response": f"Thank you for your response. Now, let's move on to: {next_questions}",
-                        "options": options,
-                    }
+            # Proceed to the next predefined question
+            conversation_state["current_question_index"] += 1
+            if conversation_state["current_question_index"] < len(questions):
+                next_question = questions[conversation_state["current_question_index"]]
+                options = ", ".join(next_question["options"])
+                next_questions = next_question["question"]
 
-                else:
-                    with open("user_responses.json", "w") as file:
-                        json.dump(responses, file, indent=4)
-                    return {
-                        "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
-                        "final_responses": responses,
-                    }
+                return {
+                    "response": f"Thank you! Now, let's move on to: {next_questions}",
+                    "options": options,
+                }
             else:
-                # Handle invalid responses or unrelated queries
-                general_assistant_prompt = (
-                    f"user response: {user_message}. Please assist."
-                )
-                general_assistant_response = llm.invoke([
-                    HumanMessage(content=general_assistant_prompt)
-                ])
+                # All predefined questions have been answered
+                record_completion(responses)
                 return {
-                    "response": f"{general_assistant_response.content.strip()}",
-                    "question": f"Let's try again: {question}\nPlease choose from the following options: {', '.join(valid_options)}",
+                    "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
+                    "final_responses": responses,
                 }
 
-        elif (
-            question
-            == "Please enter your Insurance Advisor code for assigning your enquiry for further assistance"
-        ):
-            if valid_adivisor_code(user_message):
-                responses[question] = user_message
-                conversation_state["current_question_index"] += 1
+        elif user_message == "Yes":
+            # Dynamically add the follow-up question if not already present
+            follow_up_question = "Please provide us with the details of your Chronic Conditions Medical Report"
+            if follow_up_question not in questions:
+                responses[follow_up_question] = None
+                # Insert the new question immediately after the current one
+                questions.insert(
+                    conversation_state["current_question_index"] + 1,
+                    follow_up_question,
+                )
 
-                # Move to the next question or finalize responsess
-                if conversation_state["current_question_index"] < len(questions):
-                    next_question = questions[
-                        conversation_state["current_question_index"]
-                    ]
-                    response_message = (
-                        f"Thank you! Now, let's move on to: {next_question}"
-                    )
-                    return format_response_in_language(
-                        response_message, [], user_language
-                    )
-                else:
-                    try:
-                        if (
-                            responses.get("Do you have an Insurance Advisor code?")
-                            == "Yes"
-                        ):
-                            medical_detail_response = fetching_medical_detail(responses)
-                            print(medical_detail_response)
-                            del user_states[user_id]
-                            if isinstance(medical_detail_response, int):
-                                # Translate the success response to user's language
-                                success_message = "Thank you for sharing the details. We will inform Shafeeque Shanavas from Wehbe Insurance to assist you further with your enquiry. Please find the link below to view your quotation:"
-                                review_message = "If you are satisfied with Wehbe(Broker) services, please leave a review for sharing happiness to others!!😊"
-
-                                translated_success = translate_text(
-                                    success_message, user_language
-                                )
-                                translated_review = translate_text(
-                                    review_message, user_language
-                                )
-
-                                # Build the customer plan link using the medical detail response ID
-                                customer_plan_link = f"{INSURANCE_LAB_BASE_URL}/customer_plan/{medical_detail_response}"
-
-                                # Reset conversation state to allow starting a new inquiry (same as SME flow)
-                                saved_language = conversation_state.get(
-                                    "preferred_language", "English"
-                                )
-                                saved_language_code = conversation_state.get(
-                                    "language_code", "en"
-                                )
-                                saved_language_explicitly_set = conversation_state.get(
-                                    "language_explicitly_set", False
-                                )
-
-                                user_states[user_id] = {
-                                    "current_question_index": 0,
-                                    "responses": {},
-                                    "current_flow": "initial",
-                                    "welcome_shown": False,  # Set to False to allow new greeting on restart
-                                    "awaiting_document_name": False,
-                                    "document_name": "",
-                                    "last_takaful_query_time": None,
-                                    "awaiting_takaful_followup": False,
-                                    "last_chronic_conditions_time": None,
-                                    "awaiting_chronic_conditions_followup": False,
-                                    "takaful_emarat_asked": False,
-                                    "preferred_language": saved_language,
-                                    "language_code": saved_language_code,
-                                    "language_explicitly_set": saved_language_explicitly_set,
-                                }
+            # Move to the new follow-up question
+            conversation_state["current_question_index"] += 1
 
-                                return {
-                                    "response": translated_success,
-                                    "link": customer_plan_link,
-                                    "review_message": translated_review,
-                                    "review_link": "https://www.google.com/search?client=ms-android-samsung-ss&sca_esv=4eb717e6f42bf628&sxsrf=AHTn8zprabdPVFL3C2gXo4guY8besI3jqQ:1744004771562&q=wehbe+insurance+services+llc+reviews&uds=ABqPDvy-z0dcsfm2PY76_gjn-YWou9-AAVQ4iWjuLR6vmDV0vf3KpBMNjU5ZkaHGmSY0wBrWI3xO9O55WuDmXbDq6a3SqlwKf2NJ5xQAjebIw44UNEU3t4CpFvpLt9qFPlVh2F8Gfv8sMuXXSo2Qq0M_ZzbXbg2c323G_bE4tVi7Ue7d_sW0CrnycpJ1CvV-OyrWryZw_TeQ3gLGDgzUuHD04MpSHquYZaSQ0_mIHLWjnu7fu8c7nb6_aGDb_H1Q-86fD2VmWluYA5jxRkC9U2NsSwSSXV4FPW9w1Q2T_Wjt6koJvLgtikd66MqwYiJPX2x9MwLhoGYlpTbKtkJuHwE9eM6wQgieChskow6tJCVjQ75I315dT8n3tUtasGdBkprOlUK9ibPrYr9HqRz4AwzEQaxAq9_EDcsSG_XW0CHuqi2lRKHw592MlGlhjyQibXKSZJh-v3KW4wIVqa-2x0k1wfbZdpaO3BZaKYCacLOxwUKTnXPbQqDPLQDeYgDBwaTLvaCN221H&si=APYL9bvoDGWmsM6h2lfKzIb8LfQg_oNQyUOQgna9TyfQHAoqUvvaXjJhb-NHEJtDKiWdK3OqRhtZNP2EtNq6veOxTLUq88TEa2J8JiXE33-xY1b8ohiuDLBeOOGhuI1U6V4mDc9jmZkDoxLC9b6s6V8MAjPhY-EC_g%3D%3D&sa=X&sqi=2&ved=2ahUKEwi05JSHnMWMAxUw8bsIHRRCDd0Qk8gLegQIHxAB&ictx=1&stq=1&cs=0&lei=o2bzZ_SGIrDi7_UPlIS16A0#ebo=1",
-                                    "language": user_language,
-                                    "language_code": get_language_code(user_language),
-                                    "restart_conversation": True,  # Signal to frontend to restart
-                                }
-                            else:
-                                # Translate the fallback response to user's language
-                                fallback_message = "Thank you for sharing the details. We will inform Shafeeque Shanavas from Wehbe Insurance to assist you further with your enquiry. Please wait for further assistance. If you have any questions, please contact support@insuranceclub.ae."
-                                translated_fallback = translate_text(
-                                    fallback_message, user_language
-                                )
-                                return {
-                                    "response": translated_fallback,
-                                    "language": user_language,
-                                    "language_code": get_language_code(user_language),
-                                }
-                    except Exception as e:
-                        # Translate the error message to user's language
-                        error_message = f"An error occurred while fetching medical details: {str(e)}"
-                        translated_error = translate_text(error_message, user_language)
-                        return {
-                            "response": translated_error,
-                            "language": user_language,
-                            "language_code": get_language_code(user_language),
-                        }
+            return {
+                "response": f"Thank you! Now, let's move on to: {follow_up_question}",
+            }
+    else:
+        pass
+    return NOT_HANDLED
+
+
+async def _answer_chronic_conditions_report(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    # if is_current_question(conversation_state, questions, question):
+    #     # Enhanced file path validation
+    #     upload_pattern = re.compile(
+    #         r"^uploads\/(?:[\w\s-]+\/)*[\w\s-]+\.(pdf|docx|jpg|png|jpeg)$", re.IGNORECASE
+    #     )
+
+    #     if upload_pattern.match(user_message):
+    #         # Valid file format
+    #         responses[question] = user_message
+    #         conversation_state["current_question_index"] += 1
+
+    #         # Check if there are more questions
+    #         if conversation_state["current_question_index"] < len(questions):
+    #             next_question = questions[conversation_state["current_question_index"]]
+    #             return {
+    #                 "response": f"Thank you for providing the document. Now, let's move on to: {next_question}",
+    #             }
+    #         else:
+    #             # Save responses and end the conversation
+    #             with open("user_responses.json", "w") as file:
+    #                 json.dump(responses, file, indent=4)
+    #             return {
+    #                 "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
+    #                 "final_responses": responses,
+    #             }
+    #     else:
+    #         # Invalid file format
+    #         return {
+    #            "response": "The file format seems incorrect. Please upload a valid document."
+    #         }
+
+    if is_current_question(conversation_state, questions, question):
+        # Store user message as is without validation
+        responses[question] = user_message
+        conversation_state["current_question_index"] += 1
 
-                    try:
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                        # Translate the no agent code message to user's language
-                        no_agent_message = "Since you don't have an agent code, we will arrange a callback from the next available agent to assist you further. Thank you!"
-                        translated_no_agent = translate_text(
-                            no_agent_message, user_language
-                        )
-                        return {
-                            "response": translated_no_agent,
-                            "final_responses": responses,
-                            "language": user_language,
-                            "language_code": get_language_code(user_language),
-                        }
-                    except Exception as e:
-                        # Translate the save error message to user's language
-                        save_error_message = (
-                            f"An error occurred while saving your responses: {str(e)}"
-                        )
-                        translated_save_error = translate_text(
-                            save_error_message, user_language
-                        )
-                        return {
-                            "response": translated_save_error,
-                            "language": user_language,
-                            "language_code": get_language_code(user_language),
-                        }
+        # Check if there are more questions
+        if conversation_state["current_question_index"] < len(questions):
+            next_question = questions[conversation_state["current_question_index"]]
+            options = ", ".join(next_question["options"])
+            next_questions = next_question["question"]
+
+            return {
+                "response": f"Thank you! Now, let's move on to: {next_questions}",
+                "options": options,
+            }
+        else:
+            # Save responses and end the conversation
+            record_completion(responses)
+            return {
+                "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
+                "final_responses": responses,
+            }
+    else:
+        # Handle other questions or general assistance
+        pass
+    return NOT_HANDLED
+
+
+async def _answer_email_address(
+    question,
+    user_message,
+    user_language,
+    conversation_state,
+    questions,
+    responses,
+    current_flow,
+    **_,
+):
+    # Regex pattern for validating email address - also accept numbers
+    email_pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
+    # Check if it's an email or just numbers (accept both)
+    is_valid_input = (
+        re.match(email_pattern, user_message) or user_message.strip().isdigit()
+    )
+
+    if is_valid_input:
+        responses[question] = user_message
+        conversation_state["current_question_index"] += 1
+
+        # Check if there are more questions
+        if conversation_state["current_question_index"] < len(questions):
+            next_question = questions[conversation_state["current_question_index"]]
+
+            # Determine appropriate response based on current flow and question
+            if (
+                current_flow == "sma"
+                and question == "May I have the Client Email Address, please?"
+            ):
+                thank_you_message = "Thank you for providing the client's email! 📧"
             else:
-                # Handle invalid advisor code or unrelated query
-                general_assistant_prompt = (
-                    f"user response: {user_message}. Please assist in {user_language}."
-                )
-                general_assistant_response = llm.invoke([
-                    SystemMessage(
-                        content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-                    ),
-                    HumanMessage(content=general_assistant_prompt),
-                ])
+                thank_you_message = "Thank you for providing the sponsor's email! 📧"
 
-                # Translate the example message to user's language
-                example_message = "The Advisor code should be a 4-digit numeric value. Please enter a valid code"
-                translated_example = translate_text(example_message, user_language)
+            # Get next question text
+            next_question_text = (
+                next_question["question"]
+                if isinstance(next_question, dict)
+                else next_question
+            )
 
-                retry_question = translate_text(
-                    f"Let's try again: {question}", user_language
-                )
+            # Translate response to user's language
+            response_msg = await translate_text(
+                f"{thank_you_message} Now, let's move on to: {next_question_text}",
+                user_language,
+            )
 
+            if isinstance(next_question, dict) and "options" in next_question:
+                translated_options = await translate_batch(
+                    next_question["options"], user_language
+                )
                 return {
-                    "response": f"{general_assistant_response.content.strip()}",
-                    "example": translated_example,
-                    "question": retry_question,
+                    "response": response_msg,
+                    "options": ", ".join(translated_options),
                     "language": user_language,
                     "language_code": get_language_code(user_language),
                 }
-        elif question == "Could you please tell me the year your bike was made?":
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Check if the input is a valid year
-                try:
-                    year = int(user_message)
-                    current_year = datetime.now().year
-                    if 1886 <= year <= current_year:  # Cars were invented in 1886
-                        # Valid year
-                        responses[question] = user_message
-                        conversation_state["current_question_index"] += 1
+            else:
+                return {
+                    "response": response_msg,
+                    "language": user_language,
+                    "language_code": get_language_code(user_language),
+                }
+        else:
+            record_completion(responses)
 
-                        # Check if there are more questions
-                        if conversation_state["current_question_index"] < len(
-                            questions
-                        ):
-                            next_question = questions[
-                                conversation_state["current_question_index"]
-                            ]
+            completion_msg = await translate_text(
+                "Thank you for sharing the details! 🎉 We will inform Shafeeque Shanavas from Wehbe Insurance to assist you further with your enquiry. Please wait for further assistance. If you have any questions, please contact support@insuranceclub.ae",
+                user_language,
+            )
+            return {
+                "response": completion_msg,
+                "final_responses": responses,
+                "language": user_language,
+                "language_code": get_language_code(user_language),
+            }
+    else:
+        # Handle invalid input
+        general_assistant_prompt = (
+            f"The user entered '{user_message}'. Please assist them in {user_language}."
+        )
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
+        return {
+            "response": f"{general_assistant_response.content.strip()}",
+            "question": f"Let's move back to: {question}",
+            "example": "The email address should be in this format: example@gmail.com",
+        }
 
-                            return {
-                                "response": f"Thank you for providing the year. Now, let's move on to: {next_question}",
-                            }
-                        else:
-                            # Save responses and end the conversation
-                            with open("user_responses.json", "w") as file:
-                                json.dump(responses, file, indent=4)
-                            return {
-                                "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
-                                "final_responses": responses,
-                            }
-                    else:
-                        # Year is out of range
-                        raise ValueError("Invalid year range")
-                except ValueError:
-                    # Handle invalid or unrelated input
-                    general_assistant_prompt = f"The user entered '{user_message}' when asked for the year their car was made. Please assist."
-                    general_assistant_response = llm.invoke([
-                        SystemMessage(
-                            content="You are Insura, a friendly AI assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-                        ),
-                        HumanMessage(content=general_assistant_prompt),
-                    ])
+
+async def _answer_sma_excel_upload(
+    question,
+    user_message,
+    user_language,
+    user_id,
+    conversation_state,
+    questions,
+    responses,
+    **_,
+):
+    if is_current_question(conversation_state, questions, question):
+        # Import user_states from excel_upload module
+        from routes.excel_upload import user_states as excel_user_states
+
+        # Check if user has uploaded Excel file via the upload-excel endpoint
+        excel_state = await excel_user_states.fetch(user_id) or {}
+        excel_data_exists = "excel_employee_data" in excel_state.get("responses", {})
+
+        # Also check for file path patterns (backwards compatibility)
+        upload_pattern = re.compile(
+            r"^(?:uploads\/)?(?:[\w\s\-\.\/]+\/)*[\w\s\-\.]+\.(xlsx|xls)$",
+            re.IGNORECASE,
+        )
+
+        is_valid_file_path = (
+            upload_pattern.match(user_message)
+            or user_message.lower().endswith((".xlsx", ".xls"))
+            or "uploaded" in user_message.lower()
+            or "excel" in user_message.lower()
+        )
+
+        if excel_data_exists or is_valid_file_path:
+            # Valid Excel file format or data exists
+            responses[question] = user_message
+
+            # Store the Excel file path/confirmation for processing
+            responses["excel_file_path"] = user_message
+
+            # If Excel data exists, store it in responses
+            if excel_data_exists:
+                responses["excel_employee_data"] = excel_state["responses"][
+                    "excel_employee_data"
+                ]
+
+                # Get the Excel employee data
+                excel_data = excel_state["responses"]["excel_employee_data"]
+                employees_list = excel_data.get("employees", [])
+                print(f"Excel Employees List: {json.dumps(employees_list, indent=2)}")
+
+                # Build the members array from Excel data
+                members = []
+                for emp in employees_list:
+                    member = {
+                        "mem_name": emp.get("first_name", ""),
+                        "mem_dob": emp.get("date_of_birth", ""),
+                        "mem_gender": emp.get("gender", ""),
+                        "mem_marital_status": emp.get("marital_status", ""),
+                        "mem_relation": emp.get("relation", ""),
+                        "mem_nationality": emp.get("nationality", ""),
+                        "mem_emirate": emp.get("visa_issued_location", ""),
+                    }
+                    members.append(member)
+                print(f"Built Members Array: {json.dumps(members, indent=2)}")
+
+                # Get the other responses from the conversation
+                visa_issued_emirates = ""
+                plan = ""
+                client_name = ""
+                client_mobile = ""
+                client_email = ""
+
+                print(f"All Responses: {json.dumps(responses, indent=2)}")
+
+                # Find these from the responses dictionary
+                for key, value in responses.items():
+                    if (
+                        "Visa issued Emirate" in key
+                        or key
+                        == "Let's start with your Medical insurance details. Choose your Visa issued Emirate?"
+                    ):
+                        visa_issued_emirates = value
+                    elif (
+                        "type of plan" in key.lower()
+                        or key == "What type of plan are you looking for?"
+                    ):
+                        plan = value
+                    elif "Client Name" in key:
+                        client_name = value
+                    elif "Client mobile" in key:
+                        client_mobile = value
+                    elif "Client Email" in key:
+                        client_email = value
+
+                print(f"Extracted Values:")
+                print(f"  visa_issued_emirates: {visa_issued_emirates}")
+                print(f"  plan: {plan}")
+                print(f"  client_name: {client_name}")
+                print(f"  client_mobile: {client_mobile}")
+                print(f"  client_email: {client_email}")
+
+                # Validate required fields
+                if (
+                    not visa_issued_emirates
+                    or not plan
+                    or not client_name
+                    or not client_mobile
+                    or not client_email
+                ):
+                    print("ERROR: Missing required fields!")
                     return {
-                        "response": f"{general_assistant_response.content.strip()}",
-                        "question": f"Let's revisit: {question}",
+                        "response": "Thank you for uploading the Excel file. However, some required information is missing. Please provide all client details.",
+                        "missing_fields": {
+                            "visa_issued_emirates": not visa_issued_emirates,
+                            "plan": not plan,
+                            "client_name": not client_name,
+                            "client_mobile": not client_mobile,
+                            "client_email": not client_email,
+                        },
                     }
 
-        elif (
-            question
-            == "Could you please provide the registration details? When was your bike first registered?"
-        ):
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Check if the input is a valid year
+                # Prepare the JSON payload
+                payload = {
+                    "visa_issued_emirates": visa_issued_emirates,
+                    "plan": plan,
+                    "client_name": client_name,
+                    "client_mobile": client_mobile,
+                    "client_email": client_email,
+                    "currency": "",
+                    "census_sheet": "",
+                    "members": members,
+                }
+
+                # Submit to the API
                 try:
-                    year = int(user_message)
-                    current_year = datetime.now().year
-                    if 1886 <= year <= current_year:  # Cars were invented in 1886
-                        # Valid year
-                        responses[question] = user_message
+                    # Print the payload for debugging
+                    print(f"API Payload: {json.dumps(payload, indent=2)}")
+                    print(f"API URL: {INSURANCE_LAB_SME_ADD_API}")
+
+                    # Set proper headers to avoid Mod_Security issues
+                    headers = {
+                        "Content-Type": "application/json",
+                        "Accept": "application/json",
+                        "User-Agent": "InsuraBot/1.0",
+                    }
+
+                    # Try to send as JSON first
+                    async with httpx.AsyncClient(timeout=30) as client:
+                        try:
+                            api_response = await client.post(
+                                INSURANCE_LAB_SME_ADD_API,
+                                json=payload,
+                                headers=headers,
+                            )
+                        except:
+                            # If JSON fails, try as form data
+                            print("JSON request failed, trying form data...")
+                            api_response = await client.post(
+                                INSURANCE_LAB_SME_ADD_API,
+                                data=payload,
+                                headers=headers,
+                            )
+
+                    print(f"API Response Status: {api_response.status_code}")
+                    print(f"API Response Text: {api_response.text}")
+
+                    if api_response.status_code == 200:
+                        response_data = api_response.json()
+                        print(
+                            f"API Response Data: {json.dumps(response_data, indent=2)}"
+                        )
+
+                        # Store the ID from response if it exists
+                        response_id = response_data.get("id", "")
+                        print(f"Extracted ID: {response_id}")
+
+                        # Build the customer plan link using the ID
+                        customer_plan_link = (
+                            f"{INSURANCE_LAB_SME_PLAN_BASE}/{response_id}"
+                        )
+
+                        # Store API response in user state
+                        responses["api_response_id"] = response_id
+                        responses["api_submission_status"] = "success"
+                        responses["customer_plan_link"] = customer_plan_link
+
+                        # Check if there are more questions after this
                         conversation_state["current_question_index"] += 1
 
-                        # Check if there are more questions
                         if conversation_state["current_question_index"] < len(
                             questions
                         ):
                             next_question = questions[
                                 conversation_state["current_question_index"]
                             ]
+                            if isinstance(next_question, dict):
+                                if "options" in next_question:
+                                    options = ", ".join(next_question["options"])
+                                    next_questions = next_question["question"]
+                                    return {
+                                        "response": f"Thank you for uploading the Excel file. Your data has been processed successfully (ID: {response_id}). Now, let's move on to: {next_questions}",
+                                        "options": options,
+                                        "submission_id": response_id,
+                                        "customer_plan_link": customer_plan_link,
+                                    }
+                                else:
+                                    next_questions = next_question["question"]
+                                    return {
+                                        "response": f"Thank you for uploading the Excel file. Your data has been processed successfully (ID: {response_id}). Now, let's move on to: {next_questions}",
+                                        "submission_id": response_id,
+                                        "customer_plan_link": customer_plan_link,
+                                    }
+                            else:
+                                return {
+                                    "response": f"Thank you for uploading the Excel file. Your data has been processed successfully (ID: {response_id}). Now, let's move on to: {next_question}",
+                                    "submission_id": response_id,
+                                    "customer_plan_link": customer_plan_link,
+                                }
+                        else:
+                            # Save responses and end the conversation - SMA flow completion
+                            record_completion(responses)
 
-                            return {
-                                "response": f"Thank you for providing the year. Now, let's move on to: {next_question}",
+                            # Format the response similar to individual flow
+                            success_message = "Thank you for sharing the details. We will inform Shafeeque Shanavas from Wehbe Insurance to assist you further with your enquiry. Please find the link below to view your quotation:"
+                            review_message = "If you are satisfied with Wehbe(Broker) services, please leave a review for sharing happiness to others!!😊"
+
+                            # Translate messages if needed
+                            translated_success = (
+                                await translate_text(success_message, user_language)
+                                if user_language != "English"
+                                else success_message
+                            )
+                            translated_review = (
+                                await translate_text(review_message, user_language)
+                                if user_language != "English"
+                                else review_message
+                            )
+
+                            # Reset conversation state to allow starting a new inquiry
+                            # Save the language preference before resetting
+                            saved_language = conversation_state.get(
+                                "preferred_language", "English"
+                            )
+                            saved_language_code = conversation_state.get(
+                                "language_code", "en"
+                            )
+                            saved_language_explicitly_set = conversation_state.get(
+                                "language_explicitly_set", False
+                            )
+
+                            user_states[user_id] = {
+                                "current_question_index": 0,
+                                "responses": {},
+                                "current_flow": "initial",
+                                "welcome_shown": False,  # Set to False to allow new greeting on restart
+                                "awaiting_document_name": False,
+                                "document_name": "",
+                                "last_takaful_query_time": None,
+                                "awaiting_takaful_followup": False,
+                                "last_chronic_conditions_time": None,
+                                "awaiting_chronic_conditions_followup": False,
+                                "takaful_emarat_asked": False,
+                                "preferred_language": saved_language,  # Preserve language
+                                "language_code": saved_language_code,
+                                "language_explicitly_set": saved_language_explicitly_set,  # Preserve explicit setting
                             }
-                        else:
-                            # Save responses and end the conversation
-                            with open("user_responses.json", "w") as file:
-                                json.dump(responses, file, indent=4)
+
                             return {
-                                "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
-                                "final_responses": responses,
+                                "response": translated_success,
+                                "link": customer_plan_link,
+                                "review_message": translated_review,
+                                "review_link": "https://www.google.com/search?client=ms-android-samsung-ss&sca_esv=4eb717e6f42bf628&sxsrf=AHTn8zprabdPVFL3C2gXo4guY8besI3jqQ:1744004771562&q=wehbe+insurance+services+llc+reviews&uds=ABqPDvy-z0dcsfm2PY76_gjn-YWou9-AAVQ4iWjuLR6vmDV0vf3KpBMNjU5ZkaHGmSY0wBrWI3xO9O55WuDmXbDq6a3SqlwKf2NJ5xQAjebIw44UNEU3t4CpFvpLt9qFPlVh2F8Gfv8sMuXXSo2Qq0M_ZzbXbg2c323G_bE4tVi7Ue7d_sW0CrnycpJ1CvV-OyrWryZw_TeQ3gLGDgzUuHD04MpSHquYZaSQ0_mIHLWjnu7fu8c7nb6_aGDb_H1Q-86fD2VmWluYA5jxRkC9U2NsSwSSXV4FPW9w1Q2T_Wjt6koJvLgtikd66MqwYiJPX2x9MwLhoGYlpTbKtkJuHwE9eM6wQgieChskow6tJCVjQ75I315dT8n3tUtasGdBkprOlUK9ibPrYr9HqRz4AwzEQaxAq9_EDcsSG_XW0CHuqi2lRKHw592MlGlhjyQibXKSZJh-v3KW4wIVqa-2x0k1wfbZdpaO3BZaKYCacLOxwUKTnXPbQqDPLQDeYgDBwaTLvaCN221H&si=APYL9bvoDGWmsM6h2lfKzIb8LfQg_oNQyUOQgna9TyfQHAoqUvvaXjJhb-NHEJtDKiWdK3OqRhtZNP2EtNq6veOxTLUq88TEa2J8JiXE33-xY1b8ohiuDLBeOOGhuI1U6V4mDc9jmZkDoxLC9b6s6V8MAjPhY-EC_g%3D%3D&sa=X&sqi=2&ved=2ahUKEwi05JSHnMWMAxUw8bsIHRRCDd0Qk8gLegQIHxAB&ictx=1&stq=1&cs=0&lei=o2bzZ_SGIrDi7_UPlIS16A0#ebo=1",
+                                "language": user_language,
+                                "language_code": get_language_code(user_language),
+                                "restart_conversation": True,  # Signal to frontend to restart
                             }
                     else:
-                        # Year is out of range
-                        raise ValueError("Invalid year range")
-                except ValueError:
-                    # Handle invalid or unrelated input
-                    general_assistant_prompt = f"The user entered '{user_message}' when asked for the year their car was made. Please assist."
-                    general_assistant_response = llm.invoke([
-                        SystemMessage(
-                            content="You are Insura, a friendly AI assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-                        ),
-                        HumanMessage(content=general_assistant_prompt),
-                    ])
-                    return {
-                        "response": f"{general_assistant_response.content.strip()}",
-                        "question": f"Let's revisit: {question}",
-                    }
-
-        elif (
-            question
-            == "Could you kindly share your contact details with me? To start, may I know your name, please?"
-        ):
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Prompt LLM to check if the input is a valid person name
-                check_prompt = f"The user has responded with: '{user_message}'. Is this a valid person's name? Respond with 'Yes' or 'No'."
-                llm_response = llm.invoke([
-                    SystemMessage(
-                        content="You are Insura, an AI assistant specialized in insurance-related tasks. Your task is to determine if the input provided by the user is a valid person's name.Make sure it a valide name for a person"
-                    ),
-                    HumanMessage(content=check_prompt),
-                ])
-                is_person_name = llm_response.content.strip().lower() == "yes"
-
-                if is_person_name:
-                    # Store the person's name
-                    responses[question] = user_message
+                        # API call failed
+                        print(
+                            f"API Error - Status: {api_response.status_code}, Response: {api_response.text}"
+                        )
+                        responses["api_submission_status"] = "error"
+                        responses["api_error_message"] = api_response.text
+                        return {
+                            "response": f"Thank you for uploading the Excel file. However, there was an issue processing your data (Error: {api_response.status_code}). Please try again or contact support@insuranceclub.ae",
+                            "error_details": api_response.text,
+                        }
+                except httpx.HTTPError as e:
+                    # Handle request exceptions
+                    responses["api_submission_status"] = "error"
+                    responses["api_error_message"] = str(e)
+                    print(f"API request error: {e}")
+                    # Continue with normal flow even if API fails
                     conversation_state["current_question_index"] += 1
 
-                    # Check if there are more questions
                     if conversation_state["current_question_index"] < len(questions):
                         next_question = questions[
                             conversation_state["current_question_index"]
                         ]
-                        return {
-                            "response": f"Thank you for providing your name. Now, let's move on to: {next_question}"
-                        }
+                        if isinstance(next_question, dict):
+                            options = ", ".join(next_question.get("options", []))
+                            next_questions = next_question.get("question", "")
+                            return {
+                                "response": f"Thank you for uploading the Excel file. There was a temporary issue, but we've saved your data. Now, let's move on to: {next_questions}",
+                                "options": options,
+                            }
+                        else:
+                            return {
+                                "response": f"Thank you for uploading the Excel file. Now, let's move on to: {next_question}"
+                            }
                     else:
-                        # If all questions are completed, save responses and end conversation
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
                         return {
-                            "response": "Thank you for using Insura. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
+                            "response": "Thank you for uploading the Excel file. We will inform Shafeeque Shanavas from Wehbe Insurance to assist you further with your enquiry.",
                             "final_responses": responses,
                         }
-                else:
-                    # Handle invalid or unrelated input
-                    general_assistant_prompt = f"The user entered '{user_message}', which does not appear to be a person's name. Please assist."
-                    general_assistant_response = llm.invoke([
-                        SystemMessage(
-                            content="You are Insura, an AI assistant created by CloudSubset. Your role is to assist users with their inquiries. Your task here is to redirect or assist the user appropriately."
-                        ),
-                        HumanMessage(content=general_assistant_prompt),
-                    ])
-                    return {
-                        "response": f"{general_assistant_response.content.strip()}",
-                        "question": f"Let's move back to: {question}",
-                    }
-
-        elif (
-            question
-            == "Could you kindly provide me with the sponsor's Source of Income"
-        ):
-            valid_options = ["Business", "Salary"]
-            if user_message in valid_options:
-                responses[question] = user_message
+            else:
+                # Excel data doesn't exist yet - wait for it
                 conversation_state["current_question_index"] += 1
 
-                # Check if there are more questions
                 if conversation_state["current_question_index"] < len(questions):
                     next_question = questions[
                         conversation_state["current_question_index"]
                     ]
-                    if "options" in next_question:
-                        options = ", ".join(next_question["options"])
-                        next_questions = next_question["question"]
+                    if isinstance(next_question, dict):
+                        options = ", ".join(next_question.get("options", []))
+                        next_questions = next_question.get("question", "")
                         return {
-                            "response": f"Thank you! Now, let's move on to: {next_questions}",
+                            "response": f"Thank you for sharing the details. We will inform Shafeeque Shanavas from Wehbe Insurance to assist you further with your enquiry. Now, let's move on to: {next_questions}",
                             "options": options,
                         }
                     else:
                         return {
-                            "response": f"Thank you. Now, let's move on to: {next_question}"
+                            "response": f"Thank you for sharing the details. We will inform Shafeeque Shanavas from Wehbe Insurance to assist you further with your enquiry. Now, let's move on to: {next_question}"
                         }
                 else:
-                    with open("user_responses.json", "w") as file:
-                        json.dump(responses, file, indent=4)
+                    # Save responses and end the conversation - SMA flow completion
+                    record_completion(responses)
+
+                    # Reset conversation state to allow starting a new inquiry
+                    user_states[user_id] = {
+                        "current_question_index": 0,
+                        "responses": {},
+                        "current_flow": "initial",
+                        "welcome_shown": True,
+                        "awaiting_document_name": False,
+                        "document_name": "",
+                        "last_takaful_query_time": None,
+                        "awaiting_takaful_followup": False,
+                        "last_chronic_conditions_time": None,
+                        "awaiting_chronic_conditions_followup": False,
+                        "takaful_emarat_asked": False,
+                    }
+
                     return {
-                        "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
+                        "response": "Thank you for sharing the details. We will inform Shafeeque Shanavas from Wehbe Insurance to assist you further with your enquiry. Please wait for further assistance. If you have any questions, please contact support@insuranceclub.ae",
                         "final_responses": responses,
                     }
-            else:
-                # Handle invalid responses or unrelated queries
-                general_assistant_prompt = (
-                    f"user response: {user_message}. Please assist."
-                )
-                general_assistant_response = llm.invoke([
-                    HumanMessage(content=general_assistant_prompt)
-                ])
-                return {
-                    "response": f"{general_assistant_response.content.strip()}",
-                    "question": f"Let's try again: {question}\nPlease choose from the following options: {', '.join(valid_options)}",
-                }
+        else:
+            # Invalid file format
+            return {
+                "response": "The file format seems incorrect. Please upload a valid Excel file (xlsx or xls format) using the upload button."
+            }
+    return NOT_HANDLED
+
+
+async def _answer_has_advisor_code(
+    question, user_message, user_language, conversation_state, questions, responses, **_
+):
+    # Use the advisor code handler with multilingual support
+    return await handle_adiviosr_code(
+        question,
+        user_message,
+        responses,
+        conversation_state,
+        questions,
+        user_language,
+    )
 
-        elif (
-            question == "Are you suffering from any pre-existing or chronic conditions?"
-        ):
-            valid_options = ["Yes", "No"]
-            if user_message in valid_options:
-                responses[question] = user_message  # Store the response
-
-                if user_message == "No":
-                    # Check if the follow-up question is already in the list
-                    follow_up_question = "Please provide us with the details of your Chronic Conditions Medical Report"
-                    if follow_up_question in questions:
-                        # If the follow-up question exists, skip it and proceed
-                        questions.remove(follow_up_question)
-
-                    # Proceed to the next predefined question
-                    conversation_state["current_question_index"] += 1
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        options = ", ".join(next_question["options"])
-                        next_questions = next_question["question"]
 
-                        return {
-                            "response": f"Thank you! Now, let's move on to: {next_questions}",
-                            "options": options,
-                        }
-                    else:
-                        # All predefined questions have been answered
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                        return {
-                            "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
-                            "final_responses": responses,
-                        }
+async def _answer_sponsor_relationship(
+    question,
+    user_message,
+    user_language,
+    user_id,
+    conversation_state,
+    questions,
+    responses,
+    **_,
+):
+    # Use multilingual validation for relationship selection
+    valid_options = [
+        "Investor",
+        "Employee",
+        "Spouse",
+        "Child",
+        "4th Child",
+        "Parent",
+        "Domestic",
+    ]
+    return await handle_option_validation_multilingual(
+        user_message,
+        valid_options,
+        question,
+        user_language,
+        conversation_state,
+        questions,
+        responses,
+        user_id,
+    )
 
-                elif user_message == "Yes":
-                    # Dynamically add the follow-up question if not already present
-                    follow_up_question = "Please provide us with the details of your Chronic Conditions Medical Report"
-                    if follow_up_question not in questions:
-                        responses[follow_up_question] = None
-                        # Insert the new question immediately after the current one
-                        questions.insert(
-                            conversation_state["current_question_index"] + 1,
-                            follow_up_question,
-                        )
 
-                    # Move to the new follow-up question
-                    conversation_state["current_question_index"] += 1
+async def _answer_claim_license_front(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    if is_current_question(conversation_state, questions, question):
+        # Enhanced file path validation
+        upload_pattern = re.compile(
+            r"^uploads\/(?:[\w\s-]+\/)*[\w\s-]+\.(pdf|docx|jpg|png|jpeg)$",
+            re.IGNORECASE,
+        )
 
-                    return {
-                        "response": f"Thank you! Now, let's move on to: {follow_up_question}",
-                    }
+        if upload_pattern.match(user_message):
+            # Valid file format
+            responses[question] = user_message
+            conversation_state["current_question_index"] += 1
+
+            # Check if there are more questions
+            if conversation_state["current_question_index"] < len(questions):
+                next_question = questions[conversation_state["current_question_index"]]
+                return {
+                    "response": f"Thank you for providing the driving license Front side. Now, let's move on to: {next_question}",
+                }
             else:
-                pass
+                # Save responses and end the conversation
+                record_completion(responses)
+                return {
+                    "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
+                    "final_responses": responses,
+                }
+        else:
+            # Invalid file format
+            return {
+                "response": "The file format seems incorrect. Please upload a valid document."
+            }
+    return NOT_HANDLED
 
-        elif (
-            question
-            == "Please provide us with the details of your Chronic Conditions Medical Report"
-        ):
-            # if conversation_state["current_question_index"] == questions.index(question):
-            #     # Enhanced file path validation
-            #     upload_pattern = re.compile(
-            #         r"^uploads\/(?:[\w\s-]+\/)*[\w\s-]+\.(pdf|docx|jpg|png|jpeg)$", re.IGNORECASE
-            #     )
-
-            #     if upload_pattern.match(user_message):
-            #         # Valid file format
-            #         responses[question] = user_message
-            #         conversation_state["current_question_index"] += 1
-
-            #         # Check if there are more questions
-            #         if conversation_state["current_question_index"] < len(questions):
-            #             next_question = questions[conversation_state["current_question_index"]]
-            #             return {
-            #                 "response": f"Thank you for providing the document. Now, let's move on to: {next_question}",
-            #             }
-            #         else:
-            #             # Save responses and end the conversation
-            #             with open("user_responses.json", "w") as file:
-            #                 json.dump(responses, file, indent=4)
-            #             return {
-            #                 "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
-            #                 "final_responses": responses,
-            #             }
-            #     else:
-            #         # Invalid file format
-            #         return {
-            #            "response": "The file format seems incorrect. Please upload a valid document."
-            #         }
-
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Store user message as is without validation
-                responses[question] = user_message
-                conversation_state["current_question_index"] += 1
 
-                # Check if there are more questions
-                if conversation_state["current_question_index"] < len(questions):
-                    next_question = questions[
-                        conversation_state["current_question_index"]
-                    ]
-                    options = ", ".join(next_question["options"])
-                    next_questions = next_question["question"]
+async def _answer_claim_license_back(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    if is_current_question(conversation_state, questions, question):
+        # Enhanced file path validation
+        upload_pattern = re.compile(
+            r"^uploads\/(?:[\w\s-]+\/)*[\w\s-]+\.(pdf|docx|jpg|png|jpeg)$",
+            re.IGNORECASE,
+        )
 
-                    return {
-                        "response": f"Thank you! Now, let's move on to: {next_questions}",
-                        "options": options,
-                    }
-                else:
-                    # Save responses and end the conversation
-                    with open("user_responses.json", "w") as file:
-                        json.dump(responses, file, indent=4)
-                    return {
-                        "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
-                        "final_responses": responses,
-                    }
+        if upload_pattern.match(user_message):
+            # Valid file format
+            responses[question] = user_message
+            conversation_state["current_question_index"] += 1
+
+            # Check if there are more questions
+            if conversation_state["current_question_index"] < len(questions):
+                next_question = questions[conversation_state["current_question_index"]]
+                return {
+                    "response": f"Thank you for providing the driving license. Now, let's move on to: {next_question}",
+                }
             else:
-                # Handle other questions or general assistance
-                pass
-        elif question in [
-            "May I have the sponsor's Email Address, please?",
-            "May i know your Email address",
-            "May I have the Client Email Address, please?",
-        ]:
-            # Regex pattern for validating email address - also accept numbers
-            email_pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-            # Check if it's an email or just numbers (accept both)
-            is_valid_input = (
-                re.match(email_pattern, user_message) or user_message.strip().isdigit()
-            )
+                # Save responses and end the conversation
+                record_completion(responses)
+                return {
+                    "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
+                    "final_responses": responses,
+                }
+        else:
+            # Invalid file format
+            return {
+                "response": "The file format seems incorrect. Please upload a valid document."
+            }
+    return NOT_HANDLED
 
-            if is_valid_input:
-                responses[question] = user_message
+
+async def _answer_claim_mulkiya_front(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    if is_current_question(conversation_state, questions, question):
+        # Enhanced file path validation
+        upload_pattern = re.compile(
+            r"^uploads\/(?:[\w\s-]+\/)*[\w\s-]+\.(pdf|docx|jpg|png|jpeg)$",
+            re.IGNORECASE,
+        )
+
+        if upload_pattern.match(user_message):
+            # Valid file format
+            responses[question] = user_message
+            conversation_state["current_question_index"] += 1
+
+            # Check if there are more questions
+            if conversation_state["current_question_index"] < len(questions):
+                next_question = questions[conversation_state["current_question_index"]]
+                return {
+                    "response": f"Thank you for providing vehicle registration Front side. Now, let's move on to: {next_question}",
+                }
+            else:
+                # Save responses and end the conversation
+                record_completion(responses)
+                return {
+                    "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
+                    "final_responses": responses,
+                }
+        else:
+            # Invalid file format
+            return {
+                "response": "The file format seems incorrect. Please upload a valid document."
+            }
+    return NOT_HANDLED
+
+
+async def _answer_claim_mulkiya_back(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    if is_current_question(conversation_state, questions, question):
+        # Enhanced file path validation
+        upload_pattern = re.compile(
+            r"^uploads\/(?:[\w\s-]+\/)*[\w\s-]+\.(pdf|docx|jpg|png|jpeg)$",
+            re.IGNORECASE,
+        )
+
+        if upload_pattern.match(user_message):
+            # Valid file format
+            responses[question] = user_message
+            conversation_state["current_question_index"] += 1
+
+            # Check if there are more questions
+            if conversation_state["current_question_index"] < len(questions):
+                next_question = questions[conversation_state["current_question_index"]]
+                return {
+                    "response": f"Thank you for providing the vehicle registration Back side. Now, let's move on to: {next_question}",
+                }
+            else:
+                # Save responses and end the conversation
+                record_completion(responses)
+                return {
+                    "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
+                    "final_responses": responses,
+                }
+        else:
+            # Invalid file format
+            return {
+                "response": "The file format seems incorrect. Please upload a valid document."
+            }
+    return NOT_HANDLED
+
+
+async def _answer_claim_police_report(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    if is_current_question(conversation_state, questions, question):
+        # Enhanced file path validation
+        upload_pattern = re.compile(
+            r"^uploads\/(?:[\w\s-]+\/)*[\w\s-]+\.(pdf|docx|jpg|png|jpeg)$",
+            re.IGNORECASE,
+        )
+
+        if upload_pattern.match(user_message):
+            # Valid file format
+            responses[question] = user_message
+            conversation_state["current_question_index"] += 1
+
+            # Check if there are more questions
+            if conversation_state["current_question_index"] < len(questions):
+                next_question = questions[conversation_state["current_question_index"]]
+                options = ", ".join(next_question["options"])
+                next_questions = next_question["question"]
+                return {
+                    "response": f"Thank you for providing the Policy Report. Now, let's move on to: {next_questions}",
+                    "options": options,
+                }
+
+            else:
+                # Save responses and end the conversation
+                record_completion(responses)
+                return {
+                    "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
+                    "final_responses": responses,
+                }
+        else:
+            # Invalid file format
+            return {
+                "response": "The file format seems incorrect. Please upload a valid document."
+            }
+    return NOT_HANDLED
+
+
+async def _answer_job_title(
+    question, user_message, user_language, conversation_state, questions, responses, **_
+):
+    return await handle_job_title_question(
+        question,
+        user_message,
+        conversation_state,
+        questions,
+        responses,
+        user_language,
+    )
+
+
+async def _answer_sponsor_type(
+    question,
+    user_message,
+    user_language,
+    user_id,
+    conversation_state,
+    questions,
+    responses,
+    **_,
+):
+    valid_options = ["Employee", "Investors"]
+    # Use generic multilingual handler
+    return await handle_option_validation_multilingual(
+        user_message,
+        valid_options,
+        question,
+        user_language,
+        conversation_state,
+        questions,
+        responses,
+        user_id,
+    )
+
+
+async def _answer_currency(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    valid_options = ["AED", "USD"]
+    if user_message in valid_options:
+        responses["question"] = user_message
+        conversation_state["current_question_index"] += 1
+
+        if conversation_state["current_question_index"] < len(questions):
+            next_question = questions[conversation_state["current_question_index"]]
+            if "options" in next_question:
+                options = ", ".join(next_question["options"])
+                next_questions = next_question["question"]
+                return {
+                    "response": f"Thank you! Now, let's move on to: {next_questions}",
+                    "options": options,
+                }
+            else:
+                return {
+                    "response": f"Thank you. Now, let's move on to: {next_question}"
+                }
+        else:
+            record_completion(responses)
+            return {
+                "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
+                "final_responses": responses,
+            }
+    else:
+        # Handle invalid responses or unrelated queries
+        general_assistant_prompt = f"user response: {user_message}. Please assist."
+        general_assistant_response = await cached_reply(
+            llm, [HumanMessage(content=general_assistant_prompt)], user_message
+        )
+        return {
+            "response": f"{general_assistant_response.content.strip()}",
+            "question": f"Let's try again: {question}\nPlease choose from the following options: {', '.join(valid_options)}",
+        }
+
+
+async def _answer_monthly_salary(
+    question, user_message, user_language, conversation_state, questions, responses, **_
+):
+    if is_current_question(conversation_state, questions, question):
+        try:
+            # Check if the input is a valid numeric value
+            salary = float(user_message)  # Attempt to convert the input to a float
+            if salary > 0:  # Ensure it's a positive number
+                # Store the salary
+                responses[question] = salary
                 conversation_state["current_question_index"] += 1
 
                 # Check if there are more questions
@@ -4201,56 +4552,43 @@ def process_user_input(user_input: UserInput):
                     next_question = questions[
                         conversation_state["current_question_index"]
                     ]
+                    if "options" in next_question:
+                        options = ", ".join(next_question["options"])
+                        next_questions = next_question["question"]
 
-                    # Determine appropriate response based on current flow and question
-                    if (
-                        current_flow == "sma"
-                        and question == "May I have the Client Email Address, please?"
-                    ):
-                        thank_you_message = (
-                            "Thank you for providing the client's email! 📧"
+                        # Translate response to user's language
+                        thank_you_msg = await translate_text(
+                            f"Thank you! 😊 Now, let's move on to: {next_questions}",
+                            user_language,
                         )
-                    else:
-                        thank_you_message = (
-                            "Thank you for providing the sponsor's email! 📧"
+                        translated_options = await translate_batch(
+                            next_question["options"], user_language
                         )
 
-                    # Get next question text
-                    next_question_text = (
-                        next_question["question"]
-                        if isinstance(next_question, dict)
-                        else next_question
-                    )
-
-                    # Translate response to user's language
-                    response_msg = translate_text(
-                        f"{thank_you_message} Now, let's move on to: {next_question_text}",
-                        user_language,
-                    )
-
-                    if isinstance(next_question, dict) and "options" in next_question:
-                        translated_options = [
-                            translate_text(opt, user_language)
-                            for opt in next_question["options"]
-                        ]
                         return {
-                            "response": response_msg,
-                            "options": ", ".join(translated_options),
+                            "response": thank_you_msg,
+                            "options": translated_options,
                             "language": user_language,
                             "language_code": get_language_code(user_language),
                         }
                     else:
+                        # Translate response to user's language
+                        thank_you_msg = await translate_text(
+                            f"Thank you for providing your salary! 💰 Now, let's move on to: {next_question}",
+                            user_language,
+                        )
                         return {
-                            "response": response_msg,
+                            "response": thank_you_msg,
                             "language": user_language,
                             "language_code": get_language_code(user_language),
                         }
                 else:
-                    with open("user_responses.json", "w") as file:
-                        json.dump(responses, file, indent=4)
+                    # If all questions are completed, save responses and end conversation
+                    record_completion(responses)
 
-                    completion_msg = translate_text(
-                        "Thank you for sharing the details! 🎉 We will inform Shafeeque Shanavas from Wehbe Insurance to assist you further with your enquiry. Please wait for further assistance. If you have any questions, please contact support@insuranceclub.ae",
+                    # Translate completion message to user's language
+                    completion_msg = await translate_text(
+                        "Thank you for using Insura! 🎉 Your request has been processed. If you have any further questions, feel free to ask. Have a great day! 😊",
                         user_language,
                     )
                     return {
@@ -4260,717 +4598,1007 @@ def process_user_input(user_input: UserInput):
                         "language_code": get_language_code(user_language),
                     }
             else:
-                # Handle invalid input
-                general_assistant_prompt = f"The user entered '{user_message}'. Please assist them in {user_language}."
-                general_assistant_response = llm.invoke([
+                # Handle invalid input for non-positive values
+                error_msg = await translate_text(
+                    "The salary must be a positive number. Could you please re-enter your monthly salary in AED?",
+                    user_language,
+                )
+                translated_question = await translate_text(question, user_language)
+                return {
+                    "response": error_msg,
+                    "question": translated_question,
+                    "language": user_language,
+                    "language_code": get_language_code(user_language),
+                }
+        except ValueError:
+            # If invalid input, use the general assistant
+            general_assistant_prompt = f"The user entered '{user_message}', which does not appear to be a valid monetary amount. Please assist them in {user_language}."
+            general_assistant_response = await cached_reply(
+                llm,
+                [
                     SystemMessage(
-                        content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                        content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
                     ),
                     HumanMessage(content=general_assistant_prompt),
-                ])
+                ],
+                user_message,
+                user_language,
+            )
+
+            retry_msg = await translate_text(
+                f"Let's move back to: {question}", user_language
+            )
+            return {
+                "response": f"{general_assistant_response.content.strip()}",
+                "question": retry_msg,
+                "language": user_language,
+                "language_code": get_language_code(user_language),
+            }
+    return NOT_HANDLED
+
+
+async def _answer_emirate(
+    question, user_message, user_language, conversation_state, questions, responses, **_
+):
+    return await handle_emirate_question(
+        question,
+        user_message,
+        conversation_state,
+        questions,
+        responses,
+        user_language,
+    )
+
+
+async def _answer_repair_area(
+    question, user_message, conversation_state, questions, responses, **_
+):
+    if is_current_question(conversation_state, questions, question):
+        # Fetch the emirate from the previous response
+        emirate = (
+            responses
+            .get(
+                "In which emirate would you prefer your vehicle to be repaired?",
+                "",
+            )
+            .strip()
+            .lower()
+        )
+
+        # Prompt LLM for additional validation
+        check_prompt = (
+            f"The user has responded with: '{user_message}'. Determine if this is a valid area within the emirate '{emirate}'. "
+            "Respond only with 'Yes' or 'No'."
+        )
+        llm_response = await llm.ainvoke([
+            SystemMessage(
+                content=f"You are Insura, an AI assistant specialized in identifying the area based on the {emirate}. "
+                "Your task is to verify if the provided input is a valid area within the specified emirate."
+            ),
+            HumanMessage(content=check_prompt),
+        ])
+        is_valid_area = llm_response.content.strip().lower() == "yes"
+
+        if is_valid_area:
+            # Store the area
+            responses[question] = user_message
+            conversation_state["current_question_index"] += 1
+
+            if conversation_state["current_question_index"] < len(questions):
+                next_question = questions[conversation_state["current_question_index"]]
+                if "options" in next_question:
+                    options = ", ".join(next_question["options"])
+                    next_questions = next_question["question"]
+                    return {
+                        "response": f"Thank you! Now, let's move on to: {next_questions}",
+                        "options": options,
+                    }
+                else:
+                    return {
+                        "response": f"Thank you for providing the area. Now, let's move on to: {next_question['question']}"
+                    }
+            else:
+                # All questions completed
+                record_completion(responses)
                 return {
-                    "response": f"{general_assistant_response.content.strip()}",
-                    "question": f"Let's move back to: {question}",
-                    "example": "The email address should be in this format: example@gmail.com",
+                    "response": "Thank you for using Insura. Your request has been processed. Have a great day!",
+                    "final_responses": responses,
                 }
-        elif (
-            question
-            == "Please upload an Excel file to get your medical insurance details"
-        ):
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Import user_states from excel_upload module
-                from routes.excel_upload import user_states as excel_user_states
-                import requests
-
-                # Check if user has uploaded Excel file via the upload-excel endpoint
-                excel_data_exists = (
-                    user_id in excel_user_states
-                    and "responses" in excel_user_states[user_id]
-                    and "excel_employee_data" in excel_user_states[user_id]["responses"]
-                )
+        else:
+            # Use general assistant for invalid LLM validation
+            general_assistant_prompt = (
+                f"The user entered '{user_message}', which was not validated as a valid area within the emirate '{emirate}' by Insura. "
+                "Please assist them in correcting their input."
+            )
+            general_assistant_response = await cached_reply(
+                llm,
+                [
+                    SystemMessage(
+                        content="You are Insura, an AI assistant created by CloudSubset. "
+                        "Your role is to assist users with their inquiries and guide them appropriately."
+                    ),
+                    HumanMessage(content=general_assistant_prompt),
+                ],
+                user_message,
+            )
+            return {
+                "response": f"{general_assistant_response.content.strip()}",
+                "question": f"Let's try again: {question}\n",
+            }
+    return NOT_HANDLED
+
+
+async def _answer_date_of_birth(
+    question, user_message, user_language, conversation_state, questions, responses, **_
+):
+    return await handle_date_question(
+        question,
+        user_message,
+        responses,
+        conversation_state,
+        questions,
+        user_language,
+    )
 
-                # Also check for file path patterns (backwards compatibility)
-                upload_pattern = re.compile(
-                    r"^(?:uploads\/)?(?:[\w\s\-\.\/]+\/)*[\w\s\-\.]+\.(xlsx|xls)$",
-                    re.IGNORECASE,
-                )
 
-                is_valid_file_path = (
-                    upload_pattern.match(user_message)
-                    or user_message.lower().endswith((".xlsx", ".xls"))
-                    or "uploaded" in user_message.lower()
-                    or "excel" in user_message.lower()
-                )
+SHARED_QUESTION_HANDLERS = {
+    "Please Enter Your PassKey": _answer_passkey,
+    "What type of plan are you looking for?": _answer_plan_type,
+    "Please Upload Your Document": _answer_document_upload,
+    "Please Upload Back Page of Your Document": _answer_document_back_page,
+    "Please Upload Front Page of Your Document": _answer_document_front_page,
+    "May I have the sponsor's mobile number, please?": _answer_sponsor_mobile_number,
+    "What would you like to do today?": _answer_main_menu,
+    "Now, let's move to the sponsor details. Please provide the Sponsor Name?": _answer_person_name,
+    "Please provide the member's details.Please tell me the Name": _answer_person_name,
+    "Next, Please provide the member's details.Please tell me the Name": _answer_person_name,
+    "Could you please provide your full name": _answer_person_name,
+    "Could you kindly share your contact details with me? To start, may I know your name, please?": _answer_person_name,
+    "Please enter your Insurance Advisor code for assigning your enquiry for further assistance": _answer_advisor_code_entry,
+    "May I have the sponsor's Email Address, please?": _answer_email_address,
+    "May i know your Email address": _answer_email_address,
+    "May I have the Client Email Address, please?": _answer_email_address,
+    "Do you have an Insurance Advisor code?": _answer_has_advisor_code,
+    "Now, let's move to the sponsor details, Could you let me know the sponsor's type?": _answer_sponsor_type,
+    "Could you please tell me your monthly salary?": _answer_monthly_salary,
+    "Tell me your Emirate": _answer_emirate,
+    "Tell me your Emirate sponsor located in?": _answer_emirate,
+    "In which emirate would you prefer your vehicle to be repaired?": _answer_emirate,
+    "Let's start with your motor insurance details. Select the city of registration": _answer_emirate,
+}
+
+
+MEDICAL_QUESTION_HANDLERS = {
+    "May I know your name, please?": _answer_emaf_name,
+    "May I kindly ask for your phone number, please?": _answer_emaf_phone_number,
+    "Could you kindly confirm the name of your insurance company, please?": _answer_emaf_insurance_company,
+    "Please confirm this gender of": _answer_gender_confirmation,
+    "Next, we need the details of the member. Would you like to upload their Emirates ID or manually enter the information?": _answer_member_id_choice,
+    "Please choose which one would you like to": _answer_medical_plan_choice,
+    "Please Confirm the marital status of": _answer_member_marital_status,
+    "May I know sponsor's marital status?": _answer_sponsor_marital_status,
+    "Tell me you Height in Cm": _answer_height,
+    "Tell me you Weight in Kg": _answer_weight,
+    "What company does the sponsor work for?": _answer_sponsor_company,
+    "Have you been vaccinated for Covid-19?": _answer_covid_vaccination,
+    "Can you please tell me the date of your first dose?": _answer_first_dose_date,
+    "Can you please tell me the date of your second dose?": _answer_second_dose_date,
+    "Next, we need the details of the member for whom the policy is being purchased. Please provide Name": _answer_member_name,
+    "Could you provide the sponsor's Emirates ID?": _answer_sponsor_emirates_id,
+    "Could you kindly provide me with the sponsor's Source of Income": _answer_sponsor_income_source,
+    "Are you suffering from any pre-existing or chronic conditions?": _answer_chronic_conditions,
+    "Please provide us with the details of your Chronic Conditions Medical Report": _answer_chronic_conditions_report,
+    "Could you kindly share your relationship with the sponsor?": _answer_sponsor_relationship,
+    "Please provide us with your job title": _answer_job_title,
+    "Please provide us with the member job title.": _answer_job_title,
+}
+
+
+SMA_QUESTION_HANDLERS = {
+    "May I have the Client Name, please?": _answer_client_name,
+    "May I have the Client mobile number, please?": _answer_client_mobile_number,
+    "Please upload an Excel file to get your medical insurance details": _answer_sma_excel_upload,
+}
+
+
+CAR_QUESTION_HANDLERS = {
+    "Please Upload Your Driving license": _answer_driving_license_upload,
+    "Please Upload Mulkiya": _answer_mulkiya_upload,
+    "Next, we need the details of the car owner. Would you like to upload their Emirates ID or manually enter the information?": _answer_car_owner_id_choice,
+    "You Wish to Buy": _answer_car_purchase_type,
+    "Let me know the make of the car": _answer_car_make,
+    "May I know the model number of your car, please?": _answer_car_model,
+    "May I know the variant of your car, please?": _answer_car_variant,
+    "Can you please tell me the year your insurance expired?": _answer_insurance_expiry_year,
+    "How many years of driving experience do you have in the UAE?": _answer_driving_experience,
+    "Could you please let me know the year your car was made?": _answer_car_manufacture_year,
+    "Could you please provide the registration details? When was your car first registered?": _answer_car_registration_year,
+    "Do you have a No Claim certificate?": _answer_no_claim_certificate,
+    "Do you have a vehicle test passing certificate?": _answer_vehicle_test_certificate,
+    "Does your current policy have comprehensive cover?": _answer_comprehensive_cover,
+    "Does your policy include agency repair?": _answer_agency_repair,
+}
+
+
+BIKE_QUESTION_HANDLERS = {
+    "Now, let's gather some details about your bike. Let me know the make of the bike.": _answer_bike_make,
+    "Could you please tell me the model number of your bike": _answer_bike_model,
+    "Could you please tell me the Variant of your bike": _answer_bike_variant,
+    "Could you please tell me the year your bike was made?": _answer_bike_manufacture_year,
+    "Could you please provide the registration details? When was your bike first registered?": _answer_bike_registration_year,
+}
+
+
+EXISTING_POLICY_QUESTION_HANDLERS = {
+    "Which insurance company is your current policy with?": _answer_current_insurer,
+    "Your policy is up for renewal. Would you like to proceed with renewing it?": _answer_policy_renewal,
+    "May I kindly ask you to tell me the currency?": _answer_currency,
+    "Date of Birth (DOB)": _answer_date_of_birth,
+}
+
+
+MOTOR_CLAIM_QUESTION_HANDLERS = {
+    "Please upload photos of your driving license Front side": _answer_claim_license_front,
+    "Please upload photos of your driving license Back side": _answer_claim_license_back,
+    "Please upload photos of your vehicle registration (Mulkiya) Front side": _answer_claim_mulkiya_front,
+    "Please upload photos of your vehicle registration (Mulkiya)  Back side": _answer_claim_mulkiya_back,
+    "Please upload a copy of the police report related to the incident": _answer_claim_police_report,
+    "Which area you prefer for the vehicle repair? Please type the name of the area": _answer_repair_area,
+}
+
+
+def _build_question_registry(*tables) -> dict:
+    """
+    Merge the per-flow handler tables into a single question -> handler map.
 
-                if excel_data_exists or is_valid_file_path:
-                    # Valid Excel file format or data exists
-                    responses[question] = user_message
+    Raises:
+        ValueError: If two flows register different handlers for the same question
+    """
+    registry = {}
+    for table in tables:
+        for question, handler in table.items():
+            if registry.setdefault(question, handler) is not handler:
+                raise ValueError(f"Conflicting handlers for question: {question!r}")
+    return registry
+
+
+QUESTION_HANDLERS = _build_question_registry(
+    SHARED_QUESTION_HANDLERS,
+    MEDICAL_QUESTION_HANDLERS,
+    SMA_QUESTION_HANDLERS,
+    CAR_QUESTION_HANDLERS,
+    BIKE_QUESTION_HANDLERS,
+    EXISTING_POLICY_QUESTION_HANDLERS,
+    MOTOR_CLAIM_QUESTION_HANDLERS,
+)
 
-                    # Store the Excel file path/confirmation for processing
-                    responses["excel_file_path"] = user_message
 
-                    # If Excel data exists, store it in responses
-                    if excel_data_exists:
-                        responses["excel_employee_data"] = excel_user_states[user_id][
-                            "responses"
-                        ]["excel_employee_data"]
+def benchmark_dispatch(rounds: int = 20000) -> dict:
+    """
+    Measure the per-turn cost of finding the handler for the current question.
 
-                        # Get the Excel employee data
-                        excel_data = excel_user_states[user_id]["responses"][
-                            "excel_employee_data"
-                        ]
-                        employees_list = excel_data.get("employees", [])
-                        print(
-                            f"Excel Employees List: {json.dumps(employees_list, indent=2)}"
-                        )
+    "chain" reproduces the old lookup: compare the question against every
+    handled question in turn, then call questions.index(question) to confirm it
+    is current. "registry" is the dictionary lookup plus is_current_question.
 
-                        # Build the members array from Excel data
-                        members = []
-                        for emp in employees_list:
-                            member = {
-                                "mem_name": emp.get("first_name", ""),
-                                "mem_dob": emp.get("date_of_birth", ""),
-                                "mem_gender": emp.get("gender", ""),
-                                "mem_marital_status": emp.get("marital_status", ""),
-                                "mem_relation": emp.get("relation", ""),
-                                "mem_nationality": emp.get("nationality", ""),
-                                "mem_emirate": emp.get("visa_issued_location", ""),
-                            }
-                            members.append(member)
-                        print(f"Built Members Array: {json.dumps(members, indent=2)}")
-
-                        # Get the other responses from the conversation
-                        visa_issued_emirates = ""
-                        plan = ""
-                        client_name = ""
-                        client_mobile = ""
-                        client_email = ""
-
-                        print(f"All Responses: {json.dumps(responses, indent=2)}")
-
-                        # Find these from the responses dictionary
-                        for key, value in responses.items():
-                            if (
-                                "Visa issued Emirate" in key
-                                or key
-                                == "Let's start with your Medical insurance details. Choose your Visa issued Emirate?"
-                            ):
-                                visa_issued_emirates = value
-                            elif (
-                                "type of plan" in key.lower()
-                                or key == "What type of plan are you looking for?"
-                            ):
-                                plan = value
-                            elif "Client Name" in key:
-                                client_name = value
-                            elif "Client mobile" in key:
-                                client_mobile = value
-                            elif "Client Email" in key:
-                                client_email = value
-
-                        print(f"Extracted Values:")
-                        print(f"  visa_issued_emirates: {visa_issued_emirates}")
-                        print(f"  plan: {plan}")
-                        print(f"  client_name: {client_name}")
-                        print(f"  client_mobile: {client_mobile}")
-                        print(f"  client_email: {client_email}")
-
-                        # Validate required fields
-                        if (
-                            not visa_issued_emirates
-                            or not plan
-                            or not client_name
-                            or not client_mobile
-                            or not client_email
-                        ):
-                            print("ERROR: Missing required fields!")
-                            return {
-                                "response": "Thank you for uploading the Excel file. However, some required information is missing. Please provide all client details.",
-                                "missing_fields": {
-                                    "visa_issued_emirates": not visa_issued_emirates,
-                                    "plan": not plan,
-                                    "client_name": not client_name,
-                                    "client_mobile": not client_mobile,
-                                    "client_email": not client_email,
-                                },
-                            }
+    Args:
+        rounds: Number of passes over every handled question of every flow
 
-                        # Prepare the JSON payload
-                        payload = {
-                            "visa_issued_emirates": visa_issued_emirates,
-                            "plan": plan,
-                            "client_name": client_name,
-                            "client_mobile": client_mobile,
-                            "client_email": client_email,
-                            "currency": "",
-                            "census_sheet": "",
-                            "members": members,
-                        }
+    Returns:
+        Mean nanoseconds per turn for both strategies
+    """
+    flows = [
+        initial_questions,
+        medical_questions,
+        individual_questions,
+        sma_questions,
+        existing_policy_questions,
+        motor_insurance_questions,
+        car_questions,
+        bike_questions,
+        motor_claim,
+    ]
+    turns = []
+    for flow in flows:
+        questions = [
+            item["question"] if isinstance(item, dict) else item for item in flow
+        ]
+        for index, question in enumerate(questions):
+            if question in QUESTION_HANDLERS:
+                turns.append((questions, question, {"current_question_index": index}))
+    branches = list(QUESTION_HANDLERS.items())
+
+    def chain_lookup(questions, question, conversation_state):
+        for candidate, handler in branches:
+            if question == candidate:
+                return handler, conversation_state[
+                    "current_question_index"
+                ] == questions.index(question)
+
+    def registry_lookup(questions, question, conversation_state):
+        return QUESTION_HANDLERS.get(question), is_current_question(
+            conversation_state, questions, question
+        )
 
-                        # Submit to the API
-                        try:
-                            # Print the payload for debugging
-                            print(f"API Payload: {json.dumps(payload, indent=2)}")
-                            print(f"API URL: {INSURANCE_LAB_SME_ADD_API}")
-
-                            # Set proper headers to avoid Mod_Security issues
-                            headers = {
-                                "Content-Type": "application/json",
-                                "Accept": "application/json",
-                                "User-Agent": "InsuraBot/1.0",
-                            }
+    results = {"turns": len(turns), "rounds": rounds}
+    for name, lookup in [("chain", chain_lookup), ("registry", registry_lookup)]:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for questions, question, conversation_state in turns:
+                lookup(questions, question, conversation_state)
+        elapsed = time.perf_counter() - start
+        results[f"{name}_ns"] = round(elapsed / (rounds * len(turns)) * 1e9, 1)
+    return results
 
-                            # Try to send as JSON first
-                            try:
-                                api_response = requests.post(
-                                    INSURANCE_LAB_SME_ADD_API,
-                                    json=payload,
-                                    headers=headers,
-                                    timeout=30,
-                                )
-                            except:
-                                # If JSON fails, try as form data
-                                print("JSON request failed, trying form data...")
-                                api_response = requests.post(
-                                    INSURANCE_LAB_SME_ADD_API,
-                                    data=payload,
-                                    headers=headers,
-                                    timeout=30,
-                                )
-
-                            print(f"API Response Status: {api_response.status_code}")
-                            print(f"API Response Text: {api_response.text}")
-
-                            if api_response.status_code == 200:
-                                response_data = api_response.json()
-                                print(
-                                    f"API Response Data: {json.dumps(response_data, indent=2)}"
-                                )
-
-                                # Store the ID from response if it exists
-                                response_id = response_data.get("id", "")
-                                print(f"Extracted ID: {response_id}")
-
-                                # Build the customer plan link using the ID
-                                customer_plan_link = (
-                                    f"{INSURANCE_LAB_SME_PLAN_BASE}/{response_id}"
-                                )
-
-                                # Store API response in user state
-                                responses["api_response_id"] = response_id
-                                responses["api_submission_status"] = "success"
-                                responses["customer_plan_link"] = customer_plan_link
-
-                                # Check if there are more questions after this
-                                conversation_state["current_question_index"] += 1
-
-                                if conversation_state["current_question_index"] < len(
-                                    questions
-                                ):
-                                    next_question = questions[
-                                        conversation_state["current_question_index"]
-                                    ]
-                                    if isinstance(next_question, dict):
-                                        if "options" in next_question:
-                                            options = ", ".join(
-                                                next_question["options"]
-                                            )
-                                            next_questions = next_question["question"]
-                                            return {
-                                                "response": f"Thank you for uploading the Excel file. Your data has been processed successfully (ID: {response_id}). Now, let's move on to: {next_questions}",
-                                                "options": options,
-                                                "submission_id": response_id,
-                                                "customer_plan_link": customer_plan_link,
-                                            }
-                                        else:
-                                            next_questions = next_question["question"]
-                                            return {
-                                                "response": f"Thank you for uploading the Excel file. Your data has been processed successfully (ID: {response_id}). Now, let's move on to: {next_questions}",
-                                                "submission_id": response_id,
-                                                "customer_plan_link": customer_plan_link,
-                                            }
-                                    else:
-                                        return {
-                                            "response": f"Thank you for uploading the Excel file. Your data has been processed successfully (ID: {response_id}). Now, let's move on to: {next_question}",
-                                            "submission_id": response_id,
-                                            "customer_plan_link": customer_plan_link,
-                                        }
-                                else:
-                                    # Save responses and end the conversation - SMA flow completion
-                                    with open("user_responses.json", "w") as file:
-                                        json.dump(responses, file, indent=4)
-
-                                    # Format the response similar to individual flow
-                                    success_message = "Thank you for sharing the details. We will inform Shafeeque Shanavas from Wehbe Insurance to assist you further with your enquiry. Please find the link below to view your quotation:"
-                                    review_message = "If you are satisfied with Wehbe(Broker) services, please leave a review for sharing happiness to others!!😊"
-
-                                    # Translate messages if needed
-                                    translated_success = (
-                                        translate_text(success_message, user_language)
-                                        if user_language != "English"
-                                        else success_message
-                                    )
-                                    translated_review = (
-                                        translate_text(review_message, user_language)
-                                        if user_language != "English"
-                                        else review_message
-                                    )
-
-                                    # Reset conversation state to allow starting a new inquiry
-                                    # Save the language preference before resetting
-                                    saved_language = conversation_state.get(
-                                        "preferred_language", "English"
-                                    )
-                                    saved_language_code = conversation_state.get(
-                                        "language_code", "en"
-                                    )
-                                    saved_language_explicitly_set = (
-                                        conversation_state.get(
-                                            "language_explicitly_set", False
-                                        )
-                                    )
-
-                                    user_states[user_id] = {
-                                        "current_question_index": 0,
-                                        "responses": {},
-                                        "current_flow": "initial",
-                                        "welcome_shown": False,  # Set to False to allow new greeting on restart
-                                        "awaiting_document_name": False,
-                                        "document_name": "",
-                                        "last_takaful_query_time": None,
-                                        "awaiting_takaful_followup": False,
-                                        "last_chronic_conditions_time": None,
-                                        "awaiting_chronic_conditions_followup": False,
-                                        "takaful_emarat_asked": False,
-                                        "preferred_language": saved_language,  # Preserve language
-                                        "language_code": saved_language_code,
-                                        "language_explicitly_set": saved_language_explicitly_set,  # Preserve explicit setting
-                                    }
 
-                                    return {
-                                        "response": translated_success,
-                                        "link": customer_plan_link,
-                                        "review_message": translated_review,
-                                        "review_link": "https://www.google.com/search?client=ms-android-samsung-ss&sca_esv=4eb717e6f42bf628&sxsrf=AHTn8zprabdPVFL3C2gXo4guY8besI3jqQ:1744004771562&q=wehbe+insurance+services+llc+reviews&uds=ABqPDvy-z0dcsfm2PY76_gjn-YWou9-AAVQ4iWjuLR6vmDV0vf3KpBMNjU5ZkaHGmSY0wBrWI3xO9O55WuDmXbDq6a3SqlwKf2NJ5xQAjebIw44UNEU3t4CpFvpLt9qFPlVh2F8Gfv8sMuXXSo2Qq0M_ZzbXbg2c323G_bE4tVi7Ue7d_sW0CrnycpJ1CvV-OyrWryZw_TeQ3gLGDgzUuHD04MpSHquYZaSQ0_mIHLWjnu7fu8c7nb6_aGDb_H1Q-86fD2VmWluYA5jxRkC9U2NsSwSSXV4FPW9w1Q2T_Wjt6koJvLgtikd66MqwYiJPX2x9MwLhoGYlpTbKtkJuHwE9eM6wQgieChskow6tJCVjQ75I315dT8n3tUtasGdBkprOlUK9ibPrYr9HqRz4AwzEQaxAq9_EDcsSG_XW0CHuqi2lRKHw592MlGlhjyQibXKSZJh-v3KW4wIVqa-2x0k1wfbZdpaO3BZaKYCacLOxwUKTnXPbQqDPLQDeYgDBwaTLvaCN221H&si=APYL9bvoDGWmsM6h2lfKzIb8LfQg_oNQyUOQgna9TyfQHAoqUvvaXjJhb-NHEJtDKiWdK3OqRhtZNP2EtNq6veOxTLUq88TEa2J8JiXE33-xY1b8ohiuDLBeOOGhuI1U6V4mDc9jmZkDoxLC9b6s6V8MAjPhY-EC_g%3D%3D&sa=X&sqi=2&ved=2ahUKEwi05JSHnMWMAxUw8bsIHRRCDd0Qk8gLegQIHxAB&ictx=1&stq=1&cs=0&lei=o2bzZ_SGIrDi7_UPlIS16A0#ebo=1",
-                                        "language": user_language,
-                                        "language_code": get_language_code(
-                                            user_language
-                                        ),
-                                        "restart_conversation": True,  # Signal to frontend to restart
-                                    }
-                            else:
-                                # API call failed
-                                print(
-                                    f"API Error - Status: {api_response.status_code}, Response: {api_response.text}"
-                                )
-                                responses["api_submission_status"] = "error"
-                                responses["api_error_message"] = api_response.text
-                                return {
-                                    "response": f"Thank you for uploading the Excel file. However, there was an issue processing your data (Error: {api_response.status_code}). Please try again or contact support@insuranceclub.ae",
-                                    "error_details": api_response.text,
-                                }
-                        except requests.exceptions.RequestException as e:
-                            # Handle request exceptions
-                            responses["api_submission_status"] = "error"
-                            responses["api_error_message"] = str(e)
-                            print(f"API request error: {e}")
-                            # Continue with normal flow even if API fails
-                            conversation_state["current_question_index"] += 1
-
-                            if conversation_state["current_question_index"] < len(
-                                questions
-                            ):
-                                next_question = questions[
-                                    conversation_state["current_question_index"]
-                                ]
-                                if isinstance(next_question, dict):
-                                    options = ", ".join(
-                                        next_question.get("options", [])
-                                    )
-                                    next_questions = next_question.get("question", "")
-                                    return {
-                                        "response": f"Thank you for uploading the Excel file. There was a temporary issue, but we've saved your data. Now, let's move on to: {next_questions}",
-                                        "options": options,
-                                    }
-                                else:
-                                    return {
-                                        "response": f"Thank you for uploading the Excel file. Now, let's move on to: {next_question}"
-                                    }
-                            else:
-                                return {
-                                    "response": "Thank you for uploading the Excel file. We will inform Shafeeque Shanavas from Wehbe Insurance to assist you further with your enquiry.",
-                                    "final_responses": responses,
-                                }
-                    else:
-                        # Excel data doesn't exist yet - wait for it
-                        conversation_state["current_question_index"] += 1
+async def process_user_input(user_input: UserInput):
+    user_id = user_input.user_id.strip()
+    # Completed applications are logged under this user
+    current_user_id.set(user_id)
+    # Load the user's state for this turn and write it back when the turn ends
+    async with user_states.checkout(user_id):
+        return await _process_turn(user_input)
 
-                        if conversation_state["current_question_index"] < len(
-                            questions
-                        ):
-                            next_question = questions[
-                                conversation_state["current_question_index"]
-                            ]
-                            if isinstance(next_question, dict):
-                                options = ", ".join(next_question.get("options", []))
-                                next_questions = next_question.get("question", "")
-                                return {
-                                    "response": f"Thank you for sharing the details. We will inform Shafeeque Shanavas from Wehbe Insurance to assist you further with your enquiry. Now, let's move on to: {next_questions}",
-                                    "options": options,
-                                }
-                            else:
-                                return {
-                                    "response": f"Thank you for sharing the details. We will inform Shafeeque Shanavas from Wehbe Insurance to assist you further with your enquiry. Now, let's move on to: {next_question}"
-                                }
-                        else:
-                            # Save responses and end the conversation - SMA flow completion
-                            with open("user_responses.json", "w") as file:
-                                json.dump(responses, file, indent=4)
 
-                            # Reset conversation state to allow starting a new inquiry
-                            user_states[user_id] = {
-                                "current_question_index": 0,
-                                "responses": {},
-                                "current_flow": "initial",
-                                "welcome_shown": True,
-                                "awaiting_document_name": False,
-                                "document_name": "",
-                                "last_takaful_query_time": None,
-                                "awaiting_takaful_followup": False,
-                                "last_chronic_conditions_time": None,
-                                "awaiting_chronic_conditions_followup": False,
-                                "takaful_emarat_asked": False,
-                            }
+async def _process_turn(user_input: UserInput):
+    user_id = user_input.user_id.strip()
+    user_message = user_input.message.strip()
+    # Initialize user state if not already presents
+    if user_id not in user_states:
+        user_states[user_id] = {
+            "current_question_index": 0,
+            "responses": {},
+            "current_flow": "initial",
+            "welcome_shown": False,
+            "awaiting_document_name": False,
+            "document_name": "",
+            "last_takaful_query_time": None,
+            "awaiting_takaful_followup": False,
+            "last_chronic_conditions_time": None,
+            "awaiting_chronic_conditions_followup": False,
+            "takaful_emarat_asked": False,
+            "preferred_language": "English",  # Default language
+            "language_code": "en",
+            "language_explicitly_set": False,  # Track if user explicitly set language
+        }
 
-                            return {
-                                "response": "Thank you for sharing the details. We will inform Shafeeque Shanavas from Wehbe Insurance to assist you further with your enquiry. Please wait for further assistance. If you have any questions, please contact support@insuranceclub.ae",
-                                "final_responses": responses,
-                            }
-                else:
-                    # Invalid file format
-                    return {
-                        "response": "The file format seems incorrect. Please upload a valid Excel file (xlsx or xls format) using the upload button."
-                    }
-        elif question == "Do you have an Insurance Advisor code?":
-            # Use the advisor code handler with multilingual support
-            return handle_adiviosr_code(
-                question,
-                user_message,
-                responses,
-                conversation_state,
-                questions,
-                user_language,
+    conversation_state = user_states[user_id]
+    user_name = get_user_name(user_id)
+
+    # ==================== LANGUAGE DETECTION ====================
+    # Check for explicit language requests first
+    language_requests = {
+        "say in arabic": {"language": "Arabic", "code": "ar"},
+        "speak in arabic": {"language": "Arabic", "code": "ar"},
+        "change language to arabic": {"language": "Arabic", "code": "ar"},
+        "arabic": {"language": "Arabic", "code": "ar"},
+        "عربي": {"language": "Arabic", "code": "ar"},
+        "بالعربية": {"language": "Arabic", "code": "ar"},
+        "say in hindi": {"language": "Hindi", "code": "hi"},
+        "hindi": {"language": "Hindi", "code": "hi"},
+        "हिंदी": {"language": "Hindi", "code": "hi"},
+        "say in urdu": {"language": "Urdu", "code": "ur"},
+        "urdu": {"language": "Urdu", "code": "ur"},
+        "اردو": {"language": "Urdu", "code": "ur"},
+        "say in english": {"language": "English", "code": "en"},
+        "english": {"language": "English", "code": "en"},
+    }
+
+    # Check if this is a document upload success message (define this before the if/else block)
+    is_document_upload_success = (
+        "document upload successfully" in user_message.lower()
+        or "upload successfully" in user_message.lower()
+        or "file uploaded" in user_message.lower()
+        or "document uploaded" in user_message.lower()
+    )
+
+    # Check if user is making an explicit language request
+    user_message_lower = user_message.lower().strip()
+    if user_message_lower in language_requests:
+        requested_lang = language_requests[user_message_lower]
+        conversation_state["preferred_language"] = requested_lang["language"]
+        conversation_state["language_code"] = requested_lang["code"]
+        conversation_state["language_explicitly_set"] = True  # Mark as explicitly set
+        print(
+            f"[Language Request] User {user_id} explicitly requested {requested_lang['language']}"
+        )
+        user_language = requested_lang["language"]
+    else:
+        # Only detect language for the first few messages or when user explicitly changes language
+        # Don't change language for numeric inputs, short responses, or when already in a flow
+        current_flow = conversation_state.get("current_flow", "initial")
+        current_question_index = conversation_state.get("current_question_index", 0)
+
+        # Check if this is a numeric input, very short response, or document upload success message
+        is_numeric_or_short = (
+            user_message.strip().isdigit()
+            or len(user_message.strip()) <= 3
+            or user_message.strip().lower() in ["yes", "no", "y", "n", "ok", "okay"]
+        )
+
+        # Only detect language if:
+        # 1. Language was not explicitly set by user
+        # 2. We're still in initial flow (first few questions)
+        # 3. User hasn't established a language preference yet
+        # 4. The input is not numeric/short
+        # 5. The input is not a document upload success message (regardless of current language)
+        should_detect_language = (
+            not conversation_state.get("language_explicitly_set", False)
+            and current_flow == "initial"
+            and current_question_index < 3
+            and not is_numeric_or_short
+            and not is_document_upload_success  # This prevents language detection for document upload messages in ANY language
+            and conversation_state.get("preferred_language", "English") == "English"
+        )
+
+        if should_detect_language:
+            detected_lang = await detect_language(user_message)
+            print(f"[DEBUG] Detected language: {detected_lang}")
+
+            # Update the user's preferred language if it's different
+            if detected_lang["language"] != conversation_state.get(
+                "preferred_language", "English"
+            ):
+                conversation_state["preferred_language"] = detected_lang["language"]
+                conversation_state["language_code"] = detected_lang["code"]
+                print(
+                    f"[Language Detection] User {user_id} switched to {detected_lang['language']}"
+                )
+        else:
+            reason = "unknown"
+            if conversation_state.get("language_explicitly_set", False):
+                reason = "language explicitly set by user"
+            elif current_flow != "initial":
+                reason = "not in initial flow"
+            elif current_question_index >= 3:
+                reason = "beyond initial questions"
+            elif is_numeric_or_short:
+                reason = "numeric or short input"
+            elif is_document_upload_success:
+                reason = "document upload success message"
+            elif conversation_state.get("preferred_language", "English") != "English":
+                reason = "language already established"
+
+            print(
+                f"[DEBUG] Skipping language detection ({reason}) - preserving current language: {conversation_state.get('preferred_language', 'English')}"
             )
-        elif question == "Could you kindly share your relationship with the sponsor?":
-            # Use multilingual validation for relationship selection
-            valid_options = [
-                "Investor",
-                "Employee",
-                "Spouse",
-                "Child",
-                "4th Child",
-                "Parent",
-                "Domestic",
+
+        user_language = conversation_state.get("preferred_language", "English")
+
+    print(f"[DEBUG] Final user language: {user_language}")
+    # ==================== END LANGUAGE DETECTION ====================
+
+    # Handle document upload success messages - maintain current language flow
+    if is_document_upload_success:
+        print(
+            f"[DEBUG] Document upload success detected - maintaining current language: {user_language}"
+        )
+        # Continue with the current flow without changing language
+        # The system will proceed to the next question in the same language
+
+    # Handle language requests - present current question in new language
+    if user_message_lower in language_requests:
+        # Get current question
+        current_question_index = conversation_state.get("current_question_index", 0)
+        current_flow = conversation_state.get("current_flow", "initial")
+
+        # Get the session's questions for the current flow
+        questions_list = get_question_plan(conversation_state, default_flow="initial")
+
+        # Present current question in new language
+        if current_question_index < len(questions_list):
+            current_question = questions_list[current_question_index]
+            if isinstance(current_question, dict):
+                question_text = current_question["question"]
+                options = current_question.get("options", [])
+                return await format_response_in_language(
+                    question_text, options, user_language
+                )
+            else:
+                return await format_response_in_language(
+                    current_question, [], user_language
+                )
+        else:
+            # No current question, show welcome
+            first_question = initial_questions[0]
+            if isinstance(first_question, dict):
+                question_text = first_question["question"]
+                options = first_question.get("options", [])
+                return await format_response_in_language(
+                    question_text, options, user_language
+                )
+            else:
+                return await format_response_in_language(
+                    first_question, [], user_language
+                )
+
+    # Handle cancel command - reset everything and start fresh
+    if user_message.lower() in ["cancel", "restart", "reset", "start over"]:
+        # Save the language preference before resetting
+        saved_language = conversation_state.get("preferred_language", "English")
+        saved_language_code = conversation_state.get("language_code", "en")
+        saved_language_explicitly_set = conversation_state.get(
+            "language_explicitly_set", False
+        )
+
+        # Reset the entire conversation state
+        user_states[user_id] = {
+            "current_question_index": 0,
+            "responses": {},
+            "current_flow": "initial",
+            "welcome_shown": True,  # Set to True to prevent duplicate greeting
+            "awaiting_document_name": False,
+            "document_name": "",
+            "last_takaful_query_time": None,
+            "awaiting_takaful_followup": False,
+            "last_chronic_conditions_time": None,
+            "awaiting_chronic_conditions_followup": False,
+            "takaful_emarat_asked": False,
+            "preferred_language": saved_language,  # Preserve language
+            "language_code": saved_language_code,
+            "language_explicitly_set": saved_language_explicitly_set,  # Preserve explicit setting
+        }
+
+        # Return the first initial question
+        first_question = initial_questions[0]
+        if isinstance(first_question, dict):
+            question_text = first_question["question"]
+            options = first_question.get("options", [])
+            reset_message = (
+                "Your conversation has been reset. Let's start fresh! " + question_text
+            )
+
+            # Format response in user's language
+            return await format_response_in_language(
+                reset_message, options, saved_language
+            )
+        else:
+            reset_message = (
+                "Your conversation has been reset. Let's start fresh! " + first_question
+            )
+            return await format_response_in_language(reset_message, [], saved_language)
+
+    # Handle Takaful Emarat Silver query
+    if "takaful emarat silver" in user_message.lower():
+        conversation_state["last_takaful_query_time"] = datetime.now()
+        conversation_state["awaiting_takaful_followup"] = True
+        conversation_state["takaful_emarat_asked"] = (
+            True  # Set flag to indicate Takaful Emarat was asked
+        )
+        welcome_response = await fixed_answer("takaful_welcome", user_language)
+        return {
+            "response": f"{welcome_response}",
+        }
+
+    # Handle Pre-existing & Chronic conditions query (only if Takaful Emarat Silver was asked first)
+    if "pre existing & chronic conditions" in user_message.lower():
+        # Check if user has already asked about Takaful Emarat Silver
+        if conversation_state.get("takaful_emarat_asked", False):
+            conversation_state["last_chronic_conditions_time"] = datetime.now()
+            conversation_state["awaiting_chronic_conditions_followup"] = True
+            conversation_state["chronic_conditions_shown"] = (
+                True  # Flag to track that response was shown
+            )
+            chronic_conditions_response = await fixed_answer(
+                "takaful_chronic_conditions", user_language
+            )
+            return {
+                "response": f"{chronic_conditions_response}",
+                "pdf_link": "/pdf-view/",
+            }
+        else:
+            # If Takaful Emarat Silver wasn't asked first, provide a general response
+            return {
+                "response": "I'd be happy to help you with information about pre-existing and chronic conditions. However, to provide you with the most accurate and specific information, could you please first ask about the Takaful Emarat Silver plan? This will help me give you the most relevant details for your situation."
+            }
+
+    # Handle Area of Coverage query (only if Takaful Emarat Silver was asked first)
+    if "area of coverage" in user_message.lower():
+        # Check if user has already asked about Takaful Emarat Silver
+        if conversation_state.get("takaful_emarat_asked", False):
+            conversation_state["awaiting_takaful_followup"] = True
+            coverage_response = await fixed_answer("takaful_coverage", user_language)
+            return {
+                "response": f"{coverage_response}.",
+                "pdf_link": "/pdf-view/",
+            }
+        else:
+            # If Takaful Emarat Silver wasn't asked first, provide a general response
+            return {
+                "response": "I'd be happy to help you with information about area of coverage. However, to provide you with the most accurate and specific information, could you please first ask about the Takaful Emarat Silver plan? This will help me give you the most relevant details for your situation."
+            }
+
+    # Handle Annual Medicine Limit query (only if Takaful Emarat Silver was asked first)
+    if (
+        "annual medicine limit" in user_message.lower()
+        or "medicine limit" in user_message.lower()
+    ):
+        # Check if user has already asked about Takaful Emarat Silver
+        if conversation_state.get("takaful_emarat_asked", False):
+            conversation_state["awaiting_takaful_followup"] = True
+            medicine_response = await fixed_answer("takaful_medicine", user_language)
+            return {
+                "response": f"{medicine_response}.",
+                "pdf_link": "/pdf-view/",
+            }
+        else:
+            # If Takaful Emarat Silver wasn't asked first, provide a general response
+            return {
+                "response": "I'd be happy to help you with information about annual medicine limit. However, to provide you with the most accurate and specific information, could you please first ask about the Takaful Emarat Silver plan? This will help me give you the most relevant details for your situation."
+            }
+
+    # Handle Consultation Fee query (only if Takaful Emarat Silver was asked first)
+    if "consultation fee" in user_message.lower() or "fee" in user_message.lower():
+        # Check if user has already asked about Takaful Emarat Silver
+        if conversation_state.get("takaful_emarat_asked", False):
+            conversation_state["awaiting_takaful_followup"] = True
+            consultation_response = await fixed_answer(
+                "takaful_consultation", user_language
+            )
+            return {
+                "response": f"{consultation_response}.",
+                "pdf_link": "/pdf-view/",
+            }
+        else:
+            # If Takaful Emarat Silver wasn't asked first, provide a general response
+            return {
+                "response": "I'd be happy to help you with information about consultation fee. However, to provide you with the most accurate and specific information, could you please first ask about the Takaful Emarat Silver plan? This will help me give you the most relevant details for your situation."
+            }
+
+    # Handle Network query (only if Takaful Emarat Silver was asked first)
+    if "network" in user_message.lower():
+        # Check if user has already asked about Takaful Emarat Silver
+        if conversation_state.get("takaful_emarat_asked", False):
+            conversation_state["awaiting_takaful_followup"] = True
+            network_response = await fixed_answer("takaful_network", user_language)
+            return {
+                "response": f"{network_response}.",
+                "pdf_link": "/pdf-view/",
+            }
+        else:
+            # If Takaful Emarat Silver wasn't asked first, provide a general response
+            return {
+                "response": "I'd be happy to help you with information about the network. However, to provide you with the most accurate and specific information, could you please first ask about the Takaful Emarat Silver plan? This will help me give you the most relevant details for your situation."
+            }
+
+    # Handle Dental Treatment query (only if Takaful Emarat Silver was asked first)
+    if "dental treatment" in user_message.lower() or "dental" in user_message.lower():
+        # Check if user has already asked about Takaful Emarat Silver
+        if conversation_state.get("takaful_emarat_asked", False):
+            conversation_state["awaiting_takaful_followup"] = True
+            dental_response = await fixed_answer("takaful_dental", user_language)
+            return {
+                "response": f"{dental_response}.",
+                "pdf_link": "/pdf-view/",
+            }
+        else:
+            # If Takaful Emarat Silver wasn't asked first, provide a general response
+            return {
+                "response": "I'd be happy to help you with information about dental treatment coverage. However, to provide you with the most accurate and specific information, could you please first ask about the Takaful Emarat Silver plan? This will help me give you the most relevant details for your situation."
+            }
+
+    # Handle Direct Access to Hospital query (only if Takaful Emarat Silver was asked first)
+    if (
+        "direct access" in user_message.lower()
+        or "hospital access" in user_message.lower()
+    ):
+        # Check if user has already asked about Takaful Emarat Silver
+        if conversation_state.get("takaful_emarat_asked", False):
+            conversation_state["awaiting_takaful_followup"] = True
+            access_response = await fixed_answer("takaful_access", user_language)
+            return {
+                "response": f"{access_response}.",
+                "pdf_link": "/pdf-view/",
+            }
+        else:
+            # If Takaful Emarat Silver wasn't asked first, provide a general response
+            return {
+                "response": "I'd be happy to help you with information about direct access to hospital. However, to provide you with the most accurate and specific information, could you please first ask about the Takaful Emarat Silver plan? This will help me give you the most relevant details for your situation."
+            }
+
+    # Check for Takaful questions follow-up (show options after response)
+    if (
+        conversation_state.get("awaiting_takaful_followup")
+        and not user_message.lower() in ["yes", "no"]
+        and any(
+            keyword in user_message.lower()
+            for keyword in [
+                "area of coverage",
+                "annual medicine limit",
+                "medicine limit",
+                "consultation fee",
+                "fee",
+                "network",
+                "dental treatment",
+                "dental",
+                "direct access",
+                "hospital access",
             ]
-            return handle_option_validation_multilingual(
-                user_message,
-                valid_options,
-                question,
-                user_language,
-                conversation_state,
-                questions,
-                responses,
-                user_id,
+        )
+    ):
+        # This means user just got a Takaful question response, show follow-up options
+        return {
+            "response": "Is there anything else you want me to help you with related to Takaful Emarat Silver?",
+            "options": "Yes, No",
+        }
+
+    # Handle Yes/No response for Chronic conditions follow-up
+    if conversation_state.get(
+        "awaiting_chronic_conditions_followup"
+    ) and user_message.lower() in ["yes", "no"]:
+        if user_message.lower() == "yes":
+            conversation_state["awaiting_chronic_conditions_followup"] = False
+            conversation_state["awaiting_takaful_followup"] = True
+            conversation_state["chronic_conditions_shown"] = False  # Reset the flag
+            return {
+                "response": "Great! Please ask your question about the Takaful Emarat Silver plan, and I'll assist you."
+            }
+        else:
+            conversation_state["awaiting_chronic_conditions_followup"] = False
+            conversation_state["current_flow"] = "initial"
+            conversation_state["current_question_index"] = 0
+            conversation_state["chronic_conditions_shown"] = False  # Reset the flag
+            conversation_state.pop("question_overlays", None)  # Restart flows fresh
+            first_question = initial_questions[0]
+            next_options = first_question.get("options", [])
+            response_message = (
+                f"Alright, let's go back to the main menu. {first_question['question']}"
             )
-        elif question == "Please upload photos of your driving license Front side":
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Enhanced file path validation
-                upload_pattern = re.compile(
-                    r"^uploads\/(?:[\w\s-]+\/)*[\w\s-]+\.(pdf|docx|jpg|png|jpeg)$",
-                    re.IGNORECASE,
-                )
 
-                if upload_pattern.match(user_message):
-                    # Valid file format
-                    responses[question] = user_message
-                    conversation_state["current_question_index"] += 1
+            # Translate to user's language
+            return await format_response_in_language(
+                response_message, next_options, user_language
+            )
 
-                    # Check if there are more questions
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        return {
-                            "response": f"Thank you for providing the driving license Front side. Now, let's move on to: {next_question}",
-                        }
-                    else:
-                        # Save responses and end the conversation
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                        return {
-                            "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
-                            "final_responses": responses,
-                        }
-                else:
-                    # Invalid file format
-                    return {
-                        "response": "The file format seems incorrect. Please upload a valid document."
-                    }
+    # Check for Chronic conditions follow-up (show options after response)
+    if (
+        conversation_state.get("awaiting_chronic_conditions_followup")
+        and conversation_state.get("chronic_conditions_shown", False)
+        and not user_message.lower() in ["yes", "no"]
+    ):
+        # This means user just got the chronic conditions response, show follow-up options
+        conversation_state["chronic_conditions_shown"] = False  # Reset the flag
+        return {
+            "response": "Is there anything else you want me to help you with?",
+            "options": "Yes, No",
+        }
 
-        elif question == "Please upload photos of your driving license Back side":
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Enhanced file path validation
-                upload_pattern = re.compile(
-                    r"^uploads\/(?:[\w\s-]+\/)*[\w\s-]+\.(pdf|docx|jpg|png|jpeg)$",
-                    re.IGNORECASE,
-                )
+    # Handle Yes/No response for Takaful follow-up
+    if conversation_state.get("awaiting_takaful_followup") and user_message.lower() in [
+        "yes",
+        "no",
+    ]:
+        if user_message.lower() == "yes":
+            conversation_state["awaiting_takaful_followup"] = True
+            return {
+                "response": "Is there anything else Please ask, I am here to help you. realted to Takaful Emarat Silver",
+            }
+        else:
+            conversation_state["awaiting_takaful_followup"] = False
+            conversation_state["current_flow"] = "initial"
+            conversation_state["current_question_index"] = 0
+            conversation_state.pop("question_overlays", None)  # Restart flows fresh
+            first_question = initial_questions[0]
+            next_options = first_question.get("options", [])
+            response_message = f"Alright, let's move on. {first_question['question']}"
 
-                if upload_pattern.match(user_message):
-                    # Valid file format
-                    responses[question] = user_message
-                    conversation_state["current_question_index"] += 1
+            # Translate to user's language
+            return await format_response_in_language(
+                response_message, next_options, user_language
+            )
 
-                    # Check if there are more questions
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        return {
-                            "response": f"Thank you for providing the driving license. Now, let's move on to: {next_question}",
-                        }
-                    else:
-                        # Save responses and end the conversation
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                        return {
-                            "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
-                            "final_responses": responses,
-                        }
-                else:
-                    # Invalid file format
-                    return {
-                        "response": "The file format seems incorrect. Please upload a valid document."
-                    }
+    # Check for Takaful follow-up (handle questions after initial response)
+    if conversation_state.get(
+        "awaiting_takaful_followup"
+    ) and not user_message.lower() in ["yes", "no"]:
+        # User is asking a question after the initial Takaful response
+        takaful_response = await fixed_answer("takaful_followup", user_language)
+        return {
+            "response": f"{takaful_response} Do you need to know anything else related Takaful Emarat Silver plan?",
+            "options": "Yes, No",
+        }
 
-        elif (
-            question
-            == "Please upload photos of your vehicle registration (Mulkiya) Front side"
-        ):
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Enhanced file path validation
-                upload_pattern = re.compile(
-                    r"^uploads\/(?:[\w\s-]+\/)*[\w\s-]+\.(pdf|docx|jpg|png|jpeg)$",
-                    re.IGNORECASE,
-                )
+    # Show welcome message with the first question if not already shown
+    if not conversation_state["welcome_shown"]:
+        conversation_state["welcome_shown"] = True
+        first_question = initial_questions[0]
+        next_options = first_question.get("options", [])
+        greeting_template = choice(greeting_templates)
+        greeting = greeting_template.format(
+            user_name=user_name, first_question=first_question["question"]
+        )
 
-                if upload_pattern.match(user_message):
-                    # Valid file format
-                    responses[question] = user_message
-                    conversation_state["current_question_index"] += 1
+        # Use the pre-translated template when the catalog has one
+        localized_greeting = None
+        localized_template = question_catalog.lookup(greeting_template, user_language)
+        localized_question = question_catalog.lookup(
+            first_question["question"], user_language
+        )
+        if localized_template and localized_question:
+            localized_greeting = localized_template.format(
+                user_name=user_name, first_question=localized_question
+            )
 
-                    # Check if there are more questions
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        return {
-                            "response": f"Thank you for providing vehicle registration Front side. Now, let's move on to: {next_question}",
-                        }
-                    else:
-                        # Save responses and end the conversation
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                        return {
-                            "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
-                            "final_responses": responses,
-                        }
-                else:
-                    # Invalid file format
-                    return {
-                        "response": "The file format seems incorrect. Please upload a valid document."
-                    }
+        # Translate greeting and options to user's language
+        return await format_response_in_language(
+            greeting,
+            next_options,
+            user_language,
+            localized_response=localized_greeting,
+        )
 
-        elif (
-            question
-            == "Please upload photos of your vehicle registration (Mulkiya)  Back side"
-        ):
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Enhanced file path validation
-                upload_pattern = re.compile(
-                    r"^uploads\/(?:[\w\s-]+\/)*[\w\s-]+\.(pdf|docx|jpg|png|jpeg)$",
-                    re.IGNORECASE,
-                )
+    # Determine the current flow and the session's questions for it
+    current_flow = conversation_state["current_flow"]
+    questions = get_question_plan(conversation_state)
 
-                if upload_pattern.match(user_message):
-                    # Valid file format
-                    responses[question] = user_message
-                    conversation_state["current_question_index"] += 1
+    # Get current question index
+    current_index = conversation_state["current_question_index"]
+    responses = conversation_state["responses"]
 
-                    # Check if there are more questions
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        return {
-                            "response": f"Thank you for providing the vehicle registration Back side. Now, let's move on to: {next_question}",
-                        }
-                    else:
-                        # Save responses and end the conversation
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                        return {
-                            "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
-                            "final_responses": responses,
-                        }
-                else:
-                    # Invalid file format
-                    return {
-                        "response": "The file format seems incorrect. Please upload a valid document."
-                    }
+    if current_index < len(questions):
+        # Current question
+        question_data = questions[current_index]
+        if isinstance(question_data, dict):
+            question = question_data["question"]
+            options = question_data.get("options", [])
+        else:
+            question = question_data
+            options = []
 
-        elif (
-            question
-            == "Please upload a copy of the police report related to the incident"
-        ):
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Enhanced file path validation
-                upload_pattern = re.compile(
-                    r"^uploads\/(?:[\w\s-]+\/)*[\w\s-]+\.(pdf|docx|jpg|png|jpeg)$",
-                    re.IGNORECASE,
-                )
+        # Handle options
+        if options:
+            # Validate user response against options using multilingual validation
+            validation_result = await validate_response_multilingual(
+                user_message, options, user_language
+            )
 
-                if upload_pattern.match(user_message):
-                    # Valid file format
-                    responses[question] = user_message
-                    conversation_state["current_question_index"] += 1
+            if validation_result["is_valid"]:
+                # Store the English version
+                matched_option = validation_result["matched_value"]
+                responses[question] = matched_option
 
-                    # Check if there are more questions
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        options = ", ".join(next_question["options"])
-                        next_questions = next_question["question"]
-                        return {
-                            "response": f"Thank you for providing the Policy Report. Now, let's move on to: {next_questions}",
-                            "options": options,
-                        }
+                if matched_option == "Purchase a Medical Insurance":
+                    conversation_state["current_flow"] = "medical_insurance"
+                    conversation_state["current_question_index"] = 0
 
+                    # Check if medical_questions is a list of dictionaries
+                    if isinstance(medical_questions[0], dict):
+                        next_options = medical_questions[0].get("options", [])
+                        response_message = (
+                            f"Great choice! {medical_questions[0]['question']}"
+                        )
+                        # Translate to user's language
+                        return await format_response_in_language(
+                            response_message, next_options, user_language
+                        )
+                    # If medical_questions is a list of strings
                     else:
-                        # Save responses and end the conversation
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                        return {
-                            "response": "Thank you for using Insuar. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!",
-                            "final_responses": responses,
-                        }
-                else:
-                    # Invalid file format
-                    return {
-                        "response": "The file format seems incorrect. Please upload a valid document."
-                    }
-
-        elif question == "Could you please provide your full name":
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Prompt LLM to check if the input is a valid person name
-                check_prompt = f"The user has responded with: '{user_message}'. Is this a valid person's  name? Respond with 'Yes' or 'No'."
-                llm_response = llm.invoke([
-                    SystemMessage(
-                        content="You are Insura, an AI assistant specialized in insurance-related tasks. Your task is to determine if the input provided by the user is a valid person's  name. Make sure it is a valid  name for a person."
-                    ),
-                    HumanMessage(content=check_prompt),
-                ])
-                is_person_name = llm_response.content.strip().lower() == "yes"
+                        response_message = f"Great choice! {medical_questions[0]}"
+                        return await format_response_in_language(
+                            response_message, [], user_language
+                        )
+                elif matched_option == "Purchase a Motor Insurance":
+                    conversation_state["current_flow"] = "motor_insurance"
+                    conversation_state["current_question_index"] = 0
+                    next_options = motor_insurance_questions[0].get("options", [])
+                    response_message = (
+                        f"Great choice! {motor_insurance_questions[0]['question']}"
+                    )
 
-                if is_person_name:
-                    # Translate name to English for storage
-                    name_in_english = translate_to_english_for_storage(
-                        user_message, user_language
+                    # Translate to user's language
+                    return await format_response_in_language(
+                        response_message, next_options, user_language
                     )
-                    responses[question] = name_in_english
-                    conversation_state["current_question_index"] += 1
+                elif matched_option == "Purchase a Car Insurance":
+                    conversation_state["current_flow"] = "car_questions"
+                    conversation_state["current_question_index"] = 0
+                    # Check if car_questions is a list of dictionaries
+                    if isinstance(car_questions[0], dict):
+                        next_options = car_questions[0].get("options", [])
+                        response_message = (
+                            f"Great choice! {car_questions[0]['question']}"
+                        )
+                    else:
+                        next_options = []
+                        response_message = f"Great choice! {car_questions[0]}"
 
-                    # Check if there are more questions
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        response_message = f"Thank you for providing the name. Now, let's move on to: {next_question}"
+                    # Translate to user's language
+                    return await format_response_in_language(
+                        response_message, next_options, user_language
+                    )
 
-                        # Format in user's language
-                        if isinstance(next_question, dict):
-                            return format_response_in_language(
-                                f"Thank you for providing the name. Now, let's move on to: {next_question['question']}",
-                                next_question.get("options", []),
-                                user_language,
-                            )
-                        else:
-                            return format_response_in_language(
-                                response_message, [], user_language
-                            )
+                elif matched_option == "Purchase a Bike Insurance":
+                    conversation_state["current_flow"] = "bike_questions"
+                    conversation_state["current_question_index"] = 0
+                    # Check if bike_questions is a list of dictionaries
+                    if isinstance(bike_questions[0], dict):
+                        next_options = bike_questions[0].get("options", [])
+                        response_message = (
+                            f"Great choice! {bike_questions[0]['question']}"
+                        )
                     else:
-                        # If all questions are completed, save responses and end conversation
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
+                        next_options = []
+                        response_message = f"Great choice! {bike_questions[0]}"
 
-                        final_message = "Thank you for using Insura. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!"
-                        result = format_response_in_language(
-                            final_message, [], user_language
+                    # Translate to user's language
+                    return await format_response_in_language(
+                        response_message, next_options, user_language
+                    )
+                # elif matched_option == "Purchase a new policy":
+                #     conversation_state["current_flow"] = "new_policy"
+                #     conversation_state["current_question_index"] = 0
+                #     return {
+                #         "response": f"Great choice! {new_policy_questions[0]}"
+                #     }
+                elif matched_option == "Renew my existing policy":
+                    conversation_state["current_flow"] = "existing_policy"
+                    conversation_state["current_question_index"] = 0
+                    # Check if existing_policy_questions is a list of dictionaries
+                    if isinstance(existing_policy_questions[0], dict):
+                        next_options = existing_policy_questions[0].get("options", [])
+                        response_message = (
+                            f"Great choice! {existing_policy_questions[0]['question']}"
                         )
-                        result["final_responses"] = responses
-                        return result
-                else:
-                    # Handle invalid or unrelated input
-                    general_assistant_prompt = f"The user entered '{user_message}', which does not appear to be a person's name. Please assist them in {user_language}."
-                    general_assistant_response = llm.invoke([
-                        SystemMessage(
-                            content=f"You are Insura, an AI assistant created by CloudSubset. Respond in {user_language}. Your role is to assist users with their inquiries. Your task here is to redirect or assist the user appropriately."
-                        ),
-                        HumanMessage(content=general_assistant_prompt),
-                    ])
+                    else:
+                        next_options = []
+                        response_message = (
+                            f"Great choice! {existing_policy_questions[0]}"
+                        )
+
+                    # Translate to user's language
+                    return await format_response_in_language(
+                        response_message, next_options, user_language
+                    )
+                elif matched_option == "Claim a Motor Insurance":
+                    conversation_state["current_flow"] = "motor_claim"
+                    conversation_state["current_question_index"] = 0
+                    # Get the first motor_claim question
+                    if isinstance(motor_claim[0], dict):
+                        next_options = motor_claim[0].get("options", [])
+                        response_message = f"Great choice! {motor_claim[0]['question']}"
+                    else:
+                        next_options = []
+                        response_message = f"Great choice! {motor_claim[0]}"
 
-                    retry_question = translate_text(
-                        f"Let's move back to: {question}", user_language
+                    # Translate to user's language
+                    return await format_response_in_language(
+                        response_message, next_options, user_language
                     )
-                    return {
-                        "response": f"{general_assistant_response.content.strip()}",
-                        "question": retry_question,
-                    }
+            else:
+                # Invalid option - provide helpful error in user's language
+                error_prompt = f"The user said '{user_message}' but needs to choose from: {', '.join(options)}. Provide a brief, helpful message."
+                error_response = await llm.ainvoke([
+                    SystemMessage(
+                        content=f"You are Insura, a friendly insurance assistant. Respond in {user_language}. Be brief and helpful."
+                    ),
+                    HumanMessage(content=error_prompt),
+                ])
 
-        elif question in [
-            "Please provide us with your job title",
-            "Please provide us with the member job title.",
-        ]:
-            return handle_job_title_question(
-                question,
-                user_message,
-                conversation_state,
-                questions,
-                responses,
-                user_language,
-            )
+                retry_message = f"Let's try again: {question}"
+                retry_translated = await translate_text(retry_message, user_language)
+                translated_options = await translate_batch(options, user_language)
 
-        elif (
-            question
-            == "Now, let's move to the sponsor details, Could you let me know the sponsor's type?"
-        ):
-            valid_options = ["Employee", "Investors"]
-            # Use generic multilingual handler
-            return handle_option_validation_multilingual(
+                return {
+                    "response": error_response.content.strip(),
+                    "question": retry_translated,
+                    "options": ", ".join(translated_options),
+                }
+
+        if question in [
+            "Let's start with your Medical insurance details. Choose your Visa issued Emirate?",
+            "Tell me your Emirate sponsor located in?",
+        ]:
+            # Use multilingual validation for emirate selection
+            valid_options = [
+                "Abudhabi",
+                "Ajman",
+                "Dubai",
+                "Fujairah",
+                "Ras Al Khaimah",
+                "Sharjah",
+                "Umm Al Quwain",
+            ]
+            return await handle_option_validation_multilingual(
                 user_message,
                 valid_options,
                 question,
@@ -4981,252 +5609,133 @@ def process_user_input(user_input: UserInput):
                 user_id,
             )
 
-        elif question == "May I kindly ask you to tell me the currency?":
-            valid_options = ["AED", "USD"]
-            if user_message in valid_options:
-                responses["question"] = user_message
-                conversation_state["current_question_index"] += 1
+        elif "emaf" in user_message.lower() or "from" in user_message.lower():
+            return handle_emaf_document(
+                question, user_message, responses, conversation_state, questions
+            )
+        elif "post a review" in user_message.lower():
+            user_message = user_message.lower()  # Convert user_message to lowercase
+            if "post a review" in user_message:
+                return {
+                    "review_message": "If you are satisfied with Wehbe(Broker) services, please leave a review for sharing happiness to others!!😊",
+                    "review_link": "https://www.google.com/search?client=ms-android-samsung-ss&sca_esv=4eb717e6f42bf628&sxsrf=AHTn8zprabdPVFL3C2gXo4guY8besI3jqQ:1744004771562&q=wehbe+insurance+services+llc+reviews&uds=ABqPDvy-z0dcsfm2PY76_gjn-YWou9-AAVQ4iWjuLR6vmDV0vf3KpBMNjU5ZkaHGmSY0wBrWI3xO9O55WuDmXbDq6a3SqlwKf2NJ5xQAjebIw44UNEU3t4CpFvpLt9qFPlVh2F8Gfv8sMuXXSo2Qq0M_ZzbXbg2c323G_bE4tVi7Ue7d_sW0CrnycpJ1CvV-OyrWryZw_TeQ3gLGDgzUuHD04MpSHquYZaSQ0_mIHLWjnu7fu8c7nb6_aGDb_H1Q-86fD2VmWluYA5jxRkC9U2NsSwSSXV4FPW9w1Q2T_Wjt6koJvLgtikd66MqwYiJPX2x9MwLhoGYlpTbKtkJuHwE9eM6wQgieChskow6tJCVjQ75I315dT8n3tUtasGdBkprOlUK9ibPrYr9HqRz4AwzEQaxAq9_EDcsSG_XW0CHuqi2lRKHw592MlGlhjyQibXKSZJh-v3KW4wIVqa-2x0k1wfbZdpaO3BZaKYCacLOxwUKTnXPbQqDPLQDeYgDBwaTLvaCN221H&si=APYL9bvoDGWmsM6h2lfKzIb8LfQg_oNQyUOQgna9TyfQHAoqUvvaXjJhb-NHEJtDKiWdK3OqRhtZNP2EtNq6veOxTLUq88TEa2J8JiXE33-xY1b8ohiuDLBeOOGhuI1U6V4mDc9jmZkDoxLC9b6s6V8MAjPhY-EC_g%3D%3D&sa=X&sqi=2&ved=2ahUKEwi05JSHnMWMAxUw8bsIHRRCDd0Qk8gLegQIHxAB&ictx=1&stq=1&cs=0&lei=o2bzZ_SGIrDi7_UPlIS16A0#ebo=1",
+                }
+            else:
+                general_assistant_prompt = (
+                    f"user response: {user_message}. Please assist."
+                )
+                general_assistant_response = await cached_reply(
+                    llm,
+                    [
+                        SystemMessage(
+                            content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                        ),
+                        HumanMessage(content=general_assistant_prompt),
+                    ],
+                    user_message,
+                    user_language,
+                )
 
+                # Safely access the next question
                 if conversation_state["current_question_index"] < len(questions):
                     next_question = questions[
                         conversation_state["current_question_index"]
                     ]
-                    if "options" in next_question:
+                    if isinstance(next_question, dict) and "options" in next_question:
                         options = ", ".join(next_question["options"])
-                        next_questions = next_question["question"]
                         return {
-                            "response": f"Thank you! Now, let's move on to: {next_questions}",
+                            "response": f"{general_assistant_response.content.strip()}",
+                            "question": f"Let's try again: {next_question['question']}",
                             "options": options,
                         }
                     else:
-                        return {
-                            "response": f"Thank you. Now, let's move on to: {next_question}"
-                        }
-                else:
-                    with open("user_responses.json", "w") as file:
-                        json.dump(responses, file, indent=4)
-                    return {
-                        "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
-                        "final_responses": responses,
-                    }
-            else:
-                # Handle invalid responses or unrelated queries
-                general_assistant_prompt = (
-                    f"user response: {user_message}. Please assist."
-                )
-                general_assistant_response = llm.invoke([
-                    HumanMessage(content=general_assistant_prompt)
-                ])
-                return {
-                    "response": f"{general_assistant_response.content.strip()}",
-                    "question": f"Let's try again: {question}\nPlease choose from the following options: {', '.join(valid_options)}",
-                }
-
-        elif question == "Could you please tell me your monthly salary?":
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                try:
-                    # Check if the input is a valid numeric value
-                    salary = float(
-                        user_message
-                    )  # Attempt to convert the input to a float
-                    if salary > 0:  # Ensure it's a positive number
-                        # Store the salary
-                        responses[question] = salary
-                        conversation_state["current_question_index"] += 1
-
-                        # Check if there are more questions
-                        if conversation_state["current_question_index"] < len(
-                            questions
-                        ):
-                            next_question = questions[
-                                conversation_state["current_question_index"]
-                            ]
-                            if "options" in next_question:
-                                options = ", ".join(next_question["options"])
-                                next_questions = next_question["question"]
-
-                                # Translate response to user's language
-                                thank_you_msg = translate_text(
-                                    f"Thank you! 😊 Now, let's move on to: {next_questions}",
-                                    user_language,
-                                )
-                                translated_options = [
-                                    translate_text(opt, user_language)
-                                    for opt in next_question["options"]
-                                ]
-
-                                return {
-                                    "response": thank_you_msg,
-                                    "options": translated_options,
-                                    "language": user_language,
-                                    "language_code": get_language_code(user_language),
-                                }
-                            else:
-                                # Translate response to user's language
-                                thank_you_msg = translate_text(
-                                    f"Thank you for providing your salary! 💰 Now, let's move on to: {next_question}",
-                                    user_language,
-                                )
-                                return {
-                                    "response": thank_you_msg,
-                                    "language": user_language,
-                                    "language_code": get_language_code(user_language),
-                                }
-                        else:
-                            # If all questions are completed, save responses and end conversation
-                            with open("user_responses.json", "w") as file:
-                                json.dump(responses, file, indent=4)
-
-                            # Translate completion message to user's language
-                            completion_msg = translate_text(
-                                "Thank you for using Insura! 🎉 Your request has been processed. If you have any further questions, feel free to ask. Have a great day! 😊",
-                                user_language,
-                            )
-                            return {
-                                "response": completion_msg,
-                                "final_responses": responses,
-                                "language": user_language,
-                                "language_code": get_language_code(user_language),
-                            }
-                    else:
-                        # Handle invalid input for non-positive values
-                        error_msg = translate_text(
-                            "The salary must be a positive number. Could you please re-enter your monthly salary in AED?",
-                            user_language,
+                        question_text = (
+                            next_question["question"]
+                            if isinstance(next_question, dict)
+                            else next_question
                         )
-                        translated_question = translate_text(question, user_language)
                         return {
-                            "response": error_msg,
-                            "question": translated_question,
-                            "language": user_language,
-                            "language_code": get_language_code(user_language),
+                            "response": f"{general_assistant_response.content.strip()}",
+                            "question": f"Let's try again: {question_text}",
                         }
-                except ValueError:
-                    # If invalid input, use the general assistant
-                    general_assistant_prompt = f"The user entered '{user_message}', which does not appear to be a valid monetary amount. Please assist them in {user_language}."
-                    general_assistant_response = llm.invoke([
-                        SystemMessage(
-                            content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-                        ),
-                        HumanMessage(content=general_assistant_prompt),
-                    ])
-
-                    retry_msg = translate_text(
-                        f"Let's move back to: {question}", user_language
-                    )
+                else:
                     return {
                         "response": f"{general_assistant_response.content.strip()}",
-                        "question": retry_msg,
-                        "language": user_language,
-                        "language_code": get_language_code(user_language),
+                        "question": "It seems we have reached the end of the questions.",
                     }
+        # elif "post a review" in user_message.lower():
+        #     user_message = user_message.lower()  # Convert user_message to lowercase
+        #     next_question = questions[conversation_state["current_question_index"]]
+        #     if "post a review" in user_message:
+        #         if "options" in next_question:
+        #             options = ", ".join(next_question["options"])
+        #             return {
+        #                 return {
+        #             "review_message": "If you are satisfied with Wehbe(Broker) services, please leave a review for sharing happiness to others!!😊",
+        #             "review_link": "https://www.google.com/search?client=ms-android-samsung-ss&sca_esv=4eb717e6f42bf628&sxsrf=AHTn8zprabdPVFL3C2gXo4guY8besI3jqQ:1744004771562&q=wehbe+insurance+services+llc+reviews&uds=ABqPDvy-z0dcsfm2PY76_gjn-YWou9-AAVQ4iWjuLR6vmDV0vf3KpBMNjU5ZkaHGmSY0wBrWI3xO9O55WuDmXbDq6a3SqlwKf2NJ5xQAjebIw44UNEU3t4CpFvpLt9qFPlVh2F8Gfv8sMuXXSo2Qq0M_ZzbXbg2c323G_bE4tVi7Ue7d_sW0CrnycpJ1CvV-OyrWryZw_TeQ3gLGDgzUuHD04MpSHquYZaSQ0_mIHLWjnu7fu8c7nb6_aGDb_H1Q-86fD2VmWluYA5jxRkC9U2NsSwSSXV4FPW9w1Q2T_Wjt6koJvLgtikd66MqwYiJPX2x9MwLhoGYlpTbKtkJuHwE9eM6wQgieChskow6tJCVjQ75I315dT8n3tUtasGdBkprOlUK9ibPrYr9HqRz4AwzEQaxAq9_EDcsSG_XW0CHuqi2lRKHw592MlGlhjyQibXKSZJh-v3KW4wIVqa-2x0k1wfbZdpaO3BZaKYCacLOxwUKTnXPbQqDPLQDeYgDBwaTLvaCN221H&si=APYL9bvoDGWmsM6h2lfKzIb8LfQg_oNQyUOQgna9TyfQHAoqUvvaXjJhb-NHEJtDKiWdK3OqRhtZNP2EtNq6veOxTLUq88TEa2J8JiXE33-xY1b8ohiuDLBeOOGhuI1U6V4mDc9jmZkDoxLC9b6s6V8MAjPhY-EC_g%3D%3D&sa=X&sqi=2&ved=2ahUKEwi05JSHnMWMAxUw8bsIHRRCDd0Qk8gLegQIHxAB&ictx=1&stq=1&cs=0&lei=o2bzZ_SGIrDi7_UPlIS16A0#ebo=1"
+        #         }
+        #                 "question": f"Let's Move Back {question}",
+        #                 "options": options
+        #             }
 
-        elif question in [
-            "Tell me your Emirate",
-            "Tell me your Emirate sponsor located in?",
-            "In which emirate would you prefer your vehicle to be repaired?",
-            "Let's start with your motor insurance details. Select the city of registration",
-        ]:
-            return handle_emirate_question(
-                question,
-                user_message,
-                conversation_state,
-                questions,
-                responses,
-                user_language,
-            )
-
-        elif (
-            question
-            == "Which area you prefer for the vehicle repair? Please type the name of the area"
-        ):
-            if conversation_state["current_question_index"] == questions.index(
-                question
-            ):
-                # Fetch the emirate from the previous response
-                emirate = (
-                    responses.get(
-                        "In which emirate would you prefer your vehicle to be repaired?",
-                        "",
-                    )
-                    .strip()
-                    .lower()
-                )
+        #         else:
+        #                 return {
+        #                 return {
+        #             "review_message": "If you are satisfied with Wehbe(Broker) services, please leave a review for sharing happiness to others!!😊",
+        #             "review_link": "https://www.google.com/search?client=ms-android-samsung-ss&sca_esv=4eb717e6f42bf628&sxsrf=AHTn8zprabdPVFL3C2gXo4guY8besI3jqQ:1744004771562&q=wehbe+insurance+services+llc+reviews&uds=ABqPDvy-z0dcsfm2PY76_gjn-YWou9-AAVQ4iWjuLR6vmDV0vf3KpBMNjU5ZkaHGmSY0wBrWI3xO9O55WuDmXbDq6a3SqlwKf2NJ5xQAjebIw44UNEU3t4CpFvpLt9qFPlVh2F8Gfv8sMuXXSo2Qq0M_ZzbXbg2c323G_bE4tVi7Ue7d_sW0CrnycpJ1CvV-OyrWryZw_TeQ3gLGDgzUuHD04MpSHquYZaSQ0_mIHLWjnu7fu8c7nb6_aGDb_H1Q-86fD2VmWluYA5jxRkC9U2NsSwSSXV4FPW9w1Q2T_Wjt6koJvLgtikd66MqwYiJPX2x9MwLhoGYlpTbKtkJuHwE9eM6wQgieChskow6tJCVjQ75I315dT8n3tUtasGdBkprOlUK9ibPrYr9HqRz4AwzEQaxAq9_EDcsSG_XW0CHuqi2lRKHw592MlGlhjyQibXKSZJh-v3KW4wIVqa-2x0k1wfbZdpaO3BZaKYCacLOxwUKTnXPbQqDPLQDeYgDBwaTLvaCN221H&si=APYL9bvoDGWmsM6h2lfKzIb8LfQg_oNQyUOQgna9TyfQHAoqUvvaXjJhb-NHEJtDKiWdK3OqRhtZNP2EtNq6veOxTLUq88TEa2J8JiXE33-xY1b8ohiuDLBeOOGhuI1U6V4mDc9jmZkDoxLC9b6s6V8MAjPhY-EC_g%3D%3D&sa=X&sqi=2&ved=2ahUKEwi05JSHnMWMAxUw8bsIHRRCDd0Qk8gLegQIHxAB&ictx=1&stq=1&cs=0&lei=o2bzZ_SGIrDi7_UPlIS16A0#ebo=1"
+        #         }
+        #                 "question": f"Let's Move Back {question}",
+        #                 }
 
-                # Prompt LLM for additional validation
-                check_prompt = (
-                    f"The user has responded with: '{user_message}'. Determine if this is a valid area within the emirate '{emirate}'. "
-                    "Respond only with 'Yes' or 'No'."
-                )
-                llm_response = llm.invoke([
-                    SystemMessage(
-                        content=f"You are Insura, an AI assistant specialized in identifying the area based on the {emirate}. "
-                        "Your task is to verify if the provided input is a valid area within the specified emirate."
-                    ),
-                    HumanMessage(content=check_prompt),
-                ])
-                is_valid_area = llm_response.content.strip().lower() == "yes"
+        #     else:
+        #         general_assistant_prompt = f"user response: {user_message}. Please assist."
+        #         general_assistant_response = llm.invoke([
+        #             SystemMessage(content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."),
+        #             HumanMessage(content=general_assistant_prompt)
+        #         ])
 
-                if is_valid_area:
-                    # Store the area
-                    responses[question] = user_message
-                    conversation_state["current_question_index"] += 1
+        #         # Safely access the next question
+        #         if conversation_state["current_question_index"] < len(questions):
+        #             next_question = questions[conversation_state["current_question_index"]]
+        #             if isinstance(next_question, dict) and "options" in next_question:
+        #                 options = ", ".join(next_question["options"])
+        #                 return {
+        #                     "response": f"{general_assistant_response.content.strip()}",
+        #                     "question": f"Let's try again: {next_question['question']}",
+        #                     "options": options
+        #                 }
+        #             else:
+        #                 question_text = next_question["question"] if isinstance(next_question, dict) else next_question
+        #                 return {
+        #                     "response": f"{general_assistant_response.content.strip()}",
+        #                     "question": f"Let's try again: {question_text}"
+        #                 }
+        #         else:
+        #             return {
+        #                 "response": f"{general_assistant_response.content.strip()}",
+        #                 "question": "It seems we have reached the end of the questions."
+        #             }
 
-                    if conversation_state["current_question_index"] < len(questions):
-                        next_question = questions[
-                            conversation_state["current_question_index"]
-                        ]
-                        if "options" in next_question:
-                            options = ", ".join(next_question["options"])
-                            next_questions = next_question["question"]
-                            return {
-                                "response": f"Thank you! Now, let's move on to: {next_questions}",
-                                "options": options,
-                            }
-                        else:
-                            return {
-                                "response": f"Thank you for providing the area. Now, let's move on to: {next_question['question']}"
-                            }
-                    else:
-                        # All questions completed
-                        with open("user_responses.json", "w") as file:
-                            json.dump(responses, file, indent=4)
-                        return {
-                            "response": "Thank you for using Insura. Your request has been processed. Have a great day!",
-                            "final_responses": responses,
-                        }
-                else:
-                    # Use general assistant for invalid LLM validation
-                    general_assistant_prompt = (
-                        f"The user entered '{user_message}', which was not validated as a valid area within the emirate '{emirate}' by Insura. "
-                        "Please assist them in correcting their input."
-                    )
-                    general_assistant_response = llm.invoke([
-                        SystemMessage(
-                            content="You are Insura, an AI assistant created by CloudSubset. "
-                            "Your role is to assist users with their inquiries and guide them appropriately."
-                        ),
-                        HumanMessage(content=general_assistant_prompt),
-                    ])
-                    return {
-                        "response": f"{general_assistant_response.content.strip()}",
-                        "question": f"Let's try again: {question}\n",
-                    }
-        elif question == "Date of Birth (DOB)":
-            return handle_date_question(
-                question,
-                user_message,
-                responses,
-                conversation_state,
-                questions,
-                user_language,
-            )
+        else:
+            handler = QUESTION_HANDLERS.get(question)
+            if handler is not None:
+                result = await handler(
+                    question=question,
+                    user_message=user_message,
+                    user_language=user_language,
+                    user_id=user_id,
+                    conversation_state=conversation_state,
+                    questions=questions,
+                    responses=responses,
+                    options=options,
+                    current_flow=conversation_state.get("current_flow", "initial"),
+                )
+                if result is not NOT_HANDLED:
+                    return result
         # For other free-text questions - Use multilingual evaluation
 
         evaluation_prompt = f"Is the user's response '{user_message}' correct for the question '{question}'? The user is responding in {user_language}. Answer 'yes' or 'no'."
-        evaluation_response = llm.invoke([
+        evaluation_response = await llm.ainvoke([
             SystemMessage(
                 content=f"You are evaluating user responses in {user_language}. Consider language variations and cultural context."
             ),
@@ -5236,7 +5745,7 @@ def process_user_input(user_input: UserInput):
 
         if evaluation == "yes":
             # Translate to English for storage if needed
-            english_response = translate_to_english_for_storage(
+            english_response = await translate_to_english_for_storage(
                 user_message, user_language
             )
             responses[question] = english_response
@@ -5253,7 +5762,7 @@ def process_user_input(user_input: UserInput):
                     response_message = f"Thank you! That was helpful. Now, let's move on to: {next_question}"
 
                     # Translate to user's language
-                    return format_response_in_language(
+                    return await format_response_in_language(
                         response_message, next_options, user_language
                     )
                 else:
@@ -5261,16 +5770,17 @@ def process_user_input(user_input: UserInput):
                     response_message = f"Thank you! That was helpful. Now, let's move on to: {next_question}"
 
                     # Translate to user's language
-                    return format_response_in_language(
+                    return await format_response_in_language(
                         response_message, [], user_language
                     )
             else:
                 # All questions answered
-                with open("user_responses.json", "w") as file:
-                    json.dump(responses, file, indent=4)
+                record_completion(responses)
 
                 final_message = "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask."
-                result = format_response_in_language(final_message, [], user_language)
+                result = await format_response_in_language(
+                    final_message, [], user_language
+                )
                 result["final_responses"] = responses
                 return result
         else:
@@ -5278,14 +5788,19 @@ def process_user_input(user_input: UserInput):
             general_assistant_prompt = (
                 f"User response: {user_message}. Please assist them in {user_language}."
             )
-            general_assistant_response = llm.invoke([
-                SystemMessage(
-                    content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-                ),
-                HumanMessage(content=general_assistant_prompt),
-            ])
+            general_assistant_response = await cached_reply(
+                llm,
+                [
+                    SystemMessage(
+                        content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                    ),
+                    HumanMessage(content=general_assistant_prompt),
+                ],
+                user_message,
+                user_language,
+            )
 
-            retry_question = translate_text(
+            retry_question = await translate_text(
                 f"Let's Move back to {question}", user_language
             )
             return {
@@ -5299,12 +5814,17 @@ def process_user_input(user_input: UserInput):
         user_language = conversation_state.get("preferred_language", "English")
 
         general_assistant_prompt = f"General query: {user_message}."
-        general_assistant_response = llm.invoke([
-            SystemMessage(
-                content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-            ),
-            HumanMessage(content=general_assistant_prompt),
-        ])
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
 
         return {
             "response": f"{general_assistant_response.content.strip()}",
@@ -5313,17 +5833,6 @@ def process_user_input(user_input: UserInput):
         }
 
 
-async def clear_user_states_task():
-    while True:
-        await asyncio.sleep(86400)  # Sleep for 24 hours
-        user_states.clear()
-        print(f"User states cleared at {datetime.utcnow()}")
-
-
-def start_clear_user_states_task():
-    loop = asyncio.get_event_loop()
-    loop.create_task(clear_user_states_task())
-
-
-# Ensure the task starts when the module is imported
-start_clear_user_states_task()
+if __name__ == "__main__":
+    # Question dispatch micro-benchmark: python -m services.llm_services
+    print(benchmark_dispatch())
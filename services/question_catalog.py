@@ -0,0 +1,384 @@
+"""
+Question Catalog
+Pre-translated copies of the static question text, options and greeting
+templates from questions/questions.json, so that non-English turns can be
+served without a live LLM translation.
+
+It also holds pools of pre-written variants for fixed answers (see
+FIXED_ANSWER_REWRITES in services/llm_services.py), so those turns do not
+wait for an LLM rewrite.
+
+Build (or rebuild after editing questions.json) with:
+    python -m services.question_catalog
+Build the answer variants with:
+    python -m services.question_catalog --answers
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from typing import Optional
+
+QUESTIONS_FILE = "questions/questions.json"
+CATALOG_FILE = os.getenv("QUESTION_CATALOG_FILE", "questions/catalog.json")
+CATALOG_FORMAT = 1
+ANSWER_VARIANTS_PER_LANGUAGE = int(os.getenv("ANSWER_VARIANTS_PER_LANGUAGE", "5"))
+ANSWER_VARIANT_TEMPERATURE = float(os.getenv("ANSWER_VARIANT_TEMPERATURE", "0.9"))
+
+# Static framing phrases that handlers put in front of a catalog question
+FRAMING_PREFIXES = [
+    "Great choice! ",
+    "Thank you! Now, let's move on to: ",
+    "Thank you for your response. Now, let's move on to: ",
+    "Thank you for uploading the document. Now, let's move on to: ",
+    "Thank you. Now, let's move on to: ",
+    "Let's try again: ",
+    "Let's move back to: ",
+    "Let's revisit: ",
+    "Alright, let's move on. ",
+    "Alright, let's go back to the main menu. ",
+    "Your conversation has been reset. Let's start fresh! ",
+]
+
+_PLACEHOLDER = re.compile(r"\{[a-z_]+\}")
+
+
+def _questions_version(questions_path: str, languages: list) -> str:
+    with open(questions_path, "rb") as file:
+        digest = hashlib.sha256(file.read())
+    digest.update(json.dumps(FRAMING_PREFIXES).encode("utf-8"))
+    digest.update(",".join(sorted(languages)).encode("utf-8"))
+    return f"{CATALOG_FORMAT}-{digest.hexdigest()[:16]}"
+
+
+def collect_static_strings(questions_data: dict) -> list:
+    """
+    Collect every static string that is shown to users.
+
+    Args:
+        questions_data: Parsed questions.json
+
+    Returns:
+        Sorted list of unique English strings
+    """
+    strings = set(FRAMING_PREFIXES)
+    for key, items in questions_data.items():
+        for item in items:
+            if isinstance(item, dict):
+                strings.add(item["question"])
+                strings.update(item.get("options", []))
+            else:
+                strings.add(item)
+    return sorted(s for s in strings if s and s.strip())
+
+
+def _supported_languages() -> list:
+    from services.llm_services import LANGUAGE_CODES
+
+    return [name.capitalize() for name in LANGUAGE_CODES if name != "english"]
+
+
+class QuestionCatalog:
+    """
+    Read-only view over a built catalog file.
+
+    Lookups are exact-match dictionary reads keyed by language (case-insensitive)
+    and the original English text. A framing prefix followed by a catalog
+    question is also resolved locally.
+    """
+
+    def __init__(
+        self,
+        translations: Optional[dict] = None,
+        version: str = None,
+        answer_variants: Optional[dict] = None,
+    ):
+        self.version = version
+        # answer key -> {"source": prompt digest, "languages": {language: [variants]}}
+        self._answers = {
+            key: {
+                "source": entry.get("source"),
+                "languages": {
+                    language.lower(): variants
+                    for language, variants in entry.get("languages", {}).items()
+                },
+            }
+            for key, entry in (answer_variants or {}).items()
+        }
+        self._translations = {
+            language.lower(): entries
+            for language, entries in (translations or {}).items()
+        }
+        # casefolded translation -> English originals, across every language
+        self._reverse = {}
+        for entries in self._translations.values():
+            for english, translated in entries.items():
+                self._reverse.setdefault(translated.strip().casefold(), set()).add(
+                    english
+                )
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(
+        cls, catalog_path: str = CATALOG_FILE, questions_path: str = QUESTIONS_FILE
+    ) -> "QuestionCatalog":
+        if not os.path.exists(catalog_path):
+            print(
+                f"[Question Catalog] {catalog_path} not found. Static prompts will be translated live."
+            )
+            return cls()
+        try:
+            with open(catalog_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"[Question Catalog] Could not read {catalog_path}: {e}")
+            return cls()
+
+        expected = _questions_version(questions_path, list(data.get("languages", {})))
+        if data.get("version") != expected:
+            if data.get("languages"):
+                print(
+                    f"[Question Catalog] {catalog_path} is stale (questions.json changed). Rebuild with: python -m services.question_catalog"
+                )
+            # Answer variants do not depend on questions.json
+            return cls(answer_variants=data.get("answer_variants"))
+        return cls(data["languages"], data["version"], data.get("answer_variants"))
+
+    def __bool__(self):
+        return bool(self._translations)
+
+    def lookup(self, text: str, language: str) -> Optional[str]:
+        """
+        Return the pre-translated text, or None if it is not in the catalog.
+
+        Args:
+            text: English text exactly as shown to the user
+            language: Target language name (e.g. 'Arabic')
+
+        Returns:
+            Translated text or None
+        """
+        entries = self._translations.get(language.lower())
+        if not entries or not text:
+            return None
+
+        translated = entries.get(text)
+        if translated is None:
+            for prefix in FRAMING_PREFIXES:
+                if not text.startswith(prefix):
+                    continue
+                # Either half may be missing if its translation failed at build time
+                framing = entries.get(prefix)
+                question = entries.get(text[len(prefix) :])
+                if framing is not None and question is not None:
+                    translated = f"{framing.strip()} {question}"
+                    break
+
+        if translated is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return translated
+
+    def match_translated_option(self, text: str, options: list) -> Optional[str]:
+        """
+        Map a translated option label typed or clicked by the user back to English.
+
+        Args:
+            text: The user's response
+            options: Candidate options in English
+
+        Returns:
+            The English option whose translation equals text, or None
+        """
+        originals = self._reverse.get(text.strip().casefold())
+        if not originals:
+            return None
+        matches = [option for option in options if option in originals]
+        return matches[0] if len(matches) == 1 else None
+
+    def answer_variants(self, key: str, source: str, language: str) -> list:
+        """
+        Return the pre-written variants of a fixed answer.
+
+        Args:
+            key: Answer key (e.g. 'takaful_network')
+            source: Digest of the prompt the variants must have been generated from
+            language: Preferred language; English variants are used when it has none
+
+        Returns:
+            List of variants, empty if there are none or they are stale
+        """
+        entry = self._answers.get(key)
+        if not entry or entry["source"] != source:
+            return []
+        languages = entry["languages"]
+        return languages.get((language or "english").lower()) or languages.get(
+            "english", []
+        )
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "languages": sorted(self._translations),
+            "answer_variants": sorted(self._answers),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+async def build_catalog(
+    questions_path: str = QUESTIONS_FILE,
+    catalog_path: str = CATALOG_FILE,
+    languages: list = None,
+    concurrency: int = 4,
+) -> dict:
+    """
+    Translate every static string into every supported language and write the catalog.
+
+    Args:
+        questions_path: Source questions.json
+        catalog_path: Output catalog file
+        languages: Target languages (defaults to everything in LANGUAGE_CODES except English)
+        concurrency: Maximum number of translation calls in flight
+
+    Returns:
+        The catalog dict that was written
+    """
+    from services.llm_services import load_questions, translate_text
+
+    languages = languages or _supported_languages()
+    questions_data = load_questions(questions_path)
+    strings = collect_static_strings(questions_data)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def translate(text: str, language: str) -> Optional[str]:
+        async with semaphore:
+            translated = await translate_text(text, language, "English")
+        if translated == text:
+            # translate_text returns the input unchanged when the call fails
+            return None
+        # Templates are only usable if every placeholder survived translation
+        if set(_PLACEHOLDER.findall(text)) != set(_PLACEHOLDER.findall(translated)):
+            print(f"[Question Catalog] Dropping {language} template: {text!r}")
+            return None
+        return translated
+
+    catalog = {
+        "version": _questions_version(questions_path, languages),
+        "generated_at": datetime.utcnow().isoformat(),
+        "source": questions_path,
+        "languages": {},
+        "answer_variants": _read_catalog(catalog_path).get("answer_variants", {}),
+    }
+    for language in languages:
+        results = await asyncio.gather(*[translate(s, language) for s in strings])
+        catalog["languages"][language] = {
+            text: translated
+            for text, translated in zip(strings, results)
+            if translated is not None
+        }
+        print(
+            f"[Question Catalog] {language}: {len(catalog['languages'][language])}/{len(strings)} strings"
+        )
+
+    with open(catalog_path, "w", encoding="utf-8") as file:
+        json.dump(catalog, file, ensure_ascii=False, indent=2)
+    return catalog
+
+
+def _read_catalog(catalog_path: str) -> dict:
+    try:
+        with open(catalog_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+async def build_answer_variants(
+    catalog_path: str = CATALOG_FILE,
+    languages: list = None,
+    count: int = ANSWER_VARIANTS_PER_LANGUAGE,
+    concurrency: int = 4,
+) -> dict:
+    """
+    Generate reworded variants of every fixed answer and store them in the catalog.
+
+    Args:
+        catalog_path: Catalog file to update (created if missing)
+        languages: Languages to translate the English variants into
+        count: Variants generated per answer
+        concurrency: Maximum number of LLM calls in flight
+
+    Returns:
+        The answer_variants section that was written
+    """
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    from services.llm_clients import get_llm
+    from services.llm_services import (
+        FIXED_ANSWER_REWRITES,
+        answer_source,
+        llm,
+        translate_text,
+    )
+
+    languages = languages or _supported_languages()
+    writer = get_llm(llm.model_name, ANSWER_VARIANT_TEMPERATURE)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def rewrite(system_prompt: str, prompt: str) -> Optional[str]:
+        async with semaphore:
+            try:
+                response = await writer.ainvoke([
+                    SystemMessage(content=system_prompt),
+                    HumanMessage(content=prompt),
+                ])
+            except Exception as e:
+                print(f"[Question Catalog] Rewrite failed: {e}")
+                return None
+        return response.content.strip() or None
+
+    async def translate(text: str, language: str) -> Optional[str]:
+        async with semaphore:
+            translated = await translate_text(text, language, "English")
+        return None if translated == text else translated
+
+    answers = {}
+    for key, (system_prompt, prompt) in FIXED_ANSWER_REWRITES.items():
+        results = await asyncio.gather(*[
+            rewrite(system_prompt, prompt) for _ in range(count)
+        ])
+        english = list(dict.fromkeys(r for r in results if r))
+        if not english:
+            continue
+        entry = {"source": answer_source(key), "languages": {"English": english}}
+        for language in languages:
+            translated = await asyncio.gather(*[
+                translate(text, language) for text in english
+            ])
+            kept = [text for text in translated if text]
+            if kept:
+                entry["languages"][language] = kept
+        answers[key] = entry
+        print(
+            f"[Question Catalog] {key}: {len(english)} variants, {len(entry['languages'])} languages"
+        )
+
+    catalog = _read_catalog(catalog_path)
+    catalog["answer_variants"] = answers
+    with open(catalog_path, "w", encoding="utf-8") as file:
+        json.dump(catalog, file, ensure_ascii=False, indent=2)
+    return answers
+
+
+if __name__ == "__main__":
+    if "--answers" in sys.argv:
+        asyncio.run(build_answer_variants())
+    else:
+        asyncio.run(build_catalog())
@@ -0,0 +1,89 @@
+"""
+Question Plan
+Per-session view over a question flow from questions/questions.json.
+
+The base flows are compiled once into tuples and shared by every session.
+Handlers that add or drop follow-up questions (Emirates ID back page, vaccine
+dose dates, advisor code, ...) mutate a QuestionPlan instead, which copies the
+base flow into the session's own overlay on the first write. Sessions that
+never branch hold no copy at all.
+"""
+
+from collections.abc import MutableSequence
+
+
+def compile_flows(questions_data: dict, flow_keys: list) -> dict:
+    """
+    Freeze the question lists that make up the conversation flows.
+
+    Args:
+        questions_data: Parsed questions.json
+        flow_keys: Keys of the lists to compile (e.g. 'car_questions')
+
+    Returns:
+        dict mapping each key to a tuple of questions
+    """
+    return {key: tuple(questions_data[key]) for key in flow_keys}
+
+
+class QuestionPlan(MutableSequence):
+    """
+    Copy-on-write list of the questions one session is working through.
+
+    Reads go to the session overlay when there is one and to the shared base
+    tuple otherwise. The overlay lives in a plain dict (the session's
+    conversation state), keyed by flow, so it is stored with the rest of the
+    session. Question dicts themselves are shared and must be treated as
+    read-only.
+    """
+
+    def __init__(self, base: tuple, overlays: dict, flow: str):
+        self._base = base
+        self._overlays = overlays
+        self._flow = flow
+
+    @property
+    def _items(self):
+        return self._overlays.get(self._flow, self._base)
+
+    def _writable(self) -> list:
+        items = self._overlays.get(self._flow)
+        if items is None:
+            items = self._overlays[self._flow] = list(self._base)
+        return items
+
+    @property
+    def is_modified(self) -> bool:
+        return self._flow in self._overlays
+
+    def reset(self):
+        """Drop the session overlay and go back to the base flow."""
+        self._overlays.pop(self._flow, None)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __setitem__(self, index, value):
+        self._writable()[index] = value
+
+    def __delitem__(self, index):
+        del self._writable()[index]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __contains__(self, value):
+        return value in self._items
+
+    def index(self, value, *args):
+        return self._items.index(value, *args)
+
+    def insert(self, index, value):
+        self._writable().insert(index, value)
+
+    def __repr__(self):
+        state = "modified" if self.is_modified else "base"
+        return f"QuestionPlan({self._flow!r}, {len(self)} questions, {state})"
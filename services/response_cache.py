@@ -0,0 +1,209 @@
+"""
+Response Cache
+Cache for the general-assistant fallback replies ("You are Insura, ...").
+
+Entries are keyed by the prompt with the user's message taken out (the
+template), the response language and the normalized user message, so
+"What is Takaful?" and "what is takaful" asked at the same step share one
+reply. The memory tier is a TTLCache (LRU eviction plus per-entry expiry).
+
+With ASSISTANT_CACHE_SEMANTIC enabled, a miss is also compared against the
+other messages cached for the same template and language, and the closest
+one is reused when its cosine similarity reaches ASSISTANT_CACHE_SIMILARITY.
+Vectors come from a local character/word n-gram model, or from a
+sentence-transformers model when ASSISTANT_CACHE_EMBEDDING_MODEL is set.
+"""
+
+import asyncio
+import hashlib
+import math
+import os
+import re
+import unicodedata
+from collections import Counter, OrderedDict
+from typing import Optional
+
+from cachetools import TTLCache
+from langchain_core.messages import AIMessage
+
+ASSISTANT_CACHE_SIZE = int(os.getenv("ASSISTANT_CACHE_SIZE", "2000"))
+ASSISTANT_CACHE_TTL = int(os.getenv("ASSISTANT_CACHE_TTL", str(86400)))
+ASSISTANT_CACHE_SEMANTIC = os.getenv("ASSISTANT_CACHE_SEMANTIC", "").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+ASSISTANT_CACHE_SIMILARITY = float(os.getenv("ASSISTANT_CACHE_SIMILARITY", "0.9"))
+# Most recent messages compared per (template, language) on a semantic lookup
+ASSISTANT_CACHE_SEMANTIC_CANDIDATES = int(
+    os.getenv("ASSISTANT_CACHE_SEMANTIC_CANDIDATES", "500")
+)
+ASSISTANT_CACHE_EMBEDDING_MODEL = os.getenv("ASSISTANT_CACHE_EMBEDDING_MODEL")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_message(text: str) -> str:
+    """Casefold, drop punctuation and collapse whitespace."""
+    text = "".join(
+        " " if unicodedata.category(char).startswith("P") else char
+        for char in text.casefold()
+    )
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _ngram_vector(text: str) -> dict:
+    counts = Counter(text.split())
+    padded = f" {text} "
+    counts.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    norm = math.sqrt(sum(value * value for value in counts.values())) or 1.0
+    return {gram: value / norm for gram, value in counts.items()}
+
+
+def _cosine(a, b) -> float:
+    if isinstance(a, dict):
+        if len(a) > len(b):
+            a, b = b, a
+        return sum(value * b.get(gram, 0.0) for gram, value in a.items())
+    return sum(x * y for x, y in zip(a, b))
+
+
+class ResponseCache:
+    """Exact-match reply cache with an optional similarity tier."""
+
+    def __init__(
+        self,
+        maxsize: int = ASSISTANT_CACHE_SIZE,
+        ttl: int = ASSISTANT_CACHE_TTL,
+        semantic: bool = ASSISTANT_CACHE_SEMANTIC,
+        threshold: float = ASSISTANT_CACHE_SIMILARITY,
+        embedding_model: Optional[str] = ASSISTANT_CACHE_EMBEDDING_MODEL,
+    ):
+        self._replies = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.semantic = semantic
+        self.threshold = threshold
+        self.embedding_model = embedding_model
+        self._encoder = None
+        # (template, language) -> OrderedDict(normalized message -> vector)
+        self._vectors = {}
+        self.stats_counters = {
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "writes": 0,
+        }
+
+    @staticmethod
+    def make_key(
+        messages: list, user_message: str, user_language: Optional[str]
+    ) -> Optional[tuple]:
+        """
+        Build the cache key, or None when the reply should not be cached.
+
+        Args:
+            messages: The messages sent to the LLM
+            user_message: The user's raw message embedded in those messages
+            user_language: Response language, if the prompt depends on it
+        """
+        normalized = normalize_message(user_message or "")
+        if not normalized:
+            return None
+        prompt = "\n".join(
+            f"{message.type}:{message.content}" for message in messages
+        ).replace(user_message, "{user_message}")
+        template = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:20]
+        return (template, (user_language or "").strip().lower(), normalized)
+
+    def _embed(self, text: str):
+        if not self.embedding_model:
+            return _ngram_vector(text)
+        if self._encoder is None:
+            from sentence_transformers import SentenceTransformer
+
+            self._encoder = SentenceTransformer(self.embedding_model)
+        return self._encoder.encode(text, normalize_embeddings=True).tolist()
+
+    async def _vector(self, text: str):
+        if self.embedding_model:
+            return await asyncio.to_thread(self._embed, text)
+        return self._embed(text)
+
+    async def get(self, key: tuple) -> Optional[str]:
+        reply = self._replies.get(key)
+        if reply is not None:
+            self.stats_counters["exact_hits"] += 1
+            return reply
+
+        bucket = self._vectors.get(key[:2]) if self.semantic else None
+        if bucket:
+            vector = await self._vector(key[2])
+            best, best_score = None, self.threshold
+            for message, candidate in list(bucket.items()):
+                if (*key[:2], message) not in self._replies:
+                    # Expired or evicted from the reply tier
+                    del bucket[message]
+                    continue
+                score = _cosine(vector, candidate)
+                if score >= best_score:
+                    best, best_score = message, score
+            if best is not None:
+                reply = self._replies.get((*key[:2], best))
+                if reply is not None:
+                    self.stats_counters["semantic_hits"] += 1
+                    return reply
+
+        self.stats_counters["misses"] += 1
+        return None
+
+    async def set(self, key: tuple, reply: str):
+        self._replies[key] = reply
+        self.stats_counters["writes"] += 1
+        if self.semantic:
+            bucket = self._vectors.setdefault(key[:2], OrderedDict())
+            bucket[key[2]] = await self._vector(key[2])
+            bucket.move_to_end(key[2])
+            while len(bucket) > ASSISTANT_CACHE_SEMANTIC_CANDIDATES:
+                bucket.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = sum(
+            self.stats_counters[name]
+            for name in ("exact_hits", "semantic_hits", "misses")
+        )
+        hits = lookups - self.stats_counters["misses"]
+        return {
+            **self.stats_counters,
+            "entries": len(self._replies),
+            "semantic": self.semantic,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+response_cache = ResponseCache()
+
+
+async def cached_reply(
+    llm, messages: list, user_message: str, user_language: Optional[str] = None
+) -> AIMessage:
+    """
+    llm.ainvoke(messages) for general-assistant fallbacks, served from the cache when possible.
+
+    Args:
+        llm: Chat model to call on a miss
+        messages: System and human messages for the reply
+        user_message: The user's message the prompt was built from
+        user_language: Response language, if the prompt depends on it
+
+    Returns:
+        The model's reply (a cached one on a hit)
+    """
+    key = response_cache.make_key(messages, user_message, user_language)
+    if key is not None:
+        reply = await response_cache.get(key)
+        if reply is not None:
+            return AIMessage(content=reply)
+
+    response = await llm.ainvoke(messages)
+    if key is not None and isinstance(response.content, str) and response.content:
+        await response_cache.set(key, response.content)
+    return response
@@ -0,0 +1,521 @@
+"""
+Session Store
+Per-user conversation state shared by every router, with pluggable backends.
+
+SESSION_STORE_URL selects the backend:
+    memory://                              in-process (default, single worker)
+    sqlite:///cache/sessions.sqlite3       shared by the workers on one host
+    redis://localhost:6379/0               shared across hosts (any Redis-protocol server)
+
+Sessions expire after SESSION_TTL seconds without activity. A background
+sweeper (start_sweeper) removes idle sessions a small batch at a time, so
+active conversations are never dropped in bulk.
+
+Routers use a SessionNamespace as a dict keyed by user id. A request checks
+the user's state out with `async with user_states.checkout(user_id):`, works
+on it synchronously, and the state is written back (and its TTL refreshed)
+when the block exits.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from typing import Optional
+
+SESSION_STORE_URL = os.getenv("SESSION_STORE_URL", "memory://")
+SESSION_TTL = int(os.getenv("SESSION_TTL", "3600"))
+# Memory backend only; the oldest session is evicted (and logged) past this
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "10000"))
+SESSION_SWEEP_INTERVAL = int(os.getenv("SESSION_SWEEP_INTERVAL", "60"))
+SESSION_SWEEP_BATCH = int(os.getenv("SESSION_SWEEP_BATCH", "200"))
+# Serialized states larger than this are zlib-compressed
+SESSION_COMPRESS_MIN_BYTES = 1024
+
+_DATETIME_TAG = "__dt__"
+_DATE_TAG = "__date__"
+_COMPRESSED = b"z"
+_PLAIN = b"j"
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {_DATETIME_TAG: value.isoformat()}
+    if isinstance(value, date):
+        return {_DATE_TAG: value.isoformat()}
+    if hasattr(value, "item"):
+        # numpy / pandas scalars from the Excel parser
+        return value.item()
+    return str(value)
+
+
+def _decode_object(obj: dict):
+    if len(obj) == 1:
+        if _DATETIME_TAG in obj:
+            return datetime.fromisoformat(obj[_DATETIME_TAG])
+        if _DATE_TAG in obj:
+            return date.fromisoformat(obj[_DATE_TAG])
+    return obj
+
+
+def serialize_state(state: dict) -> bytes:
+    """Compact JSON (datetimes tagged), zlib-compressed when large."""
+    data = json.dumps(
+        state, separators=(",", ":"), ensure_ascii=False, default=_encode_value
+    ).encode("utf-8")
+    if len(data) >= SESSION_COMPRESS_MIN_BYTES:
+        return _COMPRESSED + zlib.compress(data, 6)
+    return _PLAIN + data
+
+
+def deserialize_state(payload: bytes) -> dict:
+    data = payload[1:]
+    if payload[:1] == _COMPRESSED:
+        data = zlib.decompress(data)
+    return json.loads(data.decode("utf-8"), object_hook=_decode_object)
+
+
+class SessionStore:
+    """
+    Backend interface. Keys are namespaced strings; values are state dicts.
+
+    Every write refreshes the key's TTL. touch() refreshes it without
+    rewriting the value. sweep() removes at most batch_size idle sessions.
+    """
+
+    # True when load() hands out the stored object itself, so in-place
+    # changes need no write-back
+    live_objects = False
+
+    def __init__(self, ttl: int = SESSION_TTL):
+        self.ttl = ttl
+        self.stats_counters = {
+            "loads": 0,
+            "misses": 0,
+            "saves": 0,
+            "touches": 0,
+            "idle_evictions": 0,
+            "capacity_evictions": 0,
+        }
+
+    async def load(self, key: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def save(self, key: str, state: dict):
+        raise NotImplementedError
+
+    async def touch(self, key: str):
+        raise NotImplementedError
+
+    async def delete(self, key: str):
+        raise NotImplementedError
+
+    async def clear(self, prefix: str = ""):
+        raise NotImplementedError
+
+    async def sweep(self, batch_size: int = SESSION_SWEEP_BATCH) -> int:
+        return 0
+
+    async def stats(self) -> dict:
+        return {"backend": type(self).__name__, "ttl": self.ttl, **self.stats_counters}
+
+
+class MemorySessionStore(SessionStore):
+    """
+    In-process store. States are kept as live dicts, never serialized.
+
+    Sessions are ordered by last activity, so the idle sweep and the capacity
+    limit both remove the least recently active sessions first.
+    """
+
+    live_objects = True
+
+    def __init__(self, ttl: int = SESSION_TTL, maxsize: int = SESSION_MAX_ENTRIES):
+        super().__init__(ttl)
+        self.maxsize = maxsize
+        # key -> (last activity, state), least recently active first
+        self._sessions = OrderedDict()
+
+    def _is_idle(self, last_seen: float, now: float) -> bool:
+        return now - last_seen >= self.ttl
+
+    def _mark_active(self, key: str, state: dict):
+        self._sessions[key] = (time.monotonic(), state)
+        self._sessions.move_to_end(key)
+
+    async def load(self, key: str) -> Optional[dict]:
+        self.stats_counters["loads"] += 1
+        entry = self._sessions.get(key)
+        if entry is None or self._is_idle(entry[0], time.monotonic()):
+            self.stats_counters["misses"] += 1
+            return None
+        return entry[1]
+
+    async def save(self, key: str, state: dict):
+        self.stats_counters["saves"] += 1
+        self._mark_active(key, state)
+        while len(self._sessions) > self.maxsize:
+            evicted, _ = self._sessions.popitem(last=False)
+            self.stats_counters["capacity_evictions"] += 1
+            print(
+                f"[Session Store] Memory store is full ({self.maxsize} sessions); evicted {evicted}"
+            )
+
+    async def touch(self, key: str):
+        entry = self._sessions.get(key)
+        if entry is not None:
+            self.stats_counters["touches"] += 1
+            self._mark_active(key, entry[1])
+
+    async def delete(self, key: str):
+        self._sessions.pop(key, None)
+
+    async def clear(self, prefix: str = ""):
+        for key in [key for key in self._sessions if key.startswith(prefix)]:
+            del self._sessions[key]
+
+    async def sweep(self, batch_size: int = SESSION_SWEEP_BATCH) -> int:
+        now = time.monotonic()
+        evicted = 0
+        while self._sessions and evicted < batch_size:
+            key, (last_seen, _) = next(iter(self._sessions.items()))
+            if not self._is_idle(last_seen, now):
+                break
+            del self._sessions[key]
+            evicted += 1
+        self.stats_counters["idle_evictions"] += evicted
+        return evicted
+
+    async def stats(self) -> dict:
+        # Footprint is estimated from the serialized size of the most recent sessions
+        sample = [state for _, state in list(self._sessions.values())[-100:]]
+        sample_bytes = sum(len(serialize_state(state)) for state in sample)
+        average = sample_bytes / len(sample) if sample else 0
+        return {
+            **await super().stats(),
+            "live_sessions": len(self._sessions),
+            "max_sessions": self.maxsize,
+            "approx_bytes": int(average * len(self._sessions)),
+        }
+
+
+class SQLiteSessionStore(SessionStore):
+    """File-backed store that every worker process on the host can share."""
+
+    def __init__(self, db_path: str, ttl: int = SESSION_TTL):
+        super().__init__(ttl)
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS sessions (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                expires_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at)"
+        )
+        self._conn.commit()
+        print(f"[Session Store] SQLite backend at {db_path}")
+
+    def _execute(self, sql: str, params: tuple = (), fetch: bool = False):
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            result = cursor.fetchone() if fetch else cursor.rowcount
+            self._conn.commit()
+            return result
+
+    def _load(self, key: str) -> Optional[bytes]:
+        row = self._execute(
+            "SELECT value FROM sessions WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+            fetch=True,
+        )
+        return row[0] if row else None
+
+    def _save(self, key: str, payload: bytes):
+        self._execute(
+            "INSERT OR REPLACE INTO sessions (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, payload, time.time() + self.ttl),
+        )
+
+    async def load(self, key: str) -> Optional[dict]:
+        self.stats_counters["loads"] += 1
+        payload = await asyncio.to_thread(self._load, key)
+        if payload is None:
+            self.stats_counters["misses"] += 1
+            return None
+        return deserialize_state(payload)
+
+    async def save(self, key: str, state: dict):
+        self.stats_counters["saves"] += 1
+        await asyncio.to_thread(self._save, key, serialize_state(state))
+
+    async def touch(self, key: str):
+        self.stats_counters["touches"] += 1
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE sessions SET expires_at = ? WHERE key = ?",
+            (time.time() + self.ttl, key),
+        )
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(
+            self._execute, "DELETE FROM sessions WHERE key = ?", (key,)
+        )
+
+    async def clear(self, prefix: str = ""):
+        await asyncio.to_thread(
+            self._execute,
+            "DELETE FROM sessions WHERE substr(key, 1, ?) = ?",
+            (len(prefix), prefix),
+        )
+
+    async def sweep(self, batch_size: int = SESSION_SWEEP_BATCH) -> int:
+        # Expired rows are already invisible to load(); this reclaims the space
+        evicted = await asyncio.to_thread(
+            self._execute,
+            "DELETE FROM sessions WHERE rowid IN ("
+            "SELECT rowid FROM sessions WHERE expires_at <= ? LIMIT ?)",
+            (time.time(), batch_size),
+        )
+        self.stats_counters["idle_evictions"] += evicted
+        return evicted
+
+    async def stats(self) -> dict:
+        live, size = await asyncio.to_thread(
+            self._execute,
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM sessions "
+            "WHERE expires_at > ?",
+            (time.time(),),
+            True,
+        )
+        return {
+            **await super().stats(),
+            "live_sessions": live,
+            "approx_bytes": size,
+            "db_file_bytes": os.path.getsize(self.db_path),
+        }
+
+
+class RedisSessionStore(SessionStore):
+    """Store on any Redis-protocol server (Redis, Valkey, KeyDB, Dragonfly)."""
+
+    def __init__(self, url: str, ttl: int = SESSION_TTL, prefix: str = "insura:"):
+        super().__init__(ttl)
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "SESSION_STORE_URL points at Redis but the 'redis' package is not installed"
+            ) from e
+        self.prefix = prefix
+        self._client = redis.from_url(url, health_check_interval=30)
+        print(f"[Session Store] Redis backend at {url.split('@')[-1]}")
+
+    async def load(self, key: str) -> Optional[dict]:
+        self.stats_counters["loads"] += 1
+        payload = await self._client.get(self.prefix + key)
+        if payload is None:
+            self.stats_counters["misses"] += 1
+            return None
+        return deserialize_state(payload)
+
+    async def save(self, key: str, state: dict):
+        self.stats_counters["saves"] += 1
+        await self._client.set(self.prefix + key, serialize_state(state), ex=self.ttl)
+
+    async def touch(self, key: str):
+        self.stats_counters["touches"] += 1
+        await self._client.expire(self.prefix + key, self.ttl)
+
+    async def delete(self, key: str):
+        await self._client.delete(self.prefix + key)
+
+    async def clear(self, prefix: str = ""):
+        async for key in self._client.scan_iter(match=f"{self.prefix}{prefix}*"):
+            await self._client.delete(key)
+
+    # sweep() stays a no-op: the server expires keys itself
+
+    async def stats(self) -> dict:
+        memory = await self._client.info("memory")
+        return {
+            **await super().stats(),
+            "server_used_memory": memory.get("used_memory"),
+        }
+
+
+def create_session_store(url: str = SESSION_STORE_URL, ttl: int = SESSION_TTL):
+    """
+    Build the backend named by a store URL.
+
+    Args:
+        url: memory://, sqlite:///path or redis://host:port/db (rediss:// for TLS)
+        ttl: Seconds a session survives without activity
+
+    Returns:
+        SessionStore
+    """
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisSessionStore(url, ttl)
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url[len("sqlite:///") :], ttl)
+    if url.startswith("memory://"):
+        return MemorySessionStore(ttl)
+    raise ValueError(f"Unsupported SESSION_STORE_URL: {url}")
+
+
+class SessionNamespace(MutableMapping):
+    """
+    Dict-like view of one router's sessions (e.g. 'chat', 'excel_upload').
+
+    Only checked-out keys are visible to the synchronous dict operations.
+    checkout() loads the state once per request (concurrent requests for the
+    same user share it) and writes it back, or deletes it, when the last one
+    finishes. An unchanged state only has its TTL refreshed. Loading and
+    writing back are serialized per user, so a request never loads a state
+    that is still being saved, or replaces one another request is using.
+    """
+
+    def __init__(self, store: SessionStore, name: str):
+        self.store = store
+        self.name = name
+        self._live = {}
+        self._snapshots = {}
+        self._holders = {}
+        self._deleted = set()
+        # user_id -> [asyncio.Lock, checkouts using it]
+        self._locks = {}
+
+    def _key(self, user_id: str) -> str:
+        return f"{self.name}:{user_id}"
+
+    def _lock(self, user_id: str) -> asyncio.Lock:
+        entry = self._locks.get(user_id)
+        if entry is None:
+            entry = self._locks[user_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        return entry[0]
+
+    def _unlock(self, user_id: str):
+        entry = self._locks[user_id]
+        entry[1] -= 1
+        if not entry[1]:
+            del self._locks[user_id]
+
+    @asynccontextmanager
+    async def checkout(self, user_id: str):
+        lock = self._lock(user_id)
+        try:
+            async with lock:
+                if not self._holders.get(user_id):
+                    state = await self.store.load(self._key(user_id))
+                    self._deleted.discard(user_id)
+                    if state is not None:
+                        self._live[user_id] = state
+                        if not self.store.live_objects:
+                            self._snapshots[user_id] = serialize_state(state)
+                self._holders[user_id] = self._holders.get(user_id, 0) + 1
+            try:
+                yield self
+            finally:
+                async with lock:
+                    self._holders[user_id] -= 1
+                    if not self._holders[user_id]:
+                        del self._holders[user_id]
+                        await self._release(user_id)
+        finally:
+            self._unlock(user_id)
+
+    async def _release(self, user_id: str):
+        key = self._key(user_id)
+        snapshot = self._snapshots.pop(user_id, None)
+        if user_id in self._live:
+            state = self._live.pop(user_id)
+            if snapshot is not None and serialize_state(state) == snapshot:
+                await self.store.touch(key)
+            else:
+                await self.store.save(key, state)
+        elif user_id in self._deleted:
+            self._deleted.discard(user_id)
+            await self.store.delete(key)
+
+    async def fetch(self, user_id: str) -> Optional[dict]:
+        """Read a state without checking it out (changes are not saved)."""
+        if user_id in self._live:
+            return self._live[user_id]
+        return await self.store.load(self._key(user_id))
+
+    def __getitem__(self, user_id):
+        return self._live[user_id]
+
+    def __setitem__(self, user_id, state):
+        self._deleted.discard(user_id)
+        self._live[user_id] = state
+
+    def __delitem__(self, user_id):
+        del self._live[user_id]
+        self._deleted.add(user_id)
+
+    def __iter__(self):
+        return iter(self._live)
+
+    def __len__(self):
+        return len(self._live)
+
+    def __contains__(self, user_id):
+        return user_id in self._live
+
+
+session_store = create_session_store()
+
+
+def namespace(name: str) -> SessionNamespace:
+    return SessionNamespace(session_store, name)
+
+
+async def sweep_idle_sessions(
+    store: SessionStore = session_store,
+    interval: int = SESSION_SWEEP_INTERVAL,
+    batch_size: int = SESSION_SWEEP_BATCH,
+):
+    """Evict idle sessions in batches, yielding to requests between batches."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            evicted = 0
+            while True:
+                count = await store.sweep(batch_size)
+                evicted += count
+                if count < batch_size:
+                    break
+                await asyncio.sleep(0)
+            if evicted:
+                print(f"[Session Store] Expired {evicted} idle sessions")
+        except Exception as e:
+            print(f"[Session Store] Sweep failed: {e}")
+
+
+_sweeper = None
+
+
+def start_sweeper():
+    """Start the idle-session sweeper once per process."""
+    global _sweeper
+    if _sweeper is None or _sweeper.done():
+        _sweeper = asyncio.create_task(sweep_idle_sessions())
@@ -0,0 +1,173 @@
+"""
+Translation Cache
+Keyed cache for LLM translations with an in-process LRU/TTL tier and an
+optional SQLite tier that survives restarts.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from cachetools import TTLCache
+
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "5000"))
+TRANSLATION_CACHE_TTL = int(os.getenv("TRANSLATION_CACHE_TTL", str(7 * 86400)))
+# Set to a file path (e.g. "cache/translations.sqlite3") to enable the disk tier
+TRANSLATION_CACHE_DB = os.getenv("TRANSLATION_CACHE_DB")
+TRANSLATION_CACHE_DB_MAX_ROWS = int(os.getenv("TRANSLATION_CACHE_DB_MAX_ROWS", "50000"))
+
+
+class TranslationCache:
+    """
+    Two-tier translation cache keyed by (text, source language, target language).
+
+    The memory tier is a TTLCache (LRU eviction plus per-entry expiry). When a
+    database path is given, entries are also written to SQLite so they survive
+    restarts and can be shared by several workers on the same host.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = TRANSLATION_CACHE_SIZE,
+        ttl: int = TRANSLATION_CACHE_TTL,
+        db_path: Optional[str] = TRANSLATION_CACHE_DB,
+        db_max_rows: int = TRANSLATION_CACHE_DB_MAX_ROWS,
+    ):
+        self.ttl = ttl
+        self.db_path = db_path
+        self.db_max_rows = db_max_rows
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._disk_writes = 0
+        self.stats_counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+        }
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, db_path: str):
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS translations (
+                text TEXT NOT NULL,
+                source TEXT NOT NULL,
+                target TEXT NOT NULL,
+                translated TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (text, source, target)
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_translations_created_at "
+            "ON translations (created_at)"
+        )
+        self._conn.execute(
+            "DELETE FROM translations WHERE created_at < ?", (time.time() - self.ttl,)
+        )
+        self._conn.commit()
+        print(f"[Translation Cache] Disk tier enabled at {db_path}")
+
+    @staticmethod
+    def make_key(text: str, source_language: str, target_language: str) -> tuple:
+        return (
+            text.strip(),
+            (source_language or "auto").strip().lower(),
+            target_language.strip().lower(),
+        )
+
+    def _disk_get(self, key: tuple) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT translated, created_at FROM translations "
+                "WHERE text = ? AND source = ? AND target = ?",
+                key,
+            ).fetchone()
+        if row is None or row[1] < time.time() - self.ttl:
+            return None
+        return row[0]
+
+    def _disk_set(self, key: tuple, translated: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations "
+                "(text, source, target, translated, created_at) VALUES (?, ?, ?, ?, ?)",
+                (*key, translated, time.time()),
+            )
+            self._disk_writes += 1
+            # Keep the disk tier bounded by periodically dropping the oldest rows
+            if self._disk_writes % 200 == 0:
+                self._conn.execute(
+                    "DELETE FROM translations WHERE rowid IN ("
+                    "SELECT rowid FROM translations ORDER BY created_at DESC "
+                    "LIMIT -1 OFFSET ?)",
+                    (self.db_max_rows,),
+                )
+            self._conn.commit()
+
+    async def get(
+        self, text: str, source_language: str, target_language: str
+    ) -> Optional[str]:
+        """
+        Look up a cached translation.
+
+        Args:
+            text: The original text
+            source_language: Source language ('auto' when unknown)
+            target_language: Target language
+
+        Returns:
+            The cached translation, or None on a miss
+        """
+        key = self.make_key(text, source_language, target_language)
+        value = self._memory.get(key)
+        if value is not None:
+            self.stats_counters["memory_hits"] += 1
+            return value
+
+        if self._conn is not None:
+            value = await asyncio.to_thread(self._disk_get, key)
+            if value is not None:
+                self.stats_counters["disk_hits"] += 1
+                self._memory[key] = value
+                return value
+
+        self.stats_counters["misses"] += 1
+        return None
+
+    async def set(
+        self, text: str, source_language: str, target_language: str, translated: str
+    ):
+        """Store a translation in every enabled tier."""
+        key = self.make_key(text, source_language, target_language)
+        self._memory[key] = translated
+        self.stats_counters["writes"] += 1
+        if self._conn is not None:
+            await asyncio.to_thread(self._disk_set, key, translated)
+
+    def stats(self) -> dict:
+        lookups = (
+            self.stats_counters["memory_hits"]
+            + self.stats_counters["disk_hits"]
+            + self.stats_counters["misses"]
+        )
+        hits = lookups - self.stats_counters["misses"]
+        return {
+            **self.stats_counters,
+            "memory_entries": len(self._memory),
+            "disk_enabled": self._conn is not None,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+translation_cache = TranslationCache()
@@ -0,0 +1,216 @@
+"""
+Vision Encoder
+Prepares images for vision-model requests so each upload is no larger than
+the model can use.
+
+encode_for_vision():
+    1. crops to the document when it sits on a plain background (a card
+       photographed on a desk, a scan with wide margins);
+    2. downscales so the long edge is at most VISION_MAX_EDGE pixels, the
+       resolution the model effectively sees (larger images are resized by
+       the provider anyway, after being uploaded);
+    3. encodes as JPEG or WebP (VISION_IMAGE_FORMAT), starting at
+       VISION_IMAGE_MAX_QUALITY and lowering the quality, then the size,
+       until the payload fits VISION_IMAGE_BUDGET_BYTES.
+
+Bytes sent per request are logged and aggregated in vision_payload_stats().
+"""
+
+import base64
+import io
+import os
+import threading
+from typing import NamedTuple
+
+from PIL import Image, ImageFilter, ImageOps
+
+VISION_MAX_EDGE = int(os.getenv("VISION_MAX_EDGE", "1120"))
+VISION_IMAGE_FORMAT = os.getenv("VISION_IMAGE_FORMAT", "jpeg").lower()
+VISION_IMAGE_BUDGET_BYTES = int(os.getenv("VISION_IMAGE_BUDGET_BYTES", "350000"))
+VISION_IMAGE_MAX_QUALITY = int(os.getenv("VISION_IMAGE_MAX_QUALITY", "90"))
+VISION_IMAGE_MIN_QUALITY = int(os.getenv("VISION_IMAGE_MIN_QUALITY", "50"))
+VISION_CROP = os.getenv("VISION_CROP", "true").lower() not in ("0", "false", "no")
+
+_MIME_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp"}
+# Grey-level difference from the background that counts as document content
+_CROP_THRESHOLD = 40
+# Margin kept around the detected document, as a fraction of its size
+_CROP_MARGIN = 0.02
+
+_lock = threading.Lock()
+_counters = {
+    "images": 0,
+    "cropped": 0,
+    "bytes_sent": 0,
+    "source_pixels": 0,
+    "sent_pixels": 0,
+}
+
+
+class EncodedImage(NamedTuple):
+    data: str  # base64
+    mime_type: str
+    size: int  # bytes before base64
+    width: int
+    height: int
+    quality: int
+    cropped: bool
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.mime_type};base64,{self.data}"
+
+
+def _background_level(gray: Image.Image) -> int:
+    # Median of a thin frame around the image
+    width, height = gray.size
+    edge = max(1, min(width, height) // 50)
+    frame = []
+    for box in (
+        (0, 0, width, edge),
+        (0, height - edge, width, height),
+        (0, 0, edge, height),
+        (width - edge, 0, width, height),
+    ):
+        frame.extend(gray.crop(box).getdata())
+    frame.sort()
+    return frame[len(frame) // 2]
+
+
+def crop_to_document(image: Image.Image) -> tuple:
+    """
+    Crop to the region that differs from the image's border colour.
+
+    Returns:
+        (image, cropped): the original image and False when no clear document
+        region is found
+    """
+    # Work on a small copy; noise is removed with a median filter
+    probe = ImageOps.grayscale(image)
+    scale = max(1, max(probe.size) // 400)
+    probe = probe.reduce(scale).filter(ImageFilter.MedianFilter(5))
+    background = _background_level(probe)
+    mask = probe.point(
+        lambda level: 255 if abs(level - background) > _CROP_THRESHOLD else 0
+    )
+    box = mask.getbbox()
+    if box is None:
+        return image, False
+
+    left, top, right, bottom = (value * scale for value in box)
+    area = (right - left) * (bottom - top)
+    full = image.width * image.height
+    # Nothing to gain, or too small to be the document (a speck, a logo)
+    if area > 0.9 * full or area < 0.2 * full:
+        return image, False
+
+    margin_x = int((right - left) * _CROP_MARGIN)
+    margin_y = int((bottom - top) * _CROP_MARGIN)
+    box = (
+        max(0, left - margin_x),
+        max(0, top - margin_y),
+        min(image.width, right + margin_x),
+        min(image.height, bottom + margin_y),
+    )
+    return image.crop(box), True
+
+
+def fit_to_edge(image: Image.Image, max_edge: int = VISION_MAX_EDGE) -> Image.Image:
+    """Downscale (never upscale) so the long edge is at most max_edge, keeping the aspect ratio."""
+    long_edge = max(image.size)
+    if long_edge <= max_edge:
+        return image
+    ratio = max_edge / long_edge
+    size = (max(1, round(image.width * ratio)), max(1, round(image.height * ratio)))
+    return image.resize(size, Image.LANCZOS)
+
+
+def render_zoom(page_width: float, page_height: float, dpi: int = 300) -> float:
+    """
+    PyMuPDF zoom for rendering a PDF page for the vision model.
+
+    Renders at 1.5x the target resolution at most (then encode_for_vision
+    downsamples), instead of always rendering at the full dpi.
+    """
+    target = VISION_MAX_EDGE * 1.5 / max(page_width, page_height, 1)
+    return min(dpi / 72, target)
+
+
+def encode_for_vision(
+    image: Image.Image,
+    max_edge: int = VISION_MAX_EDGE,
+    budget: int = VISION_IMAGE_BUDGET_BYTES,
+    image_format: str = VISION_IMAGE_FORMAT,
+    crop: bool = VISION_CROP,
+) -> EncodedImage:
+    """
+    Crop, downscale and compress an image for a vision request.
+
+    Args:
+        image: Image to send
+        max_edge: Long-edge limit in pixels
+        budget: Target encoded size in bytes
+        image_format: 'jpeg' or 'webp'
+        crop: Crop to the detected document region
+
+    Returns:
+        EncodedImage with the base64 payload and what was sent
+    """
+    if image_format not in _MIME_TYPES:
+        image_format = "jpeg"
+    source_pixels = image.width * image.height
+
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    cropped = False
+    if crop:
+        image, cropped = crop_to_document(image)
+    image = fit_to_edge(image, max_edge)
+
+    while True:
+        quality = VISION_IMAGE_MAX_QUALITY
+        while True:
+            buffered = io.BytesIO()
+            image.save(buffered, format=image_format.upper(), quality=quality)
+            payload = buffered.getvalue()
+            if len(payload) <= budget or quality <= VISION_IMAGE_MIN_QUALITY:
+                break
+            quality = max(VISION_IMAGE_MIN_QUALITY, quality - 10)
+        if len(payload) <= budget or max(image.size) <= 512:
+            break
+        # Still over budget at the lowest quality: shrink and start again
+        image = fit_to_edge(image, int(max(image.size) * 0.75))
+
+    encoded = EncodedImage(
+        data=base64.b64encode(payload).decode("utf-8"),
+        mime_type=_MIME_TYPES[image_format],
+        size=len(payload),
+        width=image.width,
+        height=image.height,
+        quality=quality,
+        cropped=cropped,
+    )
+    with _lock:
+        _counters["images"] += 1
+        _counters["cropped"] += cropped
+        _counters["bytes_sent"] += encoded.size
+        _counters["source_pixels"] += source_pixels
+        _counters["sent_pixels"] += encoded.width * encoded.height
+    print(
+        f"[Vision Encoder] {encoded.width}x{encoded.height} {image_format.upper()} "
+        f"q{quality} {encoded.size / 1024:.0f} KB{' (cropped)' if cropped else ''}"
+    )
+    return encoded
+
+
+def vision_payload_stats() -> dict:
+    """Bytes and pixels sent to vision models so far."""
+    images = _counters["images"]
+    return {
+        **_counters,
+        "avg_bytes": round(_counters["bytes_sent"] / images) if images else 0,
+        "max_edge": VISION_MAX_EDGE,
+        "budget_bytes": VISION_IMAGE_BUDGET_BYTES,
+        "format": VISION_IMAGE_FORMAT,
+    }
@@ -10,7 +10,7 @@ import json
 from rapidfuzz import process, fuzz
 from ast import Dict
 from fastapi import APIRouter, File, UploadFile, HTTPException
-from langchain_groq import ChatGroq
+from services.llm_clients import get_llm
 from langchain.chains import create_extraction_chain
 import pytesseract
 from pdf2image import convert_from_path
@@ -606,10 +606,10 @@ def is_valid_country(user_input):
     return False
 
 
-import requests
+import httpx
 
 
-def fetching_medical_detail(responses_dict):
+async def fetching_medical_detail(responses_dict):
     def convert_date_format(date_str):
         try:
             return datetime.strptime(date_str, "%d/%m/%Y").strftime("%Y-%m-%d")
@@ -694,18 +694,18 @@ def fetching_medical_detail(responses_dict):
         "X-Requested-With": "XMLHttpRequest",
     }
 
-
     try:
-        res = requests.post(api, json=payload,headers=headers, timeout=10)
+        async with httpx.AsyncClient(timeout=10) as client:
+            res = await client.post(api, json=payload, headers=headers)
         print(f"API Response Status Code: {res.status_code}")
         print(f"API Response Body: {res.text}")
         res.raise_for_status()
         id = res.json()["id"]
         print(f"Successfully created medical detail with ID: {id}")
         return id
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"API Request Error: {str(e)}")
-        if hasattr(e.response, "text"):
+        if isinstance(e, httpx.HTTPStatusError):
             print(f"API Error Response: {e.response.text}")
         return "There are some issues with the request. Please wait for a moment and try again. If the problem persists, contact support@insurca.com."
 
@@ -713,17 +713,15 @@ def fetching_medical_detail(responses_dict):
 def extract_image_info(file_path: str) -> Dict:
     """
     Extract information from JPG and return as JSON
+
+    Blocks on OCR and the LLM; from async code, call it with asyncio.to_thread.
     """
     try:
         # Extract text from JPG image
         raw_text = pytesseract.image_to_string(Image.open(file_path), lang="eng")
 
         # Initialize LLM and create extraction chain
-        llm = ChatGroq(
-            model=os.getenv("LLM_MODEL"),
-            temperature=0,
-            api_key=os.getenv("GROQ_API_KEY"),
-        )
+        llm = get_llm()
 
         schema = {
             "properties": {
@@ -770,7 +768,7 @@ def extract_image_info(file_path: str) -> Dict:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def emaf_document(response_dict):
+async def emaf_document(response_dict):
     payload = {
         "name": response_dict.get("May I know your name, please?"),
         "network_id": response_dict.get("emaf_company_id"),
@@ -779,11 +777,12 @@ def emaf_document(response_dict):
     emaf_api = "https://www.insuranceclub.ae/Api/emaf"
     try:
         # Use data= or json= instead of payload=
-        respond = requests.post(emaf_api, json=payload, timeout=10)
+        async with httpx.AsyncClient(timeout=10) as client:
+            respond = await client.post(emaf_api, json=payload)
         respond.raise_for_status()
         id = respond.json()["id"]
         return id
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         return "There are some issues with the request. Please wait for a moment and try again. If the problem persists, contact support@insurca.com."
 
 
@@ -1,23 +1,24 @@
-import json
 from langchain_core.messages import HumanMessage, SystemMessage
-import os
-from langchain_groq.chat_models import ChatGroq
+from services.llm_clients import get_llm
+from services.response_cache import cached_reply
 import re
 from datetime import datetime
 from utils.helper import fetching_medical_detail, is_valid_country, is_valid_nationality
 from utils.helper import valid_date_format
 from fastapi import Request
+from services.completion_sink import record_completion
 
-llm = ChatGroq(
-    model=os.getenv("LLM_MODEL"),
-    temperature=0,
-    api_key=os.getenv("GROQ_API_KEY"),
-    groq_proxy=None,
-)
+llm = get_llm()
+
+
+def is_current_question(conversation_state, questions, question) -> bool:
+    """O(1) equivalent of current_question_index == questions.index(question)."""
+    index = conversation_state["current_question_index"]
+    return index < len(questions) and questions[index] == question
 
 
 # Question To whom are you purchasing this plan?
-def handle_purchasing_plan_question(
+async def handle_purchasing_plan_question(
     user_message, conversation_state, questions, responses, question
 ):
     valid_options = [
@@ -41,8 +42,7 @@ def handle_purchasing_plan_question(
                 "response": f"Thank you! That was helpful. Now, let's move on to: {next_question}"
             }
         else:
-            with open("user_responses.json", "w") as file:
-                json.dump(responses, file, indent=4)
+            record_completion(responses)
             return {
                 "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
                 "final_responses": responses,
@@ -51,9 +51,9 @@ def handle_purchasing_plan_question(
         general_assistant_prompt = (
             f"The user entered '{user_message}', . Please assist."
         )
-        general_assistant_response = llm.invoke([
-            HumanMessage(content=general_assistant_prompt)
-        ])
+        general_assistant_response = await cached_reply(
+            llm, [HumanMessage(content=general_assistant_prompt)], user_message
+        )
         next_question = questions[conversation_state["current_question_index"]]
         if "options" in next_question:
             options = ", ".join(next_question["options"])
@@ -71,7 +71,7 @@ def handle_purchasing_plan_question(
 
 
 # Question Visa issued Emirate?
-def handle_visa_issued_emirate_question(
+async def handle_visa_issued_emirate_question(
     user_message, conversation_state, questions, responses, question
 ):
     valid_options = [
@@ -101,8 +101,7 @@ def handle_visa_issued_emirate_question(
                     "response": f"Thank you for providing the visa emirate Now, let's move on to: {next_question}"
                 }
         else:
-            with open("user_responses.json", "w") as file:
-                json.dump(responses, file, indent=4)
+            record_completion(responses)
             return {
                 "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
                 "final_responses": responses,
@@ -111,12 +110,16 @@ def handle_visa_issued_emirate_question(
         general_assistant_prompt = (
             f"The user entered '{user_message}', . Please assist."
         )
-        general_assistant_response = llm.invoke([
-            SystemMessage(
-                content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-            ),
-            HumanMessage(content=general_assistant_prompt),
-        ])
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+        )
         next_question = questions[conversation_state["current_question_index"]]
         if "options" in next_question:
             options = ", ".join(next_question["options"])
@@ -134,7 +137,7 @@ def handle_visa_issued_emirate_question(
 
 
 # Question What type of plan are you looking for?
-def handle_type_plan_question(
+async def handle_type_plan_question(
     user_message, conversation_state, questions, responses, question
 ):
     valid_options = [
@@ -159,8 +162,7 @@ def handle_type_plan_question(
             else:
                 return {"response": f"Thank you.{next_question}"}
         else:
-            with open("user_responses.json", "w") as file:
-                json.dump(responses, file, indent=4)
+            record_completion(responses)
             return {
                 "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
                 "final_responses": responses,
@@ -169,12 +171,16 @@ def handle_type_plan_question(
         general_assistant_prompt = (
             f"The user entered '{user_message}', . Please assist."
         )
-        general_assistant_response = llm.invoke([
-            SystemMessage(
-                content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-            ),
-            HumanMessage(content=general_assistant_prompt),
-        ])
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+        )
         next_question = questions[conversation_state["current_question_index"]]
         if "options" in next_question:
             options = ", ".join(next_question["options"])
@@ -192,7 +198,7 @@ def handle_type_plan_question(
 
 
 # Question Is accommodation provided to you?
-def handle_yes_or_no(
+async def handle_yes_or_no(
     user_message,
     conversation_state,
     questions,
@@ -208,7 +214,7 @@ def handle_yes_or_no(
     valid_options = ["Yes", "No"]
 
     # Use multilingual validation instead of direct string matching
-    validation_result = validate_response_multilingual(
+    validation_result = await validate_response_multilingual(
         user_message, valid_options, user_language
     )
 
@@ -224,35 +230,39 @@ def handle_yes_or_no(
                 options = next_question["options"]
                 next_questions = next_question["question"]
                 response_message = f"Thank you! Now, let's move on to: {next_questions}"
-                return format_response_in_language(
+                return await format_response_in_language(
                     response_message, options, user_language
                 )
             else:
                 response_message = f"Thank you. Now, let's move on to: {next_question}"
-                return format_response_in_language(response_message, [], user_language)
+                return await format_response_in_language(
+                    response_message, [], user_language
+                )
         else:
-            with open("user_responses.json", "w") as file:
-                json.dump(responses, file, indent=4)
+            record_completion(responses)
             final_message = "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask."
-            result = format_response_in_language(final_message, [], user_language)
+            result = await format_response_in_language(final_message, [], user_language)
             result["final_responses"] = responses
             return result
     else:
         # Handle invalid responses or unrelated queries
         general_assistant_prompt = f"user response: {user_message}. Please assist."
-        general_assistant_response = llm.invoke([
-            HumanMessage(content=general_assistant_prompt)
-        ])
+        general_assistant_response = await cached_reply(
+            llm,
+            [HumanMessage(content=general_assistant_prompt)],
+            user_message,
+            user_language,
+        )
         return {
             "response": f"{general_assistant_response.content.strip()}",
             "question": f"Let’s try again: {question}\nPlease choose from the following options: {', '.join(valid_options)}",
         }
 
 
-def handle_validate_name(
+async def handle_validate_name(
     question, user_message, conversation_state, questions, responses, is_valid_name
 ):
-    if conversation_state["current_question_index"] == questions.index(question):
+    if is_current_question(conversation_state, questions, question):
         # Convert user input to title case
         user_message = user_message.strip().title()
 
@@ -262,13 +272,17 @@ def handle_validate_name(
                 f"The user entered '{user_message}', which does not appear to be a valid name. "
                 "Please assist them in providing a valid name."
             )
-            general_assistant_response = llm.invoke([
-                SystemMessage(
-                    content="You are Insura, an AI assistant created by CloudSubset. "
-                    "Your role is to assist users with their inquiries and guide them appropriately."
-                ),
-                HumanMessage(content=general_assistant_prompt),
-            ])
+            general_assistant_response = await cached_reply(
+                llm,
+                [
+                    SystemMessage(
+                        content="You are Insura, an AI assistant created by CloudSubset. "
+                        "Your role is to assist users with their inquiries and guide them appropriately."
+                    ),
+                    HumanMessage(content=general_assistant_prompt),
+                ],
+                user_message,
+            )
             return {
                 "response": f"{general_assistant_response.content.strip()}",
                 "question": question,
@@ -280,7 +294,7 @@ def handle_validate_name(
             f"The user has responded with: '{user_message}'. Determine if this is a valid person's name. "
             "Respond only with 'Yes' or 'No'."
         )
-        llm_response = llm.invoke([
+        llm_response = await llm.ainvoke([
             SystemMessage(
                 content="You are Insura, an AI assistant specialized in insurance-related tasks. "
                 "Your task is to verify if the provided input is a valid person's name."
@@ -301,8 +315,7 @@ def handle_validate_name(
                 }
             else:
                 # All questions completed
-                with open("user_responses.json", "w") as file:
-                    json.dump(responses, file, indent=4)
+                record_completion(responses)
                 return {
                     "response": "Thank you for using Insura. Your request has been processed. Have a great day!",
                     "final_responses": responses,
@@ -313,13 +326,17 @@ def handle_validate_name(
                 f"The user entered '{user_message}', which was not validated as a name by Insura. "
                 "Please assist them in correcting their input."
             )
-            general_assistant_response = llm.invoke([
-                SystemMessage(
-                    content="You are Insura, an AI assistant created by CloudSubset. "
-                    "Your role is to assist users with their inquiries and guide them appropriately."
-                ),
-                HumanMessage(content=general_assistant_prompt),
-            ])
+            general_assistant_response = await cached_reply(
+                llm,
+                [
+                    SystemMessage(
+                        content="You are Insura, an AI assistant created by CloudSubset. "
+                        "Your role is to assist users with their inquiries and guide them appropriately."
+                    ),
+                    HumanMessage(content=general_assistant_prompt),
+                ],
+                user_message,
+            )
             return {
                 "response": f"{general_assistant_response.content.strip()}",
                 "question": question,
@@ -334,7 +351,7 @@ def handle_client_name_question(
     Handles the 'May I have the Client Name, please?' question.
     This function directly accepts the user's input as the client name without validation.
     """
-    if conversation_state["current_question_index"] == questions.index(question):
+    if is_current_question(conversation_state, questions, question):
         # Convert user input to title case and store the client name
         user_message = user_message.strip().title()
         responses[question] = user_message
@@ -355,15 +372,16 @@ def handle_client_name_question(
                 }
         else:
             # All questions completed
-            with open("user_responses.json", "w") as file:
-                json.dump(responses, file, indent=4)
+            record_completion(responses)
             return {
                 "response": "Thank you for using Insura. Your request has been processed. Have a great day!",
                 "final_responses": responses,
             }
 
 
-def handle_gender(user_message, conversation_state, questions, responses, question):
+async def handle_gender(
+    user_message, conversation_state, questions, responses, question
+):
     valid_options = ["Male", "Female"]
     # member_name = responses.get("Next, we need the details of the member for whom the policy is being purchased. Please provide Name")
     if user_message in valid_options:
@@ -386,8 +404,7 @@ def handle_gender(user_message, conversation_state, questions, responses, questi
                 "response": f"Thank you,{next_question}"
             }
         else:
-            with open("user_responses.json", "w") as file:
-                json.dump(responses, file, indent=4)
+            record_completion(responses)
             return {
                 "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
                 "final_responses": responses,
@@ -395,9 +412,9 @@ def handle_gender(user_message, conversation_state, questions, responses, questi
     else:
         # Handle invalid responses or unrelated queries
         general_assistant_prompt = f"user response: {user_message}. Please assist."
-        general_assistant_response = llm.invoke([
-            HumanMessage(content=general_assistant_prompt)
-        ])
+        general_assistant_response = await cached_reply(
+            llm, [HumanMessage(content=general_assistant_prompt)], user_message
+        )
         return {
             "response": f"{general_assistant_response.content.strip()}",
             "question": f"Let’s try again: {question}\nPlease choose from the following options: {', '.join(valid_options)}",
@@ -412,20 +429,20 @@ def is_valid_policy_number(policy_number: str) -> bool:
     return bool(re.match(r"^[A-Za-z0-9]{6,12}$", policy_number))
 
 
-def handle_policy_question(
+async def handle_policy_question(
     user_message, conversation_state, questions, responses, question
 ):
     """
     Handles the 'tell your policy number' question by validating and processing the user's input.
     """
     if question == question:
-        if conversation_state["current_question_index"] == questions.index(question):
+        if is_current_question(conversation_state, questions, question):
             # Prompt LLM for additional validation
             check_prompt = (
                 f"The user has responded with: '{user_message}'. Determine if this is a valid policy number. "
                 "Respond only with 'Yes' or 'No'."
             )
-            llm_response = llm.invoke([
+            llm_response = await llm.ainvoke([
                 SystemMessage(
                     content="You are Insura, an AI assistant specialized in insurance-related tasks. "
                     "Your task is to verify if the provided input is a valid policy number."
@@ -456,8 +473,7 @@ def handle_policy_question(
                         }
                 else:
                     # All questions completed
-                    with open("user_responses.json", "w") as file:
-                        json.dump(responses, file, indent=4)
+                    record_completion(responses)
                     return {
                         "response": "Thank you for using Insura. Your request has been processed. Have a great day!",
                         "final_responses": responses,
@@ -468,13 +484,17 @@ def handle_policy_question(
                     f"The user entered '{user_message}', which was not validated as a policy number by Insura. "
                     "Please assist them in correcting their input."
                 )
-                general_assistant_response = llm.invoke([
-                    SystemMessage(
-                        content="You are Insura, an AI assistant created by CloudSubset. "
-                        "Your role is to assist users with their inquiries and guide them appropriately."
-                    ),
-                    HumanMessage(content=general_assistant_prompt),
-                ])
+                general_assistant_response = await cached_reply(
+                    llm,
+                    [
+                        SystemMessage(
+                            content="You are Insura, an AI assistant created by CloudSubset. "
+                            "Your role is to assist users with their inquiries and guide them appropriately."
+                        ),
+                        HumanMessage(content=general_assistant_prompt),
+                    ],
+                    user_message,
+                )
                 return {
                     "response": f"{general_assistant_response.content.strip()}",
                     "question": f"Let’s try again: {question}\n",
@@ -530,14 +550,14 @@ def handle_policy_question(
 #             }
 
 
-def handle_company_name_question(
+async def handle_company_name_question(
     question, user_message, conversation_state, questions, responses
 ):
     if question == question:
-        if conversation_state["current_question_index"] == questions.index(question):
+        if is_current_question(conversation_state, questions, question):
             # Check if the input is a company name using LLM
             check_prompt = f"The user has responded with: '{user_message}'. Is this a valid company name? Respond with 'Yes' or 'No'."
-            llm_response = llm.invoke([
+            llm_response = await llm.ainvoke([
                 SystemMessage(
                     content=f"Check {user_message} this message is a valid Company name not an general topic make sure check all the details "
                 ),
@@ -567,8 +587,7 @@ def handle_company_name_question(
                             "response": f"Thank you for providing the company name. Now, let's move on to: {next_question}"
                         }
                 else:
-                    with open("user_responses.json", "w") as file:
-                        json.dump(responses, file, indent=4)
+                    record_completion(responses)
                     return {
                         "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
                         "final_responses": responses,
@@ -578,9 +597,9 @@ def handle_company_name_question(
                 general_assistant_prompt = (
                     f"The user entered '{user_message}', . Please assist."
                 )
-                general_assistant_response = llm.invoke([
-                    HumanMessage(content=general_assistant_prompt)
-                ])
+                general_assistant_response = await cached_reply(
+                    llm, [HumanMessage(content=general_assistant_prompt)], user_message
+                )
                 next_question = questions[conversation_state["current_question_index"]]
                 if "options" in next_question:
                     next_question = next_question["question"]
@@ -598,7 +617,7 @@ def handle_company_name_question(
                     }
 
 
-def handle_job_title_question(
+async def handle_job_title_question(
     question,
     user_message,
     conversation_state,
@@ -611,10 +630,10 @@ def handle_job_title_question(
         translate_text,
     )
 
-    if conversation_state["current_question_index"] == questions.index(question):
+    if is_current_question(conversation_state, questions, question):
         # Prompt LLM to check if the input is a valid job title
         check_prompt = f"The user has responded with: '{user_message}'. Is this a valid job title? Respond with 'Yes' or 'No'."
-        llm_response = llm.invoke([
+        llm_response = await llm.ainvoke([
             SystemMessage(
                 content="You are Insura, an AI assistant specialized in insurance-related tasks. You are in a job title validation section you task is when any job title comes make sure that is a job title or not"
             ),
@@ -636,36 +655,42 @@ def handle_job_title_question(
                     response_message = (
                         f"Thank you for providing your job title. {next_question_text}"
                     )
-                    return format_response_in_language(
+                    return await format_response_in_language(
                         response_message, next_options, user_language
                     )
                 else:
                     response_message = (
                         f"Thank you for providing your job title. {next_question}"
                     )
-                    return format_response_in_language(
+                    return await format_response_in_language(
                         response_message, [], user_language
                     )
             else:
                 # If all questions are completed, save responses and end conversation
-                with open("user_responses.json", "w") as file:
-                    json.dump(responses, file, indent=4)
+                record_completion(responses)
                 final_message = "Thank you for using Insura. Your request has been processed. If you have any further questions, feel free to ask. Have a great day!"
-                result = format_response_in_language(final_message, [], user_language)
+                result = await format_response_in_language(
+                    final_message, [], user_language
+                )
                 result["final_responses"] = responses
                 return result
         else:
             # Handle invalid or unrelated input in user's language
             general_assistant_prompt = f"The user entered '{user_message}', which does not appear to be a valid job title. Please assist them in {user_language}."
-            general_assistant_response = llm.invoke([
-                SystemMessage(
-                    content=f"You are Insura, an AI assistant created by CloudSubset. Respond in {user_language}. Your role is to assist users with their inquiries. Your task here is to redirect or assist the user appropriately"
-                ),
-                HumanMessage(content=general_assistant_prompt),
-            ])
+            general_assistant_response = await cached_reply(
+                llm,
+                [
+                    SystemMessage(
+                        content=f"You are Insura, an AI assistant created by CloudSubset. Respond in {user_language}. Your role is to assist users with their inquiries. Your task here is to redirect or assist the user appropriately"
+                    ),
+                    HumanMessage(content=general_assistant_prompt),
+                ],
+                user_message,
+                user_language,
+            )
 
             # Translate the retry question to user's language
-            retry_question = translate_text(
+            retry_question = await translate_text(
                 f"Let's move back to: {question}", user_language
             )
 
@@ -675,7 +700,7 @@ def handle_job_title_question(
             }
 
 
-def handle_emirate_question(
+async def handle_emirate_question(
     question,
     user_message,
     conversation_state,
@@ -686,6 +711,7 @@ def handle_emirate_question(
     from services.llm_services import (
         format_response_in_language,
         validate_response_multilingual,
+        translate_batch,
         translate_text,
     )
 
@@ -700,7 +726,7 @@ def handle_emirate_question(
     ]
 
     # Use multilingual validation instead of direct string matching
-    validation_result = validate_response_multilingual(
+    validation_result = await validate_response_multilingual(
         user_message, valid_options, user_language
     )
 
@@ -716,17 +742,18 @@ def handle_emirate_question(
                 options = next_question["options"]
                 next_questions = next_question["question"]
                 response_message = f"Thank you! Now, let's move on to: {next_questions}"
-                return format_response_in_language(
+                return await format_response_in_language(
                     response_message, options, user_language
                 )
             else:
                 response_message = f"Thank you! Now, let's move on to: {next_question}"
-                return format_response_in_language(response_message, [], user_language)
+                return await format_response_in_language(
+                    response_message, [], user_language
+                )
         else:
-            with open("user_responses.json", "w") as file:
-                json.dump(responses, file, indent=4)
+            record_completion(responses)
             final_message = "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask."
-            result = format_response_in_language(final_message, [], user_language)
+            result = await format_response_in_language(final_message, [], user_language)
             result["final_responses"] = responses
             return result
     else:
@@ -734,18 +761,23 @@ def handle_emirate_question(
         general_assistant_prompt = (
             f"user response: {user_message}. Please assist them in {user_language}."
         )
-        general_assistant_response = llm.invoke([
-            SystemMessage(
-                content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-            ),
-            HumanMessage(content=general_assistant_prompt),
-        ])
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
 
         # Translate the retry question and options to user's language
-        retry_question = translate_text(f"Let's try again: {question}", user_language)
-        translated_options = [
-            translate_text(opt, user_language) for opt in valid_options
-        ]
+        retry_question = await translate_text(
+            f"Let's try again: {question}", user_language
+        )
+        translated_options = await translate_batch(valid_options, user_language)
 
         return {
             "response": f"{general_assistant_response.content.strip()}",
@@ -754,10 +786,10 @@ def handle_emirate_question(
         }
 
 
-def handle_nationality_question(
+async def handle_nationality_question(
     user_message, question, conversation_state, questions, responses
 ):
-    if conversation_state["current_question_index"] == questions.index(question):
+    if is_current_question(conversation_state, questions, question):
         # First check if the input is a valid nationality using the is_valid_nationality function
         is_nationality = is_valid_nationality(user_message)
 
@@ -773,8 +805,7 @@ def handle_nationality_question(
                     "response": f"Thank you for providing the nationality. Now, let's move on to: {next_question}"
                 }
             else:
-                with open("user_responses.json", "w") as file:
-                    json.dump(responses, file, indent=4)
+                record_completion(responses)
                 return {
                     "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
                     "final_responses": responses,
@@ -784,9 +815,9 @@ def handle_nationality_question(
             general_assistant_prompt = (
                 f"The user entered '{user_message}'. Please assist."
             )
-            general_assistant_response = llm.invoke([
-                HumanMessage(content=general_assistant_prompt)
-            ])
+            general_assistant_response = await cached_reply(
+                llm, [HumanMessage(content=general_assistant_prompt)], user_message
+            )
             return {
                 "response": f"{general_assistant_response.content.strip()}",
                 "question": f"Let's move back: {question}",
@@ -976,7 +1007,7 @@ def handle_nationality_question(
 #                 }
 
 
-def handle_marital_status(
+async def handle_marital_status(
     user_message, conversation_state, questions, responses, question
 ):
     valid_options = ["Single", "Married"]
@@ -1002,8 +1033,7 @@ def handle_marital_status(
                 }
             return {"response": f"Thank you Next, let's discuss. {next_question}"}
         else:
-            with open("user_responses.json", "w") as file:
-                json.dump(responses, file, indent=4)
+            record_completion(responses)
             return {
                 "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
                 "final_responses": responses,
@@ -1011,12 +1041,16 @@ def handle_marital_status(
     else:
         # Handle invalid responses or unrelated queries
         general_assistant_prompt = f"user response: {user_message}. Please assist."
-        general_assistant_response = llm.invoke([
-            SystemMessage(
-                content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-            ),
-            HumanMessage(content=general_assistant_prompt),
-        ])
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+        )
         next_question = questions[conversation_state["current_question_index"]]
         if "options" in next_question:
             options = ", ".join(next_question["options"])
@@ -1033,7 +1067,9 @@ def handle_marital_status(
             }
 
 
-def handle_pregant(user_message, conversation_state, questions, responses, question):
+async def handle_pregant(
+    user_message, conversation_state, questions, responses, question
+):
     valid_options = ["Yes", "No"]
     if user_message in valid_options:
         responses[question] = user_message
@@ -1053,8 +1089,7 @@ def handle_pregant(user_message, conversation_state, questions, responses, quest
                     "response": f"Thank you. Now, let's move on to: {next_question}"
                 }
         else:
-            with open("user_responses.json", "w") as file:
-                json.dump(responses, file, indent=4)
+            record_completion(responses)
             return {
                 "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
                 "final_responses": responses,
@@ -1062,16 +1097,16 @@ def handle_pregant(user_message, conversation_state, questions, responses, quest
     else:
         # Handle invalid responses or unrelated queries
         general_assistant_prompt = f"user response: {user_message}. Please assist."
-        general_assistant_response = llm.invoke([
-            HumanMessage(content=general_assistant_prompt)
-        ])
+        general_assistant_response = await cached_reply(
+            llm, [HumanMessage(content=general_assistant_prompt)], user_message
+        )
         return {
             "response": f"{general_assistant_response.content.strip()}",
             "question": f"Let’s try again: {question}\nPlease choose from the following options: {', '.join(valid_options)}",
         }
 
 
-def handle_sposor_type(
+async def handle_sposor_type(
     user_message, conversation_state, questions, responses, question
 ):
     valid_options = ["Employee", "Investors"]
@@ -1093,8 +1128,7 @@ def handle_sposor_type(
                     "response": f"Thank you. Now, let's move on to: {next_question}"
                 }
         else:
-            with open("user_responses.json", "w") as file:
-                json.dump(responses, file, indent=4)
+            record_completion(responses)
             return {
                 "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
                 "final_responses": responses,
@@ -1104,9 +1138,9 @@ def handle_sposor_type(
         general_assistant_prompt = (
             f"The user entered '{user_message}', . Please assist."
         )
-        general_assistant_response = llm.invoke([
-            HumanMessage(content=general_assistant_prompt)
-        ])
+        general_assistant_response = await cached_reply(
+            llm, [HumanMessage(content=general_assistant_prompt)], user_message
+        )
         next_question = questions[conversation_state["current_question_index"]]
         if "options" in next_question:
             options = ", ".join(next_question["options"])
@@ -1174,10 +1208,10 @@ def valid_date_format(date_str):
 #         }
 
 
-def handle_country_question(
+async def handle_country_question(
     user_message, question, conversation_state, questions, responses
 ):
-    if conversation_state["current_question_index"] == questions.index(question):
+    if is_current_question(conversation_state, questions, question):
         is_country = is_valid_country(user_message)
 
         if is_country:
@@ -1192,8 +1226,7 @@ def handle_country_question(
                     "response": f"Thank you for providing the Country. Now, let's move on to: {next_question}"
                 }
             else:
-                with open("user_responses.json", "w") as file:
-                    json.dump(responses, file, indent=4)
+                record_completion(responses)
                 return {
                     "response": "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask.",
                     "final_responses": responses,
@@ -1203,16 +1236,16 @@ def handle_country_question(
             general_assistant_prompt = (
                 f"The user entered '{user_message}'. Please assist."
             )
-            general_assistant_response = llm.invoke([
-                HumanMessage(content=general_assistant_prompt)
-            ])
+            general_assistant_response = await cached_reply(
+                llm, [HumanMessage(content=general_assistant_prompt)], user_message
+            )
             return {
                 "response": f"{general_assistant_response.content.strip()}",
                 "question": f"Let's move back: {question}",
             }
 
 
-def handle_individual_sma_choice(
+async def handle_individual_sma_choice(
     user_message,
     conversation_state,
     questions,
@@ -1225,13 +1258,14 @@ def handle_individual_sma_choice(
         sma_questions,
         format_response_in_language,
         validate_response_multilingual,
+        translate_batch,
         translate_text,
     )
 
     valid_options = ["Individual", "SME"]
 
     # Use multilingual validation instead of direct string matching
-    validation_result = validate_response_multilingual(
+    validation_result = await validate_response_multilingual(
         user_message, valid_options, user_language
     )
 
@@ -1251,12 +1285,14 @@ def handle_individual_sma_choice(
                     f"Great choice! {individual_questions[0]['question']}"
                 )
                 # Translate to user's language
-                return format_response_in_language(
+                return await format_response_in_language(
                     response_message, next_options, user_language
                 )
             else:
                 response_message = f"Great choice! {individual_questions[0]}"
-                return format_response_in_language(response_message, [], user_language)
+                return await format_response_in_language(
+                    response_message, [], user_language
+                )
         elif matched_option == "SME":
             conversation_state["current_flow"] = "sma"
             conversation_state["current_question_index"] = 0
@@ -1265,29 +1301,36 @@ def handle_individual_sma_choice(
                 next_options = sma_questions[0].get("options", [])
                 response_message = f"Great choice! {sma_questions[0]['question']}"
                 # Translate to user's language
-                return format_response_in_language(
+                return await format_response_in_language(
                     response_message, next_options, user_language
                 )
             else:
                 response_message = f"Great choice! {sma_questions[0]}"
-                return format_response_in_language(response_message, [], user_language)
+                return await format_response_in_language(
+                    response_message, [], user_language
+                )
     else:
         # Handle invalid responses or unrelated queries in user's language
         general_assistant_prompt = (
             f"user response: {user_message}. Please assist them in {user_language}."
         )
-        general_assistant_response = llm.invoke([
-            SystemMessage(
-                content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-            ),
-            HumanMessage(content=general_assistant_prompt),
-        ])
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
 
         # Translate the retry question and options to user's language
-        retry_question = translate_text(f"Let's try again: {question}", user_language)
-        translated_options = [
-            translate_text(opt, user_language) for opt in valid_options
-        ]
+        retry_question = await translate_text(
+            f"Let's try again: {question}", user_language
+        )
+        translated_options = await translate_batch(valid_options, user_language)
 
         return {
             "response": f"{general_assistant_response.content.strip()}",
@@ -1296,7 +1339,7 @@ def handle_individual_sma_choice(
         }
 
 
-def handle_what_would_you_do_today_question(
+async def handle_what_would_you_do_today_question(
     user_message,
     conversation_state,
     questions,
@@ -1316,7 +1359,7 @@ def handle_what_would_you_do_today_question(
     ]
 
     # Use multilingual validation instead of direct string matching
-    validation_result = validate_response_multilingual(
+    validation_result = await validate_response_multilingual(
         user_message, valid_options, user_language
     )
 
@@ -1332,29 +1375,35 @@ def handle_what_would_you_do_today_question(
                 options = next_question["options"]
                 next_questions = next_question["question"]
                 response_message = f"Thank you! Now, let's move on to: {next_questions}"
-                return format_response_in_language(
+                return await format_response_in_language(
                     response_message, options, user_language
                 )
             else:
                 response_message = f"Thank you for providing the plan. Now, let's move on to: {next_question}"
-                return format_response_in_language(response_message, [], user_language)
+                return await format_response_in_language(
+                    response_message, [], user_language
+                )
         else:
-            with open("user_responses.json", "w") as file:
-                json.dump(responses, file, indent=4)
+            record_completion(responses)
             final_message = "You're all set! Thank you for providing your details. If you need further assistance, feel free to ask."
-            result = format_response_in_language(final_message, [], user_language)
+            result = await format_response_in_language(final_message, [], user_language)
             result["final_responses"] = responses
             return result
     else:
         # TODO
         # Handle invalid responses or unrelated queries
         general_assistant_prompt = f"user response: {user_message}. Please assist."
-        general_assistant_response = llm.invoke([
-            SystemMessage(
-                content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-            ),
-            HumanMessage(content=general_assistant_prompt),
-        ])
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content="You are Insura, a friendly Insurance assistant created by CloudSubset. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
         next_question = questions[conversation_state["current_question_index"]]
         if "options" in next_question:
             options = ", ".join(next_question["options"])
@@ -1372,7 +1421,7 @@ def handle_what_would_you_do_today_question(
 
 
 # Todo
-def handle_date_question(
+async def handle_date_question(
     question,
     user_message,
     responses,
@@ -1380,7 +1429,7 @@ def handle_date_question(
     questions,
     user_language="English",
 ):
-    from services.llm_services import translate_text
+    from services.llm_services import translate_batch, translate_text
 
     # Also accept numbers as valid input (in addition to date format)
     is_valid_input = valid_date_format(user_message) or user_message.strip().isdigit()
@@ -1399,14 +1448,13 @@ def handle_date_question(
                 )
 
                 # Translate response to user's language
-                response_text = translate_text(
+                response_text = await translate_text(
                     f"Thanks! 📅 Let's continue. {next_questions} {member_name}. given below",
                     user_language,
                 )
-                translated_options = [
-                    translate_text(opt, user_language)
-                    for opt in next_question["options"]
-                ]
+                translated_options = await translate_batch(
+                    next_question["options"], user_language
+                )
 
                 return {
                     "response": response_text,
@@ -1419,7 +1467,7 @@ def handle_date_question(
                     if isinstance(next_question, str)
                     else next_question.get("question", "")
                 )
-                response_text = translate_text(
+                response_text = await translate_text(
                     f"Thanks! 😊 Let's continue with {next_question_text}",
                     user_language,
                 )
@@ -1430,10 +1478,9 @@ def handle_date_question(
         else:
             # All questions answered
             try:
-                with open("user_responses.json", "w") as file:
-                    json.dump(responses, file, indent=4)
+                record_completion(responses)
 
-                completion_msg = translate_text(
+                completion_msg = await translate_text(
                     "Thank you for using Insura! 🎉 Your responses have been recorded. Feel free to ask any other questions. Have a great day!",
                     user_language,
                 )
@@ -1443,7 +1490,7 @@ def handle_date_question(
                     "language": user_language,
                 }
             except Exception as e:
-                error_msg = translate_text(
+                error_msg = await translate_text(
                     f"An error occurred while saving your responses: {str(e)}",
                     user_language,
                 )
@@ -1456,17 +1503,22 @@ def handle_date_question(
         general_assistant_prompt = (
             f"user response: {user_message}. Please assist them in {user_language}."
         )
-        general_assistant_response = llm.invoke([
-            SystemMessage(
-                content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-            ),
-            HumanMessage(content=general_assistant_prompt),
-        ])
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
 
-        example_msg = translate_text(
+        example_msg = await translate_text(
             "Please provide the date in the format DD/MM/YYYY.", user_language
         )
-        retry_msg = translate_text(f"Let's try again: {question}", user_language)
+        retry_msg = await translate_text(f"Let's try again: {question}", user_language)
 
         return {
             "response": (f"{general_assistant_response.content.strip()} \n\n"),
@@ -1476,7 +1528,7 @@ def handle_date_question(
         }
 
 
-def handle_adiviosr_code(
+async def handle_adiviosr_code(
     question,
     user_message,
     responses,
@@ -1486,6 +1538,7 @@ def handle_adiviosr_code(
 ):
     from services.llm_services import (
         validate_response_multilingual,
+        translate_batch,
         translate_text,
     )
 
@@ -1493,7 +1546,7 @@ def handle_adiviosr_code(
     first_question = "Please enter your Insurance Advisor code for assigning your enquiry for further assistance"
 
     # Use multilingual validation
-    validation_result = validate_response_multilingual(
+    validation_result = await validate_response_multilingual(
         user_message, valid_options, user_language
     )
 
@@ -1515,7 +1568,7 @@ def handle_adiviosr_code(
             next_question = questions[conversation_state["current_question_index"]]
 
             # Translate response to user's language
-            response_msg = translate_text(
+            response_msg = await translate_text(
                 f"Thank you for the responses! 👍 Now, {next_question}", user_language
             )
             return {
@@ -1538,17 +1591,16 @@ def handle_adiviosr_code(
                 )
 
                 # Translate response to user's language
-                response_text = translate_text(
+                response_text = await translate_text(
                     f"Thank you for your response! 😊 Now, let's move on to: {next_questions}",
                     user_language,
                 )
 
                 # Handle options if they exist
                 if isinstance(next_question, dict) and "options" in next_question:
-                    translated_options = [
-                        translate_text(opt, user_language)
-                        for opt in next_question["options"]
-                    ]
+                    translated_options = await translate_batch(
+                        next_question["options"], user_language
+                    )
                     return {
                         "response": response_text,
                         "options": ", ".join(translated_options),
@@ -1561,8 +1613,8 @@ def handle_adiviosr_code(
             else:
                 # All predefined questions have been answered
                 if responses.get("Do you have an Insurance Advisor code?") == "Yes":
-                    medical_deatil_response = fetching_medical_detail(responses)
-                    completion_msg = translate_text(
+                    medical_deatil_response = await fetching_medical_detail(responses)
+                    completion_msg = await translate_text(
                         f"Thank you for sharing the details! 🎉 We will inform the agent to assist you further with your enquiry. Please find the link below to view your quotation: {medical_deatil_response}",
                         user_language,
                     )
@@ -1571,10 +1623,9 @@ def handle_adiviosr_code(
                         "language": user_language,
                     }
 
-                with open("user_responses.json", "w") as file:
-                    json.dump(responses, file, indent=4)
+                record_completion(responses)
 
-                no_agent_msg = translate_text(
+                no_agent_msg = await translate_text(
                     "Since you don't have an agent code, we will arrange a callback from the next available agent to assist you further. Thank you! 📞",
                     user_language,
                 )
@@ -1587,14 +1638,21 @@ def handle_adiviosr_code(
         general_assistant_prompt = (
             f"user response: {user_message}. Please assist them in {user_language}."
         )
-        general_assistant_response = llm.invoke([
-            SystemMessage(
-                content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-            ),
-            HumanMessage(content=general_assistant_prompt),
-        ])
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
 
-        retry_question = translate_text(f"Let's try again: {question}", user_language)
+        retry_question = await translate_text(
+            f"Let's try again: {question}", user_language
+        )
         return {
             "response": (f"{general_assistant_response.content.strip()} \n\n"),
             "question": retry_question,
@@ -1602,7 +1660,7 @@ def handle_adiviosr_code(
         }
 
 
-def handle_emirate_upload_document(
+async def handle_emirate_upload_document(
     user_message,
     conversation_state,
     questions,
@@ -1612,6 +1670,7 @@ def handle_emirate_upload_document(
 ):
     from services.llm_services import (
         validate_response_multilingual,
+        translate_batch,
         translate_text,
     )
 
@@ -1631,7 +1690,7 @@ def handle_emirate_upload_document(
     }
 
     # Use multilingual validation instead of direct string matching
-    validation_result = validate_response_multilingual(
+    validation_result = await validate_response_multilingual(
         user_message, valid_options, user_language
     )
 
@@ -1639,19 +1698,24 @@ def handle_emirate_upload_document(
         general_assistant_prompt = (
             f"user response: {user_message}. Please assist them in {user_language}."
         )
-        general_assistant_response = llm.invoke([
-            SystemMessage(
-                content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-            ),
-            HumanMessage(content=general_assistant_prompt),
-        ])
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
         next_question = questions[conversation_state["current_question_index"]]
         if isinstance(next_question, dict) and "options" in next_question:
             options = next_question["options"]
-            retry_question = translate_text(
+            retry_question = await translate_text(
                 f"Let's try again: {next_question['question']}", user_language
             )
-            translated_options = [translate_text(opt, user_language) for opt in options]
+            translated_options = await translate_batch(options, user_language)
             return {
                 "response": f"{general_assistant_response.content.strip()}",
                 "question": retry_question,
@@ -1662,12 +1726,10 @@ def handle_emirate_upload_document(
             question_text = (
                 question["question"] if isinstance(question, dict) else question
             )
-            retry_question = translate_text(
+            retry_question = await translate_text(
                 f"Let's try again: {question_text}", user_language
             )
-            translated_options = [
-                translate_text(opt, user_language) for opt in valid_options
-            ]
+            translated_options = await translate_batch(valid_options, user_language)
             return {
                 "response": f"{general_assistant_response.content.strip()}",
                 "question": f"{retry_question}\nPlease choose from the following options: {', '.join(translated_options)}",
@@ -1706,7 +1768,7 @@ def handle_emirate_upload_document(
         )
 
         # Translate response to user's language
-        response_msg = translate_text(
+        response_msg = await translate_text(
             f"Thank you for the responses! 📄 Now, {next_question_text}", user_language
         )
         return {
@@ -1747,17 +1809,16 @@ def handle_emirate_upload_document(
             )
 
             # Translate response to user's language
-            response_text = translate_text(
+            response_text = await translate_text(
                 f"Thank you for your response! 😊 Now, let's move on to: {next_question_text}",
                 user_language,
             )
 
             # Add options if they exist
             if isinstance(next_question, dict) and "options" in next_question:
-                translated_options = [
-                    translate_text(opt, user_language)
-                    for opt in next_question["options"]
-                ]
+                translated_options = await translate_batch(
+                    next_question["options"], user_language
+                )
                 return {
                     "response": response_text,
                     "options": ", ".join(translated_options),
@@ -1771,8 +1832,7 @@ def handle_emirate_upload_document(
         # Handle end of questions
         else:
             try:
-                with open("user_responses.json", "w") as file:
-                    json.dump(responses, file, indent=4)
+                record_completion(responses)
                 return {
                     "response": "Thank you for using Insura. Your responses have been recorded. "
                     "Feel free to ask any other questions. Have a great day!",
@@ -1913,8 +1973,7 @@ def handle_emaf_document(
     # Handle end of questions
     else:
         try:
-            with open("user_responses.json", "w") as file:
-                json.dump(responses, file, indent=4)
+            record_completion(responses)
             return {
                 "response": "Thank you for using Insura. Your responses have been recorded. "
                 "Feel free to ask any other questions. Have a great day!",
@@ -1927,7 +1986,7 @@ def handle_emaf_document(
             }
 
 
-def handle_emirate_upload_document_car_insurance(
+async def handle_emirate_upload_document_car_insurance(
     user_message,
     conversation_state,
     questions,
@@ -1938,6 +1997,7 @@ def handle_emirate_upload_document_car_insurance(
     from services.llm_services import (
         format_response_in_language,
         validate_response_multilingual,
+        translate_batch,
         translate_text,
     )
 
@@ -1957,7 +2017,7 @@ def handle_emirate_upload_document_car_insurance(
     }
 
     # Use multilingual validation instead of direct string matching
-    validation_result = validate_response_multilingual(
+    validation_result = await validate_response_multilingual(
         user_message, valid_options, user_language
     )
 
@@ -1965,19 +2025,24 @@ def handle_emirate_upload_document_car_insurance(
         general_assistant_prompt = (
             f"user response: {user_message}. Please assist them in {user_language}."
         )
-        general_assistant_response = llm.invoke([
-            SystemMessage(
-                content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
-            ),
-            HumanMessage(content=general_assistant_prompt),
-        ])
+        general_assistant_response = await cached_reply(
+            llm,
+            [
+                SystemMessage(
+                    content=f"You are Insura, a friendly Insurance assistant created by CloudSubset. Respond in {user_language}. Your role is to assist with any inquiries using your vast knowledge base. Provide helpful, accurate, and user-friendly responses to all questions or requests. Do not mention being a large language model; you are Insura."
+                ),
+                HumanMessage(content=general_assistant_prompt),
+            ],
+            user_message,
+            user_language,
+        )
         next_question = questions[conversation_state["current_question_index"]]
         if isinstance(next_question, dict) and "options" in next_question:
             options = next_question["options"]
-            retry_question = translate_text(
+            retry_question = await translate_text(
                 f"Let's try again: {next_question['question']}", user_language
             )
-            translated_options = [translate_text(opt, user_language) for opt in options]
+            translated_options = await translate_batch(options, user_language)
             return {
                 "response": f"{general_assistant_response.content.strip()}",
                 "question": retry_question,
@@ -1987,12 +2052,10 @@ def handle_emirate_upload_document_car_insurance(
             question_text = (
                 question["question"] if isinstance(question, dict) else question
             )
-            retry_question = translate_text(
+            retry_question = await translate_text(
                 f"Let's try again: {question_text}", user_language
             )
-            translated_options = [
-                translate_text(opt, user_language) for opt in valid_options
-            ]
+            translated_options = await translate_batch(valid_options, user_language)
             return {
                 "response": f"{general_assistant_response.content.strip()}",
                 "question": f"{retry_question}\nPlease choose from the following options: {', '.join(translated_options)}",
@@ -2029,7 +2092,7 @@ def handle_emirate_upload_document_car_insurance(
             else next_question
         )
         response_message = f"Thank you for the responses! Now, {next_question_text}"
-        return format_response_in_language(response_message, [], user_language)
+        return await format_response_in_language(response_message, [], user_language)
 
     # Handle "No" path
     elif matched_value == "No":
@@ -2067,22 +2130,25 @@ def handle_emirate_upload_document_car_insurance(
             # Add options if they exist
             if isinstance(next_question, dict) and "options" in next_question:
                 options = next_question["options"]
-                return format_response_in_language(
+                return await format_response_in_language(
                     response_text, options, user_language
                 )
-            return format_response_in_language(response_text, [], user_language)
+            return await format_response_in_language(response_text, [], user_language)
 
         # Handle end of questions
         else:
             try:
-                with open("user_responses.json", "w") as file:
-                    json.dump(responses, file, indent=4)
+                record_completion(responses)
                 final_message = "Thank you for using Insura. Your responses have been recorded. Feel free to ask any other questions. Have a great day!"
-                result = format_response_in_language(final_message, [], user_language)
+                result = await format_response_in_language(
+                    final_message, [], user_language
+                )
                 result["final_responses"] = responses
                 return result
             except Exception as e:
                 error_message = (
                     f"An error occurred while saving your responses: {str(e)}"
                 )
-                return format_response_in_language(error_message, [], user_language)
+                return await format_response_in_language(
+                    error_message, [], user_language
+                )